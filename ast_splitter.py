@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from cache_manager import LRUCache
 from config import CHUNK_OVERLAP, CHUNK_SIZE
 from logger import get_logger
+from parse_cache import content_hash, get_parse_cache
+from parser_pool import get_parser_pool, thread_parser
+from ts_queries import get_top_level_query, run_captures
 
 logger = get_logger()
 
@@ -71,60 +76,31 @@ NAME_FIELD: dict[str, str] = {
     "ruby": "name",
 }
 
-_parsers: dict[str, Any] = {}
+# Number of recently split files whose source, tree and per-node chunks are
+# retained for incremental reparsing.
+INCREMENTAL_STATE_CAPACITY = 128
+# Bytes compared per step when looking for the unchanged prefix and suffix of
+# an edited file
+EDIT_COMPARE_BLOCK = 4096
 
 
 def _get_parser(language: str) -> Any | None:
-    if language in _parsers:
-        return _parsers[language]
-
-    try:
-        from tree_sitter import Language, Parser
-
-        if language == "python":
-            import tree_sitter_python as mod
-        elif language == "javascript":
-            import tree_sitter_javascript as mod
-        elif language == "typescript":
-            import tree_sitter_typescript as mod
-
-            lang = Language(mod.language_typescript())
-            parser = Parser(lang)
-            _parsers[language] = parser
-            return parser
-        elif language == "tsx":
-            import tree_sitter_typescript as mod
-
-            lang = Language(mod.language_tsx())
-            parser = Parser(lang)
-            _parsers[language] = parser
-            return parser
-        elif language == "java":
-            import tree_sitter_java as mod
-        elif language == "go":
-            import tree_sitter_go as mod
-        elif language == "rust":
-            import tree_sitter_rust as mod
-        elif language == "ruby":
-            import tree_sitter_ruby as mod
-        else:
-            return None
+    """
+    Returns a parser owned by the calling thread. Parsers are not thread-safe;
+    code that parses should prefer `get_parser_pool().checkout(language)`.
+    """
+    return thread_parser(language)
 
-        lang = Language(mod.language())
-        parser = Parser(lang)
-        _parsers[language] = parser
-        return parser
 
-    except Exception as e:
-        logger.warning(f"Could not load tree-sitter parser for {language}: {e}")
-        _parsers[language] = None
-        return None
+def _node_text(node: Any, source: bytes) -> str:
+    """Decodes a node's text from a slice of the shared source buffer."""
+    return source[node.start_byte : node.end_byte].decode("utf-8", errors="replace")
 
 
 def _get_node_name(node: Any, source: bytes) -> str:
     for child in node.children:
         if child.type == "identifier" or child.type == "name":
-            return child.text.decode("utf-8", errors="replace")
+            return _node_text(child, source)
     if node.start_byte < len(source):
         first_line = source[node.start_byte : node.start_byte + 80].decode(
             "utf-8", errors="replace"
@@ -144,7 +120,7 @@ def _extract_class_chunks(
     class_name = _get_node_name(class_node, source)
     method_types = METHOD_NODES.get(language, [])
 
-    class_text = class_node.text.decode("utf-8", errors="replace")
+    class_text = _node_text(class_node, source)
     body_node = None
     for child in class_node.children:
         if child.type in ("block", "class_body", "declaration_list"):
@@ -171,7 +147,7 @@ def _extract_class_chunks(
         if child.type in method_types:
             has_methods = True
             method_name = _get_node_name(child, source)
-            method_text = child.text.decode("utf-8", errors="replace")
+            method_text = _node_text(child, source)
             context_prefix = f"# Class: {class_name}\n"
             full_text = context_prefix + method_text
             chunks.extend(
@@ -250,36 +226,212 @@ def _make_text_chunks(
     return result
 
 
+def _point_at(data: bytes, offset: int) -> tuple[int, int]:
+    row = data.count(b"\n", 0, offset)
+    col = offset - (data.rfind(b"\n", 0, offset) + 1)
+    return row, col
+
+
+def _common_prefix(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common prefix of a and b, at most limit."""
+    # Whole blocks are compared in C; only the first differing block is bisected
+    start = 0
+    while start < limit:
+        end = min(start + EDIT_COMPARE_BLOCK, limit)
+        if a[start:end] != b[start:end]:
+            break
+        start = end
+    else:
+        return limit
+    lo, hi = start, min(start + EDIT_COMPARE_BLOCK, limit)
+    # a[:lo] == b[:lo] and a[:hi] != b[:hi]
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _common_suffix(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common suffix of a and b, at most limit."""
+    len_a, len_b = len(a), len(b)
+    size = 0
+    while size < limit:
+        step = min(EDIT_COMPARE_BLOCK, limit - size)
+        if a[len_a - size - step : len_a - size] != b[len_b - size - step : len_b - size]:
+            break
+        size += step
+    else:
+        return limit
+    lo, hi = size, min(size + EDIT_COMPARE_BLOCK, limit)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[len_a - mid : len_a - lo] == b[len_b - mid : len_b - lo]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _compute_edit(old: bytes, new: bytes) -> dict[str, Any] | None:
+    """
+    Describes the change from old to new as a single tree-sitter edit
+    (common prefix and suffix are kept, the middle is replaced).
+
+    Returns:
+        Keyword arguments for Tree.edit(), or None if the sources are identical
+    """
+    if old == new:
+        return None
+    limit = min(len(old), len(new))
+    start = _common_prefix(old, new, limit)
+    suffix = _common_suffix(old, new, limit - start)
+    old_end = len(old) - suffix
+    new_end = len(new) - suffix
+    return {
+        "start_byte": start,
+        "old_end_byte": old_end,
+        "new_end_byte": new_end,
+        "start_point": _point_at(old, start),
+        "old_end_point": _point_at(old, old_end),
+        "new_end_point": _point_at(new, new_end),
+    }
+
+
+def _shift_chunks(chunks: list[dict[str, Any]], delta: int) -> list[dict[str, Any]]:
+    if delta == 0:
+        return chunks
+    shifted = []
+    for chunk in chunks:
+        meta = dict(chunk["metadata"])
+        meta["line_start"] += delta
+        meta["line_end"] += delta
+        shifted.append({"text": chunk["text"], "metadata": meta})
+    return shifted
+
+
+@dataclass
+class _SplitState:
+    """What the splitter remembers about the last version of a file it split."""
+
+    language: str
+    source: bytes
+    tree: Any
+    # (node type, node content hash) -> (node start line, chunks built for it)
+    node_chunks: dict[tuple[str, str], tuple[int, list[dict[str, Any]]]] = field(
+        default_factory=dict
+    )
+
+
 class ASTSplitter:
     def __init__(self) -> None:
         self._text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
         )
-
-    def split(self, content: str, file_path: Path) -> list[dict[str, Any]]:
+        self._states = LRUCache(INCREMENTAL_STATE_CAPACITY)
+        self.full_parses = 0
+        self.incremental_parses = 0
+        self.reused_nodes = 0
+        self.rechunked_nodes = 0
+
+    def split(self, content: str, file_path: Path, retain: bool = True) -> list[dict[str, Any]]:
+        """
+        Splits a file's content into AST-aware chunks.
+
+        Args:
+            content: Source text
+            file_path: File the content belongs to (language and chunk source)
+            retain: Keep the tree for incremental reparsing of the next version;
+                False for partial content such as a window of a streamed file
+
+        Returns:
+            Chunks with text and metadata
+        """
         language = LANGUAGE_MAP.get(file_path.suffix.lower())
         if language:
-            parser = _get_parser(language)
-            if parser:
-                try:
-                    return self._split_by_ast(content, language, parser, file_path)
-                except Exception as e:
-                    logger.warning(f"AST split failed for {file_path}, falling back: {e}")
+            with get_parser_pool().checkout(language) as parser:
+                if parser:
+                    try:
+                        return self._split_by_ast(content, language, parser, file_path, retain)
+                    except Exception as e:
+                        logger.warning(f"AST split failed for {file_path}, falling back: {e}")
 
         return self._split_by_text(content, file_path)
 
+    def get_stats(self) -> dict[str, int]:
+        """Returns parse and re-chunking counters for this splitter."""
+        return {
+            "full_parses": self.full_parses,
+            "incremental_parses": self.incremental_parses,
+            "reused_nodes": self.reused_nodes,
+            "rechunked_nodes": self.rechunked_nodes,
+            "retained_files": self._states.get_stats()["size"],
+        }
+
+    def _parse(
+        self, source: bytes, language: str, parser: Any, file_path: Path
+    ) -> tuple[Any, list[tuple[int, int]] | None, _SplitState | None]:
+        """
+        Parses source, incrementally when the previous version of the file is retained.
+
+        Returns:
+            (tree, dirty byte ranges in the new source or None if unknown, previous state)
+        """
+        cache = get_parse_cache()
+        prev: _SplitState | None = self._states.get(str(file_path))
+        if prev is not None and prev.language != language:
+            prev = None
+
+        cached = cache.get(file_path, source, language).tree
+        if cached is not None:
+            return cached, None if prev is None or prev.source != source else [], prev
+
+        edit = _compute_edit(prev.source, source) if prev is not None else None
+        if prev is not None and edit is None:
+            tree, dirty = prev.tree, []
+        elif prev is not None and edit is not None:
+            old_tree = prev.tree.copy()
+            old_tree.edit(**edit)
+            tree = parser.parse(source, old_tree)
+            # changed_ranges() only reports structural changes; an edit inside a
+            # single token keeps the structure, so the edited span is dirty too.
+            dirty = [(r.start_byte, r.end_byte) for r in old_tree.changed_ranges(tree)]
+            dirty.append((edit["start_byte"], edit["new_end_byte"]))
+            self.incremental_parses += 1
+        else:
+            tree, dirty = parser.parse(source), None
+            self.full_parses += 1
+
+        cache.put_tree(file_path, source, language, tree)
+        return tree, dirty, prev
+
     def _split_by_ast(
-        self, content: str, language: str, parser: Any, file_path: Path
+        self, content: str, language: str, parser: Any, file_path: Path, retain: bool = True
     ) -> list[dict[str, Any]]:
         source = content.encode("utf-8")
-        tree = parser.parse(source)
+        if retain:
+            tree, dirty, prev = self._parse(source, language, parser, file_path)
+        else:
+            tree, dirty, prev = parser.parse(source), None, None
+            self.full_parses += 1
         root = tree.root_node
+        state = _SplitState(language=language, source=source, tree=tree)
+        if retain:
+            self._states.put(str(file_path), state)
 
         top_types = TOP_LEVEL_NODES.get(language, [])
         chunks: list[dict[str, Any]] = []
-        covered_ranges: list[tuple[int, int]] = []
+        covered_starts: set[int] = set()
 
-        for node in root.children:
+        query = get_top_level_query(language, parser, top_types)
+        if query is not None:
+            definitions = run_captures(query, root, max_start_depth=0).get("definition", [])
+        else:
+            definitions = [node for node in root.children if node.type in top_types]
+
+        for node in definitions:
             actual_node = node
             if node.type == "decorated_definition":
                 for child in node.children:
@@ -293,46 +445,55 @@ class ASTSplitter:
                         actual_node = child
                         break
 
-            if actual_node.type not in top_types and node.type not in top_types:
-                continue
-
-            node_text = node.text.decode("utf-8", errors="replace") if node.text else ""
-            if not node_text.strip():
+            node_bytes = source[node.start_byte : node.end_byte]
+            if not node_bytes.strip():
                 continue
+            node_text = node_bytes.decode("utf-8", errors="replace")
 
-            covered_ranges.append((node.start_byte, node.end_byte))
+            covered_starts.add(node.start_byte)
 
-            if actual_node.type == "class_definition" or actual_node.type == "class_declaration":
-                chunks.extend(
-                    _extract_class_chunks(
-                        actual_node, source, language, file_path, self._text_splitter
-                    )
+            key = (node.type, content_hash(node_bytes))
+            start_line = node.start_point[0]
+            clean = dirty is None or not any(
+                s <= node.end_byte and node.start_byte <= e for s, e in dirty
+            )
+            if prev is not None and clean and key in prev.node_chunks:
+                old_line, old_chunks = prev.node_chunks[key]
+                node_chunks = _shift_chunks(old_chunks, start_line - old_line)
+                self.reused_nodes += 1
+            elif actual_node.type == "class_definition" or actual_node.type == "class_declaration":
+                node_chunks = _extract_class_chunks(
+                    actual_node, source, language, file_path, self._text_splitter
                 )
+                self.rechunked_nodes += 1
             else:
                 symbol_name = _get_node_name(actual_node, source)
-                chunks.extend(
-                    _make_text_chunks(
-                        node_text,
-                        str(file_path),
-                        "function",
-                        symbol_name,
-                        None,
-                        node.start_point[0] + 1,
-                        node.end_point[0] + 1,
-                        self._text_splitter,
-                    )
+                node_chunks = _make_text_chunks(
+                    node_text,
+                    str(file_path),
+                    "function",
+                    symbol_name,
+                    None,
+                    start_line + 1,
+                    node.end_point[0] + 1,
+                    self._text_splitter,
                 )
+                self.rechunked_nodes += 1
+
+            state.node_chunks[key] = (start_line, node_chunks)
+            chunks.extend(node_chunks)
 
         if not chunks:
             return self._split_by_text(content, file_path)
 
+        # Definitions are direct children of the root, so coverage is a set lookup.
         module_lines = []
         for node in root.children:
-            is_covered = any(s <= node.start_byte < e for s, e in covered_ranges)
-            if not is_covered and node.text:
-                line = node.text.decode("utf-8", errors="replace").strip()
-                if line:
-                    module_lines.append(line)
+            if node.start_byte in covered_starts:
+                continue
+            line = _node_text(node, source).strip()
+            if line:
+                module_lines.append(line)
 
         if module_lines:
             module_text = "\n".join(module_lines)
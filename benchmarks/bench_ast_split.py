@@ -0,0 +1,76 @@
+"""
+Benchmarks per-file AST splitting and tree-sitter complexity analysis.
+
+Every iteration uses a fresh splitter and an empty parse cache, so the numbers
+measure cold parse + chunk extraction rather than cache hits.
+
+Usage:
+    python benchmarks/bench_ast_split.py [path ...] [--repeat N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ast_splitter import LANGUAGE_MAP, ASTSplitter  # noqa: E402
+from code_intelligence import compute_file_complexity_ast  # noqa: E402
+from parse_cache import get_parse_cache  # noqa: E402
+
+
+def _collect(paths: list[Path]) -> list[Path]:
+    files: list[Path] = []
+    for path in paths:
+        if path.is_file():
+            files.append(path)
+            continue
+        for candidate in sorted(path.rglob("*")):
+            if candidate.suffix.lower() in LANGUAGE_MAP and ".venv" not in candidate.parts:
+                files.append(candidate)
+    return files
+
+
+def _time_per_file(files: list[Path], repeat: int, fn: Callable[[Path], object]) -> list[float]:
+    per_file: list[float] = []
+    for path in files:
+        samples: list[float] = []
+        for _ in range(repeat):
+            get_parse_cache().clear()
+            start = time.perf_counter()
+            fn(path)
+            samples.append(time.perf_counter() - start)
+        per_file.append(statistics.median(samples))
+    return per_file
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("paths", nargs="*", type=Path, default=[Path(".")])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    files = _collect(args.paths)
+    if not files:
+        print("No supported source files found.")
+        return
+    contents = {path: path.read_text(encoding="utf-8", errors="replace") for path in files}
+    total_kb = sum(len(c) for c in contents.values()) / 1024
+
+    split_times = _time_per_file(files, args.repeat, lambda p: ASTSplitter().split(contents[p], p))
+    complexity_times = _time_per_file(files, args.repeat, compute_file_complexity_ast)
+
+    print(f"{len(files)} files, {total_kb:.0f} KB, median of {args.repeat} runs per file")
+    for label, times in (("split", split_times), ("complexity", complexity_times)):
+        print(
+            f"{label:>10}: total {sum(times) * 1000:8.1f} ms | "
+            f"mean {statistics.mean(times) * 1000:6.2f} ms/file | "
+            f"max {max(times) * 1000:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmarks ignore-pattern matching over a synthetic tree.
+
+Compares the previous per-file loop (a substring test per pattern, as in the old
+`should_index_file`, which ignores glob syntax entirely), a per-pattern fnmatch
+loop over each path component, and the compiled `IgnoreMatcher`.
+
+Usage:
+    python benchmarks/bench_ignore.py [--patterns N] [--paths N] [--repeat N]
+"""
+
+import argparse
+import fnmatch
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ignore_matcher import IgnoreMatcher  # noqa: E402
+
+_DIRS = ["src", "lib", "app", "pkg", "core", "utils", "api", "web", "tests", "docs"]
+_EXTS = [".py", ".js", ".ts", ".md", ".json", ".go", ".rs", ".css", ".min.js", ".lock"]
+
+
+def _make_patterns(count: int, rng: random.Random) -> list[str]:
+    patterns = ["node_modules", "*.min.js", "*.lock", "coverage/", "/build", "docs/**/*.png"]
+    while len(patterns) < count:
+        kind = rng.randrange(4)
+        token = f"gen{len(patterns)}"
+        if kind == 0:
+            patterns.append(token)
+        elif kind == 1:
+            patterns.append(f"*.{token}")
+        elif kind == 2:
+            patterns.append(f"{rng.choice(_DIRS)}/{token}/")
+        else:
+            patterns.append(f"{token}_*.tmp")
+    return patterns
+
+
+def _make_paths(count: int, rng: random.Random) -> list[str]:
+    paths = []
+    for i in range(count):
+        depth = rng.randint(1, 5)
+        parts = [rng.choice(_DIRS) for _ in range(depth)]
+        paths.append("/".join(parts) + f"/file{i}{rng.choice(_EXTS)}")
+    return paths
+
+
+def _substring(patterns: list[str], paths: list[str]) -> int:
+    return sum(1 for path in paths if any(p in path for p in patterns))
+
+
+def _fnmatch(patterns: list[str], paths: list[str]) -> int:
+    globs = [p.strip("/") for p in patterns]
+    return sum(
+        1
+        for path in paths
+        if any(fnmatch.fnmatch(part, g) for part in path.split("/") for g in globs)
+    )
+
+
+def _compiled(patterns: list[str], paths: list[str]) -> int:
+    matcher = IgnoreMatcher(patterns)
+    return sum(1 for path in paths if matcher.is_ignored(path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--patterns", type=int, default=500)
+    parser.add_argument("--paths", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    patterns = _make_patterns(args.patterns, rng)
+    paths = _make_paths(args.paths, rng)
+
+    print(f"{len(patterns)} patterns, {len(paths)} paths, median of {args.repeat} runs")
+    for label, fn in (
+        ("substring", _substring),
+        ("fnmatch", _fnmatch),
+        ("compiled", _compiled),
+    ):
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            hits = fn(patterns, paths)
+            samples.append(time.perf_counter() - start)
+        median = statistics.median(samples)
+        print(
+            f"{label:>10}: {median * 1000:8.1f} ms | "
+            f"{median / len(paths) * 1e6:6.2f} us/path | {hits} ignored"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import time
 from collections import OrderedDict
+from collections.abc import Callable
 from pathlib import Path
 from threading import Lock
 from typing import Any
@@ -15,18 +16,20 @@ class LRUCache:
     Automatically evicts least recently used items when capacity is reached.
     """
 
-    def __init__(self, capacity: int = 100):
+    def __init__(self, capacity: int = 100, on_evict: Callable[[str, Any], None] | None = None):
         """
         Initialize LRU cache.
 
         Args:
             capacity: Maximum number of items to cache
+            on_evict: Optional callback invoked (outside the lock) with each evicted key/value
         """
         self.capacity = capacity
         self.cache: OrderedDict = OrderedDict()
         self.lock = Lock()
         self.hits = 0
         self.misses = 0
+        self.on_evict = on_evict
 
     def get(self, key: str) -> Any | None:
         """
@@ -54,16 +57,23 @@ class LRUCache:
             key: Cache key
             value: Value to cache
         """
+        evicted: tuple[str, Any] | None = None
         with self.lock:
             if key in self.cache:
                 self.cache.move_to_end(key)
             else:
                 if len(self.cache) >= self.capacity:
                     oldest_key = next(iter(self.cache))
-                    del self.cache[oldest_key]
+                    evicted = (oldest_key, self.cache.pop(oldest_key))
                     logger.debug(f"LRU cache evicted: {oldest_key}")
             self.cache[key] = value
 
+        if evicted is not None and self.on_evict is not None:
+            try:
+                self.on_evict(*evicted)
+            except Exception as e:
+                logger.debug(f"LRU eviction callback failed for {evicted[0]}: {e}")
+
     def clear(self) -> None:
         """Clears all cached items."""
         with self.lock:
@@ -1,10 +1,10 @@
 """Static code intelligence: conventions, import graph, TODOs, dependencies. No ML dependencies."""
 
 import json
-import os
 import re
 import threading
 import time
+from bisect import bisect_left
 from collections import Counter
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -14,10 +14,13 @@ from config import (
     BINARY_EXTENSIONS,
     CODE_EXTENSIONS,
     INDEXABLE_EXTENSIONS,
-    is_dir_ignored,
     safe_read_text,
 )
+from file_catalog import get_file_catalog
 from logger import get_logger
+from parse_cache import get_parse_cache
+from parser_pool import get_parser_pool
+from ts_queries import get_kinds_query, run_captures
 
 logger = get_logger()
 
@@ -71,17 +74,14 @@ class ProjectConventions:
 
 
 def _iter_code_files(root: Path, max_files: int = 5000) -> list[tuple[Path, str]]:
-    """Yields (path, extension) for code files in project. Skips ignored dirs."""
+    """Returns (path, extension) for code files in project from the file catalog. Skips ignored dirs."""
     results = []
-    for dirpath, dirs, files in os.walk(root):
-        dirs[:] = [d for d in dirs if not is_dir_ignored(d) and not d.startswith(".")]
-        for fname in files:
-            fpath = Path(dirpath) / fname
-            ext = fpath.suffix.lower()
-            if ext in INDEXABLE_EXTENSIONS and ext not in BINARY_EXTENSIONS:
-                results.append((fpath, ext))
-                if len(results) >= max_files:
-                    return results
+    for entry in get_file_catalog(root).files(skip_hidden=True):
+        ext = entry.suffix
+        if ext in INDEXABLE_EXTENSIONS and ext not in BINARY_EXTENSIONS:
+            results.append((entry.path, ext))
+            if len(results) >= max_files:
+                return results
     return results
 
 
@@ -500,9 +500,17 @@ def _build_import_graph_uncached(root: Path, max_files: int = 3000) -> dict[str,
 
         imports_raw: list[str] = []
         if ext == ".py":
-            imports_raw = _extract_imports_py(content)
+            imports_raw = get_parse_cache().derive(
+                fpath, content, "python", "imports", lambda text=content: _extract_imports_py(text)
+            )
         elif ext in (".js", ".ts", ".jsx", ".tsx"):
-            imports_raw = _extract_imports_js(content)
+            imports_raw = get_parse_cache().derive(
+                fpath,
+                content,
+                _LANGUAGE_MAP.get(ext, "javascript"),
+                "imports",
+                lambda text=content: _extract_imports_js(text),
+            )
 
         resolved = set()
         for imp in imports_raw:
@@ -1239,6 +1247,27 @@ def _get_func_name(node: Any, source: bytes) -> str:
     return first.split("\n")[0].strip()[:40]
 
 
+def _complexity_from_queries(root: Any, source: bytes, query: Any) -> list[tuple[str, int, int]]:
+    """
+    Query-based equivalent of the recursive walk: only outermost functions are
+    reported (nested ones count towards their parent), and branches are counted
+    by bisecting their start offsets instead of revisiting every subtree.
+    """
+    captured = run_captures(query, root)
+    branch_starts = [n.start_byte for n in captured.get("branch", [])]
+    results: list[tuple[str, int, int]] = []
+    outer_end = -1
+    for node in captured.get("function", []):
+        if node.start_byte < outer_end:
+            continue
+        outer_end = node.end_byte
+        branches = bisect_left(branch_starts, node.end_byte) - bisect_left(
+            branch_starts, node.start_byte
+        )
+        results.append((_get_func_name(node, source), node.start_point[0] + 1, 1 + branches))
+    return results
+
+
 def compute_file_complexity_ast(
     file_path: Path,
 ) -> list[tuple[str, int, int]]:
@@ -1254,30 +1283,39 @@ def compute_file_complexity_ast(
         return []
 
     try:
-        from ast_splitter import _get_parser
-
-        parser = _get_parser(language)
-        if not parser:
+        pool = get_parser_pool()
+        if pool.language(language) is None:
             return []
 
         source = file_path.read_bytes()
-        tree = parser.parse(source)
-        root = tree.root_node
-
-        func_types = _FUNCTION_NODES.get(language, set())
-        branch_types = _BRANCH_NODES.get(language, set())
-        results: list[tuple[str, int, int]] = []
-
-        def walk(node: Any) -> None:
-            if node.type in func_types:
-                name = _get_func_name(node, source)
-                complexity = 1 + _count_branches(node, branch_types)
-                results.append((name, node.start_point[0] + 1, complexity))
-            else:
-                for child in node.children:
-                    walk(child)
-
-        walk(root)
+        cache = get_parse_cache()
+
+        def compute() -> list[tuple[str, int, int]]:
+            func_types = _FUNCTION_NODES.get(language, set())
+            branch_types = _BRANCH_NODES.get(language, set())
+            with pool.checkout(language) as parser:
+                root = cache.tree(file_path, source, language, parser).root_node
+                query = get_kinds_query(
+                    language, "complexity", parser, {"function": func_types, "branch": branch_types}
+                )
+            if query is not None:
+                return _complexity_from_queries(root, source, query)
+
+            found: list[tuple[str, int, int]] = []
+
+            def walk(node: Any) -> None:
+                if node.type in func_types:
+                    name = _get_func_name(node, source)
+                    complexity = 1 + _count_branches(node, branch_types)
+                    found.append((name, node.start_point[0] + 1, complexity))
+                else:
+                    for child in node.children:
+                        walk(child)
+
+            walk(root)
+            return found
+
+        results = cache.derive(file_path, source, language, "complexity", compute)
         return sorted(results, key=lambda x: x[2], reverse=True)
 
     except Exception as e:
@@ -1,32 +1,94 @@
-import os
-from collections.abc import Callable
+import functools
+import threading
+import time
+import uuid
+from collections.abc import Callable, Collection
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import asdict
 from pathlib import Path
+from typing import Any
 
 from ast_splitter import ASTSplitter
 from config import (
     BATCH_SIZE,
     BINARY_EXTENSIONS,
     INDEXABLE_EXTENSIONS,
+    get_auto_exclude_mode,
+    get_embed_minify_mode,
+    get_git_change_detection,
+    get_index_priority,
     get_max_file_size_bytes,
     get_max_memory_bytes,
+    get_max_stream_file_size_bytes,
     is_dir_ignored,
     safe_read_text,
 )
-from incremental_indexing import IndexMetadata
+from embedding_minifier import EmbeddingMinifier, approx_token_count
+from file_catalog import get_file_catalog
+from file_classifier import ExclusionReport, classify
+from git_changes import GitChanges, GitIndexState, capture_state, detect_changes
+from git_changes import save_state as save_git_state
+from ignore_matcher import IgnoreMatcher, compile_patterns, relative_posix
+from incremental_indexing import IndexCheckpoint, IndexMetadata
+from index_priority import prioritize
+from indexing_telemetry import IndexTelemetry, save_run
 from logger import get_logger
 from memory_limited_indexer import MemoryLimitedIndexer
+from resource_policy import throttle, throttle_run
+from streaming_splitter import StreamingSplitter, iter_segments
 from vector_store_manager import VectorStoreManager
 
 logger = get_logger()
 
-# Maximum files to index in a single index_all operation
-# This prevents extremely long operations that can cause timeouts
-MAX_FILES_PER_INDEX = 5000
+# index_all checkpoints its progress after every N files
+CHECKPOINT_BATCH_FILES = 200
 
 # Progress reporting interval (every N files)
 PROGRESS_REPORT_INTERVAL = 100
 
 BatchUpsertCallback = Callable[[list[str], list[dict], list[str]], None]
+IndexProgressCallback = Callable[[str, IndexCheckpoint | None], None]
+IndexMethod = Callable[..., str]
+
+
+def _as_matcher(ignore_patterns: Collection[str] | IgnoreMatcher) -> IgnoreMatcher:
+    """Compiled form of ignore patterns (cached per distinct collection)."""
+    if isinstance(ignore_patterns, IgnoreMatcher):
+        return ignore_patterns
+    return compile_patterns(ignore_patterns)
+
+
+def _recorded(kind: str) -> Callable[[IndexMethod], IndexMethod]:
+    """
+    Serializes calls of an indexing method and records each one as a
+    telemetry run (see indexing_telemetry) and a throttle run (see
+    resource_policy).
+    """
+
+    def decorate(method: IndexMethod) -> IndexMethod:
+        @functools.wraps(method)
+        def wrapper(self: "CodebaseIndexer", *args: Any, **kwargs: Any) -> str:
+            with self.index_lock:
+                if self.telemetry is not None:
+                    # Nested call (index_changed -> index_paths): part of the outer run
+                    return method(self, *args, **kwargs)
+                root = args[0] if args and isinstance(args[0], Path) else kwargs.get("root_dir", "")
+                self.telemetry = IndexTelemetry(kind, str(root))
+                result = ""
+                try:
+                    with throttle_run():
+                        result = method(self, *args, **kwargs)
+                    return result
+                except Exception as e:
+                    result = f"failed: {e}"
+                    raise
+                finally:
+                    telemetry, self.telemetry = self.telemetry, None
+                    save_run(telemetry.finish(result))
+
+        return wrapper
+
+    return decorate
 
 
 class CodebaseIndexer:
@@ -35,6 +97,14 @@ class CodebaseIndexer:
     Encapsulates file scanning, chunking, and indexing logic.
     """
 
+    # Held for the duration of an index_all / index_changed / index_paths call.
+    # The job worker, the file watcher and direct tool calls share the index
+    # metadata, the staging collection and the run state below, so runs never
+    # overlap; a nested call from the same thread re-enters.
+    index_lock = threading.RLock()
+    # Set for the duration of an index_all / index_changed / index_paths call
+    telemetry: IndexTelemetry | None = None
+
     def __init__(self, vector_store: VectorStoreManager):
         """
         Initialize codebase indexer.
@@ -44,6 +114,13 @@ class CodebaseIndexer:
         """
         self.vector_store = vector_store
         self.splitter = ASTSplitter()
+        self.minifier = EmbeddingMinifier(get_embed_minify_mode())
+
+    def _stage(self, name: str, items: int = 0) -> AbstractContextManager[None]:
+        """Times a block as a telemetry stage of the current run, if any."""
+        if self.telemetry is None:
+            return nullcontext()
+        return self.telemetry.stage(name, items)
 
     def _create_batch_upsert_callback(self) -> BatchUpsertCallback:
         """
@@ -56,21 +133,46 @@ class CodebaseIndexer:
         def batch_upsert(documents: list[str], metadatas: list[dict], ids: list[str]) -> None:
             for i in range(0, len(documents), BATCH_SIZE):
                 end = min(i + BATCH_SIZE, len(documents))
-                self.vector_store.upsert(
-                    documents=documents[i:end],
-                    metadatas=metadatas[i:end],
-                    ids=ids[i:end],
-                )
+                embeddings = None
+                embed_inputs = documents[i:end]
+                if self.minifier.enabled:
+                    with self._stage("minify", end - i):
+                        embed_inputs = self.minifier.minify_batch(
+                            documents[i:end], metadatas[i:end]
+                        )
+                    started = time.perf_counter()
+                    embeddings = self.vector_store.embed(embed_inputs)
+                    embed_seconds = time.perf_counter() - started
+                    self.minifier.stats.embed_seconds += embed_seconds
+                    if self.telemetry is not None:
+                        self.telemetry.add("embed", embed_seconds, end - i)
+                if self.telemetry is not None:
+                    self.telemetry.note_tokens(sum(approx_token_count(t) for t in embed_inputs))
+                with self._stage("upsert", end - i):
+                    self.vector_store.upsert(
+                        documents=documents[i:end],
+                        metadatas=metadatas[i:end],
+                        ids=ids[i:end],
+                        embeddings=embeddings,
+                    )
 
         return batch_upsert
 
-    def should_index_file(self, file_path: Path, ignore_patterns: set[str]) -> bool:
+    def should_index_file(
+        self,
+        file_path: Path,
+        ignore_patterns: Collection[str] | IgnoreMatcher,
+        size: int | None = None,
+    ) -> bool:
         """
         Determines if a file should be indexed.
 
         Args:
             file_path: Path to check
-            ignore_patterns: Patterns to ignore
+            ignore_patterns: .gitignore-style patterns, matched relative to the project
+                root, or a matcher already compiled from them (callers checking many
+                files compile once)
+            size: File size if already known (skips the stat call)
 
         Returns:
             True if file should be indexed
@@ -81,14 +183,14 @@ class CodebaseIndexer:
         if file_path.suffix and file_path.suffix not in INDEXABLE_EXTENSIONS:
             return False
 
-        file_str = str(file_path)
-        for pattern in ignore_patterns:
-            if pattern in file_str:
-                return False
+        matcher = _as_matcher(ignore_patterns)
+        if len(matcher) and matcher.is_ignored(relative_posix(file_path)):
+            return False
 
         try:
-            file_size = file_path.stat().st_size
-            if file_size > get_max_file_size_bytes():
+            file_size = file_path.stat().st_size if size is None else size
+            # Larger files are streamed in windows, up to the streaming limit
+            if file_size > max(get_max_file_size_bytes(), get_max_stream_file_size_bytes()):
                 logger.info(f"Skipping {file_path}: exceeds max file size")
                 return False
         except Exception:
@@ -100,38 +202,50 @@ class CodebaseIndexer:
         self,
         root_dir: Path,
         ignored_dirs: set[str],
-        ignore_patterns: set[str],
-        max_files: int = 20000,
+        ignore_patterns: Collection[str],
+        max_files: int | None = 20000,
+        exclusions: ExclusionReport | None = None,
     ) -> list[Path]:
         """
-        Scans directory tree and returns list of indexable files.
+        Returns indexable files from the shared file catalog (one cached walk of
+        the tree, already pruned of config-ignored directories). Generated,
+        minified and vendored files are left out or kept for last, depending on
+        PROJECTMIND_AUTO_EXCLUDE; they are recorded in `exclusions`.
 
         Args:
             root_dir: Root directory to scan
             ignored_dirs: Directories to skip
-            ignore_patterns: File patterns to ignore
-            max_files: Maximum files to scan (safety limit)
+            ignore_patterns: .gitignore-style patterns to ignore
+            max_files: Maximum files to scan (safety limit; None for no limit)
+            exclusions: Report that collects the classified files (created with
+                the configured mode, and discarded, if not given)
 
         Returns:
             List of indexable file paths
         """
-        indexable_files = []
+        indexable_files: list[Path] = []
+        extra_ignored = {d for d in ignored_dirs if not is_dir_ignored(d)}
+        matcher = _as_matcher(ignore_patterns)
+        report = exclusions if exclusions is not None else ExclusionReport(get_auto_exclude_mode())
 
-        for root, dirs, files in os.walk(root_dir):
-            if len(indexable_files) >= max_files:
+        for entry in get_file_catalog(root_dir).files():
+            if max_files is not None and len(indexable_files) >= max_files:
                 logger.warning(f"Scan limit reached ({max_files} files). Stopping scan.")
                 break
-
-            dirs[:] = [d for d in dirs if d not in ignored_dirs and not is_dir_ignored(d)]
-
-            for file in files:
-                if len(indexable_files) >= max_files:
-                    break
-
-                file_path = Path(root) / file
-                if self.should_index_file(file_path, ignore_patterns):
-                    indexable_files.append(file_path)
-
+            if extra_ignored and not extra_ignored.isdisjoint(entry.rel.split("/")[:-1]):
+                continue
+            if not self.should_index_file(entry.path, matcher, size=entry.size):
+                continue
+            if report.mode != "off":
+                file_class = classify(entry.path, entry.rel, entry.size, entry.mtime_ns)
+                if file_class is not None:
+                    report.add(entry.path, entry.rel, entry.size, file_class)
+                    if report.mode == "skip":
+                        continue
+            indexable_files.append(entry.path)
+
+        if report.files:
+            logger.info(f"Scan {report.summary()}")
         return indexable_files
 
     def process_file_to_chunks(self, file_path: Path, indexer: MemoryLimitedIndexer) -> bool:
@@ -145,33 +259,77 @@ class CodebaseIndexer:
         Returns:
             True if file was successfully processed
         """
-        try:
-            content = safe_read_text(file_path)
-            if not content.strip():
-                return False
+        return self._chunk_file(file_path, indexer) is not None
 
-            chunks = self.splitter.split(content, file_path)
-
-            for chunk in chunks:
-                text = chunk["text"]
-                meta = chunk["metadata"]
-                class_prefix = f"{meta['class_name']}_" if meta.get("class_name") else ""
-                chunk_id = f"{file_path}_{meta['symbol_type']}_{class_prefix}{meta['symbol_name']}_{meta['chunk_index']}"
-                indexer.add_chunk(text, meta, chunk_id)
-
-            return True
+    def _chunk_file(self, file_path: Path, indexer: MemoryLimitedIndexer) -> list[str] | None:
+        """Adds a file's chunks to the indexer; returns their ids, or None if skipped."""
+        try:
+            started = time.perf_counter()
+            size = file_path.stat().st_size
+            if size > get_max_file_size_bytes():
+                chunk_ids = self._stream_file(file_path, indexer)
+                if not chunk_ids:
+                    return None
+            else:
+                with self._stage("read"):
+                    content = safe_read_text(file_path)
+                if not content.strip():
+                    return None
+
+                with self._stage("split"):
+                    chunks = self.splitter.split(content, file_path)
+
+                chunk_ids = [self._add_chunk(file_path, chunk, indexer) for chunk in chunks]
+
+            if self.telemetry is not None:
+                self.telemetry.note_file(
+                    file_path, time.perf_counter() - started, size, len(chunk_ids)
+                )
+            return chunk_ids
         except (OSError, UnicodeDecodeError) as e:
             logger.warning(f"Skipping {file_path}: encoding error - {e}")
-            return False
+            return None
         except Exception as e:
             logger.error(f"Unexpected error processing {file_path}: {e}", exc_info=True)
-            return False
+            return None
+
+    def _add_chunk(
+        self, file_path: Path, chunk: dict[str, Any], indexer: MemoryLimitedIndexer
+    ) -> str:
+        meta = chunk["metadata"]
+        class_prefix = f"{meta['class_name']}_" if meta.get("class_name") else ""
+        chunk_id = f"{file_path}_{meta['symbol_type']}_{class_prefix}{meta['symbol_name']}_{meta['chunk_index']}"
+        indexer.add_chunk(chunk["text"], meta, chunk_id)
+        return chunk_id
+
+    def _stream_file(self, file_path: Path, indexer: MemoryLimitedIndexer) -> list[str]:
+        """
+        Chunks a file over the in-memory size limit window by window (see
+        streaming_splitter), handing each window's chunks to the indexer before
+        the next window is read.
+        """
+        streaming = StreamingSplitter(self.splitter)
+        segments = iter_segments(file_path, streaming.window_bytes)
+        next_index: dict[str, int] = {}
+        chunk_ids: list[str] = []
+        while True:
+            with self._stage("read"):
+                segment = next(segments, None)
+            if segment is None:
+                break
+            with self._stage("split"):
+                chunks = streaming.split_segment(segment, file_path, next_index)
+            chunk_ids.extend(self._add_chunk(file_path, chunk, indexer) for chunk in chunks)
+            # A large file is many windows of work; yield to tool calls between them
+            throttle()
+        logger.info(f"Streamed {file_path}: {streaming.windows} windows, {len(chunk_ids)} chunks")
+        return chunk_ids
 
     def process_file_with_metadata(
         self, file_path: Path, indexer: MemoryLimitedIndexer, metadata: IndexMetadata
     ) -> bool:
         """
-        Processes a file and updates its metadata.
+        Processes a file and records its stat, hash and chunk ids in the metadata.
 
         Args:
             file_path: File to process
@@ -181,73 +339,197 @@ class CodebaseIndexer:
         Returns:
             True if file was successfully processed
         """
-        if not self.process_file_to_chunks(file_path, indexer):
+        chunk_ids = self._chunk_file(file_path, indexer)
+        if chunk_ids is None:
             return False
 
         try:
-            mtime = file_path.stat().st_mtime
-            metadata.update_file(str(file_path), mtime)
+            metadata.record_indexed(file_path, chunk_ids)
             return True
         except Exception as e:
             logger.error(f"Error updating metadata for {file_path}: {e}")
             return False
 
+    @_recorded("full")
     def index_all(
-        self, root_dir: Path, ignored_dirs: set[str], ignore_patterns: set[str], force: bool = False
+        self,
+        root_dir: Path,
+        ignored_dirs: set[str],
+        ignore_patterns: Collection[str],
+        force: bool = False,
+        time_budget: float | None = None,
+        progress: IndexProgressCallback | None = None,
     ) -> str:
         """
-        Indexes entire codebase.
+        Indexes entire codebase as a resumable job.
+
+        The scanned file list and the progress are checkpointed in the index
+        metadata store every CHECKPOINT_BATCH_FILES files. With a time budget
+        the call returns after about that many seconds, and the next call
+        continues from the checkpoint, as does a call after an interrupted run.
 
         Args:
             root_dir: Root directory to index
             ignored_dirs: Directories to skip
-            ignore_patterns: File patterns to ignore
-            force: If True, clears existing index first
+            ignore_patterns: .gitignore-style patterns to ignore
+            force: If True, rebuilds the index from scratch (into a staging collection
+                that replaces the current one at the end) and discards an unfinished job
+            time_budget: Seconds of work before returning with a checkpoint
+                (None runs to completion)
+            progress: Called with the phase ("scanning", "indexing", "finalizing")
+                and the current checkpoint after each checkpointed batch
 
         Returns:
-            Status message with indexing stats
+            Status message with indexing stats or progress
         """
-        if force:
-            logger.info("Clearing existing index...")
-            error = self.vector_store.clear_collection()
-            if error:
-                return error
+        started = time.monotonic()
+        deadline = started + time_budget if time_budget else None
+        exclusions = ExclusionReport(get_auto_exclude_mode())
+        metadata = IndexMetadata()
+        checkpoint = metadata.load_checkpoint()
+        if checkpoint is not None and (force or checkpoint.root != str(root_dir)):
+            logger.info(f"Discarding unfinished index job {checkpoint.job_id}")
+            if checkpoint.force and not force:
+                self.vector_store.abort_rebuild()
+            checkpoint = None
+
+        if checkpoint is None:
+            if force:
+                # Searches keep using the current collection until the rebuild is complete
+                error = self.vector_store.begin_rebuild()
+                if error:
+                    return error
+            if progress:
+                progress("scanning", None)
+            logger.info("Scanning files...")
+            with self._stage("scan"):
+                git_state = capture_state(root_dir) if get_git_change_detection() else None
+                # A full index covers every file; the catalog's own cap is reported
+                files = self.scan_indexable_files(
+                    root_dir, ignored_dirs, ignore_patterns, max_files=None, exclusions=exclusions
+                )
+                # Deferred files go last and stay out of the hot set, whose
+                # entries must lead the work list (see IndexCheckpoint.hot_total)
+                deferred = [f for f in files if f in exclusions.deferred]
+                files = [f for f in files if f not in exclusions.deferred]
+                hot_total = 0
+                if get_index_priority():
+                    plan = prioritize(files, root_dir)
+                    files, hot_total = plan.order, plan.hot
+                    logger.info(f"Indexing order: {plan.summary()} first")
+                files += deferred
+            checkpoint = IndexCheckpoint(
+                job_id=uuid.uuid4().hex[:12],
+                root=str(root_dir),
+                total=len(files),
+                started_at=time.time(),
+                force=force,
+                git_state=asdict(git_state) if git_state else None,
+                hot_total=hot_total,
+            )
+            metadata.begin_job(checkpoint, files, reset=force)
+        else:
+            logger.info(
+                f"Resuming index job {checkpoint.job_id} at "
+                f"{checkpoint.cursor}/{checkpoint.total} files"
+            )
+            if checkpoint.force:
+                error = self.vector_store.begin_rebuild(resume=True)
+                if error:
+                    return error
+        if progress:
+            progress("indexing", checkpoint)
 
         max_memory = get_max_memory_bytes()
         indexer = MemoryLimitedIndexer(max_memory, self._create_batch_upsert_callback())
+        self.minifier.reset_stats()
+        logger.info(
+            f"Indexing {checkpoint.total - checkpoint.cursor} files "
+            f"(memory limit: {max_memory / 1024 / 1024:.0f} MB)..."
+        )
 
-        logger.info(f"Scanning files (memory limit: {max_memory / 1024 / 1024:.0f} MB)...")
-
-        indexable_files = self.scan_indexable_files(root_dir, ignored_dirs, ignore_patterns)
-
-        # Apply limit to prevent extremely long operations
-        total_files = len(indexable_files)
-        if total_files > MAX_FILES_PER_INDEX:
-            logger.warning(f"Limiting index to {MAX_FILES_PER_INDEX} of {total_files} files")
-            indexable_files = indexable_files[:MAX_FILES_PER_INDEX]
-
-        file_count = 0
-
-        for file_path in indexable_files:
-            if self.process_file_to_chunks(file_path, indexer):
-                file_count += 1
-            # Progress reporting
-            if file_count % PROGRESS_REPORT_INTERVAL == 0:
-                logger.info(f"Progress: {file_count}/{len(indexable_files)} files processed...")
-
-        indexer.flush()
+        checkpoint.slices += 1
+        chunks_before = checkpoint.chunks
+        elapsed_before = checkpoint.elapsed
+        out_of_time = False
+        while not out_of_time:
+            batch = metadata.job_files(checkpoint, CHECKPOINT_BATCH_FILES)
+            if not batch:
+                break
+            for seq, file_path in batch:
+                # Background jobs yield to tool calls in flight
+                throttle()
+                if file_path.is_file() and self.process_file_with_metadata(
+                    file_path, indexer, metadata
+                ):
+                    checkpoint.files_indexed += 1
+                checkpoint.cursor = seq
+                if deadline is not None and time.monotonic() >= deadline:
+                    out_of_time = True
+                    break
+            indexer.flush()
+            checkpoint.chunks = chunks_before + indexer.get_stats()["total_chunks"]
+            checkpoint.elapsed = elapsed_before + time.monotonic() - started
+            self._delete_orphaned_chunks(metadata)
+            with self._stage("metadata"):
+                metadata.save(checkpoint)
+            logger.info(f"Progress: {checkpoint.cursor}/{checkpoint.total} files processed...")
+            if progress:
+                progress("indexing", checkpoint)
+
+        batching = indexer.get_stats()
+        if self.telemetry is not None and batching["flush_wait_seconds"]:
+            self.telemetry.add("flush_wait", batching["flush_wait_seconds"])
+        logger.info(
+            f"Flushed {batching['total_batches']} batches "
+            f"(avg {batching['avg_batch_latency_s']}s, max {batching['max_batch_latency_s']}s, "
+            f"{batching['chunks_per_second']} chunks/s), final batch target "
+            f"{batching['target_batch_bytes'] / 1024:.0f} KB"
+        )
 
+        if out_of_time and not checkpoint.complete:
+            percent = 100 * checkpoint.cursor / max(checkpoint.total, 1)
+            return (
+                f"Indexing in progress: {checkpoint.cursor}/{checkpoint.total} files "
+                f"({percent:.0f}%), {checkpoint.files_indexed} indexed, {checkpoint.chunks} chunks."
+                + self._hot_set_summary(checkpoint)
+                + " Progress is checkpointed; call index_codebase() again to continue."
+            )
+
+        if progress:
+            progress("finalizing", checkpoint)
+        if checkpoint.force:
+            with self._stage("swap"):
+                error = self.vector_store.commit_rebuild()
+            if error:
+                return error
         logger.info("Rebuilding BM25 index...")
-        self.vector_store.rebuild_bm25()
-
-        stats = indexer.get_stats()
-        warning = (
-            "" if total_files <= MAX_FILES_PER_INDEX else f" (limited from {total_files} files)"
+        with self._stage("bm25"):
+            self.vector_store.rebuild_bm25()
+        metadata.finish_job()
+        if checkpoint.git_state:
+            self._record_git_state(GitIndexState(**checkpoint.git_state))
+
+        calls = f" over {checkpoint.slices} calls" if checkpoint.slices > 1 else ""
+        return (
+            f"Indexed {checkpoint.files_indexed} files ({checkpoint.chunks} chunks{calls}, "
+            f"{checkpoint.elapsed:.1f}s)."
+            + self._hot_set_summary(checkpoint)
+            + self._catalog_cap_summary(root_dir)
+            + self._exclusion_summary(exclusions)
+            + self._minify_summary()
         )
-        return f"Indexed {file_count} files ({stats['total_chunks']} chunks in {stats['total_batches']} batches){warning}."
 
+    def _hot_set_summary(self, checkpoint: IndexCheckpoint) -> str:
+        """Coverage of the prioritized hot set (processed first, see index_priority)."""
+        if not checkpoint.hot_total:
+            return ""
+        percent = 100 * checkpoint.hot_done / checkpoint.hot_total
+        return f" Hot set coverage: {checkpoint.hot_done}/{checkpoint.hot_total} files ({percent:.0f}%)."
+
+    @_recorded("changed")
     def index_changed(
-        self, root_dir: Path, ignored_dirs: set[str], ignore_patterns: set[str]
+        self, root_dir: Path, ignored_dirs: set[str], ignore_patterns: Collection[str]
     ) -> str:
         """
         Indexes only changed files (incremental indexing).
@@ -255,21 +537,54 @@ class CodebaseIndexer:
         Args:
             root_dir: Root directory to scan
             ignored_dirs: Directories to skip
-            ignore_patterns: File patterns to ignore
+            ignore_patterns: .gitignore-style patterns to ignore
 
         Returns:
             Status message with indexing stats
         """
+        unfinished = IndexMetadata().load_checkpoint()
+        if unfinished is not None:
+            # Files past the cursor have no metadata yet and would all count as changed
+            return (
+                f"A full index is in progress ({unfinished.cursor}/{unfinished.total} files); "
+                "call index_codebase() to continue it."
+            )
+
+        git_state = None
+        if get_git_change_detection():
+            changes = detect_changes(root_dir)
+            if changes is not None:
+                return self._index_git_changes(changes, ignored_dirs, ignore_patterns)
+            git_state = capture_state(root_dir)
+
         metadata = IndexMetadata()
+        exclusions = ExclusionReport(get_auto_exclude_mode())
 
-        all_files = self.scan_indexable_files(root_dir, ignored_dirs, ignore_patterns)
-        changed_files = metadata.get_changed_files(all_files)
+        with self._stage("scan"):
+            all_files = self.scan_indexable_files(
+                root_dir, ignored_dirs, ignore_patterns, exclusions=exclusions
+            )
+        with self._stage("changes", len(all_files)):
+            changed_files = metadata.get_changed_files(all_files)
+        # Deleted and newly excluded files
+        metadata.remove_deleted_files({str(f) for f in all_files})
 
         if not changed_files:
-            return "No changed files to index."
+            if self._delete_orphaned_chunks(metadata):
+                with self._stage("bm25"):
+                    self.vector_store.rebuild_bm25()
+            if metadata.dirty:
+                metadata.save()
+            self._record_git_state(git_state)
+            return (
+                "No changed files to index."
+                + self._change_scan_summary(metadata)
+                + self._exclusion_summary(exclusions)
+            )
 
         max_memory = get_max_memory_bytes()
         indexer = MemoryLimitedIndexer(max_memory, self._create_batch_upsert_callback())
+        self.minifier.reset_stats()
 
         logger.info(
             f"Found {len(changed_files)} changed files (memory limit: {max_memory / 1024 / 1024:.0f} MB)..."
@@ -285,12 +600,190 @@ class CodebaseIndexer:
 
         indexer.flush()
 
-        existing_files = {str(f) for f in all_files}
-        metadata.remove_deleted_files(existing_files)
-        metadata.save()
+        self._delete_orphaned_chunks(metadata)
+        with self._stage("metadata"):
+            metadata.save()
 
         logger.info("Rebuilding BM25 index...")
-        self.vector_store.rebuild_bm25()
+        with self._stage("bm25"):
+            self.vector_store.rebuild_bm25()
+        self._record_git_state(git_state)
+
+        stats = indexer.get_stats()
+        return (
+            f"Incrementally indexed {file_count} changed files ({stats['total_chunks']} chunks in {stats['total_batches']} batches)."
+            + self._change_scan_summary(metadata)
+            + self._exclusion_summary(exclusions)
+            + self._minify_summary()
+        )
+
+    def _index_git_changes(
+        self, changes: GitChanges, ignored_dirs: Collection[str], ignore_patterns: Collection[str]
+    ) -> str:
+        """Indexes exactly the paths git reports as changed, then records the new git state."""
+        logger.info(
+            f"Git reports {len(changes.paths)} changed paths since {changes.base[:7]} "
+            f"({changes.committed} committed, {changes.worktree_changed} in the working tree)"
+        )
+        result = self.index_paths(
+            changes.paths, ignore_patterns, ignored_dirs=ignored_dirs, check_mtime=False
+        )
+        self._record_git_state(changes.state)
+        if result.startswith("No changed files"):
+            return result
+        return f"{result} Change source: git ({changes.base[:7]}..{changes.head[:7]})."
+
+    def _record_git_state(self, state: GitIndexState | None) -> None:
+        if state is None:
+            return
+        try:
+            save_git_state(state)
+        except Exception as e:
+            logger.warning(f"Could not record git index state: {e}")
+
+    @_recorded("paths")
+    def index_paths(
+        self,
+        paths: list[Path],
+        ignore_patterns: Collection[str],
+        ignored_dirs: Collection[str] = (),
+        check_mtime: bool = True,
+    ) -> str:
+        """
+        Incrementally indexes a known set of changed paths (e.g. a file watcher
+        batch or a git diff) without scanning the project.
+
+        Args:
+            paths: Changed files or directories; missing paths are dropped from metadata
+            ignore_patterns: .gitignore-style patterns to ignore
+            ignored_dirs: Directory names to skip in addition to the configured ones
+            check_mtime: Skip files whose mtime is not newer than the indexed one
+                (False when the caller already knows the content changed)
+
+        Returns:
+            Status message with indexing stats
+        """
+        metadata = IndexMetadata()
+        unfinished = metadata.load_checkpoint()
+        if unfinished is not None:
+            # index_all will reach these files; indexing them now would race its cursor
+            return (
+                f"A full index is in progress ({unfinished.cursor}/{unfinished.total} files); "
+                "call index_codebase() to continue it."
+            )
+        candidates: list[Path] = []
+        removed = 0
+        report = ExclusionReport(get_auto_exclude_mode())
+        matcher = _as_matcher(ignore_patterns)
+        for path in paths:
+            if path.is_file():
+                rel = relative_posix(path)
+                if any(is_dir_ignored(d) or d in ignored_dirs for d in rel.split("/")[:-1]):
+                    continue
+                if not self.should_index_file(path, matcher) or (
+                    report.mode == "skip" and self._auto_excluded(path, rel, report)
+                ):
+                    # A file indexed before it was ignored or excluded
+                    removed += metadata.remove_path(path)
+                    continue
+                candidates.append(path)
+                continue
+            if path.exists():
+                continue
+            removed += metadata.remove_path(path)
+
+        with self._stage("changes", len(candidates)):
+            changed_files = metadata.get_changed_files(candidates) if check_mtime else candidates
+        if not changed_files and not removed:
+            if metadata.dirty:
+                metadata.save()
+            return (
+                "No changed files to index."
+                + (self._change_scan_summary(metadata) if check_mtime else "")
+                + self._exclusion_summary(report)
+            )
+
+        indexer = MemoryLimitedIndexer(get_max_memory_bytes(), self._create_batch_upsert_callback())
+        self.minifier.reset_stats()
+        file_count = 0
+        for file_path in changed_files:
+            if self.process_file_with_metadata(file_path, indexer, metadata):
+                file_count += 1
+        indexer.flush()
+        deleted = self._delete_orphaned_chunks(metadata)
+        with self._stage("metadata"):
+            metadata.save()
+
+        if file_count or deleted:
+            with self._stage("bm25"):
+                self.vector_store.rebuild_bm25()
 
         stats = indexer.get_stats()
-        return f"Incrementally indexed {file_count} changed files ({stats['total_chunks']} chunks in {stats['total_batches']} batches)."
+        return (
+            f"Incrementally indexed {file_count} changed files ({stats['total_chunks']} chunks), "
+            f"{removed} removed from metadata."
+            + (self._change_scan_summary(metadata) if check_mtime else "")
+            + self._exclusion_summary(report)
+            + self._minify_summary()
+        )
+
+    def _delete_orphaned_chunks(self, metadata: IndexMetadata) -> int:
+        """
+        Deletes the chunks of removed files, and those a re-indexed file no longer
+        produces, from the vector store. Runs before the metadata is saved, so a
+        crash leaves the ids recorded for the next run.
+
+        Returns:
+            Number of chunk ids deleted
+        """
+        ids = metadata.take_orphaned_chunk_ids()
+        if ids:
+            with self._stage("delete", len(ids)):
+                self.vector_store.delete(ids)
+        return len(ids)
+
+    def _auto_excluded(self, path: Path, rel: str, report: ExclusionReport) -> bool:
+        """Classifies one changed file and records it in `report` if it is excluded."""
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        file_class = classify(path, rel, st.st_size, st.st_mtime_ns)
+        if file_class is None:
+            return False
+        report.add(path, rel, st.st_size, file_class)
+        return True
+
+    def _catalog_cap_summary(self, root_dir: Path) -> str:
+        """Warns when the file catalog stopped growing, leaving files unindexed."""
+        catalog = get_file_catalog(root_dir)
+        if not catalog.capped:
+            return ""
+        return (
+            f" Warning: the file catalog is capped at {catalog.max_files} files, "
+            "so files past the cap were not indexed (add .indexignore patterns)."
+        )
+
+    def _exclusion_summary(self, report: ExclusionReport) -> str:
+        """Reports files left out (or deferred) as generated, minified or vendored."""
+        if not report.files:
+            return ""
+        summary = report.summary()
+        return f" {summary[0].upper()}{summary[1:]}."
+
+    def _change_scan_summary(self, metadata: IndexMetadata) -> str:
+        """Reports files whose stat changed but whose content hash did not (skipped work)."""
+        scan = metadata.last_scan
+        if not scan.touched_unchanged:
+            return ""
+        summary = scan.summary()
+        logger.info(summary)
+        return f" {summary[0].upper()}{summary[1:]}."
+
+    def _minify_summary(self) -> str:
+        """Returns the token/time savings of embedding-input minification for this run."""
+        if not self.minifier.enabled or not self.minifier.stats.chunks:
+            return ""
+        summary = self.minifier.stats.summary()
+        logger.info(summary)
+        return f" {summary[0].upper()}{summary[1:]}."
@@ -1,5 +1,6 @@
 import fnmatch
 import os
+import re
 import sys
 from pathlib import Path
 from typing import Any
@@ -69,6 +70,8 @@ MEMORY_FILE = AI_DIR / "memory.md"
 VECTOR_STORE_DIR = AI_DIR / "vector_store"
 INDEX_IGNORE_FILE = AI_DIR / ".indexignore"
 INDEX_METADATA_FILE = AI_DIR / "index_metadata.json"
+INDEX_META_DB = AI_DIR / "index_meta.sqlite"
+INDEX_TELEMETRY_FILE = AI_DIR / "index_telemetry.jsonl"
 BM25_INDEX_PATH = AI_DIR / "bm25_index.pkl"
 MEMORY_HISTORY_DIR = AI_DIR / "memory_history"
 LOG_FILE = AI_DIR / "projectmind.log"
@@ -94,13 +97,17 @@ def resolve_index_ignore_file() -> Path:
 
 def reconfigure(new_root: Path) -> None:
     global PROJECT_ROOT, AI_DIR, MEMORY_FILE, VECTOR_STORE_DIR
-    global INDEX_IGNORE_FILE, INDEX_METADATA_FILE, BM25_INDEX_PATH, MEMORY_HISTORY_DIR, LOG_FILE
+    global INDEX_IGNORE_FILE, INDEX_METADATA_FILE, INDEX_META_DB, INDEX_TELEMETRY_FILE
+    global BM25_INDEX_PATH
+    global MEMORY_HISTORY_DIR, LOG_FILE
     PROJECT_ROOT = new_root.resolve()
     AI_DIR = PROJECT_ROOT / ".ai"
     MEMORY_FILE = AI_DIR / "memory.md"
     VECTOR_STORE_DIR = AI_DIR / "vector_store"
     INDEX_IGNORE_FILE = AI_DIR / ".indexignore"
     INDEX_METADATA_FILE = AI_DIR / "index_metadata.json"
+    INDEX_META_DB = AI_DIR / "index_meta.sqlite"
+    INDEX_TELEMETRY_FILE = AI_DIR / "index_telemetry.jsonl"
     BM25_INDEX_PATH = AI_DIR / "bm25_index.pkl"
     MEMORY_HISTORY_DIR = AI_DIR / "memory_history"
     LOG_FILE = AI_DIR / "projectmind.log"
@@ -121,6 +128,58 @@ CHUNK_OVERLAP = 150
 BATCH_SIZE = 100
 MAX_FILE_SIZE_MB = 10
 MAX_MEMORY_MB = 100
+# Files over MAX_FILE_SIZE_MB are chunked in bounded windows by
+# streaming_splitter instead of being read whole; files over this size are
+# skipped (0 skips everything over MAX_FILE_SIZE_MB). Overridable via
+# PROJECTMIND_MAX_STREAM_FILE_SIZE_MB.
+MAX_STREAM_FILE_SIZE_MB = 512
+
+# Embedding-input minification: "off" embeds chunks verbatim, "basic" collapses
+# whitespace and drops license headers / comment banners, "aggressive" also strips
+# full-line comments and docstrings. The original text is always what gets stored.
+EMBED_MINIFY_MODE = "basic"
+EMBED_MINIFY_MODES: tuple[str, ...] = ("off", "basic", "aggressive")
+
+# Apply the project's root .gitignore (in addition to .indexignore) when
+# cataloguing files. Overridable via PROJECTMIND_RESPECT_GITIGNORE.
+RESPECT_GITIGNORE = True
+
+# Ask git for changed files in index_changed_files() instead of stat-ing the
+# whole tree (falls back to the mtime scan outside git repositories).
+# Overridable via PROJECTMIND_GIT_CHANGES.
+GIT_CHANGE_DETECTION = True
+
+# Watch mode: "off" (default), or the backend used to follow file changes
+# ("auto" tries inotify, then polling). Overridable via PROJECTMIND_WATCH.
+WATCH_MODE = "off"
+WATCH_MODES: tuple[str, ...] = ("off", "auto", "inotify", "polling")
+
+# Seconds of work per index_codebase() call; a longer full index is checkpointed
+# and continued by the next call. 0 disables the limit. Overridable via
+# PROJECTMIND_INDEX_TIME_SLICE.
+INDEX_TIME_SLICE_SECONDS = 45.0
+
+# Order full-index work so recently changed, recently used, entry-point and
+# widely imported files are indexed first. Overridable via PROJECTMIND_INDEX_PRIORITY.
+INDEX_PRIORITY = True
+
+# Low-impact background work (see resource_policy.py): background threads run
+# at a lower CPU/IO priority, use half the effective CPUs and yield to tool
+# calls. Overridable via PROJECTMIND_LOW_IMPACT.
+LOW_IMPACT_INDEXING = True
+# Nice value of background threads. Overridable via PROJECTMIND_BACKGROUND_NICE.
+BACKGROUND_NICE = 10
+# Threads shared by background pools and torch; 0 derives it from the
+# effective CPU count. Overridable via PROJECTMIND_BACKGROUND_THREADS.
+BACKGROUND_THREADS = 0
+
+# Scan-time detection of generated, minified and vendored files (see
+# file_classifier.py): "defer" indexes them after everything else, "skip"
+# leaves them out of the index, "off" disables detection. Defer is the default
+# because the signals are heuristics; a misjudged file is indexed late rather
+# than never. Overridable via PROJECTMIND_AUTO_EXCLUDE.
+AUTO_EXCLUDE_MODE = "defer"
+AUTO_EXCLUDE_MODES: tuple[str, ...] = ("off", "defer", "skip")
 
 DEFAULT_IGNORED_DIRS: set[str] = {
     ".git",
@@ -248,6 +307,20 @@ def get_max_file_size_bytes() -> int:
     return MAX_FILE_SIZE_MB * 1024 * 1024
 
 
+def get_max_stream_file_size_bytes() -> int:
+    """
+    Get the size limit of files chunked by streaming (0: large files are skipped).
+    Can be overridden via PROJECTMIND_MAX_STREAM_FILE_SIZE_MB environment variable.
+    """
+    env_size = os.getenv("PROJECTMIND_MAX_STREAM_FILE_SIZE_MB")
+    if env_size:
+        try:
+            return max(0, int(env_size)) * 1024 * 1024
+        except ValueError:
+            pass
+    return MAX_STREAM_FILE_SIZE_MB * 1024 * 1024
+
+
 def get_max_memory_bytes() -> int:
     """
     Get maximum memory limit for document processing in bytes.
@@ -262,14 +335,166 @@ def get_max_memory_bytes() -> int:
     return MAX_MEMORY_MB * 1024 * 1024
 
 
+def get_embed_minify_mode() -> str:
+    """
+    Get the embedding-input minification mode.
+    Can be overridden via PROJECTMIND_EMBED_MINIFY environment variable.
+    """
+    env_mode = os.getenv("PROJECTMIND_EMBED_MINIFY")
+    if env_mode and env_mode.strip().lower() in EMBED_MINIFY_MODES:
+        return env_mode.strip().lower()
+    return EMBED_MINIFY_MODE
+
+
+def get_respect_gitignore() -> bool:
+    """
+    Whether the project's .gitignore excludes files from cataloguing and indexing.
+    Can be overridden via PROJECTMIND_RESPECT_GITIGNORE environment variable.
+    """
+    env_value = os.getenv("PROJECTMIND_RESPECT_GITIGNORE")
+    if env_value and env_value.strip().lower() in ("0", "false", "no", "off"):
+        return False
+    if env_value and env_value.strip().lower() in ("1", "true", "yes", "on"):
+        return True
+    return RESPECT_GITIGNORE
+
+
+def get_git_change_detection() -> bool:
+    """
+    Whether incremental indexing asks git for changed files.
+    Can be overridden via PROJECTMIND_GIT_CHANGES environment variable.
+    """
+    env_value = os.getenv("PROJECTMIND_GIT_CHANGES")
+    if env_value and env_value.strip().lower() in ("0", "false", "no", "off"):
+        return False
+    if env_value and env_value.strip().lower() in ("1", "true", "yes", "on"):
+        return True
+    return GIT_CHANGE_DETECTION
+
+
+def get_watch_mode() -> str:
+    """
+    Get the file watch mode.
+    Can be overridden via PROJECTMIND_WATCH environment variable ("1"/"on" mean "auto").
+    """
+    env_mode = os.getenv("PROJECTMIND_WATCH")
+    if env_mode:
+        mode = env_mode.strip().lower()
+        if mode in ("1", "true", "yes", "on"):
+            return "auto"
+        if mode in ("0", "false", "no"):
+            return "off"
+        if mode in WATCH_MODES:
+            return mode
+    return WATCH_MODE
+
+
+def get_index_time_slice() -> float | None:
+    """
+    Get the time budget of one index_codebase() call in seconds (None: unlimited).
+    Can be overridden via PROJECTMIND_INDEX_TIME_SLICE environment variable.
+    """
+    seconds = INDEX_TIME_SLICE_SECONDS
+    env_value = os.getenv("PROJECTMIND_INDEX_TIME_SLICE")
+    if env_value:
+        try:
+            seconds = float(env_value)
+        except ValueError:
+            pass
+    return seconds if seconds > 0 else None
+
+
+def get_index_priority() -> bool:
+    """
+    Whether full indexing processes the hot set (see index_priority.py) first.
+    Can be overridden via PROJECTMIND_INDEX_PRIORITY environment variable.
+    """
+    env_value = os.getenv("PROJECTMIND_INDEX_PRIORITY")
+    if env_value and env_value.strip().lower() in ("0", "false", "no", "off"):
+        return False
+    if env_value and env_value.strip().lower() in ("1", "true", "yes", "on"):
+        return True
+    return INDEX_PRIORITY
+
+
+def get_low_impact_indexing() -> bool:
+    """
+    Whether background indexing and maintenance run in low-impact mode.
+    Can be overridden via PROJECTMIND_LOW_IMPACT environment variable.
+    """
+    env_value = os.getenv("PROJECTMIND_LOW_IMPACT")
+    if env_value and env_value.strip().lower() in ("0", "false", "no", "off"):
+        return False
+    if env_value and env_value.strip().lower() in ("1", "true", "yes", "on"):
+        return True
+    return LOW_IMPACT_INDEXING
+
+
+def get_background_nice() -> int:
+    """
+    Get the nice value (0-19) applied to background threads.
+    Can be overridden via PROJECTMIND_BACKGROUND_NICE environment variable.
+    """
+    env_value = os.getenv("PROJECTMIND_BACKGROUND_NICE")
+    if env_value:
+        try:
+            return min(19, max(0, int(env_value)))
+        except ValueError:
+            pass
+    return BACKGROUND_NICE
+
+
+def get_background_threads() -> int:
+    """
+    Get the thread budget of background work (0: derived from the CPU quota).
+    Can be overridden via PROJECTMIND_BACKGROUND_THREADS environment variable.
+    """
+    env_value = os.getenv("PROJECTMIND_BACKGROUND_THREADS")
+    if env_value:
+        try:
+            return max(0, int(env_value))
+        except ValueError:
+            pass
+    return BACKGROUND_THREADS
+
+
+def get_auto_exclude_mode() -> str:
+    """
+    Get what happens to files detected as generated, minified or vendored.
+    Can be overridden via PROJECTMIND_AUTO_EXCLUDE environment variable.
+    """
+    env_mode = os.getenv("PROJECTMIND_AUTO_EXCLUDE")
+    if env_mode and env_mode.strip().lower() in AUTO_EXCLUDE_MODES:
+        return env_mode.strip().lower()
+    return AUTO_EXCLUDE_MODE
+
+
 def get_ignored_dirs() -> set[str]:
     return DEFAULT_IGNORED_DIRS.copy()
 
 
+_dir_pattern_regex: tuple[frozenset[str], re.Pattern[str] | None] = (frozenset(), None)
+
+
+def _ignored_dir_regex() -> re.Pattern[str] | None:
+    """IGNORED_DIR_PATTERNS compiled into one regex (recompiled if the set changes)."""
+    global _dir_pattern_regex
+    key = frozenset(IGNORED_DIR_PATTERNS)
+    if key != _dir_pattern_regex[0]:
+        regex = None
+        if key:
+            regex = re.compile(
+                "|".join(f"(?:{fnmatch.translate(os.path.normcase(p))})" for p in sorted(key))
+            )
+        _dir_pattern_regex = (key, regex)
+    return _dir_pattern_regex[1]
+
+
 def is_dir_ignored(dir_name: str) -> bool:
     if dir_name in DEFAULT_IGNORED_DIRS:
         return True
-    return any(fnmatch.fnmatch(dir_name, pat) for pat in IGNORED_DIR_PATTERNS)
+    regex = _ignored_dir_regex()
+    return regex is not None and regex.match(os.path.normcase(dir_name)) is not None
 
 
 def validate_path(path: str) -> Path:
@@ -0,0 +1,329 @@
+"""
+Embedding-input minification.
+
+Sits between the AST splitter and the embedding model. Chunks are stored in
+the vector store verbatim (that is what search results display), but the text
+handed to the encoder is compacted first:
+
+  - "basic":      collapse whitespace runs, drop blank lines, drop the
+                  license header at the top of a file and decorative comment
+                  banners (prose keeps its "---" / "===" lines)
+  - "aggressive": additionally strip full-line comments, block comments and
+                  Python docstrings
+
+Only full-line comments are removed, so trailing comments and string literals
+that happen to contain comment markers are never touched. A line starting with
+"*" counts as a comment only inside a block comment.
+"""
+
+from __future__ import annotations
+
+import io
+import re
+import tokenize
+from dataclasses import dataclass
+from pathlib import Path
+
+from logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class CommentSyntax:
+    line_prefixes: tuple[str, ...] = ()
+    block_comments: bool = False
+    docstrings: bool = False
+    # Lines of repeated "=", "-", "*", ... are decoration in code, but headings
+    # and rules in prose
+    banners: bool = True
+
+
+_HASH = CommentSyntax(line_prefixes=("#",))
+_C_LIKE = CommentSyntax(line_prefixes=("//",), block_comments=True)
+_NONE = CommentSyntax()
+_PROSE = CommentSyntax(banners=False)
+
+LANGUAGE_SYNTAX: dict[str, CommentSyntax] = {
+    ".py": CommentSyntax(line_prefixes=("#",), docstrings=True),
+    ".js": _C_LIKE,
+    ".jsx": _C_LIKE,
+    ".ts": _C_LIKE,
+    ".tsx": _C_LIKE,
+    ".java": _C_LIKE,
+    ".c": _C_LIKE,
+    ".cpp": _C_LIKE,
+    ".h": _C_LIKE,
+    ".hpp": _C_LIKE,
+    ".cs": _C_LIKE,
+    ".go": _C_LIKE,
+    ".rs": _C_LIKE,
+    ".php": CommentSyntax(line_prefixes=("//", "#"), block_comments=True),
+    ".swift": _C_LIKE,
+    ".kt": _C_LIKE,
+    ".scala": _C_LIKE,
+    ".m": _C_LIKE,
+    ".mm": _C_LIKE,
+    ".css": CommentSyntax(block_comments=True),
+    ".scss": _C_LIKE,
+    ".sass": CommentSyntax(line_prefixes=("//",)),
+    ".rb": _HASH,
+    ".r": _HASH,
+    ".sh": _HASH,
+    ".bash": _HASH,
+    ".zsh": _HASH,
+    ".fish": _HASH,
+    ".yaml": _HASH,
+    ".yml": _HASH,
+    ".toml": _HASH,
+    ".sql": CommentSyntax(line_prefixes=("--",), block_comments=True),
+    ".graphql": _HASH,
+    ".proto": _C_LIKE,
+    ".md": _PROSE,
+    ".markdown": _PROSE,
+    ".rst": _PROSE,
+    ".txt": _PROSE,
+}
+
+# License headers are only looked for in the chunk that starts the file
+_FILE_START_SYMBOL_TYPES = frozenset({"module", "text"})
+
+_LICENSE_MARKERS = (
+    "copyright",
+    "license",
+    "spdx-license-identifier",
+    "all rights reserved",
+    "permission is hereby granted",
+)
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SPACE_RUN_RE = re.compile(r"[ \t]+")
+_BANNER_RE = re.compile(r"^(?:#|//|/\*+|\*+/?|--|;)?\s*([=\-*#~_+/\\])\1{5,}\s*(?:\*/)?$")
+_BLOCK_COMMENT_RE = re.compile(r"^[ \t]*/\*.*?\*/[ \t]*$", re.MULTILINE | re.DOTALL)
+# Fallback for chunks that do not tokenize (a fragment cut mid-string, ...)
+_DOCSTRING_RE = re.compile(
+    r'^[ \t]*[rRuU]?(?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\')[ \t]*$', re.MULTILINE
+)
+_SKIPPED_TOKENS = frozenset({tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT})
+
+
+def approx_token_count(text: str) -> int:
+    """Cheap, model-independent token estimate: words plus punctuation marks."""
+    return len(_TOKEN_RE.findall(text))
+
+
+def _is_comment_line(stripped: str, syntax: CommentSyntax, in_block: bool = False) -> bool:
+    """
+    Args:
+        stripped: Line without surrounding whitespace
+        syntax: Comment syntax of the file
+        in_block: Whether the line sits inside a block comment opened earlier;
+            only then does a leading "*" mark a comment (and not a dereference)
+    """
+    if any(stripped.startswith(p) for p in syntax.line_prefixes):
+        return True
+    if syntax.block_comments and (in_block or stripped.startswith("/*")):
+        return True
+    return False
+
+
+def _in_block_after(stripped: str, syntax: CommentSyntax, in_block: bool) -> bool:
+    """Whether a block comment is still open after this line."""
+    if not syntax.block_comments:
+        return False
+    if in_block:
+        return "*/" not in stripped
+    return stripped.startswith("/*") and "*/" not in stripped[2:]
+
+
+def _starts_file(metadata: dict) -> bool:
+    """Whether a chunk holds the top of its file (where a license header sits)."""
+    return (
+        metadata.get("symbol_type") in _FILE_START_SYMBOL_TYPES
+        and metadata.get("chunk_index", 0) == 0
+        and metadata.get("line_start", 0) <= 1
+    )
+
+
+def _drop_license_header(text: str, syntax: CommentSyntax) -> str:
+    """Removes a leading comment block if it looks like a license/copyright notice."""
+    if not syntax.line_prefixes and not syntax.block_comments:
+        return text
+    lines = text.split("\n")
+    end = 0
+    in_block = False
+    while end < len(lines):
+        stripped = lines[end].strip()
+        if stripped and not _is_comment_line(stripped, syntax, in_block):
+            break
+        in_block = _in_block_after(stripped, syntax, in_block)
+        end += 1
+    if end == 0:
+        return text
+    header = "\n".join(lines[:end]).lower()
+    if not any(marker in header for marker in _LICENSE_MARKERS):
+        return text
+    return "\n".join(lines[end:])
+
+
+def _docstring_spans(text: str) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    """
+    Finds the strings that stand alone as the first statement of a module,
+    class or function body.
+
+    Raises:
+        tokenize.TokenError, SyntaxError: If the text does not tokenize
+    """
+    spans: list[tuple[tuple[int, int], tuple[int, int]]] = []
+    pending: tuple[tuple[int, int], tuple[int, int]] | None = None
+    expect = line_start = True
+    header = False
+    depth = 0
+    for tok in tokenize.generate_tokens(io.StringIO(text).readline):
+        if tok.type in _SKIPPED_TOKENS:
+            continue
+        if pending is not None:
+            if tok.type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+                spans.append(pending)
+            pending = None
+        if tok.type == tokenize.NEWLINE:
+            # `expect` survives only if the line ended with a header's colon
+            header, line_start, depth = False, True, 0
+            continue
+        if expect and tok.type == tokenize.STRING:
+            pending = (tok.start, tok.end)
+            expect = line_start = False
+            continue
+        expect = False
+        if line_start:
+            header = tok.string in ("def", "class", "async")
+            line_start = False
+        if tok.type == tokenize.OP:
+            if tok.string in "([{":
+                depth += 1
+            elif tok.string in ")]}":
+                depth -= 1
+            elif tok.string == ":" and header and depth == 0:
+                expect = True
+    return spans
+
+
+def _strip_docstrings(text: str) -> str:
+    """Removes Python docstrings, leaving other string literals in place."""
+    try:
+        spans = _docstring_spans(text)
+    except (tokenize.TokenError, SyntaxError):
+        return _DOCSTRING_RE.sub("", text)
+    offsets = [0]
+    for line in io.StringIO(text).readlines():
+        offsets.append(offsets[-1] + len(line))
+    for (start_row, start_col), (end_row, end_col) in reversed(spans):
+        start = offsets[start_row - 1] + start_col
+        end = offsets[end_row - 1] + end_col
+        text = text[:start] + text[end:]
+    return text
+
+
+@dataclass
+class MinifyStats:
+    chunks: int = 0
+    original_tokens: int = 0
+    encoded_tokens: int = 0
+    embed_seconds: float = 0.0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.encoded_tokens)
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.tokens_saved / self.original_tokens if self.original_tokens else 0.0
+
+    @property
+    def est_seconds_saved(self) -> float:
+        """Embedding time is roughly linear in tokens; extrapolate from measured time."""
+        if not self.encoded_tokens:
+            return 0.0
+        return self.embed_seconds * self.tokens_saved / self.encoded_tokens
+
+    def summary(self) -> str:
+        return (
+            f"embedding input minified: ~{self.tokens_saved} tokens saved "
+            f"({self.saved_ratio:.0%}), ~{self.est_seconds_saved:.1f}s embedding time saved"
+        )
+
+
+class EmbeddingMinifier:
+    """
+    Produces the compacted text that is actually encoded for each chunk.
+    Keeps running token statistics for the current indexing run.
+    """
+
+    def __init__(self, mode: str = "basic") -> None:
+        """
+        Args:
+            mode: "off", "basic" or "aggressive"
+        """
+        self.mode = mode
+        self.stats = MinifyStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def reset_stats(self) -> None:
+        self.stats = MinifyStats()
+
+    def minify(self, text: str, source: str = "", file_start: bool = True) -> str:
+        """
+        Returns the compacted form of a chunk.
+
+        Args:
+            text: Original chunk text
+            source: Source file path (its suffix selects the comment syntax)
+            file_start: Whether the chunk begins at the top of the file; a
+                license header is only dropped there
+
+        Returns:
+            Text to encode. Falls back to the original if minification empties it.
+        """
+        if not self.enabled:
+            return text
+
+        syntax = LANGUAGE_SYNTAX.get(Path(source).suffix.lower(), _NONE) if source else _NONE
+        aggressive = self.mode == "aggressive"
+
+        compact = _drop_license_header(text, syntax) if file_start else text
+        if aggressive and syntax.block_comments:
+            compact = _BLOCK_COMMENT_RE.sub("", compact)
+        if aggressive and syntax.docstrings:
+            compact = _strip_docstrings(compact)
+
+        out_lines: list[str] = []
+        in_block = False
+        for line in compact.split("\n"):
+            stripped = _SPACE_RUN_RE.sub(" ", line).strip()
+            if not stripped:
+                continue
+            comment = _is_comment_line(stripped, syntax, in_block)
+            in_block = _in_block_after(stripped, syntax, in_block)
+            if syntax.banners and _BANNER_RE.match(stripped):
+                continue
+            if aggressive and comment:
+                continue
+            out_lines.append(stripped)
+
+        result = "\n".join(out_lines)
+        return result if result.strip() else text
+
+    def minify_batch(self, documents: list[str], metadatas: list[dict]) -> list[str]:
+        """Minifies a batch of chunks and accumulates token statistics."""
+        compacted: list[str] = []
+        for doc, meta in zip(documents, metadatas, strict=False):
+            meta = meta or {}
+            compact = self.minify(doc, str(meta.get("source", "")), _starts_file(meta))
+            self.stats.chunks += 1
+            self.stats.original_tokens += approx_token_count(doc)
+            self.stats.encoded_tokens += approx_token_count(compact)
+            compacted.append(compact)
+        return compacted
@@ -0,0 +1,372 @@
+"""
+Shared project file catalog.
+
+One in-memory listing of the project tree serves every scanner (manifest,
+indexer, code intelligence, overview tools) instead of each running its own
+os.walk with its own filters. The tree is walked with os.scandir, the stat
+result of every file is kept, and ignored paths are pruned in one place: the
+built-in ignored directories (config.is_dir_ignored) and the project's
+.gitignore / .indexignore rules, compiled once by `ignore_matcher`. The rules
+are re-read when one of those files changes.
+
+The catalog is kept fresh incrementally from directory mtimes: a refresh stats
+each known directory and rescans only those whose mtime changed (entries were
+added, removed or renamed), walking new subdirectories and dropping deleted
+ones. In-place edits leave directory mtimes untouched, so callers that need
+exact file stats (the manifest build) ask for a deep refresh of their scope,
+and `invalidate()` lets a file watcher mark a path for rescanning. Within
+FRESHNESS_WINDOW_SECONDS of a refresh, reads are served from memory.
+
+    for entry in get_file_catalog().files():
+        print(entry.rel, entry.size)
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import config
+from cache_manager import LRUCache
+from ignore_matcher import IgnoreMatcher, load_project_matcher
+from logger import get_logger
+
+logger = get_logger()
+
+MAX_CATALOG_FILES = 200_000
+FRESHNESS_WINDOW_SECONDS = 2.0
+CATALOG_CAPACITY = 4
+
+
+def _suffix(name: str) -> str:
+    """Lowercased extension with pathlib semantics (".bashrc" has none)."""
+    dot = name.rfind(".")
+    return name[dot:].lower() if 0 < dot < len(name) - 1 else ""
+
+
+@dataclass(slots=True)
+class CatalogEntry:
+    path: Path
+    rel: str
+    suffix: str
+    size: int
+    mtime: float
+    mtime_ns: int
+
+
+@dataclass(slots=True)
+class DirListing:
+    mtime: float
+    mtime_ns: int
+    files: list[CatalogEntry]
+    # Relative paths of non-ignored child directories, in scandir order
+    subdirs: list[str]
+
+
+class FileCatalog:
+    """
+    Incrementally refreshed listing of one directory tree.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_files: int = MAX_CATALOG_FILES,
+        matcher: IgnoreMatcher | None = None,
+    ):
+        """
+        Args:
+            root: Tree root; entries carry paths relative to it
+            max_files: Files kept before the catalog stops growing (with a warning)
+            matcher: Ignore rules for paths relative to root. If it was loaded
+                from ignore files, it is reloaded when they change.
+        """
+        self.root = Path(root)
+        self.max_files = max_files
+        self.matcher = matcher
+        self._dirs: dict[str, DirListing] = {}
+        self._file_count = 0
+        self._checked: dict[tuple[str, bool], float] = {}
+        self._lock = threading.RLock()
+        self.capped = False
+        self.full_walks = 0
+        self.dir_scans = 0
+
+    def _rel(self, under: str | Path) -> str:
+        path = Path(under)
+        if path.is_absolute():
+            path = path.relative_to(self.root)
+        rel = path.as_posix()
+        return "" if rel == "." else rel
+
+    def _abs(self, rel: str) -> Path:
+        return self.root / rel if rel else self.root
+
+    def _scan_dir(self, rel: str) -> DirListing | None:
+        path = self._abs(rel)
+        try:
+            dir_stat = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISDIR(dir_stat.st_mode):
+            return None
+        prefix = f"{rel}/" if rel else ""
+        # Parents of rel already passed the matcher, so each entry is checked on its own
+        matcher = self.matcher if self.matcher else None
+        files: list[CatalogEntry] = []
+        subdirs: list[str] = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    entry_rel = prefix + entry.name
+                    try:
+                        if entry.is_dir():
+                            # Like os.walk: symlinked directories are listed but not followed
+                            if not (
+                                entry.is_symlink()
+                                or config.is_dir_ignored(entry.name)
+                                or (matcher is not None and matcher.match(entry_rel, is_dir=True))
+                            ):
+                                subdirs.append(entry_rel)
+                            continue
+                        if matcher is not None and matcher.match(entry_rel):
+                            continue
+                        file_stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append(
+                        CatalogEntry(
+                            path=Path(entry.path),
+                            rel=entry_rel,
+                            suffix=_suffix(entry.name),
+                            size=file_stat.st_size,
+                            mtime=file_stat.st_mtime,
+                            mtime_ns=file_stat.st_mtime_ns,
+                        )
+                    )
+        except OSError as e:
+            logger.debug(f"Catalog cannot list {path}: {e}")
+        self.dir_scans += 1
+        return DirListing(dir_stat.st_mtime, dir_stat.st_mtime_ns, files, subdirs)
+
+    def _set(self, rel: str, listing: DirListing) -> None:
+        old = self._dirs.get(rel)
+        if old is not None:
+            self._file_count -= len(old.files)
+        room = self.max_files - self._file_count
+        if len(listing.files) > room:
+            if not self.capped:
+                logger.warning(f"File catalog capped at {self.max_files} files under {self.root}")
+            self.capped = True
+            listing.files = listing.files[: max(0, room)]
+        self._file_count += len(listing.files)
+        self._dirs[rel] = listing
+
+    def _drop(self, rel: str) -> None:
+        prefix = f"{rel}/"
+        for key in [k for k in self._dirs if not rel or k == rel or k.startswith(prefix)]:
+            self._file_count -= len(self._dirs.pop(key).files)
+
+    def _walk(self, rel: str) -> None:
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            listing = self._scan_dir(current)
+            if listing is None:
+                continue
+            self._set(current, listing)
+            stack.extend(reversed(listing.subdirs))
+
+    def _rescan(self, rel: str) -> None:
+        listing = self._scan_dir(rel)
+        if listing is None:
+            self._drop(rel)
+            return
+        old = self._dirs.get(rel)
+        self._set(rel, listing)
+        previous = set(old.subdirs) if old is not None else set()
+        current = set(listing.subdirs)
+        for gone in previous - current:
+            self._drop(gone)
+        for added in listing.subdirs:
+            if added not in self._dirs:
+                self._walk(added)
+
+    def _subtree(self, rel: str, recursive: bool = True, skip_hidden: bool = False) -> list[str]:
+        if rel not in self._dirs:
+            return []
+        order: list[str] = []
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            listing = self._dirs.get(current)
+            if listing is None:
+                continue
+            order.append(current)
+            if recursive:
+                children = listing.subdirs
+                if skip_hidden:
+                    children = [d for d in children if not d.rsplit("/", 1)[-1].startswith(".")]
+                stack.extend(reversed(children))
+        return order
+
+    def refresh(
+        self, under: str | Path = "", *, deep: bool = False, recursive: bool = True
+    ) -> None:
+        """
+        Brings part of the catalog up to date.
+
+        Args:
+            under: Directory to refresh (absolute, or relative to the root)
+            deep: Re-stat every file instead of only rescanning changed directories
+            recursive: Include subdirectories (False covers only under's own files)
+        """
+        rel = self._rel(under)
+        with self._lock:
+            self._reload_matcher()
+            if rel not in self._dirs:
+                if recursive:
+                    self._walk(rel)
+                    self.full_walks += 1
+                else:
+                    self._rescan(rel)
+            elif deep:
+                if recursive:
+                    self._drop(rel)
+                    self._walk(rel)
+                    self.full_walks += 1
+                else:
+                    self._rescan(rel)
+            else:
+                for current in self._subtree(rel, recursive):
+                    listing = self._dirs.get(current)
+                    if listing is None:
+                        continue
+                    try:
+                        mtime_ns = os.stat(self._abs(current)).st_mtime_ns
+                    except OSError:
+                        self._drop(current)
+                        continue
+                    if mtime_ns != listing.mtime_ns:
+                        self._rescan(current)
+            self._checked[(rel, recursive)] = time.monotonic()
+
+    def _reload_matcher(self) -> None:
+        """Recompiles the ignore rules after an ignore file changed; the tree is re-walked."""
+        if self.matcher is None or not self.matcher.sources or not self.matcher.is_stale():
+            return
+        logger.info(f"Ignore rules changed under {self.root}, re-cataloguing")
+        self.matcher = load_project_matcher(self.root)
+        self._drop("")
+        self._checked.clear()
+
+    def _ensure_fresh(self, rel: str, recursive: bool) -> None:
+        checked = max(self._checked.get((rel, recursive), 0.0), self._checked.get(("", True), 0.0))
+        if time.monotonic() - checked >= FRESHNESS_WINDOW_SECONDS:
+            self.refresh(rel, recursive=recursive)
+
+    def walk(
+        self, under: str | Path = "", *, recursive: bool = True, skip_hidden: bool = False
+    ) -> list[tuple[str, DirListing]]:
+        """
+        Returns (relative dir, listing) pairs in os.walk top-down order, without refreshing.
+
+        Args:
+            under: Directory to start from
+            recursive: Include subdirectories
+            skip_hidden: Do not descend into directories whose name starts with "."
+        """
+        rel = self._rel(under)
+        with self._lock:
+            return [(d, self._dirs[d]) for d in self._subtree(rel, recursive, skip_hidden)]
+
+    def files(
+        self,
+        under: str | Path = "",
+        *,
+        recursive: bool = True,
+        skip_hidden: bool = False,
+        deep: bool = False,
+    ) -> list[CatalogEntry]:
+        """
+        Returns catalogued files, refreshing first if the last check is older
+        than FRESHNESS_WINDOW_SECONDS.
+
+        Args:
+            under: Directory to list (absolute, or relative to the root)
+            recursive: Include subdirectories
+            skip_hidden: Do not descend into directories whose name starts with "."
+            deep: Re-stat every file in scope before listing
+
+        Returns:
+            Entries in os.walk top-down order
+        """
+        rel = self._rel(under)
+        with self._lock:
+            if deep:
+                self.refresh(rel, deep=True, recursive=recursive)
+            else:
+                self._ensure_fresh(rel, recursive)
+            return [
+                entry
+                for _, listing in self.walk(rel, recursive=recursive, skip_hidden=skip_hidden)
+                for entry in listing.files
+            ]
+
+    def invalidate(self, path: str | Path | None = None) -> None:
+        """
+        Forces a rescan on the next read.
+
+        Args:
+            path: Changed file or directory; its directory is rescanned. Without a
+                path, every directory is re-checked on the next read.
+        """
+        with self._lock:
+            self._checked.clear()
+            if path is None:
+                return
+            try:
+                rel = self._rel(path)
+            except ValueError:
+                return
+            while rel not in self._dirs and rel:
+                rel = rel.rsplit("/", 1)[0] if "/" in rel else ""
+            listing = self._dirs.get(rel)
+            if listing is not None:
+                listing.mtime_ns = -1
+
+    def get_stats(self) -> dict[str, Any]:
+        """Returns catalog statistics."""
+        with self._lock:
+            return {
+                "root": str(self.root),
+                "directories": len(self._dirs),
+                "files": self._file_count,
+                "capped": self.capped,
+                "full_walks": self.full_walks,
+                "dir_scans": self.dir_scans,
+            }
+
+
+_catalogs = LRUCache(CATALOG_CAPACITY)
+_catalogs_lock = threading.Lock()
+
+
+def get_file_catalog(root: Path | None = None) -> FileCatalog:
+    """Returns the shared catalog for root (defaults to config.PROJECT_ROOT)."""
+    if root is None:
+        root = config.PROJECT_ROOT
+    key = str(root)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.cache.get(key)
+            if catalog is None:
+                catalog = FileCatalog(Path(root), matcher=load_project_matcher(Path(root)))
+                _catalogs.put(key, catalog)
+    return catalog
@@ -0,0 +1,325 @@
+"""
+Scan-time detection of generated, minified and vendored files.
+
+`.indexignore` only catches what someone thought to list. `classify()` looks
+at each candidate file with cheap signals and tells the indexer which ones are
+not worth chunking and embedding:
+
+  - vendored: a path component names a known vendor layout (`third_party`,
+    `bower_components`, `Pods`, `site-packages`, ...)
+  - generated: a generated file name (`*_pb2.py`, `*.pb.go`, `*.g.dart`,
+    lockfiles, `__snapshots__/`), a generator marker in a comment near the top
+    ("Code generated ... DO NOT EDIT", "Generated by the protocol buffer
+    compiler", the `@` + `generated` tag), or an encoded blob (mostly-ASCII
+    text whose byte entropy is as high as base64)
+  - minified: long lines carry most of the text, or the average line is long
+    (not applied to prose or SQL)
+
+Only the first HEAD_BYTES of a file are read, and results are cached per
+(size, mtime), so repeated scans only look at new or changed files. By
+default the indexer defers classified files to the end of a full index; it
+can also skip them (PROJECTMIND_AUTO_EXCLUDE). Either way it collects them in
+an `ExclusionReport`, which estimates the chunks, tokens and embedding time
+they cost.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from cache_manager import LRUCache
+from config import CHUNK_OVERLAP, CHUNK_SIZE, CODE_EXTENSIONS
+from index_estimator import ASSUMED_EMBED_TOKENS_PER_SECOND
+from logger import get_logger
+
+logger = get_logger()
+
+# Bytes read from the top of a file for the content signals
+HEAD_BYTES = 16 * 1024
+# Generator markers count only in comments within this many leading lines
+HEADER_LINES = 20
+# Smaller files are left alone: little to save, easy to misjudge
+MIN_CLASSIFY_BYTES = 512
+# Minified: lines longer than LONG_LINE carry this share of the text, or the
+# average line is at least MINIFIED_AVG_LINE characters
+LONG_LINE = 500
+MINIFIED_LONG_SHARE = 0.5
+MINIFIED_AVG_LINE = 250
+# Encoded data: byte entropy (bits per byte) of mostly-ASCII text. Source code
+# sits around 4.5-5.2, base64 near 6
+ENCODED_ENTROPY = 5.6
+ENCODED_MIN_ASCII = 0.95
+# Rough bytes per chunk and per token for the "work saved" estimate
+BYTES_PER_CHUNK = CHUNK_SIZE - CHUNK_OVERLAP
+BYTES_PER_TOKEN = 4
+# Classified files remembered across scans
+CACHE_CAPACITY = 50_000
+# Example paths kept per kind in a report
+REPORT_EXAMPLES = 20
+
+VENDOR_DIRS = frozenset(
+    {
+        "third_party",
+        "third-party",
+        "thirdparty",
+        "bower_components",
+        "jspm_packages",
+        "web_modules",
+        "Pods",
+        "Carthage",
+        "site-packages",
+        "_vendor",
+        "vendored",
+        ".yarn",
+    }
+)
+
+GENERATED_DIRS = frozenset({"__snapshots__", "__generated__"})
+
+GENERATED_NAMES = frozenset(
+    {
+        "package-lock.json",
+        "npm-shrinkwrap.json",
+        "pnpm-lock.yaml",
+        "composer.lock",
+        "yarn.lock",
+        "Cargo.lock",
+        "poetry.lock",
+        "Pipfile.lock",
+        "go.sum",
+    }
+)
+
+_GENERATED_NAME_RE = re.compile(
+    r"(?:_pb2(?:_grpc)?\.pyi?|\.pb\.(?:go|cc|h|swift)|_grpc\.pb\.go|\.pb\.gw\.go"
+    r"|\.g\.dart|\.freezed\.dart|\.designer\.cs|\.g\.cs|\.generated\.\w+"
+    r"|\.min\.(?:js|css|mjs)|\.bundle\.js|\.chunk\.js)$",
+    re.IGNORECASE,
+)
+
+# A bare "do not edit" or "autogenerated" is too weak on its own: hand-written
+# files say "do not edit without updating X" or mention autogenerated ids
+_MARKER_RE = re.compile(
+    r"@generated\b|\bgenerated\b.*\bdo not edit\b|\bdo not edit\b.*\bgenerated\b"
+    r"|\b(?:auto-?|automatically )generated by\b|\bgenerated by the protocol buffer\b"
+    r"|\bthis file (?:is|was) (?:auto-?|automatically )?generated\b",
+    re.IGNORECASE,
+)
+
+_COMMENT_PREFIXES = ("#", "//", "/*", "*", "--", "<!--", ";", "%", '"""', "'''", "{{/*")
+
+# Prose wraps paragraphs into single long lines; line length says nothing there
+_PROSE_SUFFIXES = frozenset({".md", ".rst", ".txt"})
+# Content signals apply to code and code-like data (not prose)
+_CONTENT_SUFFIXES = (
+    CODE_EXTENSIONS | {".json", ".css", ".scss", ".html", ".xml", ".yaml", ".yml", ".sql"}
+) - _PROSE_SUFFIXES
+# Hand-written SQL keeps multi-row INSERTs and long DDL on one line
+_LINE_LENGTH_EXEMPT_SUFFIXES = frozenset({".sql"})
+
+
+@dataclass(frozen=True)
+class FileClass:
+    kind: str  # "generated", "minified" or "vendored"
+    reason: str
+
+
+def classify_path(rel: str) -> FileClass | None:
+    """Classification from the project-relative path alone (no I/O)."""
+    parts = rel.split("/")
+    for part in parts[:-1]:
+        if part in VENDOR_DIRS:
+            return FileClass("vendored", f"under {part}/")
+        if part in GENERATED_DIRS:
+            return FileClass("generated", f"under {part}/")
+    name = parts[-1]
+    if name in GENERATED_NAMES:
+        return FileClass("generated", "lockfile")
+    match = _GENERATED_NAME_RE.search(name)
+    if match:
+        kind = "minified" if match.group(0).lower().startswith(".min.") else "generated"
+        return FileClass(kind, f"*{match.group(0)} file name")
+    return None
+
+
+def _header_marker(lines: list[str]) -> str | None:
+    for line in lines[:HEADER_LINES]:
+        stripped = line.strip()
+        if not stripped.startswith(_COMMENT_PREFIXES):
+            continue
+        match = _MARKER_RE.search(stripped)
+        if match:
+            return match.group(0)
+    return None
+
+
+def _entropy(data: bytes) -> float:
+    """Shannon entropy in bits per byte."""
+    total = len(data)
+    return -sum(c / total * math.log2(c / total) for c in Counter(data).values())
+
+
+def classify_content(head: bytes, suffix: str) -> FileClass | None:
+    """
+    Classification from the first bytes of a file.
+
+    Args:
+        head: Leading bytes of the file (up to HEAD_BYTES)
+        suffix: Lowercased extension; prose formats and SQL skip the line-length signals
+
+    Returns:
+        FileClass, or None for an ordinary file
+    """
+    text = head.decode("utf-8", "replace")
+    lines = text.splitlines()
+    if not lines:
+        return None
+    marker = _header_marker(lines)
+    if marker:
+        return FileClass("generated", f'header marker "{marker}"')
+    if suffix not in _CONTENT_SUFFIXES:
+        return None
+
+    lengths = [len(line) for line in lines]
+    # The last line of a cut-off head is incomplete; it still counts toward length
+    total = sum(lengths) or 1
+    average = total / len(lengths)
+    long_share = sum(n for n in lengths if n > LONG_LINE) / total
+    minified = long_share >= MINIFIED_LONG_SHARE or average >= MINIFIED_AVG_LINE
+    if minified and suffix not in _LINE_LENGTH_EXEMPT_SUFFIXES:
+        return FileClass(
+            "minified",
+            f"average line {average:.0f} chars, longest {max(lengths)}, "
+            f"{100 * long_share:.0f}% in lines over {LONG_LINE}",
+        )
+
+    ascii_share = sum(1 for b in head if b < 128) / len(head)
+    if ascii_share >= ENCODED_MIN_ASCII:
+        entropy = _entropy(head)
+        if entropy >= ENCODED_ENTROPY:
+            return FileClass("generated", f"encoded data ({entropy:.1f} bits/byte)")
+    return None
+
+
+_cache = LRUCache(CACHE_CAPACITY)
+
+
+def classify(path: Path, rel: str, size: int, mtime_ns: int = 0) -> FileClass | None:
+    """
+    Classifies a file as generated, minified or vendored.
+
+    Args:
+        path: File to classify
+        rel: Path relative to the project root, with "/" separators
+        size: File size in bytes
+        mtime_ns: Modification time; with size, it keys the cached result
+
+    Returns:
+        FileClass, or None if the file should be indexed normally
+    """
+    by_path = classify_path(rel)
+    if by_path is not None:
+        return by_path
+    if size < MIN_CLASSIFY_BYTES:
+        return None
+
+    key = str(path)
+    cached: tuple[int, int, FileClass | None] | None = _cache.get(key)
+    if cached is not None and cached[:2] == (size, mtime_ns):
+        return cached[2]
+    try:
+        with open(path, "rb") as f:
+            head = f.read(HEAD_BYTES)
+    except OSError as e:
+        logger.debug(f"Could not classify {path}: {e}")
+        return None
+    result = classify_content(head, path.suffix.lower()) if head else None
+    _cache.put(key, (size, mtime_ns, result))
+    return result
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+@dataclass
+class ExclusionReport:
+    """Files classified during one scan, and the indexing work they would have cost."""
+
+    mode: str
+    files: int = 0
+    bytes: int = 0
+    by_kind: dict[str, list[int]] = field(default_factory=dict)
+    examples: dict[str, list[tuple[str, str]]] = field(default_factory=dict)
+    deferred: set[Path] = field(default_factory=set)
+
+    def add(self, path: Path, rel: str, size: int, file_class: FileClass) -> None:
+        self.files += 1
+        self.bytes += size
+        counts = self.by_kind.setdefault(file_class.kind, [0, 0])
+        counts[0] += 1
+        counts[1] += size
+        examples = self.examples.setdefault(file_class.kind, [])
+        if len(examples) < REPORT_EXAMPLES:
+            examples.append((rel, file_class.reason))
+        if self.mode == "defer":
+            self.deferred.add(path)
+
+    @property
+    def chunks(self) -> int:
+        return math.ceil(self.bytes / BYTES_PER_CHUNK) if self.bytes else 0
+
+    @property
+    def tokens(self) -> int:
+        return self.bytes // BYTES_PER_TOKEN
+
+    @property
+    def embed_seconds(self) -> float:
+        return self.tokens / ASSUMED_EMBED_TOKENS_PER_SECOND
+
+    def summary(self) -> str:
+        """One line for indexing results; empty when nothing was classified."""
+        if not self.files:
+            return ""
+        kinds = ", ".join(f"{counts[0]} {kind}" for kind, counts in sorted(self.by_kind.items()))
+        action = "deferred" if self.mode == "defer" else "auto-excluded"
+        saved = (
+            ""
+            if self.mode == "defer"
+            else f", saving ~{self.embed_seconds / 60:.0f} min of embedding"
+        )
+        return (
+            f"{action} {self.files} files ({kinds}; {self.bytes / (1024 * 1024):.1f} MB, "
+            f"~{self.chunks} chunks{saved})"
+        )
+
+    def format(self) -> str:
+        """Markdown report with per-kind totals and example paths."""
+        mb = 1024 * 1024
+        if not self.files:
+            return "# AUTO-EXCLUDED FILES\nNo generated, minified or vendored files detected."
+        lines = [
+            "# AUTO-EXCLUDED FILES",
+            f"- **Mode**: {self.mode} (PROJECTMIND_AUTO_EXCLUDE)",
+            f"- **Files**: {self.files} ({self.bytes / mb:.1f} MB)",
+            f"- **{'Work saved' if self.mode == 'skip' else 'Work deferred'}**: ~{self.chunks} chunks, ~{self.tokens} tokens, "
+            f"~{self.embed_seconds / 60:.0f} min of embedding at "
+            f"{ASSUMED_EMBED_TOKENS_PER_SECOND:.0f} tokens/s",
+        ]
+        for kind, (count, size) in sorted(self.by_kind.items()):
+            lines.append(f"\n## {kind.capitalize()}: {count} files ({size / mb:.1f} MB)")
+            for rel, reason in self.examples.get(kind, []):
+                lines.append(f"- `{rel}` — {reason}")
+            if count > len(self.examples.get(kind, [])):
+                lines.append(f"- ... and {count - len(self.examples[kind])} more")
+        if self.mode == "skip":
+            lines.append("\nTo index them anyway, set PROJECTMIND_AUTO_EXCLUDE=defer or off.")
+        else:
+            lines.append(
+                "\nThey are indexed last. To leave them out, set PROJECTMIND_AUTO_EXCLUDE=skip."
+            )
+        return "\n".join(lines)
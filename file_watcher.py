@@ -0,0 +1,553 @@
+"""
+Watch mode: filesystem changes feed a debounced refresh queue.
+
+A watcher thread records changed project paths from one of two backends:
+
+  - inotify (Linux), called through ctypes on libc; one watch per catalogued
+    directory, new directories are watched as they appear
+  - polling, for other platforms or when inotify is unavailable or out of
+    watches: a deep refresh of the shared file catalog every
+    POLL_INTERVAL_SECONDS, diffed against the previous (mtime_ns, size) map
+
+Ignored directories (config.is_dir_ignored and the project's ignore rules)
+are never watched, and changes to ignored files are dropped before queueing.
+
+Recorded paths are coalesced: a batch is dispatched once no new change has
+arrived for DEBOUNCE_SECONDS (so a `git checkout` burst becomes one batch),
+or when the oldest pending change is MAX_BATCH_DELAY_SECONDS old. More than
+MAX_PENDING_PATHS pending paths, or an inotify queue overflow, collapse into a
+single full re-check. Each batch invalidates the file catalog entries, marks
+the affected manifest shards dirty and drops the import graph cache when code
+changed, then goes to an optional callback (the MCP server uses it to run the
+incremental indexer on just those files).
+
+`get_stats()` reports queue depth, the age of the oldest pending change and
+the end-to-end lag of the last batch.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import config
+from file_catalog import FileCatalog, get_file_catalog
+from logger import get_logger
+from resource_policy import enter_background, throttle
+
+logger = get_logger()
+
+DEBOUNCE_SECONDS = 0.5
+MAX_BATCH_DELAY_SECONDS = 5.0
+MAX_PENDING_PATHS = 10_000
+POLL_INTERVAL_SECONDS = 2.0
+READ_TIMEOUT_SECONDS = 0.5
+WATCH_BACKENDS: tuple[str, ...] = ("auto", "inotify", "polling")
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# A backend reports (relative path, is_dir) pairs; FULL_RESCAN means "re-check everything"
+FULL_RESCAN = ("", True)
+
+
+@dataclass
+class ChangeBatch:
+    """One debounced group of changes."""
+
+    paths: list[Path]
+    full_rescan: bool = False
+    events: int = 0
+    # time.monotonic() of the oldest change in the batch
+    first_event_at: float = 0.0
+
+
+class _InotifyBackend:
+    name = "inotify"
+
+    def __init__(self, root: Path, include_dir: Callable[[str], bool], dirs: list[str]):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm = libc.inotify_rm_watch
+        self._rm.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.root = root
+        self.include_dir = include_dir
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._wd_to_rel: dict[int, str] = {}
+        self._rel_to_wd: dict[str, int] = {}
+        try:
+            for rel in dirs:
+                self._watch(rel)
+        except OSError:
+            self.close()
+            raise
+
+    @property
+    def watched_dirs(self) -> int:
+        return len(self._rel_to_wd)
+
+    def _watch(self, rel: str) -> None:
+        path = os.fsencode(self.root / rel if rel else self.root)
+        wd = self._add(self.fd, path, WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return
+            raise OSError(err, f"inotify_add_watch({rel or '.'}): {os.strerror(err)}")
+        self._wd_to_rel[wd] = rel
+        self._rel_to_wd[rel] = wd
+
+    def _watch_new_tree(self, rel: str) -> list[tuple[str, bool]]:
+        """Watches a directory that appeared after start-up; returns the files already in it."""
+        found: list[tuple[str, bool]] = []
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            try:
+                self._watch(current)
+            except OSError as e:
+                logger.warning(f"Watcher cannot watch {current}: {e}")
+                return [FULL_RESCAN]
+            try:
+                with os.scandir(self.root / current) as entries:
+                    for entry in entries:
+                        child = f"{current}/{entry.name}"
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.include_dir(child):
+                                stack.append(child)
+                        else:
+                            found.append((child, False))
+            except OSError:
+                continue
+        return found
+
+    def _forget_tree(self, rel: str) -> None:
+        prefix = f"{rel}/"
+        for key in [k for k in self._rel_to_wd if k == rel or k.startswith(prefix)]:
+            wd = self._rel_to_wd.pop(key)
+            self._wd_to_rel.pop(wd, None)
+            self._rm(self.fd, wd)
+
+    def read(self, timeout: float) -> list[tuple[str, bool]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changes: list[tuple[str, bool]] = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                changes.append(FULL_RESCAN)
+                continue
+            parent = self._wd_to_rel.get(wd)
+            if parent is None:
+                continue
+            if mask & IN_IGNORED:
+                self._wd_to_rel.pop(wd, None)
+                if self._rel_to_wd.get(parent) == wd:
+                    del self._rel_to_wd[parent]
+                continue
+            if not name:
+                # IN_DELETE_SELF / IN_MOVE_SELF of a watched directory
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    changes.append((parent, True))
+                continue
+            rel = f"{parent}/{name}" if parent else name
+            if mask & IN_ISDIR:
+                if not self.include_dir(rel):
+                    continue
+                if mask & IN_MOVED_FROM:
+                    self._forget_tree(rel)
+                elif mask & (IN_CREATE | IN_MOVED_TO) and rel not in self._rel_to_wd:
+                    changes.extend(self._watch_new_tree(rel))
+                changes.append((rel, True))
+            else:
+                changes.append((rel, False))
+        return changes
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _PollingBackend:
+    name = "polling"
+
+    def __init__(self, catalog: FileCatalog, interval: float | None = None):
+        self.catalog = catalog
+        self.interval = POLL_INTERVAL_SECONDS if interval is None else interval
+        self._snapshot = self._take()
+        self._next_poll = time.monotonic() + self.interval
+
+    @property
+    def watched_dirs(self) -> int:
+        return int(self.catalog.get_stats()["directories"])
+
+    def _take(self) -> dict[str, tuple[int, int]]:
+        return {e.rel: (e.mtime_ns, e.size) for e in self.catalog.files(deep=True)}
+
+    def read(self, timeout: float) -> list[tuple[str, bool]]:
+        wait = self._next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        if wait > 0:
+            time.sleep(wait)
+        self._next_poll = time.monotonic() + self.interval
+        current = self._take()
+        previous = self._snapshot
+        self._snapshot = current
+        changed = [rel for rel, sig in current.items() if previous.get(rel) != sig]
+        changed.extend(rel for rel in previous if rel not in current)
+        return [(rel, False) for rel in changed]
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class WatcherStats:
+    backend: str = ""
+    events: int = 0
+    dropped: int = 0
+    batches: int = 0
+    full_rescans: int = 0
+    errors: int = 0
+    last_batch_size: int = 0
+    last_batch_lag_ms: int = 0
+    last_batch_duration_ms: int = 0
+    max_batch_lag_ms: int = 0
+    recent_lags_ms: list[int] = field(default_factory=list)
+
+
+class FileWatcher:
+    """
+    Records changes under a project root and dispatches them in debounced batches.
+    """
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        on_batch: Callable[[ChangeBatch], None] | None = None,
+        backend: str = "auto",
+        debounce: float = DEBOUNCE_SECONDS,
+        max_delay: float = MAX_BATCH_DELAY_SECONDS,
+    ):
+        """
+        Args:
+            root: Directory to watch (defaults to config.PROJECT_ROOT)
+            on_batch: Called with each batch after the built-in invalidation
+            backend: "auto" (inotify, falling back to polling), "inotify" or "polling"
+            debounce: Quiet period that ends a burst of changes
+            max_delay: Upper bound on how long a change waits while a burst continues
+        """
+        if backend not in WATCH_BACKENDS:
+            raise ValueError(f"Unknown watch backend {backend!r}; expected one of {WATCH_BACKENDS}")
+        self.root = Path(root) if root is not None else config.PROJECT_ROOT
+        self.on_batch = on_batch
+        self.backend_name = backend
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.catalog = get_file_catalog(self.root)
+        self.stats = WatcherStats()
+        self._backend: _InotifyBackend | _PollingBackend | None = None
+        self._pending: dict[str, float] = {}
+        self._full_rescan = False
+        self._pending_events = 0
+        self._last_event = 0.0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def _include_dir(self, rel: str) -> bool:
+        if config.is_dir_ignored(rel.rsplit("/", 1)[-1]):
+            return False
+        matcher = self.catalog.matcher
+        return matcher is None or not matcher.is_ignored(rel, is_dir=True)
+
+    def _include_file(self, rel: str) -> bool:
+        parts = rel.split("/")
+        if any(config.is_dir_ignored(part) for part in parts[:-1]):
+            return False
+        matcher = self.catalog.matcher
+        return matcher is None or not matcher.is_ignored(rel)
+
+    def _open_backend(self) -> _InotifyBackend | _PollingBackend:
+        if self.backend_name in ("auto", "inotify"):
+            self.catalog.refresh()
+            dirs = [rel for rel, _ in self.catalog.walk()]
+            try:
+                return _InotifyBackend(self.root, self._include_dir, dirs)
+            except (OSError, AttributeError) as e:
+                if self.backend_name == "inotify":
+                    raise
+                logger.info(f"inotify unavailable ({e}); watching {self.root} by polling")
+        return _PollingBackend(self.catalog)
+
+    def start(self) -> None:
+        """Opens the backend and starts the reader and dispatcher threads."""
+        if self._threads:
+            return
+        self._stop.clear()
+        self._backend = self._open_backend()
+        self.stats.backend = self._backend.name
+        self._threads = [
+            threading.Thread(target=self._read_loop, name="ProjectMindWatchReader", daemon=True),
+            threading.Thread(target=self._dispatch_loop, name="ProjectMindWatchBatch", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(
+            f"Watching {self.root} ({self.stats.backend}, {self._backend.watched_dirs} directories)"
+        )
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def record(self, changes: list[tuple[str, bool]]) -> None:
+        """Queues (relative path, is_dir) changes; ignored paths are dropped."""
+        now = time.monotonic()
+        with self._cond:
+            for rel, is_dir in changes:
+                self.stats.events += 1
+                if (rel, is_dir) == FULL_RESCAN:
+                    self._full_rescan = True
+                elif not (self._include_dir(rel) if is_dir else self._include_file(rel)):
+                    self.stats.dropped += 1
+                    continue
+                else:
+                    self._pending.setdefault(rel, now)
+                self._pending_events += 1
+                self._last_event = now
+            if len(self._pending) > MAX_PENDING_PATHS:
+                self._full_rescan = True
+                self._pending.clear()
+            self._cond.notify_all()
+
+    def _read_loop(self) -> None:
+        while not self._stop.is_set():
+            backend = self._backend
+            if backend is None:
+                return
+            try:
+                changes = backend.read(READ_TIMEOUT_SECONDS)
+            except Exception as e:
+                self.stats.errors += 1
+                logger.warning(f"Watcher read failed: {e}")
+                self._stop.wait(READ_TIMEOUT_SECONDS)
+                continue
+            if changes:
+                self.record(changes)
+
+    def _take_batch(self) -> ChangeBatch | None:
+        """Waits until the pending changes are due, then takes them."""
+        with self._cond:
+            while not self._stop.is_set():
+                if not self._pending and not self._full_rescan:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                oldest = min(self._pending.values(), default=self._last_event)
+                due = min(self._last_event + self.debounce, oldest + self.max_delay)
+                if now >= due:
+                    batch = ChangeBatch(
+                        paths=[self.root / rel for rel in sorted(self._pending)],
+                        full_rescan=self._full_rescan,
+                        events=self._pending_events,
+                        first_event_at=oldest,
+                    )
+                    self._pending = {}
+                    self._full_rescan = False
+                    self._pending_events = 0
+                    return batch
+                self._cond.wait(due - now)
+        return None
+
+    def _dispatch_loop(self) -> None:
+        enter_background("watcher")
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            throttle()
+            self.dispatch(batch)
+
+    def dispatch(self, batch: ChangeBatch) -> None:
+        """Applies one batch: built-in invalidation, then the on_batch callback."""
+        started = time.monotonic()
+        try:
+            apply_batch(batch, self.catalog)
+            if self.on_batch is not None:
+                self.on_batch(batch)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(f"Watcher batch failed: {e}")
+        finished = time.monotonic()
+        lag_ms = int((finished - (batch.first_event_at or started)) * 1000)
+        self.stats.batches += 1
+        self.stats.full_rescans += int(batch.full_rescan)
+        self.stats.last_batch_size = len(batch.paths)
+        self.stats.last_batch_lag_ms = lag_ms
+        self.stats.last_batch_duration_ms = int((finished - started) * 1000)
+        self.stats.max_batch_lag_ms = max(self.stats.max_batch_lag_ms, lag_ms)
+        self.stats.recent_lags_ms = (self.stats.recent_lags_ms + [lag_ms])[-20:]
+
+    def get_stats(self) -> dict[str, Any]:
+        """Returns watcher statistics, including queue depth and pending lag."""
+        with self._cond:
+            depth = len(self._pending)
+            oldest = min(self._pending.values(), default=None)
+            full = self._full_rescan
+        s = self.stats
+        return {
+            "root": str(self.root),
+            "backend": s.backend,
+            "running": self.running,
+            "watched_dirs": self._backend.watched_dirs if self._backend is not None else 0,
+            "queue_depth": depth,
+            "full_rescan_pending": full,
+            "oldest_pending_s": round(time.monotonic() - oldest, 2) if oldest else 0.0,
+            "events": s.events,
+            "dropped": s.dropped,
+            "batches": s.batches,
+            "full_rescans": s.full_rescans,
+            "errors": s.errors,
+            "last_batch_size": s.last_batch_size,
+            "last_batch_lag_ms": s.last_batch_lag_ms,
+            "last_batch_duration_ms": s.last_batch_duration_ms,
+            "max_batch_lag_ms": s.max_batch_lag_ms,
+        }
+
+
+def apply_batch(batch: ChangeBatch, catalog: FileCatalog) -> None:
+    """Invalidates the file catalog, manifest shards and import graph for a batch."""
+    from code_intelligence import invalidate_import_graph_cache
+    from manifest import mark_dirty
+
+    if batch.full_rescan:
+        catalog.invalidate()
+        mark_dirty()
+        invalidate_import_graph_cache()
+        return
+    code_changed = False
+    for path in batch.paths:
+        catalog.invalidate(path)
+        mark_dirty(path)
+        suffix = path.suffix.lower()
+        code_changed = code_changed or not suffix or suffix in config.CODE_EXTENSIONS
+    if code_changed:
+        invalidate_import_graph_cache()
+
+
+_watcher: FileWatcher | None = None
+_watcher_lock = threading.Lock()
+
+
+def start_watcher(
+    root: Path | None = None,
+    on_batch: Callable[[ChangeBatch], None] | None = None,
+    backend: str | None = None,
+) -> bool:
+    """
+    Starts the process-wide watcher. Idempotent.
+
+    Args:
+        root: Directory to watch (defaults to config.PROJECT_ROOT)
+        on_batch: Callback for each batch
+        backend: Backend name (defaults to config.get_watch_mode(), or "auto"
+            when watch mode is off)
+
+    Returns:
+        True if a watcher was started, False if one is already running for root
+    """
+    global _watcher
+    root = Path(root) if root is not None else config.PROJECT_ROOT
+    with _watcher_lock:
+        if _watcher is not None and _watcher.running:
+            if _watcher.root == root:
+                return False
+            _watcher.stop()
+        if backend is None:
+            mode = config.get_watch_mode()
+            backend = "auto" if mode == "off" else mode
+        watcher = FileWatcher(root, on_batch=on_batch, backend=backend)
+        watcher.start()
+        _watcher = watcher
+        return True
+
+
+def stop_watcher(timeout: float = 2.0) -> None:
+    global _watcher
+    with _watcher_lock:
+        if _watcher is not None:
+            _watcher.stop(timeout)
+            _watcher = None
+
+
+def get_watcher() -> FileWatcher | None:
+    return _watcher
@@ -0,0 +1,285 @@
+"""
+Git-driven change detection for incremental indexing.
+
+Instead of stat-ing every file and comparing mtimes with IndexMetadata, the
+incremental indexer asks git what changed since the last index run:
+
+  - committed changes: `git diff --name-status <indexed HEAD> HEAD`
+  - working-tree changes: `git status` plus the blob id of every dirty or
+    untracked file (`git hash-object`), compared with the blob ids recorded at
+    the last run, so a file that stays dirty is not re-indexed every time and
+    a file reverted to HEAD is picked up
+  - optionally, paths recorded by post-checkout / post-merge / post-rewrite
+    hooks (`install_hooks()`), which also cover the case where the indexed
+    HEAD was rewritten away (rebase, force-pull followed by gc)
+
+Mtimes are never consulted, so a checkout that rewrites mtimes does not
+trigger a full re-index. The state (indexed HEAD and dirty blob ids) lives in
+`.ai/git_index_state.json`. `detect_changes()` returns None whenever git
+cannot answer reliably (not a repository, no recorded state, indexed HEAD gone
+without hook records); callers then fall back to the mtime scan.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import config
+from exceptions import GitError
+from git_utils import GitRepository
+from logger import get_logger
+
+logger = get_logger()
+
+STATE_FILENAME = "git_index_state.json"
+HOOK_LOG_FILENAME = "git_changed_paths"
+HOOK_MARKER = "# projectmind: record changed paths"
+HOOK_NAMES: tuple[str, ...] = ("post-checkout", "post-merge", "post-rewrite")
+
+_HOOK_COMMANDS = {
+    "post-checkout": '[ "$3" = 1 ] && git diff --name-only "$1" "$2" >> "$log"',
+    "post-merge": 'git diff --name-only ORIG_HEAD HEAD >> "$log"',
+    "post-rewrite": 'git diff --name-only ORIG_HEAD HEAD >> "$log"',
+}
+
+
+@dataclass
+class GitIndexState:
+    head: str
+    # Dirty or untracked paths (relative to the working tree root) -> blob id, "" if deleted
+    worktree: dict[str, str] = field(default_factory=dict)
+    # Hooks were installed when the state was recorded, so the hook log is complete
+    hooks: bool = False
+    recorded_at: float = 0.0
+
+
+@dataclass
+class GitChanges:
+    base: str
+    head: str
+    # Absolute paths under the project root that were added, modified or deleted
+    paths: list[Path]
+    committed: int = 0
+    worktree_changed: int = 0
+    from_hooks: int = 0
+    # State to record once the changes are indexed
+    state: GitIndexState | None = None
+
+
+def _state_path() -> Path:
+    return config.AI_DIR / STATE_FILENAME
+
+
+def _hook_log_path() -> Path:
+    return config.AI_DIR / HOOK_LOG_FILENAME
+
+
+def load_state() -> GitIndexState | None:
+    try:
+        data = json.loads(_state_path().read_text(encoding="utf-8"))
+        return GitIndexState(
+            head=data["head"],
+            worktree=dict(data.get("worktree", {})),
+            hooks=bool(data.get("hooks", False)),
+            recorded_at=float(data.get("recorded_at", 0.0)),
+        )
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Git index state unreadable: {e}")
+        return None
+
+
+def save_state(state: GitIndexState) -> None:
+    """Records the indexed state and clears the hook log it supersedes."""
+    from incremental_indexing import atomic_write
+
+    state.recorded_at = time.time()
+    atomic_write(_state_path(), json.dumps(asdict(state), ensure_ascii=False))
+    try:
+        _hook_log_path().unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _may_be_indexed(path: str) -> bool:
+    """Cheap pre-filter so dirty build outputs, stores in .ai/ etc. are never hashed."""
+    parts = path.split("/")
+    if any(config.is_dir_ignored(part) for part in parts[:-1]):
+        return False
+    suffix = Path(parts[-1]).suffix
+    return suffix not in config.BINARY_EXTENSIONS and (
+        not suffix or suffix in config.INDEXABLE_EXTENSIONS
+    )
+
+
+def _dirty_blobs(repo: GitRepository) -> dict[str, str]:
+    entries = repo.status_paths()
+    worktree: dict[str, str] = {}
+    present: list[str] = []
+    top = repo.working_tree_dir
+    for status, path in entries:
+        if not _may_be_indexed(path):
+            continue
+        if "D" in status or not (top / path).is_file():
+            worktree[path] = ""
+        else:
+            present.append(path)
+    worktree.update(repo.hash_objects(present))
+    return worktree
+
+
+def hooks_installed(repo: GitRepository) -> bool:
+    try:
+        hooks_dir = repo.git_path("hooks")
+    except GitError:
+        return False
+    for name in HOOK_NAMES:
+        try:
+            if HOOK_MARKER not in (hooks_dir / name).read_text(encoding="utf-8"):
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def capture_state(root: Path | None = None) -> GitIndexState | None:
+    """
+    Snapshots HEAD and the dirty files' blob ids. Take it before indexing and
+    save it afterwards, so edits made during the run are seen next time.
+
+    Returns:
+        The snapshot, or None if root is not in a git work tree with commits
+    """
+    repo = GitRepository(str(root or config.PROJECT_ROOT))
+    try:
+        head = repo.get_head_sha()
+        if head is None:
+            return None
+        return GitIndexState(head=head, worktree=_dirty_blobs(repo), hooks=hooks_installed(repo))
+    except GitError as e:
+        logger.debug(f"Git state unavailable: {e}")
+        return None
+
+
+def _read_hook_log() -> list[str]:
+    try:
+        lines = _hook_log_path().read_text(encoding="utf-8", errors="replace").splitlines()
+    except FileNotFoundError:
+        return []
+    return [line for line in lines if line.strip()]
+
+
+def detect_changes(root: Path | None = None) -> GitChanges | None:
+    """
+    Lists project files changed since the last recorded index run, using git only.
+
+    Args:
+        root: Project root (defaults to config.PROJECT_ROOT); may be a
+            subdirectory of the work tree
+
+    Returns:
+        GitChanges, or None if git cannot answer and the caller should scan
+    """
+    root = Path(root or config.PROJECT_ROOT)
+    previous = load_state()
+    if previous is None:
+        return None
+    repo = GitRepository(str(root))
+    try:
+        top = repo.working_tree_dir
+        head = repo.get_head_sha()
+        if head is None:
+            return None
+        touched: set[str] = set()
+        committed = from_hooks = 0
+        hook_paths = _read_hook_log()
+        if previous.head != head:
+            if repo.has_commit(previous.head):
+                diff = [p for _, p in repo.diff_names(previous.head, head) if _may_be_indexed(p)]
+                touched.update(diff)
+                committed = len(diff)
+            elif previous.hooks:
+                logger.info("Indexed HEAD no longer exists; using paths recorded by git hooks")
+            else:
+                logger.info("Indexed HEAD no longer exists; falling back to a full change scan")
+                return None
+        before = len(touched)
+        touched.update(p for p in hook_paths if _may_be_indexed(p))
+        from_hooks = len(touched) - before
+
+        worktree = _dirty_blobs(repo)
+        changed_in_worktree = {
+            p for p, blob in worktree.items() if previous.worktree.get(p) != blob
+        }
+        # Dirty last time but clean now: the file went back to its committed content
+        changed_in_worktree.update(p for p in previous.worktree if p not in worktree)
+        touched.update(changed_in_worktree)
+    except GitError as e:
+        logger.warning(f"Git change detection failed, falling back to a scan: {e}")
+        return None
+
+    paths: list[Path] = []
+    for rel in sorted(touched):
+        path = top / rel
+        try:
+            path.relative_to(root)
+        except ValueError:
+            continue
+        paths.append(path)
+    return GitChanges(
+        base=previous.head,
+        head=head,
+        paths=paths,
+        committed=committed,
+        worktree_changed=len(changed_in_worktree),
+        from_hooks=from_hooks,
+        state=GitIndexState(head=head, worktree=worktree, hooks=hooks_installed(repo)),
+    )
+
+
+def install_hooks(root: Path | None = None) -> list[Path]:
+    """
+    Installs (or appends to) post-checkout, post-merge and post-rewrite hooks
+    that record changed paths for the next incremental index run. Existing
+    hooks are kept; hooks that already contain the ProjectMind block are left alone.
+
+    Returns:
+        Hook files that were created or extended
+
+    Raises:
+        GitError: If root is not inside a git repository
+    """
+    repo = GitRepository(str(root or config.PROJECT_ROOT))
+    hooks_dir = repo.git_path("hooks")
+    hooks_dir.mkdir(parents=True, exist_ok=True)
+    log = str(_hook_log_path()).replace("'", "'\\''")
+    written: list[Path] = []
+    for name in HOOK_NAMES:
+        hook = hooks_dir / name
+        block = (
+            f"\n{HOOK_MARKER}\n"
+            f"log='{log}'\n"
+            f'mkdir -p "$(dirname "$log")" 2>/dev/null\n'
+            f"{_HOOK_COMMANDS[name]} 2>/dev/null || true\n"
+        )
+        try:
+            existing = hook.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            existing = ""
+        if HOOK_MARKER in existing:
+            continue
+        if existing:
+            content = existing.rstrip("\n") + "\n" + block
+        else:
+            content = "#!/bin/sh" + block
+        hook.write_text(content, encoding="utf-8")
+        mode = hook.stat().st_mode
+        os.chmod(hook, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        written.append(hook)
+    return written
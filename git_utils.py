@@ -2,6 +2,7 @@
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from pathlib import Path
 
 import git
 
@@ -10,6 +11,9 @@ from logger import get_logger
 
 logger = get_logger()
 
+# Paths per `git hash-object` call, to stay well below command-line length limits
+HASH_OBJECTS_CHUNK = 500
+
 
 @dataclass
 class CommitInfo:
@@ -155,3 +159,79 @@ class GitRepository:
             return sum(1 for _ in repo.iter_commits(max_count=max_scan))
         except Exception:
             return 0
+
+    @property
+    def working_tree_dir(self) -> Path:
+        repo = self._get_repo()
+        if repo.working_tree_dir is None:
+            raise GitError("Repository has no working tree.")
+        return Path(repo.working_tree_dir)
+
+    def get_head_sha(self) -> str | None:
+        """Returns the commit id of HEAD, or None on a branch without commits."""
+        try:
+            return str(self._get_repo().head.commit.hexsha)
+        except ValueError:
+            return None
+        except git.GitCommandError as e:
+            raise GitError(f"Cannot resolve HEAD: {e}") from e
+
+    def has_commit(self, sha: str) -> bool:
+        try:
+            self._get_repo().git.cat_file("-e", f"{sha}^{{commit}}")
+            return True
+        except git.GitCommandError:
+            return False
+
+    def diff_names(self, base: str, head: str = "HEAD") -> list[tuple[str, str]]:
+        """
+        Lists files that differ between two commits.
+
+        Returns:
+            (status letter, path relative to the working tree root) pairs;
+            renames are reported as a deletion plus an addition
+        """
+        try:
+            out = self._get_repo().git.diff("--name-status", "-z", "--no-renames", base, head)
+        except git.GitCommandError as e:
+            raise GitError(f"git diff {base[:7]}..{head[:7]} failed: {e}") from e
+        fields = out.split("\0")
+        return [(fields[i], fields[i + 1]) for i in range(0, len(fields) - 1, 2) if fields[i]]
+
+    def status_paths(self) -> list[tuple[str, str]]:
+        """
+        Lists working-tree and index changes, including untracked files.
+
+        Returns:
+            (two-letter porcelain status, path relative to the working tree root) pairs
+        """
+        try:
+            out = self._get_repo().git.status(
+                "--porcelain=v1", "-z", "--untracked-files=all", "--no-renames"
+            )
+        except git.GitCommandError as e:
+            raise GitError(f"git status failed: {e}") from e
+        return [(entry[:2], entry[3:]) for entry in out.split("\0") if len(entry) > 3]
+
+    def hash_objects(self, paths: list[str]) -> dict[str, str]:
+        """Returns the blob id git would store for each working-tree path (batched git calls)."""
+        repo = self._get_repo()
+        blobs: dict[str, str] = {}
+        for start in range(0, len(paths), HASH_OBJECTS_CHUNK):
+            chunk = paths[start : start + HASH_OBJECTS_CHUNK]
+            try:
+                out = repo.git.hash_object("--", *chunk)
+            except git.GitCommandError as e:
+                raise GitError(f"git hash-object failed: {e}") from e
+            blobs.update(zip(chunk, out.split(), strict=True))
+        return blobs
+
+    def git_path(self, name: str) -> Path:
+        """Resolves a path inside the git directory (honours core.hooksPath for "hooks")."""
+        repo = self._get_repo()
+        try:
+            rel = repo.git.rev_parse("--git-path", name)
+        except git.GitCommandError as e:
+            raise GitError(f"git rev-parse --git-path {name} failed: {e}") from e
+        path = Path(rel)
+        return path if path.is_absolute() else self.working_tree_dir / path
@@ -0,0 +1,326 @@
+"""
+Compiled ignore rules with .gitignore semantics.
+
+Patterns are parsed once into rules (negation with "!", directory-only rules
+ending in "/", anchoring when the pattern contains a "/", "*", "?", "[...]"
+and "**") and compiled into a few lookup structures instead of being tested
+one by one per path:
+
+  - literal basenames ("node_modules", ".env")    -> dict lookup
+  - "*<literal>" basenames ("*.pyc", "*.min.js")  -> dict lookup per suffix length
+  - other basename globs                          -> one combined regex
+  - anchored path patterns ("/build", "docs/**")  -> one combined regex
+
+In the combined regexes the rules appear in reverse order with one named group
+each, so the first alternative that matches is the last matching rule and the
+gitignore "last match wins" rule (needed for negation) falls out of a single
+regex call. As in git, a path inside an excluded directory stays excluded even
+if a later "!" rule matches it; walkers get this by pruning excluded
+directories.
+
+    matcher = IgnoreMatcher(["build/", "*.min.js", "!keep.min.js"])
+    matcher.is_ignored("web/app.min.js")  # True
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+import config
+from cache_manager import LRUCache
+from logger import get_logger
+
+logger = get_logger()
+
+_MAGIC = re.compile(r"[*?\[\\]")
+DIR_CACHE_LIMIT = 65536
+COMPILED_CACHE_CAPACITY = 32
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    pattern: str
+    body: str
+    negate: bool = False
+    dir_only: bool = False
+    anchored: bool = False
+
+
+def parse_rule(line: str) -> IgnoreRule | None:
+    """
+    Parses one .gitignore line.
+
+    Returns:
+        IgnoreRule, or None for blank lines and comments
+    """
+    text = line.rstrip("\r\n")
+    # Trailing spaces are ignored unless escaped with a backslash
+    stripped = text.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(text):
+        stripped += " "
+    text = stripped
+    if not text or text.startswith("#"):
+        return None
+    negate = text.startswith("!")
+    if negate:
+        text = text[1:]
+    elif text.startswith(("\\!", "\\#")):
+        text = text[1:]
+    dir_only = text.endswith("/")
+    body = text.rstrip("/")
+    anchored = "/" in body
+    body = body.lstrip("/")
+    if not body:
+        return None
+    return IgnoreRule(
+        pattern=line.strip(), body=body, negate=negate, dir_only=dir_only, anchored=anchored
+    )
+
+
+def glob_to_regex(glob: str) -> str:
+    """Translates a gitignore glob into a regex matching whole relative paths."""
+    out: list[str] = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if c == "*":
+            if glob.startswith("**", i):
+                j = i + 2
+                at_start = i == 0 or glob[i - 1] == "/"
+                at_end = j == n or glob[j] == "/"
+                if at_start and at_end:
+                    if j == n:
+                        out.append(".*")
+                    else:
+                        out.append("(?:.*/)?")
+                        j += 1
+                else:
+                    out.append("[^/]*")
+                i = j
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and glob[j] in "!^":
+                j += 1
+            if j < n and glob[j] == "]":
+                j += 1
+            while j < n and glob[j] != "]":
+                j += 1
+            if j >= n:
+                out.append(re.escape(c))
+            else:
+                members = glob[i + 1 : j].replace("\\", "\\\\")
+                if members[0] in "!^":
+                    members = "^" + members[1:]
+                out.append(f"[{members}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def _combine(alternatives: list[tuple[int, str]]) -> re.Pattern[str] | None:
+    if not alternatives:
+        return None
+    # Highest rule index first: the first alternative that matches is the last rule
+    ordered = sorted(alternatives, reverse=True)
+    return re.compile("|".join(f"(?P<r{idx}>{regex})" for idx, regex in ordered), re.DOTALL)
+
+
+class _RuleSet:
+    def __init__(self, rules: list[tuple[int, IgnoreRule]]):
+        self.names: dict[str, int] = {}
+        self.suffixes: dict[str, int] = {}
+        base_globs: list[tuple[int, str]] = []
+        path_globs: list[tuple[int, str]] = []
+        for idx, rule in rules:
+            body = rule.body
+            if rule.anchored:
+                path_globs.append((idx, glob_to_regex(body)))
+            elif not _MAGIC.search(body):
+                self.names[body] = idx
+            elif body.startswith("*") and len(body) > 1 and not _MAGIC.search(body[1:]):
+                self.suffixes[body[1:]] = idx
+            else:
+                base_globs.append((idx, glob_to_regex(body)))
+        self.suffix_lengths = sorted({len(s) for s in self.suffixes})
+        self.base_re = _combine(base_globs)
+        self.path_re = _combine(path_globs)
+
+    def winner(self, rel: str, base: str) -> int:
+        """Index of the last rule matching the path, or -1."""
+        best = self.names.get(base, -1)
+        for length in self.suffix_lengths:
+            if length > len(base):
+                break
+            idx = self.suffixes.get(base[-length:], -1)
+            if idx > best:
+                best = idx
+        if self.base_re is not None:
+            m = self.base_re.fullmatch(base)
+            if m is not None and m.lastgroup is not None:
+                best = max(best, int(m.lastgroup[1:]))
+        if self.path_re is not None:
+            m = self.path_re.fullmatch(rel)
+            if m is not None and m.lastgroup is not None:
+                best = max(best, int(m.lastgroup[1:]))
+        return best
+
+
+class IgnoreMatcher:
+    """
+    Ordered gitignore-style rules compiled for fast matching of relative paths.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        """
+        Args:
+            patterns: Lines in .gitignore syntax, in file order
+        """
+        self.rules = [rule for rule in (parse_rule(p) for p in patterns) if rule is not None]
+        indexed = list(enumerate(self.rules))
+        self._dir_rules = _RuleSet(indexed)
+        self._file_rules = _RuleSet([(i, r) for i, r in indexed if not r.dir_only])
+        self._dir_cache: dict[str, bool] = {}
+        # Ignore files this matcher was loaded from, with their (mtime_ns, size)
+        self.sources: dict[Path, tuple[int, int] | None] = {}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, rel: str, is_dir: bool = False) -> bool:
+        """
+        Whether the path itself is excluded, without looking at its parents.
+
+        Args:
+            rel: "/"-separated path relative to the ignore file's directory
+            is_dir: Path is a directory (directory-only rules apply)
+        """
+        if not self.rules:
+            return False
+        rules = self._dir_rules if is_dir else self._file_rules
+        idx = rules.winner(rel, rel.rsplit("/", 1)[-1])
+        return idx >= 0 and not self.rules[idx].negate
+
+    def is_ignored(self, rel: str, is_dir: bool = False) -> bool:
+        """
+        Whether the path is excluded, either directly or through an excluded
+        parent directory (parent results are cached).
+        """
+        if not self.rules:
+            return False
+        if "/" in rel and self._dir_ignored(rel.rsplit("/", 1)[0]):
+            return True
+        return self.match(rel, is_dir)
+
+    def _dir_ignored(self, rel: str) -> bool:
+        cached = self._dir_cache.get(rel)
+        if cached is None:
+            cached = self.is_ignored(rel, is_dir=True)
+            if len(self._dir_cache) >= DIR_CACHE_LIMIT:
+                self._dir_cache.clear()
+            self._dir_cache[rel] = cached
+        return cached
+
+    def is_stale(self) -> bool:
+        """True if any source ignore file was created, changed or removed since loading."""
+        return any(_signature(path) != sig for path, sig in self.sources.items())
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# Header of .indexignore files created when patterns were substring matches
+LEGACY_SUBSTRING_HEADER = "substring match on full path"
+_warned_legacy: set[str] = set()
+
+
+def read_ignore_file(path: Path) -> list[str]:
+    """
+    Returns the pattern lines of an ignore file in order (comments and blanks
+    dropped). Warns once per file if it still carries the header of the old
+    substring-matching format, whose patterns may now match less.
+    """
+    lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    if str(path) not in _warned_legacy and any(
+        LEGACY_SUBSTRING_HEADER in line for line in lines if line.lstrip().startswith("#")
+    ):
+        _warned_legacy.add(str(path))
+        logger.warning(
+            f"{path} was written for substring matching; patterns now use .gitignore "
+            'rules, so "test" ignores files or directories named test, not every path '
+            'containing it. Write "*test*" for the old behaviour and update the header comment.'
+        )
+    return [line for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+_compiled = LRUCache(COMPILED_CACHE_CAPACITY)
+
+
+def compile_patterns(patterns: Iterable[str]) -> IgnoreMatcher:
+    """Returns a compiled matcher for a pattern collection (cached per distinct collection)."""
+    patterns = tuple(patterns)
+    key = "\n".join(patterns)
+    matcher = _compiled.get(key)
+    if matcher is None:
+        matcher = IgnoreMatcher(patterns)
+        _compiled.put(key, matcher)
+    return matcher
+
+
+def load_project_matcher(root: Path | None = None) -> IgnoreMatcher:
+    """
+    Compiles the project's ignore rules: the root .gitignore (unless
+    PROJECTMIND_RESPECT_GITIGNORE=0) followed by the active .indexignore, so
+    .indexignore can re-include with "!".
+    """
+    if root is None:
+        root = config.PROJECT_ROOT
+    watched = [root / ".gitignore", root / ".indexignore"]
+    if root == config.PROJECT_ROOT:
+        watched.append(config.INDEX_IGNORE_FILE)
+        index_ignore = config.resolve_index_ignore_file()
+    else:
+        index_ignore = root / ".indexignore"
+
+    sources = [index_ignore]
+    if config.get_respect_gitignore():
+        sources.insert(0, root / ".gitignore")
+
+    patterns: list[str] = []
+    for path in sources:
+        if not path.is_file():
+            continue
+        try:
+            patterns.extend(read_ignore_file(path))
+        except OSError as e:
+            logger.warning(f"Cannot read ignore file {path}: {e}")
+    matcher = IgnoreMatcher(patterns)
+    matcher.sources = {path: _signature(path) for path in watched}
+    return matcher
+
+
+def relative_posix(path: Path, root: Path | None = None) -> str:
+    """Path relative to root (default project root) in "/" form, for matching."""
+    if root is None:
+        root = config.PROJECT_ROOT
+    try:
+        return path.relative_to(root).as_posix()
+    except ValueError:
+        return path.as_posix().lstrip("/").replace(os.sep, "/")
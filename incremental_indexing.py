@@ -1,14 +1,19 @@
+import hashlib
 import json
 import os
 import sys
 import tempfile
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 import config
+from index_store import IndexStore
+from resource_policy import pool_size
 
 if sys.platform == "win32":
     import msvcrt
@@ -43,14 +48,14 @@ def file_lock(file_handle: Any) -> Generator[None, None, None]:
             fcntl.flock(file_handle.fileno(), fcntl.LOCK_UN)
 
 
-def atomic_write(file_path: Path, content: str) -> None:
+def atomic_write(file_path: Path, content: str | bytes) -> None:
     """
     Atomically writes content to a file using temp file + rename.
     Prevents partial writes and corruption.
 
     Args:
         file_path: Target file path
-        content: Content to write
+        content: Content to write (str is written as UTF-8, bytes verbatim)
 
     Raises:
         IOError: If write operation fails
@@ -62,10 +67,16 @@ def atomic_write(file_path: Path, content: str) -> None:
     )
 
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            f.write(content)
-            f.flush()
-            os.fsync(f.fileno())
+        if isinstance(content, bytes):
+            with os.fdopen(fd, "wb") as fb:
+                fb.write(content)
+                fb.flush()
+                os.fsync(fb.fileno())
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
 
         if sys.platform == "win32":
             try:
@@ -83,78 +94,389 @@ def atomic_write(file_path: Path, content: str) -> None:
         raise
 
 
+HASH_BLOCK_SIZE = 1024 * 1024
+# Hash candidates are spread over a thread pool above this count
+PARALLEL_HASH_THRESHOLD = 16
+# Hashing runs in the background budget (cgroup-aware, see resource_policy)
+MAX_HASH_WORKERS = pool_size(background=True)
+
+
+def _hash_one(file_path: Path) -> str | None:
+    try:
+        return hash_file(file_path)
+    except OSError:
+        return None
+
+
+def _hash_files(paths: list[Path]) -> list[str | None]:
+    """Hashes files, on a thread pool when there are many (file reads release the GIL)."""
+    if len(paths) < PARALLEL_HASH_THRESHOLD or MAX_HASH_WORKERS <= 1:
+        return [_hash_one(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=MAX_HASH_WORKERS, thread_name_prefix="index-hash") as pool:
+        return list(pool.map(_hash_one, paths))
+
+
+def hash_file(file_path: Path) -> str:
+    """Streaming BLAKE2b-128 of a file's bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        while block := f.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class ChangeScanStats:
+    checked: int = 0
+    # Size and mtime_ns matched the stored record: no read at all
+    stat_unchanged: int = 0
+    hashed: int = 0
+    # Stat changed but the content hash matched: only the stat record was updated
+    touched_unchanged: int = 0
+    changed: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.changed} of {self.checked} files changed; "
+            f"{self.touched_unchanged} touched but identical (hash match, not re-indexed)"
+        )
+
+
+@dataclass
+class IndexCheckpoint:
+    """Durable progress of a resumable full index (see CodebaseIndexer.index_all)."""
+
+    job_id: str
+    root: str
+    total: int
+    started_at: float
+    force: bool = False
+    # Sequence number of the last processed work-list entry (entries are numbered 1..total)
+    cursor: int = 0
+    files_indexed: int = 0
+    chunks: int = 0
+    slices: int = 0
+    # Seconds spent working, summed over slices
+    elapsed: float = 0.0
+    # git_changes.GitIndexState captured when the job started, recorded once it completes
+    git_state: dict[str, Any] | None = None
+    # The first hot_total work-list entries are the prioritized hot set
+    hot_total: int = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.cursor >= self.total
+
+    @property
+    def hot_done(self) -> int:
+        return min(self.cursor, self.hot_total)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, text: str) -> "IndexCheckpoint":
+        return cls(**json.loads(text))
+
+
 class IndexMetadata:
+    """
+    Per-file index records: size, mtime_ns and a content hash (plus the legacy
+    float mtime), the chunk ids produced for the file and the generation in
+    which it was indexed. Change detection trusts an identical (size,
+    mtime_ns), hashes files whose stat changed, and treats a matching hash as
+    unchanged.
+
+    Records live in the SQLite store at `config.INDEX_META_DB` and are looked
+    up by path on demand; changes are buffered in memory and written by
+    `save()` in one transaction.
+    """
+
     def __init__(self) -> None:
-        self.metadata: dict[str, dict[str, str | float]] = {}
+        self.store = IndexStore(config.INDEX_META_DB)
+        # path -> record to write, or None to delete
+        self._pending: dict[str, dict[str, Any] | None] = {}
+        # The buffered records replace the whole store on save
+        self._replaced = False
+        self.last_scan = ChangeScanStats()
+        # Vector-store ids of chunks whose file record was removed or re-indexed
+        # into a different chunk set; the indexer deletes them (see take_orphaned_chunk_ids)
+        self.orphaned_chunk_ids: list[str] = []
+        self.dirty = False
         self.load()
 
+    @property
+    def metadata(self) -> dict[str, dict[str, Any]]:
+        """Snapshot of all records (stored plus unsaved); edit through the methods."""
+        records = {} if self._replaced else self.store.all_records()
+        for path, record in self._pending.items():
+            if record is None:
+                records.pop(path, None)
+            else:
+                records[path] = record
+        return records
+
+    @metadata.setter
+    def metadata(self, records: dict[str, dict[str, Any]]) -> None:
+        self._pending = dict(records)
+        self._replaced = True
+        self.dirty = True
+
     def load(self) -> None:
-        if config.INDEX_METADATA_FILE.exists():
-            try:
-                with open(config.INDEX_METADATA_FILE) as f:
-                    self.metadata = json.load(f)
-            except Exception:
-                self.metadata = {}
-        else:
-            self.metadata = {}
+        """Drops unsaved changes; migrates the legacy JSON file on first use."""
+        self._pending = {}
+        self._replaced = False
+        self.dirty = False
+        if not self.store.exists() and config.INDEX_METADATA_FILE.exists():
+            self._migrate_json()
+
+    def _migrate_json(self) -> None:
+        from logger import get_logger
 
-    def save(self) -> None:
+        logger = get_logger()
+        legacy = config.INDEX_METADATA_FILE
+        try:
+            with open(legacy) as f:
+                records = json.load(f)
+        except Exception as e:
+            logger.warning(f"Legacy index metadata unreadable, starting empty: {e}")
+            return
+        self.metadata = records
+        try:
+            self.save()
+            legacy.rename(legacy.with_name(f"{legacy.name}.migrated"))
+            logger.info(f"Migrated {len(records)} index metadata records to {self.store.db_path}")
+        except Exception as e:
+            logger.warning(f"Index metadata migration failed, using the JSON records: {e}")
+
+    def save(self, checkpoint: IndexCheckpoint | None = None) -> None:
         """
-        Atomically saves metadata to disk with file locking.
-        Uses temp file + rename to prevent corruption.
+        Writes buffered upserts and deletions to the store in a single transaction.
+
+        Args:
+            checkpoint: Job progress to commit together with the records
         """
         from logger import get_logger
 
         logger = get_logger()
 
+        upserts = {path: r for path, r in self._pending.items() if r is not None}
+        deletes = [path for path, r in self._pending.items() if r is None]
         try:
-            content = json.dumps(self.metadata, indent=2)
-            atomic_write(config.INDEX_METADATA_FILE, content)
-            logger.debug(f"Metadata saved successfully: {len(self.metadata)} files tracked")
+            generation = self.store.apply(
+                upserts,
+                deletes,
+                replace_all=self._replaced,
+                job=checkpoint.to_json() if checkpoint else None,
+            )
+            self._pending = {}
+            self._replaced = False
+            self.dirty = False
+            logger.debug(
+                f"Metadata saved: {len(upserts)} upserted, {len(deletes)} removed "
+                f"(generation {generation})"
+            )
         except Exception as e:
             logger.error(f"Error saving metadata: {e}", exc_info=True)
             raise
 
+    def load_checkpoint(self) -> IndexCheckpoint | None:
+        """Returns the checkpoint of an unfinished full index, if any."""
+        from logger import get_logger
+
+        try:
+            raw = self.store.get_meta("job")
+            return IndexCheckpoint.from_json(raw) if raw else None
+        except Exception as e:
+            get_logger().warning(f"Discarding unreadable index checkpoint: {e}")
+            return None
+
+    def begin_job(
+        self, checkpoint: IndexCheckpoint, files: list[Path], reset: bool = False
+    ) -> None:
+        """
+        Stores the work list and initial checkpoint of a full index.
+
+        Args:
+            checkpoint: Initial progress (cursor 0)
+            files: Files to index, in processing order
+            reset: Drop all file records first (forced re-index)
+        """
+        self.store.start_job(checkpoint.to_json(), (str(f) for f in files), reset=reset)
+        if reset:
+            self._pending = {}
+            self._replaced = False
+
+    def job_files(self, checkpoint: IndexCheckpoint, limit: int) -> list[tuple[int, Path]]:
+        """Next work-list entries after the checkpoint's cursor."""
+        return [(seq, Path(p)) for seq, p in self.store.job_files(checkpoint.cursor, limit)]
+
+    def finish_job(self) -> None:
+        self.store.finish_job()
+
+    def _get(self, file_path: str) -> dict[str, Any] | None:
+        if file_path in self._pending:
+            return self._pending[file_path]
+        return None if self._replaced else self.store.get(file_path)
+
+    def _get_many(self, file_paths: list[str]) -> dict[str, dict[str, Any]]:
+        stored = [p for p in file_paths if p not in self._pending]
+        records = {} if self._replaced else self.store.get_many(stored)
+        for path in file_paths:
+            record = self._pending.get(path)
+            if record is not None:
+                records[path] = record
+        return records
+
     def get_file_mtime(self, file_path: str) -> float:
-        return float(self.metadata.get(file_path, {}).get("mtime", 0.0))
+        return float((self._get(file_path) or {}).get("mtime", 0.0))
 
-    def update_file(self, file_path: str, mtime: float) -> None:
-        self.metadata[file_path] = {
-            "mtime": mtime,
-            "indexed_at": datetime.now().isoformat(),
-        }
+    def get_chunk_ids(self, file_path: str) -> list[str]:
+        """Vector-store chunk ids recorded when the file was last indexed."""
+        return list((self._get(file_path) or {}).get("chunk_ids", []))
+
+    def take_orphaned_chunk_ids(self) -> list[str]:
+        """Returns and forgets the chunk ids collected in `orphaned_chunk_ids`."""
+        ids, self.orphaned_chunk_ids = self.orphaned_chunk_ids, []
+        return ids
+
+    def update_file(
+        self,
+        file_path: str,
+        mtime: float,
+        size: int | None = None,
+        mtime_ns: int | None = None,
+        content_hash: str | None = None,
+        chunk_ids: list[str] | None = None,
+    ) -> None:
+        record: dict[str, Any] = {"mtime": mtime}
+        if size is not None and mtime_ns is not None and content_hash is not None:
+            record.update(size=size, mtime_ns=mtime_ns, hash=content_hash)
+        if chunk_ids is not None:
+            record["chunk_ids"] = list(chunk_ids)
+            kept = set(chunk_ids)
+            self.orphaned_chunk_ids.extend(
+                i for i in self.get_chunk_ids(file_path) if i not in kept
+            )
+        record["indexed_at"] = datetime.now().isoformat()
+        self._pending[file_path] = record
+        self.dirty = True
+
+    def record_indexed(self, file_path: Path, chunk_ids: list[str] | None = None) -> None:
+        """Stores the current stat, content hash and chunk ids of a file that was just indexed."""
+        st = file_path.stat()
+        self.update_file(
+            str(file_path),
+            st.st_mtime,
+            st.st_size,
+            st.st_mtime_ns,
+            hash_file(file_path),
+            chunk_ids,
+        )
 
     def get_changed_files(self, all_files: list[Path]) -> list[Path]:
-        changed_files = []
+        """
+        Returns files whose content may differ from what was indexed.
+
+        Files with an unchanged (size, mtime_ns) are skipped without reading;
+        files whose stat changed are hashed (in parallel for large sets) and
+        skipped if the hash matches, in which case only the stat record is
+        refreshed. Records without a hash fall back to the mtime comparison.
+        Counts are left in `last_scan`.
+        """
+        stats = ChangeScanStats(checked=len(all_files))
+        changed_files: list[Path] = []
+        to_hash: list[tuple[Path, os.stat_result, dict[str, Any]]] = []
+        records = self._get_many([str(p) for p in all_files])
 
         for file_path in all_files:
             try:
-                current_mtime = file_path.stat().st_mtime
-                stored_mtime = self.get_file_mtime(str(file_path))
-
-                if current_mtime > stored_mtime:
+                st = file_path.stat()
+                record = records.get(str(file_path))
+                if record is None:
+                    changed_files.append(file_path)
+                elif "hash" not in record:
+                    if st.st_mtime > float(record.get("mtime", 0.0)):
+                        changed_files.append(file_path)
+                    else:
+                        stats.stat_unchanged += 1
+                elif st.st_size != record.get("size"):
                     changed_files.append(file_path)
+                elif st.st_mtime_ns == record.get("mtime_ns"):
+                    stats.stat_unchanged += 1
+                else:
+                    to_hash.append((file_path, st, record))
             except Exception:
                 changed_files.append(file_path)
 
+        if to_hash:
+            paths = [item[0] for item in to_hash]
+            hashes = _hash_files(paths)
+            stats.hashed = len(paths)
+            for (file_path, st, record), content_hash in zip(to_hash, hashes, strict=True):
+                if content_hash is not None and content_hash == record["hash"]:
+                    record.update(mtime=st.st_mtime, mtime_ns=st.st_mtime_ns)
+                    self._pending[str(file_path)] = record
+                    self.dirty = True
+                    stats.touched_unchanged += 1
+                else:
+                    changed_files.append(file_path)
+
+        stats.changed = len(changed_files)
+        self.last_scan = stats
         return changed_files
 
+    def _known_paths(self) -> set[str]:
+        paths = set() if self._replaced else set(self.store.all_paths())
+        for path, record in self._pending.items():
+            if record is None:
+                paths.discard(path)
+            else:
+                paths.add(path)
+        return paths
+
     def remove_deleted_files(self, existing_files: set[str]) -> None:
-        files_to_remove = []
-        for file_path in self.metadata.keys():
-            if file_path not in existing_files:
-                files_to_remove.append(file_path)
+        files_to_remove = [p for p in self._known_paths() if p not in existing_files]
+        self._drop(files_to_remove)
+
+    def remove_path(self, path: Path) -> int:
+        """
+        Drops the records of a deleted file or of every file below a deleted directory.
+
+        Returns:
+            Number of records removed
+        """
+        key = str(path)
+        prefix = f"{key}{os.sep}"
+        candidates = set() if self._replaced else set(self.store.paths_under(key, os.sep))
+        candidates.update(p for p in self._pending if p == key or p.startswith(prefix))
+        gone = [p for p in candidates if self._pending.get(p, {}) is not None]
+        self._drop(gone)
+        return len(gone)
 
-        for file_path in files_to_remove:
-            del self.metadata[file_path]
+    def _drop(self, file_paths: list[str]) -> None:
+        """Marks records for deletion, keeping their chunk ids as orphans."""
+        if not file_paths:
+            return
+        for record in self._get_many(file_paths).values():
+            self.orphaned_chunk_ids.extend(record.get("chunk_ids", []))
+        for file_path in file_paths:
+            self._pending[file_path] = None
+        self.dirty = True
 
     def get_stats(self) -> dict[str, int | str | None]:
-        if not self.metadata:
-            return {"total_files": 0, "last_index": None}
+        if not self._pending and not self._replaced:
+            total, latest, generation = self.store.stats()
+            return {"total_files": total, "last_index": latest, "generation": generation}
+
+        records = self.metadata
+        generation = self.store.generation()
+        if not records:
+            return {"total_files": 0, "last_index": None, "generation": generation}
 
         indexed_times: list[str] = [
-            str(info.get("indexed_at")) for info in self.metadata.values() if "indexed_at" in info
+            str(info.get("indexed_at")) for info in records.values() if "indexed_at" in info
         ]
-        latest: str | None = max(indexed_times) if indexed_times else None
+        latest = max(indexed_times) if indexed_times else None
 
-        return {"total_files": len(self.metadata), "last_index": latest}
+        return {"total_files": len(records), "last_index": latest, "generation": generation}
@@ -0,0 +1,314 @@
+"""
+Dry-run cost estimate for a full index.
+
+`estimate_index_cost()` samples indexable files, reads and splits the sample
+with the same AST splitter the indexer uses, optionally embeds a slice of the
+resulting chunks with the loaded model, and extrapolates to the whole file
+list per file extension (languages split very differently):
+
+  - chunks and approximate tokens
+  - time: splitting (measured) plus embedding (measured on this machine when
+    an embedding function is given, otherwise an assumed CPU throughput)
+  - disk: vectors, stored text, metadata and the BM25 index
+  - peak RSS: current process plus model, batch buffers and the BM25 rebuild
+
+It also ranks directories by their share of the estimated time, so heavy
+directories can be added to `.indexignore` before paying for a full run.
+Nothing is written to the index.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+
+from ast_splitter import ASTSplitter
+from config import (
+    get_embed_minify_mode,
+    get_max_file_size_bytes,
+    get_max_memory_bytes,
+    safe_read_text,
+)
+from embedding_minifier import EmbeddingMinifier, approx_token_count
+from file_catalog import CatalogEntry
+from logger import get_logger
+from memory_limited_indexer import current_rss_bytes
+from streaming_splitter import iter_segments
+
+logger = get_logger()
+
+EmbedFunction = Callable[[list[str]], list[list[float]] | None]
+
+DEFAULT_SAMPLE_FILES = 150
+# Chunks embedded to measure throughput (after a small warm-up call)
+EMBED_SAMPLE_CHUNKS = 48
+EMBED_WARMUP_CHUNKS = 2
+# Used when no embedding function is available; a base-size transformer on CPU
+ASSUMED_EMBED_TOKENS_PER_SECOND = 1500.0
+# Dimension of the default model (distilroberta-base) when none was measured
+DEFAULT_EMBED_DIM = 768
+# Resident size of the model with torch when it is not loaded yet
+ASSUMED_MODEL_RSS_BYTES = 700 * 1024 * 1024
+
+# Disk per chunk: float32 vector in the HNSW index (with its link lists) and in
+# Chroma's SQLite segment; the document text is stored and full-text indexed
+HNSW_OVERHEAD = 1.3
+TEXT_STORAGE_FACTOR = 3.0
+METADATA_BYTES_PER_CHUNK = 300
+# BM25 pickle (tokenized corpus) relative to the chunk text
+BM25_STORAGE_FACTOR = 1.0
+# rebuild_bm25 loads every document, its metadata and tokens at once
+BM25_BUILD_MEMORY_FACTOR = 4.0
+
+
+@dataclass
+class _Rates:
+    """Per-byte costs measured on a sample."""
+
+    bytes: int = 0
+    chunks: int = 0
+    chunk_bytes: int = 0
+    tokens: int = 0
+    split_seconds: float = 0.0
+
+    def add(self, size: int, chunks: int, chunk_bytes: int, tokens: int, seconds: float) -> None:
+        self.bytes += size
+        self.chunks += chunks
+        self.chunk_bytes += chunk_bytes
+        self.tokens += tokens
+        self.split_seconds += seconds
+
+    def per_byte(self, value: float) -> float:
+        return value / self.bytes if self.bytes else 0.0
+
+
+@dataclass
+class DirectoryCost:
+    path: str
+    files: int = 0
+    bytes: int = 0
+    chunks: float = 0.0
+    seconds: float = 0.0
+
+
+@dataclass
+class IndexEstimate:
+    files: int
+    bytes: int
+    sampled_files: int
+    sampled_bytes: int
+    chunks: int
+    tokens: int
+    split_seconds: float
+    embed_seconds: float
+    # False when embedding throughput is assumed rather than measured
+    embed_measured: bool
+    embed_tokens_per_second: float
+    disk_bytes: int
+    peak_rss_bytes: int
+    directories: list[DirectoryCost] = field(default_factory=list)
+
+    @property
+    def total_seconds(self) -> float:
+        return self.split_seconds + self.embed_seconds
+
+    def format(self, top: int = 10) -> str:
+        mb = 1024 * 1024
+        source = "measured" if self.embed_measured else "assumed"
+        lines = [
+            "# INDEX COST ESTIMATE",
+            f"- **Files**: {self.files} ({self.bytes / mb:.1f} MB); sampled {self.sampled_files} "
+            f"({self.sampled_bytes / mb:.1f} MB)",
+            f"- **Chunks**: ~{self.chunks}, ~{self.tokens} tokens",
+            f"- **Time**: ~{_duration(self.total_seconds)} "
+            f"(split {_duration(self.split_seconds)}, embed {_duration(self.embed_seconds)} "
+            f"at {self.embed_tokens_per_second:.0f} tokens/s, {source})",
+            f"- **Disk**: ~{self.disk_bytes / mb:.0f} MB",
+            f"- **Peak RSS**: ~{self.peak_rss_bytes / mb:.0f} MB",
+        ]
+        if self.directories:
+            lines.append("\n## Most expensive directories")
+            total = self.total_seconds or 1.0
+            for d in self.directories[:top]:
+                lines.append(
+                    f"- `{d.path}` — {100 * d.seconds / total:.0f}% ({_duration(d.seconds)}), "
+                    f"{d.files} files, {d.bytes / mb:.1f} MB, ~{d.chunks:.0f} chunks"
+                )
+        lines.append(
+            "\nExtrapolated from the sample; Chroma writes and the BM25 rebuild add to the time."
+        )
+        return "\n".join(lines)
+
+
+def _duration(seconds: float) -> str:
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def _sample(entries: Sequence[CatalogEntry], size: int, seed: int) -> list[CatalogEntry]:
+    """Stratified by extension: slots in proportion to bytes, at least one each."""
+    if len(entries) <= size:
+        return list(entries)
+    rng = random.Random(seed)
+    groups: dict[str, list[CatalogEntry]] = {}
+    for entry in entries:
+        groups.setdefault(entry.suffix.lower(), []).append(entry)
+    total = sum(e.size for e in entries) or 1
+    ordered = sorted(groups.values(), key=lambda group: -sum(e.size for e in group))[:size]
+    takes = [1] * len(ordered)
+    spare = size - len(ordered)
+    for i, group in enumerate(ordered):
+        share = round(size * sum(e.size for e in group) / total)
+        extra = max(0, min(share - 1, len(group) - 1, spare))
+        takes[i] += extra
+        spare -= extra
+    # Slots lost to rounding go to the largest groups that have files left
+    for i, group in enumerate(ordered):
+        extra = min(len(group) - takes[i], spare)
+        takes[i] += extra
+        spare -= extra
+    sample: list[CatalogEntry] = []
+    for group, take in zip(ordered, takes, strict=True):
+        sample.extend(rng.sample(group, take))
+    return sample
+
+
+def _measure_embedding(
+    texts: list[str], embed_fn: EmbedFunction
+) -> tuple[float | None, int | None]:
+    """Returns (tokens per second, embedding dimension) or (None, None)."""
+    if len(texts) <= EMBED_WARMUP_CHUNKS:
+        return None, None
+    try:
+        embed_fn(texts[:EMBED_WARMUP_CHUNKS])
+        batch = texts[EMBED_WARMUP_CHUNKS:]
+        started = time.perf_counter()
+        vectors = embed_fn(batch)
+        elapsed = time.perf_counter() - started
+    except Exception as e:
+        logger.warning(f"Embedding sample failed: {e}")
+        return None, None
+    if not vectors or elapsed <= 0:
+        return None, None
+    tokens = sum(approx_token_count(t) for t in batch)
+    return tokens / elapsed, len(vectors[0])
+
+
+def estimate_index_cost(
+    entries: Sequence[CatalogEntry],
+    sample_files: int = DEFAULT_SAMPLE_FILES,
+    embed_fn: EmbedFunction | None = None,
+    model_loaded: bool = False,
+    depth: int = 1,
+    seed: int = 0,
+) -> IndexEstimate:
+    """
+    Estimates the cost of indexing the given files without indexing them.
+
+    Args:
+        entries: Indexable files (catalog entries; `rel` is used for directories)
+        sample_files: Files to read and split
+        embed_fn: Embeds a list of texts; None assumes a typical CPU throughput
+        model_loaded: The embedding model is already resident (not added to peak RSS)
+        depth: Path components that name a directory in the ranking
+        seed: Sampling seed (estimates are reproducible for the same file list)
+
+    Returns:
+        IndexEstimate with totals and directories ranked by estimated time
+    """
+    splitter = ASTSplitter()
+    minifier = EmbeddingMinifier(get_embed_minify_mode())
+    overall = _Rates()
+    by_suffix: dict[str, _Rates] = {}
+    embed_texts: list[str] = []
+    sample = _sample(entries, max(1, sample_files), seed)
+
+    for entry in sample:
+        started = time.perf_counter()
+        measured = entry.size
+        try:
+            if entry.size > get_max_file_size_bytes():
+                # Streamed at index time; its first window stands for the whole file
+                segment = next(iter_segments(entry.path), None)
+                measured = len(segment.data) if segment else 0
+                content = segment.data.decode("utf-8", "replace") if segment else ""
+            else:
+                content = safe_read_text(entry.path)
+            chunks = splitter.split(content, entry.path, retain=False) if content.strip() else []
+        except Exception as e:
+            logger.debug(f"Estimator skipped {entry.path}: {e}")
+            continue
+        seconds = time.perf_counter() - started
+        texts = [chunk["text"] for chunk in chunks]
+        inputs = (
+            minifier.minify_batch(texts, [chunk["metadata"] for chunk in chunks])
+            if minifier.enabled
+            else texts
+        )
+        tokens = sum(approx_token_count(t) for t in inputs)
+        chunk_bytes = sum(len(t.encode("utf-8", "surrogateescape")) for t in texts)
+        for rates in (overall, by_suffix.setdefault(entry.suffix.lower(), _Rates())):
+            rates.add(measured, len(chunks), chunk_bytes, tokens, seconds)
+        if len(embed_texts) < EMBED_SAMPLE_CHUNKS + EMBED_WARMUP_CHUNKS:
+            embed_texts.extend(
+                inputs[: EMBED_SAMPLE_CHUNKS + EMBED_WARMUP_CHUNKS - len(embed_texts)]
+            )
+
+    tokens_per_second, dim = (None, None)
+    if embed_fn is not None:
+        tokens_per_second, dim = _measure_embedding(embed_texts, embed_fn)
+    embed_measured = tokens_per_second is not None
+    embed_rate = tokens_per_second or ASSUMED_EMBED_TOKENS_PER_SECOND
+    dim = dim or DEFAULT_EMBED_DIM
+
+    chunks_total = 0.0
+    tokens_total = 0.0
+    chunk_bytes_total = 0.0
+    split_total = 0.0
+    directories: dict[str, DirectoryCost] = {}
+    for entry in entries:
+        found = by_suffix.get(entry.suffix.lower())
+        rates = found if found is not None and found.bytes else overall
+        file_chunks = entry.size * rates.per_byte(rates.chunks)
+        file_tokens = entry.size * rates.per_byte(rates.tokens)
+        split = entry.size * rates.per_byte(rates.split_seconds)
+        chunks_total += file_chunks
+        tokens_total += file_tokens
+        chunk_bytes_total += entry.size * rates.per_byte(rates.chunk_bytes)
+        split_total += split
+        parts = entry.rel.split("/")[:-1]
+        key = "/".join(parts[: max(1, depth)]) if parts else "."
+        cost = directories.setdefault(key, DirectoryCost(path=key))
+        cost.files += 1
+        cost.bytes += entry.size
+        cost.chunks += file_chunks
+        cost.seconds += split + file_tokens / embed_rate
+
+    vector_bytes = dim * 4 * (HNSW_OVERHEAD + 1)
+    disk = chunks_total * (vector_bytes + METADATA_BYTES_PER_CHUNK) + chunk_bytes_total * (
+        TEXT_STORAGE_FACTOR + BM25_STORAGE_FACTOR
+    )
+    base_rss = current_rss_bytes() or 0
+    model_rss = 0 if model_loaded else ASSUMED_MODEL_RSS_BYTES
+    work_rss = max(get_max_memory_bytes(), chunk_bytes_total * BM25_BUILD_MEMORY_FACTOR)
+
+    return IndexEstimate(
+        files=len(entries),
+        bytes=sum(e.size for e in entries),
+        sampled_files=len(sample),
+        sampled_bytes=overall.bytes,
+        chunks=round(chunks_total),
+        tokens=round(tokens_total),
+        split_seconds=split_total,
+        embed_seconds=tokens_total / embed_rate,
+        embed_measured=embed_measured,
+        embed_tokens_per_second=embed_rate,
+        disk_bytes=int(disk),
+        peak_rss_bytes=int(base_rss + model_rss + work_rss),
+        directories=sorted(directories.values(), key=lambda d: -d.seconds),
+    )
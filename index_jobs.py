@@ -0,0 +1,296 @@
+"""
+Background indexing jobs.
+
+`index_codebase` / `index_changed_files` used to embed everything inside the
+MCP tool call. With `background=True` they submit a job to a single dedicated
+worker thread and return its id at once; `index_job_status` reports phase,
+files and chunks done, throughput, ETA and errors.
+
+Submissions are deduplicated against queued and running jobs for the same
+root: a repeated request returns the existing job, a changed-files request is
+covered by a pending full index, and `force` upgrades a queued full index.
+Only one job runs at a time. Every indexing run, whether a job, a watcher
+batch or a direct tool call, also holds CodebaseIndexer.index_lock, so runs
+never overlap on the index metadata store; direct calls are turned away while
+a job for the same root is queued or running (see `active_job`).
+While a job runs, searches keep serving the index as it was: a forced rebuild
+writes to a staging collection that is swapped in when it completes (see
+VectorStoreManager.begin_rebuild).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from incremental_indexing import IndexCheckpoint
+from logger import get_logger
+from resource_policy import enter_background
+
+logger = get_logger()
+
+JOB_KINDS: tuple[str, ...] = ("full", "changed")
+ACTIVE_PHASES: tuple[str, ...] = ("queued", "scanning", "indexing", "finalizing")
+# Finished jobs kept for index_job_status
+MAX_JOB_HISTORY = 20
+
+
+@dataclass
+class IndexJob:
+    job_id: str
+    kind: str
+    root: str
+    force: bool = False
+    # queued -> scanning -> indexing -> finalizing -> done | failed
+    phase: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    files_done: int = 0
+    files_total: int = 0
+    files_indexed: int = 0
+    chunks: int = 0
+    hot_done: int = 0
+    hot_total: int = 0
+    # files_done when this run started (a resumed full index starts past zero)
+    files_at_start: int = 0
+    errors: list[str] = field(default_factory=list)
+    result: str = ""
+    # Submissions that were merged into this job
+    merged: int = 0
+
+    @property
+    def active(self) -> bool:
+        return self.phase in ACTIVE_PHASES
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def throughput(self) -> float | None:
+        """Files per second processed by this run."""
+        elapsed = self.elapsed()
+        done = self.files_done - self.files_at_start
+        if elapsed <= 0 or done <= 0:
+            return None
+        return done / elapsed
+
+    def eta_seconds(self) -> float | None:
+        rate = self.throughput()
+        if rate is None or not self.active or not self.files_total:
+            return None
+        return max(self.files_total - self.files_done, 0) / rate
+
+    def update(self, phase: str, checkpoint: IndexCheckpoint | None) -> None:
+        """Progress callback for CodebaseIndexer.index_all."""
+        if checkpoint is not None:
+            if self.phase in ("queued", "scanning"):
+                self.files_at_start = checkpoint.cursor
+            self.files_done = checkpoint.cursor
+            self.files_total = checkpoint.total
+            self.files_indexed = checkpoint.files_indexed
+            self.chunks = checkpoint.chunks
+            self.hot_done = checkpoint.hot_done
+            self.hot_total = checkpoint.hot_total
+        self.phase = phase
+
+    def to_dict(self) -> dict[str, Any]:
+        rate = self.throughput()
+        eta = self.eta_seconds()
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "force": self.force,
+            "root": self.root,
+            "phase": self.phase,
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "files_indexed": self.files_indexed,
+            "chunks": self.chunks,
+            "hot_done": self.hot_done,
+            "hot_total": self.hot_total,
+            "elapsed_s": round(self.elapsed(), 1),
+            "files_per_s": round(rate, 2) if rate is not None else None,
+            "eta_s": round(eta) if eta is not None else None,
+            "errors": list(self.errors),
+            "merged": self.merged,
+            "result": self.result,
+        }
+
+
+# Runs one job to completion and returns its result message
+JobRunner = Callable[[IndexJob], str]
+
+
+class IndexJobQueue:
+    """FIFO of indexing jobs served by one daemon worker thread."""
+
+    def __init__(self, runner: JobRunner) -> None:
+        self.runner = runner
+        self._cond = threading.Condition()
+        self._queue: deque[IndexJob] = deque()
+        self._jobs: dict[str, IndexJob] = {}
+        self._current: IndexJob | None = None
+        self._thread: threading.Thread | None = None
+
+    def submit(self, kind: str, root: str, force: bool = False) -> tuple[IndexJob, bool]:
+        """
+        Queues a job unless an equivalent one is already queued or running.
+
+        Args:
+            kind: "full" (index_codebase) or "changed" (index_changed_files)
+            root: Project root the job indexes
+            force: Rebuild from scratch (full jobs only)
+
+        Returns:
+            (job, created): the new job, or the existing one it was merged into
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}' (expected one of {JOB_KINDS})")
+        with self._cond:
+            existing = self._find_equivalent(kind, root, force)
+            if existing is not None:
+                if force and existing.phase == "queued":
+                    existing.force = True
+                existing.merged += 1
+                return existing, False
+            job = IndexJob(job_id=uuid.uuid4().hex[:12], kind=kind, root=root, force=force)
+            self._queue.append(job)
+            self._jobs[job.job_id] = job
+            self._prune_history()
+            self._ensure_worker()
+            self._cond.notify_all()
+            return job, True
+
+    def _find_equivalent(self, kind: str, root: str, force: bool) -> IndexJob | None:
+        candidates = list(self._queue)
+        if self._current is not None:
+            candidates.insert(0, self._current)
+        for job in candidates:
+            if job.root != root:
+                continue
+            running = job is self._current
+            if kind == "changed":
+                # A running job may already have looked for changes; only a queued one covers it
+                if not running:
+                    return job
+            elif job.kind == "full":
+                # A running incremental full index cannot become a rebuild; queue a new one
+                if force and running and not job.force:
+                    continue
+                return job
+        return None
+
+    def _prune_history(self) -> None:
+        finished = [j for j in self._jobs.values() if not j.active]
+        for job in finished[: max(len(finished) - MAX_JOB_HISTORY, 0)]:
+            del self._jobs[job.job_id]
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._work, name="projectmind-index-worker", daemon=True
+            )
+            self._thread.start()
+
+    def _work(self) -> None:
+        # Lower priority is inherited by the pools the runner starts
+        enter_background("index-worker")
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                job = self._queue.popleft()
+                self._current = job
+            self.run(job)
+            with self._cond:
+                self._current = None
+                self._cond.notify_all()
+
+    def run(self, job: IndexJob) -> None:
+        """Runs a job on the calling thread, recording its outcome."""
+        job.started_at = time.time()
+        job.phase = "scanning"
+        try:
+            job.result = self.runner(job)
+            job.phase = "done"
+        except Exception as e:
+            logger.error(f"Index job {job.job_id} failed: {e}", exc_info=True)
+            job.errors.append(f"{type(e).__name__}: {e}")
+            job.phase = "failed"
+        job.finished_at = time.time()
+        logger.info(f"Index job {job.job_id} ({job.kind}) {job.phase}: {job.result}")
+
+    def active_job(self, root: str) -> IndexJob | None:
+        """The running or oldest queued job for `root`, if any."""
+        with self._cond:
+            candidates = list(self._queue)
+            if self._current is not None:
+                candidates.insert(0, self._current)
+            return next((job for job in candidates if job.root == root), None)
+
+    def get(self, job_id: str) -> IndexJob | None:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[IndexJob]:
+        """All known jobs, newest first."""
+        with self._cond:
+            return sorted(self._jobs.values(), key=lambda j: j.submitted_at, reverse=True)
+
+    def wait(self, job_id: str, timeout: float | None = None) -> bool:
+        """Blocks until the job has finished; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or not job.active:
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+
+_queue: IndexJobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue(runner: JobRunner) -> IndexJobQueue:
+    """Returns the process-wide job queue, creating it with `runner` on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = IndexJobQueue(runner)
+        return _queue
+
+
+def format_job(job: IndexJob) -> str:
+    """Human-readable status block for one job."""
+    info = job.to_dict()
+    lines = [f"Job {job.job_id} [{job.kind}{', force' if job.force else ''}]: {job.phase}"]
+    if job.files_total:
+        percent = 100 * job.files_done / job.files_total
+        lines.append(
+            f"  Files: {job.files_done}/{job.files_total} ({percent:.0f}%), "
+            f"{job.files_indexed} indexed, {job.chunks} chunks"
+        )
+    if job.hot_total:
+        lines.append(f"  Hot set: {job.hot_done}/{job.hot_total} files")
+    if job.started_at is not None:
+        rate = f", {info['files_per_s']} files/s" if info["files_per_s"] is not None else ""
+        eta = f", ETA {info['eta_s']}s" if info["eta_s"] is not None else ""
+        lines.append(f"  Elapsed: {info['elapsed_s']}s{rate}{eta}")
+    if job.merged:
+        lines.append(f"  Merged submissions: {job.merged}")
+    for error in job.errors:
+        lines.append(f"  Error: {error}")
+    if job.result:
+        lines.append(f"  Result: {job.result}")
+    return "\n".join(lines)
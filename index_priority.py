@@ -0,0 +1,212 @@
+"""
+Priority ordering for full indexing.
+
+The file catalog yields files in directory-walk order, so a long first index
+used to leave the files people actually work on unsearchable until the end.
+`prioritize()` reorders the work list by signals that are already at hand:
+
+  - git recency: files touched by recent commits (`get_recently_changed_files`),
+    weighted by commit age
+  - recent use: files that recent tool calls returned or asked about
+    (`note_access()`, kept in memory for the life of the server)
+  - entry points: conventional names such as `main.py`, `__main__.py`, `index.ts`
+  - import-graph centrality: how many project files import the file
+    (`code_intelligence.build_import_graph`, cached)
+
+Files that score on any of these form the "hot set". They go first, and
+index_all reports how much of the hot set is covered. The remaining files keep
+walk order, which keeps directories together.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from logger import get_logger
+
+logger = get_logger()
+
+GIT_RECENT_DAYS = 30
+GIT_RECENT_MAX_FILES = 500
+# Accessed files remembered, and how long an access keeps boosting a file
+RECENT_ACCESS_MAX = 200
+RECENT_ACCESS_HALF_LIFE_S = 4 * 3600.0
+# Hot files are capped so a huge recent refactor does not reorder everything
+HOT_SET_LIMIT = 1000
+# A file must reach this score to count as hot (any full signal does)
+HOT_THRESHOLD = 0.5
+
+WEIGHT_GIT = 4.0
+WEIGHT_ACCESS = 3.0
+WEIGHT_ENTRY = 2.0
+WEIGHT_CENTRALITY = 1.0
+
+ENTRY_POINT_NAMES = frozenset(
+    {
+        "__main__.py",
+        "main.py",
+        "app.py",
+        "server.py",
+        "cli.py",
+        "manage.py",
+        "wsgi.py",
+        "asgi.py",
+        "index.js",
+        "index.ts",
+        "index.tsx",
+        "main.js",
+        "main.ts",
+        "main.tsx",
+        "app.js",
+        "app.ts",
+        "app.tsx",
+        "server.js",
+        "server.ts",
+        "main.go",
+        "main.rs",
+        "lib.rs",
+        "main.c",
+        "main.cpp",
+        "program.cs",
+        "main.java",
+        "application.java",
+    }
+)
+
+_access_lock = threading.Lock()
+_accessed: OrderedDict[str, float] = OrderedDict()
+
+
+def note_access(paths: Iterable[Path | str]) -> None:
+    """Records that tools just returned or inspected these files (absolute paths)."""
+    now = time.time()
+    with _access_lock:
+        for path in paths:
+            key = str(path)
+            _accessed.pop(key, None)
+            _accessed[key] = now
+        while len(_accessed) > RECENT_ACCESS_MAX:
+            _accessed.popitem(last=False)
+
+
+def recent_accesses() -> dict[str, float]:
+    with _access_lock:
+        return dict(_accessed)
+
+
+def clear_accesses() -> None:
+    with _access_lock:
+        _accessed.clear()
+
+
+@dataclass
+class PriorityPlan:
+    # Files in processing order; the first `hot` of them are the hot set
+    order: list[Path]
+    hot: int = 0
+    # Files that scored on each signal
+    signals: dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        parts = [f"{count} {name}" for name, count in self.signals.items() if count]
+        detail = f" ({', '.join(parts)})" if parts else ""
+        return f"hot set of {self.hot} files{detail}"
+
+
+def _git_recency(root: Path) -> dict[str, float]:
+    """Absolute path -> 1.0 for today's commits, decaying with commit age."""
+    from git_utils import GitRepository
+
+    try:
+        repo = GitRepository(str(root))
+        top = repo.working_tree_dir
+        recent = repo.get_recently_changed_files(
+            days=GIT_RECENT_DAYS, max_files=GIT_RECENT_MAX_FILES
+        )
+    except Exception as e:
+        logger.debug(f"No git recency signal: {e}")
+        return {}
+    now = datetime.now()
+    scores: dict[str, float] = {}
+    for rel, info in recent.items():
+        age_days = max((now - info.date).total_seconds() / 86400, 0.0)
+        scores[str(top / rel)] = 1.0 / (1.0 + age_days / 7.0)
+    return scores
+
+
+def _access_recency() -> dict[str, float]:
+    now = time.time()
+    return {
+        path: 0.5 ** ((now - at) / RECENT_ACCESS_HALF_LIFE_S)
+        for path, at in recent_accesses().items()
+    }
+
+
+def _centrality(root: Path) -> dict[str, float]:
+    """Absolute path -> in-degree in the import graph, scaled to 0..1 (log)."""
+    from code_intelligence import build_import_graph
+
+    try:
+        graph = build_import_graph(root)
+    except Exception as e:
+        logger.debug(f"No import-graph signal: {e}")
+        return {}
+    in_degree: dict[str, int] = {}
+    for targets in graph.values():
+        for target in targets:
+            in_degree[target] = in_degree.get(target, 0) + 1
+    if not in_degree:
+        return {}
+    top = math.log1p(max(in_degree.values()))
+    return {str(root / rel): math.log1p(count) / top for rel, count in in_degree.items()}
+
+
+def prioritize(files: list[Path], root: Path, use_import_graph: bool = True) -> PriorityPlan:
+    """
+    Orders files so the likely most relevant ones are indexed first.
+
+    Args:
+        files: Indexable files in walk order
+        root: Project root
+        use_import_graph: Include import-graph centrality (parses imports, cached)
+
+    Returns:
+        PriorityPlan with the hot set first, in descending score order
+    """
+    git_scores = _git_recency(root)
+    access_scores = _access_recency()
+    central_scores = _centrality(root) if use_import_graph else {}
+    signals = {"recently changed": 0, "recently used": 0, "entry points": 0, "central": 0}
+
+    scored: list[tuple[float, int, Path]] = []
+    for position, path in enumerate(files):
+        key = str(path)
+        git = git_scores.get(key, 0.0)
+        access = access_scores.get(key, 0.0)
+        entry = 1.0 if path.name.lower() in ENTRY_POINT_NAMES else 0.0
+        central = central_scores.get(key, 0.0)
+        signals["recently changed"] += git > 0
+        signals["recently used"] += access > 0
+        signals["entry points"] += entry > 0
+        signals["central"] += central > 0
+        score = (
+            WEIGHT_GIT * git
+            + WEIGHT_ACCESS * access
+            + WEIGHT_ENTRY * entry
+            + WEIGHT_CENTRALITY * central
+        )
+        if score >= HOT_THRESHOLD:
+            scored.append((score, position, path))
+
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    hot = scored[:HOT_SET_LIMIT]
+    hot_paths = {item[2] for item in hot}
+    order = [item[2] for item in hot] + [p for p in files if p not in hot_paths]
+    return PriorityPlan(order=order, hot=len(hot), signals=signals)
@@ -0,0 +1,305 @@
+"""
+SQLite store for per-file index records.
+
+Replaces the JSON file that IndexMetadata used to rewrite in full on every
+save. `.ai/index_meta.sqlite` runs in WAL mode, so readers (status tools, a
+second server process) never block the indexer. It holds one row per indexed
+file:
+
+  path        absolute path, primary key (indexed lookups)
+  size, mtime, mtime_ns, hash
+              stat fingerprint and content hash used for change detection
+  chunk_ids   JSON list of the vector-store chunk ids produced for the file
+  generation  save number in which the file was last (re)indexed
+  indexed_at  ISO timestamp of that indexing
+
+Writes are batched: IndexMetadata collects upserts and deletions in memory and
+hands them to `apply()`, which writes them in a single transaction. A resumable
+full index keeps its ordered work list in `job_files` and its checkpoint in
+`meta`; the checkpoint is written in the same transaction as the records of
+the files it covers, so the two never disagree after a crash. An existing
+`index_metadata.json` is migrated once, on first open, and renamed to
+`index_metadata.json.migrated`.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+SCHEMA_VERSION = 1
+# SQLite's default limit on bound parameters is 999 on older builds
+LOOKUP_CHUNK = 500
+RECORD_FIELDS: tuple[str, ...] = (
+    "size",
+    "mtime",
+    "mtime_ns",
+    "hash",
+    "chunk_ids",
+    "generation",
+    "indexed_at",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL NOT NULL DEFAULT 0,
+    mtime_ns INTEGER,
+    hash TEXT,
+    chunk_ids TEXT,
+    generation INTEGER NOT NULL DEFAULT 0,
+    indexed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS files_generation ON files(generation);
+CREATE INDEX IF NOT EXISTS files_indexed_at ON files(indexed_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_files (
+    seq INTEGER PRIMARY KEY,
+    path TEXT NOT NULL
+);
+"""
+
+_COLUMNS = ("path",) + RECORD_FIELDS
+_SELECT = f"SELECT {', '.join(_COLUMNS)} FROM files"
+_UPSERT = (
+    f"INSERT INTO files ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))}) "
+    "ON CONFLICT(path) DO UPDATE SET "
+    + ", ".join(f"{name} = excluded.{name}" for name in RECORD_FIELDS)
+)
+
+
+def _row_to_record(row: tuple[Any, ...]) -> dict[str, Any]:
+    record: dict[str, Any] = {}
+    for name, value in zip(RECORD_FIELDS, row[1:], strict=True):
+        if value is None:
+            continue
+        record[name] = json.loads(value) if name == "chunk_ids" else value
+    return record
+
+
+def _record_to_row(path: str, record: Mapping[str, Any], generation: int) -> tuple[Any, ...]:
+    chunk_ids = record.get("chunk_ids")
+    return (
+        path,
+        record.get("size"),
+        float(record.get("mtime", 0.0)),
+        record.get("mtime_ns"),
+        record.get("hash"),
+        json.dumps(list(chunk_ids)) if chunk_ids is not None else None,
+        int(record.get("generation", generation)),
+        record.get("indexed_at"),
+    )
+
+
+class IndexStore:
+    """
+    Thread-safe wrapper around the index metadata database. The connection is
+    opened lazily; read methods on a store whose file does not exist yet return
+    empty results without creating it.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return self._conn is not None or self.db_path.exists()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def get(self, path: str) -> dict[str, Any] | None:
+        if not self.exists():
+            return None
+        with self._lock:
+            row = self._connect().execute(f"{_SELECT} WHERE path = ?", (path,)).fetchone()
+        return _row_to_record(row) if row else None
+
+    def get_many(self, paths: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Looks up records for many paths through the primary key index."""
+        wanted = list(dict.fromkeys(paths))
+        if not wanted or not self.exists():
+            return {}
+        found: dict[str, dict[str, Any]] = {}
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(wanted), LOOKUP_CHUNK):
+                chunk = wanted[start : start + LOOKUP_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                for row in conn.execute(f"{_SELECT} WHERE path IN ({placeholders})", chunk):
+                    found[row[0]] = _row_to_record(row)
+        return found
+
+    def all_records(self) -> dict[str, dict[str, Any]]:
+        if not self.exists():
+            return {}
+        with self._lock:
+            rows = self._connect().execute(_SELECT).fetchall()
+        return {row[0]: _row_to_record(row) for row in rows}
+
+    def all_paths(self) -> list[str]:
+        if not self.exists():
+            return []
+        with self._lock:
+            return [row[0] for row in self._connect().execute("SELECT path FROM files")]
+
+    def paths_under(self, directory: str, sep: str) -> list[str]:
+        """Paths equal to `directory` or below it, via a range scan on the key."""
+        if not self.exists():
+            return []
+        prefix = directory + sep
+        # Every key starting with prefix sorts in [prefix, prefix + U+10FFFF)
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT path FROM files WHERE path = ? OR (path >= ? AND path < ?)",
+                (directory, prefix, prefix + "\U0010ffff"),
+            )
+            return [row[0] for row in rows]
+
+    def stats(self) -> tuple[int, str | None, int]:
+        """Returns (file count, latest indexed_at, current generation)."""
+        if not self.exists():
+            return 0, None, 0
+        with self._lock:
+            conn = self._connect()
+            count, latest = conn.execute("SELECT COUNT(*), MAX(indexed_at) FROM files").fetchone()
+            return int(count), latest, self._generation(conn)
+
+    def generation(self) -> int:
+        if not self.exists():
+            return 0
+        with self._lock:
+            return self._generation(self._connect())
+
+    @staticmethod
+    def _generation(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+
+    @staticmethod
+    def _set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def get_meta(self, key: str) -> str | None:
+        if not self.exists():
+            return None
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def start_job(self, job: str, paths: Iterable[str], reset: bool = False) -> None:
+        """
+        Replaces the job work list (numbered from 1 in the given order) and checkpoint.
+
+        Args:
+            job: Serialized checkpoint
+            paths: Files to process, in order
+            reset: Also drop every file record (a forced re-index)
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if reset:
+                    conn.execute("DELETE FROM files")
+                conn.execute("DELETE FROM job_files")
+                conn.executemany(
+                    "INSERT INTO job_files (seq, path) VALUES (?, ?)",
+                    ((seq, path) for seq, path in enumerate(paths, start=1)),
+                )
+                self._set_meta(conn, "job", job)
+
+    def job_files(self, after: int, limit: int) -> list[tuple[int, str]]:
+        """Next `limit` work-list entries after sequence number `after`."""
+        if not self.exists():
+            return []
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT seq, path FROM job_files WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after, limit),
+            )
+            return [(int(seq), path) for seq, path in rows]
+
+    def finish_job(self) -> None:
+        if not self.exists():
+            return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM job_files")
+                conn.execute("DELETE FROM meta WHERE key = 'job'")
+
+    def apply(
+        self,
+        upserts: Mapping[str, Mapping[str, Any]],
+        deletes: Iterable[str] = (),
+        replace_all: bool = False,
+        job: str | None = None,
+    ) -> int:
+        """
+        Writes a batch of changes in one transaction and bumps the generation.
+        Records without a "generation" key are stamped with the new one.
+
+        Args:
+            upserts: path -> record to insert or replace
+            deletes: Paths to remove
+            replace_all: Drop every existing row first
+            job: Job checkpoint to store in the same transaction
+
+        Returns:
+            The generation written
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                generation = self._generation(conn) + 1
+                if replace_all:
+                    conn.execute("DELETE FROM files")
+                else:
+                    conn.executemany(
+                        "DELETE FROM files WHERE path = ?", ((path,) for path in deletes)
+                    )
+                conn.executemany(
+                    _UPSERT,
+                    (_record_to_row(path, record, generation) for path, record in upserts.items()),
+                )
+                self._set_meta(conn, "generation", str(generation))
+                if job is not None:
+                    self._set_meta(conn, "job", job)
+        return generation
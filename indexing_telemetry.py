@@ -0,0 +1,319 @@
+"""
+Per-stage telemetry for indexing runs.
+
+Every index_all / index_changed / index_paths call is recorded as a run:
+wall time per stage, call counts and a latency histogram per stage, plus run
+totals (files, chunks, approximate tokens, bytes read) and the slowest files.
+Stages:
+
+  scan        listing indexable files (and ordering them, for a full index)
+  changes     stat / hash comparison against the index metadata
+  read        reading file contents
+  split       tree-sitter / text splitting into chunks
+  minify      embedding-input minification
+  embed       computing embeddings ahead of the upsert (minification on)
+  upsert      Chroma upsert; includes embedding when the collection embeds
+  flush_wait  time the file loop waited for a background batch flush
+  metadata    index metadata and checkpoint writes
+  swap        promoting a staging collection after a forced rebuild
+  bm25        BM25 index rebuild
+
+Runs are appended to `.ai/index_telemetry.jsonl` and shown by the
+`index_telemetry` MCP tool. Retention is per kind (the last MAX_RUNS full and
+changed runs, MAX_PATHS_RUNS watcher/git path runs), so frequent small batches
+cannot push full runs out; path runs that indexed no file are not recorded. Embedding and upsert run
+on the batch-flush thread, so stage times can overlap and their sum may exceed
+the run's wall time.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import config
+from logger import get_logger
+
+logger = get_logger()
+
+# Runs kept in the telemetry file, per kind
+MAX_RUNS = 50
+MAX_PATHS_RUNS = 20
+# A kind may exceed its limit by this share before the file is rewritten, so
+# most saves are a plain append
+TRIM_SLACK = 0.5
+# Slowest files (read + split) kept per run
+SLOWEST_FILES = 10
+# Histogram buckets are powers of two in milliseconds, up to this bound
+MAX_BUCKET_MS = 65536
+
+STAGE_ORDER: tuple[str, ...] = (
+    "scan",
+    "changes",
+    "read",
+    "split",
+    "minify",
+    "embed",
+    "upsert",
+    "flush_wait",
+    "metadata",
+    "swap",
+    "bm25",
+)
+
+
+def _bucket(seconds: float) -> str:
+    """Histogram bucket label: the smallest power-of-two millisecond bound."""
+    ms = seconds * 1000
+    if ms > MAX_BUCKET_MS:
+        return f">{MAX_BUCKET_MS}ms"
+    bound = 1 if ms <= 1 else 2 ** math.ceil(math.log2(ms))
+    return f"<={bound}ms"
+
+
+def _bucket_bound(label: str) -> int:
+    return int(label.strip("<=>ms")) + (label.startswith(">"))
+
+
+@dataclass
+class StageStats:
+    seconds: float = 0.0
+    calls: int = 0
+    items: int = 0
+    max_seconds: float = 0.0
+    histogram: dict[str, int] = field(default_factory=dict)
+
+    def add(self, seconds: float, items: int = 0) -> None:
+        self.seconds += seconds
+        self.calls += 1
+        self.items += items
+        self.max_seconds = max(self.max_seconds, seconds)
+        label = _bucket(seconds)
+        self.histogram[label] = self.histogram.get(label, 0) + 1
+
+
+class IndexTelemetry:
+    """Thread-safe recorder for one indexing run."""
+
+    def __init__(self, kind: str, root: str = "") -> None:
+        self.run_id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.root = root
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self._started = time.perf_counter()
+        self.wall_seconds = 0.0
+        self.stages: dict[str, StageStats] = {}
+        self.files = 0
+        self.chunks = 0
+        self.tokens = 0
+        self.bytes_read = 0
+        self.result = ""
+        self._slowest: list[tuple[float, str, int, int]] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, items: int = 0) -> None:
+        """Adds one timed call of a stage."""
+        with self._lock:
+            self.stages.setdefault(stage, StageStats()).add(seconds, items)
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0) -> Iterator[None]:
+        """Times the enclosed block as one call of `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started, items)
+
+    def note_file(self, path: Path | str, seconds: float, size: int, chunks: int) -> None:
+        """Counts a chunked file and keeps it if it is among the slowest."""
+        with self._lock:
+            self.files += 1
+            self.chunks += chunks
+            self.bytes_read += size
+            entry = (seconds, str(path), size, chunks)
+            if len(self._slowest) < SLOWEST_FILES:
+                heapq.heappush(self._slowest, entry)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def note_tokens(self, tokens: int) -> None:
+        with self._lock:
+            self.tokens += tokens
+
+    def finish(self, result: str = "") -> dict[str, Any]:
+        """Stops the clock and returns the run record."""
+        self.wall_seconds = time.perf_counter() - self._started
+        self.result = result
+        return self.to_dict()
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            wall = self.wall_seconds or (time.perf_counter() - self._started)
+
+            def rate(value: float) -> float | None:
+                return round(value / wall, 2) if wall > 0 else None
+
+            ordered = sorted(
+                self.stages.items(),
+                key=lambda item: (
+                    STAGE_ORDER.index(item[0]) if item[0] in STAGE_ORDER else len(STAGE_ORDER)
+                ),
+            )
+            return {
+                "run_id": self.run_id,
+                "kind": self.kind,
+                "root": self.root,
+                "started_at": self.started_at,
+                "wall_s": round(wall, 3),
+                "files": self.files,
+                "chunks": self.chunks,
+                "tokens": self.tokens,
+                "bytes_read": self.bytes_read,
+                "files_per_s": rate(self.files),
+                "chunks_per_s": rate(self.chunks),
+                "tokens_per_s": rate(self.tokens),
+                "mb_per_s": rate(self.bytes_read / (1024 * 1024)),
+                "stages": {
+                    name: {**asdict(stats), "seconds": round(stats.seconds, 4)}
+                    for name, stats in ordered
+                },
+                "slowest_files": [
+                    {"path": path, "seconds": round(seconds, 4), "bytes": size, "chunks": chunks}
+                    for seconds, path, size, chunks in sorted(self._slowest, reverse=True)
+                ],
+                "result": self.result,
+            }
+
+
+def telemetry_path() -> Path:
+    return config.INDEX_TELEMETRY_FILE
+
+
+def load_runs(path: Path | None = None) -> list[dict[str, Any]]:
+    """Recorded runs, oldest first; unreadable lines are skipped."""
+    path = path or telemetry_path()
+    if not path.exists():
+        return []
+    runs = []
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError as e:
+        logger.warning(f"Could not read index telemetry: {e}")
+        return []
+    for line in lines:
+        try:
+            runs.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return runs
+
+
+def _run_limit(kind: str) -> int:
+    return MAX_PATHS_RUNS if kind == "paths" else MAX_RUNS
+
+
+def save_run(run: dict[str, Any], path: Path | None = None) -> None:
+    """
+    Appends a run. Once a kind holds more than its limit plus TRIM_SLACK, the
+    file is rewritten with the last runs of each kind.
+    """
+    if run["kind"] == "paths" and not run["files"]:
+        return
+    path = path or telemetry_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+        runs = load_runs(path)
+        counts = Counter(r.get("kind", "") for r in runs)
+        if all(n <= _run_limit(k) * (1 + TRIM_SLACK) for k, n in counts.items()):
+            return
+        seen: Counter[str] = Counter()
+        kept: list[dict[str, Any]] = []
+        for r in reversed(runs):
+            kind = r.get("kind", "")
+            seen[kind] += 1
+            if seen[kind] <= _run_limit(kind):
+                kept.append(r)
+        text = "".join(json.dumps(r) + "\n" for r in reversed(kept))
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(path)
+    except OSError as e:
+        logger.warning(f"Could not save index telemetry: {e}")
+
+
+def _share(run: dict[str, Any], stage: str) -> float:
+    total = sum(s["seconds"] for s in run["stages"].values())
+    return run["stages"].get(stage, {}).get("seconds", 0.0) / total if total else 0.0
+
+
+def format_run(run: dict[str, Any]) -> list[str]:
+    """Markdown block for one run: totals, rates, stages and slowest files."""
+    lines = [
+        f"## {run['kind']} run {run['run_id']} ({run['started_at']})",
+        f"- **Wall time**: {run['wall_s']}s — {run['files']} files, {run['chunks']} chunks, "
+        f"~{run['tokens']} tokens, {run['bytes_read'] / (1024 * 1024):.1f} MB read",
+        f"- **Rates**: {run['files_per_s']} files/s, {run['chunks_per_s']} chunks/s, "
+        f"{run['tokens_per_s']} tokens/s, {run['mb_per_s']} MB/s",
+    ]
+    for name, stage in run["stages"].items():
+        histogram = sorted(stage["histogram"].items(), key=lambda item: _bucket_bound(item[0]))
+        buckets = ", ".join(f"{label} {count}" for label, count in histogram)
+        lines.append(
+            f"- `{name}`: {stage['seconds']}s over {stage['calls']} calls "
+            f"({100 * _share(run, name):.0f}%, max {stage['max_seconds']:.3f}s) [{buckets}]"
+        )
+    if run["slowest_files"]:
+        lines.append("- **Slowest files**:")
+        for entry in run["slowest_files"][:5]:
+            lines.append(
+                f"  - {entry['path']} — {entry['seconds']}s, {entry['bytes']} bytes, "
+                f"{entry['chunks']} chunks"
+            )
+    if run.get("result"):
+        lines.append(f"- **Result**: {run['result']}")
+    return lines
+
+
+def compare_runs(latest: dict[str, Any], previous: dict[str, Any]) -> list[str]:
+    """Markdown lines comparing rates and per-stage time of two runs."""
+
+    def change(new: float | None, old: float | None) -> str:
+        if new is None or old is None or not old:
+            return "n/a"
+        return f"{100 * (new - old) / old:+.0f}%"
+
+    lines = [
+        f"## Compared with run {previous['run_id']} ({previous['started_at']})",
+        f"- files/s {previous['files_per_s']} → {latest['files_per_s']} "
+        f"({change(latest['files_per_s'], previous['files_per_s'])}), "
+        f"chunks/s {previous['chunks_per_s']} → {latest['chunks_per_s']} "
+        f"({change(latest['chunks_per_s'], previous['chunks_per_s'])})",
+    ]
+    for name in sorted(
+        set(latest["stages"]) | set(previous["stages"]),
+        key=lambda n: STAGE_ORDER.index(n) if n in STAGE_ORDER else len(STAGE_ORDER),
+    ):
+        new = latest["stages"].get(name, {})
+        old = previous["stages"].get(name, {})
+        # Per file, so runs of different sizes compare
+        new_per_file = new.get("seconds", 0.0) / max(latest["files"], 1)
+        old_per_file = old.get("seconds", 0.0) / max(previous["files"], 1)
+        lines.append(
+            f"- `{name}`: {old_per_file * 1000:.2f} → {new_per_file * 1000:.2f} ms/file "
+            f"({change(new_per_file, old_per_file)})"
+        )
+    return lines
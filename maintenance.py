@@ -31,6 +31,7 @@ from typing import Any
 
 import config
 from logger import get_logger
+from resource_policy import enter_background, get_resource_status, throttle
 
 logger = get_logger()
 
@@ -126,8 +127,12 @@ def task_refresh_manifest(state: MaintenanceState) -> str:
     from manifest import get_or_build_manifest
 
     try:
-        m = get_or_build_manifest()
-        msg = f"manifest fresh ({m.stats.indexed_files} files, " f"built in {m.duration_ms} ms)"
+        m = get_or_build_manifest(deep=True)
+        msg = (
+            f"manifest fresh ({m.stats.indexed_files} files, {m.reused_files} reused, "
+            f"{len(getattr(m, 'rebuilt_shards', []))} shards rebuilt, "
+            f"built in {m.duration_ms} ms)"
+        )
         _record(state, "manifest_refresh", True, msg)
         return msg
     except Exception as e:
@@ -440,6 +445,7 @@ _lock = threading.Lock()
 
 
 def _loop() -> None:
+    enter_background("maintenance")
     state = load_state()
     logger.info("Maintenance daemon started")
     while not _stop.is_set():
@@ -449,6 +455,7 @@ def _loop() -> None:
                 last = float(getattr(state, task.last_attr, 0.0) or 0.0)
                 if (now - last) < task.interval:
                     continue
+                throttle()
                 try:
                     task.fn(state)
                 finally:
@@ -515,8 +522,13 @@ def get_status() -> dict[str, Any]:
                 "interval_s": task.interval,
             }
         )
+    from file_watcher import get_watcher
+
+    watcher = get_watcher()
     return {
         "daemon_alive": _thread is not None and _thread.is_alive(),
+        "watcher": watcher.get_stats() if watcher is not None else None,
+        "resource_policy": get_resource_status(),
         "vector_db_mb": round(db_mb, 1),
         "log_mb": round(log_mb, 1),
         "process_rss_mb": round(rss_mb, 1),
@@ -1,17 +1,36 @@
 """
 L0 Manifest — fast, lightweight project manifest.
 
-A single JSON file at `.ai/manifest.json` that captures:
+A compact snapshot of the project (one shard per top-level module under
+`.ai/manifest/`, see `manifest_shards`) that captures:
   - File inventory (path, size, mtime, language, top-level symbols)
   - Module summary (top directories with counts and total size)
   - Project stats (file type distribution, hot paths, totals)
 
-Built incrementally from filesystem walk. NEVER loads ChromaDB or
+Built from the shared file catalog (`file_catalog`). NEVER loads ChromaDB or
 sentence-transformer model. Closes ~80% of "what is this project"
 queries in < 50ms.
 
 The manifest is rebuilt automatically when its mtime is older than the
-oldest indexable file. Stale entries are pruned on every refresh.
+oldest indexable file. Stale entries are pruned on every refresh. Rebuilds are
+incremental: entries whose (size, mtime) match the previous manifest keep
+their symbols, so only new or modified files are read.
+
+Staleness on the query path is answered from a snapshot of directory mtimes
+(a directory's mtime changes when entries are added, removed or renamed,
+which includes editors that save via write-and-rename), so it costs one stat
+per directory instead of one per file. Within FRESHNESS_WINDOW_SECONDS of a
+check the in-process manifest is reused without any IO. In-place edits that
+leave directory mtimes untouched are caught by the deep check the maintenance
+daemon runs, or immediately when a file watcher calls `mark_dirty(path)`,
+which rebuilds only the shard containing path.
+
+On disk each manifest uses the sectioned binary format in `manifest_format`:
+loading reads only the header, and stats, modules and the file table are
+decoded when first accessed. `load_manifest()` still reads a single-file
+`.ai/manifest.bin` or a `.ai/manifest.json` written by older versions; the
+first sharded refresh deletes both. `export_manifest_json()` writes the
+human-readable form on request.
 """
 
 from __future__ import annotations
@@ -19,22 +38,37 @@ from __future__ import annotations
 import json
 import os
 import re
+import threading
 import time
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any
 
 import config
+from file_catalog import DirListing, get_file_catalog
 from logger import get_logger
 
 logger = get_logger()
 
 MANIFEST_VERSION = 1
-MANIFEST_FILENAME = "manifest.json"
+MANIFEST_FILENAME = "manifest.bin"
+LEGACY_MANIFEST_FILENAME = "manifest.json"
 MAX_FILES_TO_SCAN = 20000
 MAX_SYMBOLS_PER_FILE = 12
 PREVIEW_LINES_FOR_SYMBOLS = 200
+# Characters read from the top of a file for symbol extraction; symbols only
+# come from the first PREVIEW_LINES_FOR_SYMBOLS lines, so large files need not
+# be read whole
+PREVIEW_CHARS_FOR_SYMBOLS = 256 * 1024
 HOT_PATH_LIMIT = 15
+# Module name of files directly under the project root (also the root shard's name)
+ROOT_MODULE = "(root)"
+FRESHNESS_WINDOW_SECONDS = 2.0
+# Above this many keyword occurrences per entry, L0 search scans entries linearly.
+DENSE_MATCH_RATIO = 0.25
 
 _PY_TOP_LEVEL = re.compile(r"^(?:class|def|async def)\s+([A-Za-z_][\w]*)", re.MULTILINE)
 _JS_TOP_LEVEL = re.compile(
@@ -107,7 +141,7 @@ def _extract_symbols(content: str, language: str) -> list[str]:
     return seen
 
 
-@dataclass
+@dataclass(slots=True)
 class FileEntry:
     path: str
     size: int
@@ -134,6 +168,60 @@ class ManifestStats:
     config_files: list[str] = field(default_factory=list)
 
 
+class ManifestSearchIndex:
+    """
+    Substring index over lowercased paths and symbols.
+
+    All entries are packed into one lowercased string ("path\nsym\nsym\0" per
+    entry) with a parallel table of entry start offsets. A lookup runs
+    str.find over the packed text in C and maps each hit back to its entry by
+    bisection, skipping to the next entry after a hit, so only entries that
+    actually contain the keyword are touched from Python. Keywords matching
+    most entries fall back to an in-order scan. Lowercasing happens once per
+    manifest generation instead of on every query.
+    """
+
+    def __init__(self, files: list[FileEntry]):
+        parts: list[str] = []
+        starts: list[int] = []
+        pos = 0
+        for f in files:
+            # Lowercased per entry: lower() can change the length ("İ" -> "i̇"),
+            # so offsets must be taken from the lowercased text
+            text = ("\n".join((f.path, *f.symbols)) + "\0").lower()
+            starts.append(pos)
+            parts.append(text)
+            pos += len(text)
+        starts.append(pos)
+        self.text = "".join(parts)
+        self.starts = array("q", starts)
+        # Lowercased (path, *symbols) per entry, split once from the packed text.
+        # Tuples of strings are untracked by the GC, so this adds no collector load.
+        self.fields = [tuple(part.split("\n")) for part in self.text.split("\0")[:-1]]
+
+    def __len__(self) -> int:
+        return len(self.starts) - 1
+
+    def candidates(self, keyword_lc: str) -> Iterable[int]:
+        """Entry ids whose path or symbols may contain keyword_lc, in manifest order."""
+        text, starts, count = self.text, self.starts, len(self)
+        dense_limit = max(1, int(count * DENSE_MATCH_RATIO))
+        found: list[int] = []
+        hit = text.find(keyword_lc) if keyword_lc else -1
+        while hit != -1:
+            entry = bisect_right(starts, hit) - 1
+            if entry >= count:
+                break
+            found.append(entry)
+            if len(found) > dense_limit:
+                # Most entries match; walking them in order beats locating each hit.
+                return range(count)
+            hit = text.find(keyword_lc, starts[entry + 1])
+        if not keyword_lc:
+            return range(count)
+        return found
+
+
 @dataclass
 class Manifest:
     version: int = MANIFEST_VERSION
@@ -143,6 +231,40 @@ class Manifest:
     files: list[FileEntry] = field(default_factory=list)
     modules: list[ModuleEntry] = field(default_factory=list)
     stats: ManifestStats = field(default_factory=ManifestStats)
+    reused_files: int = 0
+    pruned_files: int = 0
+    # Relative directory path ("" for the root) -> st_mtime at build time
+    dir_mtimes: dict[str, float] = field(default_factory=dict)
+    # Top-level module this manifest covers (see manifest_shards); None for the whole tree
+    shard: str | None = None
+    _search_index: ManifestSearchIndex | None = field(default=None, repr=False, compare=False)
+
+    def search_index(self) -> ManifestSearchIndex:
+        """Substring index over this manifest's paths and symbols, built on first use."""
+        if self._search_index is None:
+            self._search_index = ManifestSearchIndex(self.files)
+        return self._search_index
+
+    def keyword_hits(self, keyword_lc: str) -> list[tuple[int, FileEntry]]:
+        """(score, entry) for every entry whose path or symbols contain keyword_lc."""
+        index = self.search_index()
+        hits: list[tuple[int, FileEntry]] = []
+        for i in index.candidates(keyword_lc):
+            entry_fields = index.fields[i]
+            path_lc = entry_fields[0]
+            score = 0
+            if keyword_lc in path_lc:
+                score += 5
+                if path_lc.endswith(f"/{keyword_lc}") or path_lc.split("/")[-1] == keyword_lc:
+                    score += 10
+            for sym_lc in entry_fields[1:]:
+                if keyword_lc in sym_lc:
+                    score += 3
+                    if sym_lc == keyword_lc:
+                        score += 7
+            if score > 0:
+                hits.append((score, self.files[i]))
+        return hits
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -150,9 +272,13 @@ class Manifest:
             "project_root": self.project_root,
             "generated_at": self.generated_at,
             "duration_ms": self.duration_ms,
+            "reused_files": self.reused_files,
+            "pruned_files": self.pruned_files,
             "files": [asdict(f) for f in self.files],
             "modules": [asdict(m) for m in self.modules],
             "stats": asdict(self.stats),
+            "dir_mtimes": self.dir_mtimes,
+            "shard": self.shard,
         }
 
     @classmethod
@@ -174,9 +300,13 @@ class Manifest:
             project_root=data.get("project_root", ""),
             generated_at=data.get("generated_at", 0.0),
             duration_ms=data.get("duration_ms", 0),
+            reused_files=data.get("reused_files", 0),
+            pruned_files=data.get("pruned_files", 0),
             files=files,
             modules=modules,
             stats=stats,
+            dir_mtimes=data.get("dir_mtimes", {}) or {},
+            shard=data.get("shard"),
         )
 
 
@@ -184,6 +314,26 @@ def _manifest_path() -> Path:
     return config.AI_DIR / MANIFEST_FILENAME
 
 
+def _legacy_manifest_path() -> Path:
+    return config.AI_DIR / LEGACY_MANIFEST_FILENAME
+
+
+def _scope_listings(
+    root: Path, shard: str | None, *, deep: bool = True
+) -> list[tuple[str, DirListing]]:
+    """
+    Directory listings (from the shared file catalog) for the part of the tree
+    a manifest covers: the whole tree, one top-level module, or (for
+    ROOT_MODULE) only the files directly under the root. With deep=True every
+    file in scope is re-stat-ed first.
+    """
+    under = "" if shard is None or shard == ROOT_MODULE else shard
+    recursive = shard != ROOT_MODULE
+    catalog = get_file_catalog(root)
+    catalog.refresh(under, deep=deep, recursive=recursive)
+    return catalog.walk(under, recursive=recursive)
+
+
 def _config_files_in_root(root: Path) -> list[str]:
     candidates = [
         "pyproject.toml",
@@ -211,6 +361,8 @@ def build_manifest(
     *,
     extract_symbols: bool = True,
     max_files: int = MAX_FILES_TO_SCAN,
+    previous: Manifest | None = None,
+    shard: str | None = None,
 ) -> Manifest:
     """
     Walks the project tree once, building a fresh manifest.
@@ -220,6 +372,10 @@ def build_manifest(
         extract_symbols: If True, reads each file (up to PREVIEW_LINES_FOR_SYMBOLS)
             to capture top-level symbols. Set False for ultra-fast scan.
         max_files: Hard safety cap on scanned files.
+        previous: Earlier manifest of the same root. Files whose size and mtime
+            are unchanged reuse its symbols instead of being read again.
+        shard: Limit the walk to one top-level module (ROOT_MODULE for files
+            directly under the root); paths stay relative to root.
 
     Returns:
         Fully populated Manifest.
@@ -228,7 +384,7 @@ def build_manifest(
         root = config.PROJECT_ROOT
 
     started = time.monotonic()
-    manifest = Manifest(project_root=str(root), generated_at=time.time())
+    manifest = Manifest(project_root=str(root), generated_at=time.time(), shard=shard)
 
     indexable = config.INDEXABLE_EXTENSIONS
     binary = config.BINARY_EXTENSIONS
@@ -240,23 +396,22 @@ def build_manifest(
     by_language: dict[str, int] = {}
     by_extension: dict[str, int] = {}
     hot_files: list[tuple[str, int]] = []  # (path, size) for hot_paths
+    previous_entries: dict[str, FileEntry] = {}
+    if previous is not None and previous.project_root == str(root):
+        previous_entries = {f.path: f for f in previous.files}
+    reused = 0
 
-    for cur_dir, dir_names, files in os.walk(root):
-        dir_names[:] = [d for d in dir_names if not config.is_dir_ignored(d)]
+    for rel_dir, listing in _scope_listings(root, shard):
+        manifest.dir_mtimes[rel_dir] = listing.mtime
 
-        for fname in files:
+        for item in listing.files:
             if total_files >= max_files:
                 break
             total_files += 1
-            full = Path(cur_dir) / fname
-            try:
-                stat = full.stat()
-            except OSError:
-                continue
-            size = stat.st_size
+            size = item.size
             total_size += size
 
-            suffix = full.suffix.lower()
+            suffix = item.suffix
             by_extension[suffix] = by_extension.get(suffix, 0) + 1
 
             if suffix in binary:
@@ -268,12 +423,8 @@ def build_manifest(
             lang = _detect_language(suffix)
             by_language[lang] = by_language.get(lang, 0) + 1
 
-            try:
-                rel = full.relative_to(root).as_posix()
-            except ValueError:
-                rel = full.as_posix()
-
-            top_module = rel.split("/", 1)[0] if "/" in rel else "(root)"
+            rel = item.rel
+            top_module = rel.split("/", 1)[0] if "/" in rel else ROOT_MODULE
             entry = module_counts.get(top_module)
             if entry is None:
                 module_counts[top_module] = ModuleEntry(name=top_module, files=1, size=size)
@@ -282,9 +433,19 @@ def build_manifest(
                 entry.size += size
 
             symbols: list[str] = []
-            if extract_symbols and size <= 256 * 1024:
+            prior = previous_entries.pop(rel, None)
+            if (
+                extract_symbols
+                and prior is not None
+                and prior.size == size
+                and prior.mtime == item.mtime
+            ):
+                symbols = prior.symbols
+                reused += 1
+            elif extract_symbols:
                 try:
-                    content = full.read_text(encoding="utf-8", errors="ignore")
+                    with open(item.path, encoding="utf-8", errors="ignore") as f:
+                        content = f.read(PREVIEW_CHARS_FOR_SYMBOLS)
                     symbols = _extract_symbols(content, lang)
                 except Exception:
                     symbols = []
@@ -293,7 +454,7 @@ def build_manifest(
                 FileEntry(
                     path=rel,
                     size=size,
-                    mtime=stat.st_mtime,
+                    mtime=item.mtime,
                     lang=lang,
                     symbols=symbols,
                 )
@@ -301,7 +462,8 @@ def build_manifest(
             hot_files.append((rel, size))
 
         if total_files >= max_files:
-            logger.warning(f"Manifest scan capped at {max_files} files")
+            scope = f" in {shard}" if shard else ""
+            logger.warning(f"Manifest scan capped at {max_files} files{scope}")
             break
 
     hot_files.sort(key=lambda x: x[1], reverse=True)
@@ -315,55 +477,150 @@ def build_manifest(
         by_language=by_language,
         by_extension=dict(sorted(by_extension.items(), key=lambda x: x[1], reverse=True)),
         hot_paths=hot_paths,
-        config_files=_config_files_in_root(root),
+        config_files=_config_files_in_root(root) if shard in (None, ROOT_MODULE) else [],
     )
+    manifest.reused_files = reused
+    manifest.pruned_files = len(previous_entries) if previous is not None else 0
     manifest.duration_ms = int((time.monotonic() - started) * 1000)
     return manifest
 
 
-def save_manifest(manifest: Manifest) -> Path:
-    """Atomically writes manifest to .ai/manifest.json."""
-    from incremental_indexing import atomic_write
+# Manifest path -> ((st_mtime_ns, st_size) of the file, parsed Manifest)
+_resident: dict[str, tuple[tuple[int, int], Manifest]] = {}
+_resident_lock = threading.Lock()
+
+
+def _generation(target: Path) -> tuple[int, int]:
+    st = target.stat()
+    return st.st_mtime_ns, st.st_size
 
-    config.AI_DIR.mkdir(parents=True, exist_ok=True)
-    target = _manifest_path()
-    atomic_write(target, json.dumps(manifest.to_dict(), ensure_ascii=False, indent=2))
+
+def save_manifest(manifest: Manifest, target: Path | None = None) -> Path:
+    """Atomically writes manifest to target (default .ai/manifest.bin)."""
+    from incremental_indexing import atomic_write
+    from manifest_format import encode_manifest
+
+    if target is None:
+        target = _manifest_path()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(target, encode_manifest(manifest))
+    with _resident_lock:
+        _resident[str(target)] = (_generation(target), manifest)
     logger.info(
-        f"Manifest saved: {len(manifest.files)} files, "
-        f"{manifest.duration_ms}ms, {target.stat().st_size // 1024} KB"
+        f"Manifest saved: {len(manifest.files)} files ({manifest.reused_files} reused, "
+        f"{manifest.pruned_files} pruned), {manifest.duration_ms}ms, "
+        f"{target.stat().st_size // 1024} KB"
     )
     return target
 
 
-def load_manifest() -> Manifest | None:
-    """Loads the persisted manifest. Returns None if missing or invalid."""
-    target = _manifest_path()
-    if not target.exists():
+def export_manifest_json(manifest: Manifest | None = None, target: Path | None = None) -> Path:
+    """
+    Writes the manifest as indented JSON for humans and external tools.
+
+    Args:
+        manifest: Manifest to export (defaults to the current one)
+        target: Output path (defaults to .ai/manifest.json)
+
+    Returns:
+        Path of the written file
+    """
+    from manifest_format import export_manifest_json as export
+
+    if manifest is None:
+        manifest = get_or_build_manifest()
+    if target is None:
+        config.AI_DIR.mkdir(parents=True, exist_ok=True)
+        target = _legacy_manifest_path()
+    return export(manifest, target)
+
+
+def _read_binary_manifest(target: Path) -> Manifest | None:
+    import manifest_format
+
+    try:
+        return manifest_format.decode_manifest(target.read_bytes())
+    except Exception as e:
+        logger.warning(f"Manifest unreadable: {e}")
         return None
+
+
+def _read_legacy_manifest(target: Path) -> Manifest | None:
     try:
         data = json.loads(target.read_text(encoding="utf-8"))
+        return Manifest.from_dict(data)
     except Exception as e:
-        logger.warning(f"Manifest unreadable: {e}")
+        logger.warning(f"Manifest deserialisation failed: {e}")
+        return None
+
+
+def load_manifest(target: Path | None = None) -> Manifest | None:
+    """
+    Loads a persisted manifest. Returns None if missing or invalid.
+
+    Without a target, prefers .ai/manifest.bin and falls back to a legacy
+    .ai/manifest.json. The parsed manifest stays resident per path and is
+    returned as-is while the file's generation (mtime_ns, size) is unchanged,
+    so repeated calls cost a single stat.
+    """
+    explicit = target is not None
+    if target is None:
+        target = _manifest_path()
+    reader = _read_binary_manifest
+    try:
+        generation = _generation(target)
+    except OSError:
+        if explicit:
+            return None
+        target = _legacy_manifest_path()
+        reader = _read_legacy_manifest
+        try:
+            generation = _generation(target)
+        except OSError:
+            return None
+    with _resident_lock:
+        cached = _resident.get(str(target))
+    if cached is not None and cached[0] == generation:
+        if cached[1].project_root and cached[1].project_root != str(config.PROJECT_ROOT):
+            return None
+        return cached[1]
+    manifest = reader(target)
+    if manifest is None:
         return None
-    if data.get("version") != MANIFEST_VERSION:
+    if manifest.version != MANIFEST_VERSION:
         logger.info(
-            f"Manifest version mismatch (got {data.get('version')}, expected {MANIFEST_VERSION})"
+            f"Manifest version mismatch (got {manifest.version}, expected {MANIFEST_VERSION})"
         )
         return None
-    if data.get("project_root") and data["project_root"] != str(config.PROJECT_ROOT):
+    if manifest.project_root and manifest.project_root != str(config.PROJECT_ROOT):
         logger.info("Manifest project_root mismatch — will rebuild")
         return None
-    try:
-        return Manifest.from_dict(data)
-    except Exception as e:
-        logger.warning(f"Manifest deserialisation failed: {e}")
-        return None
+    with _resident_lock:
+        _resident[str(target)] = (generation, manifest)
+    return manifest
+
+
+def _dirs_changed(manifest: Manifest, root: Path) -> bool:
+    """Stats every directory in the snapshot; True if any was added to, removed or renamed."""
+    threshold = manifest.generated_at
+    for rel_dir, recorded in manifest.dir_mtimes.items():
+        try:
+            current = os.stat(root / rel_dir if rel_dir else root).st_mtime
+        except OSError:
+            return True
+        if current != recorded or current > threshold:
+            return True
+    return False
 
 
-def is_manifest_stale(manifest: Manifest, root: Path | None = None) -> bool:
+def is_manifest_stale(manifest: Manifest, root: Path | None = None, *, deep: bool = False) -> bool:
     """
-    Returns True when at least one indexable file has mtime > manifest.generated_at,
-    or the file count differs by > 5%.
+    Returns True when the manifest no longer reflects the tree.
+
+    The default check compares the directory mtime snapshot (one stat per
+    directory). With deep=True — or for manifests without a snapshot — every
+    indexable file is stat-ed: True when at least one has mtime >
+    manifest.generated_at, or the file count differs by > 5%.
     """
     if root is None:
         root = config.PROJECT_ROOT
@@ -372,53 +629,103 @@ def is_manifest_stale(manifest: Manifest, root: Path | None = None) -> bool:
     if threshold <= 0:
         return True
 
+    if manifest.dir_mtimes:
+        if _dirs_changed(manifest, root):
+            return True
+        if not deep:
+            return False
+
     indexable = config.INDEXABLE_EXTENSIONS
     binary = config.BINARY_EXTENSIONS
     fresh_count = 0
     found_change = False
 
-    for cur_dir, dir_names, files in os.walk(root):
-        dir_names[:] = [d for d in dir_names if not config.is_dir_ignored(d)]
-        for fname in files:
-            full = Path(cur_dir) / fname
-            suffix = full.suffix.lower()
+    for _rel_dir, listing in _scope_listings(root, manifest.shard):
+        for item in listing.files:
+            suffix = item.suffix
             if suffix in binary:
                 continue
             if suffix and suffix not in indexable:
                 continue
             fresh_count += 1
-            try:
-                if full.stat().st_mtime > threshold:
-                    found_change = True
-                    break
-            except OSError:
-                continue
+            if item.mtime > threshold:
+                found_change = True
+                break
         if found_change:
             break
 
     if found_change:
         return True
 
-    indexed = manifest.stats.indexed_files or 1
+    indexed = manifest.stats.indexed_files
+    if not indexed:
+        return fresh_count > 0
     drift = abs(indexed - fresh_count) / indexed
     return drift > 0.05
 
 
-def get_or_build_manifest(*, force: bool = False) -> Manifest:
+_current: Manifest | None = None
+_checked_at = 0.0
+_dirty = False
+_dirty_shards: set[str] = set()
+_current_lock = threading.Lock()
+
+
+def mark_dirty(path: str | Path | None = None) -> None:
+    """
+    Forces the next get_or_build_manifest() to re-check (e.g. from a file watcher).
+
+    Args:
+        path: Changed file or directory. Its shard is rebuilt on the next call;
+            without a path every shard is re-checked.
+    """
+    global _dirty
+    if path is not None:
+        from manifest_shards import shard_for_path
+
+        name = shard_for_path(path)
+        if name is not None:
+            _dirty_shards.add(name)
+    _dirty = True
+
+
+def get_or_build_manifest(*, force: bool = False, deep: bool = False) -> Manifest:
     """
     High-level entry point. Returns a current Manifest, building if missing/stale.
+
+    The manifest is stored as one shard per top-level module (see
+    manifest_shards); only shards that are missing, stale or marked dirty are
+    rebuilt, and the returned manifest is the merged view over all shards.
+
+    Args:
+        force: Rebuild even if the manifest looks fresh.
+        deep: Stat every file instead of only directories when checking staleness.
     """
-    if not force:
-        existing = load_manifest()
-        if existing is not None and not is_manifest_stale(existing):
-            return existing
+    global _current, _checked_at, _dirty
 
-    manifest = build_manifest()
-    try:
-        save_manifest(manifest)
-    except Exception as e:
-        logger.warning(f"Could not persist manifest: {e}")
-    return manifest
+    with _current_lock:
+        now = time.monotonic()
+        root = str(config.PROJECT_ROOT)
+        if (
+            not force
+            and not deep
+            and not _dirty
+            and _current is not None
+            and _current.project_root == root
+            and now - _checked_at < FRESHNESS_WINDOW_SECONDS
+        ):
+            return _current
+
+        from manifest_shards import refresh_shards
+
+        dirty = set(_dirty_shards)
+        manifest = refresh_shards(config.PROJECT_ROOT, force=force, deep=deep, dirty=dirty)
+        _dirty_shards.difference_update(dirty)
+
+        _current = manifest
+        _checked_at = time.monotonic()
+        _dirty = False
+        return manifest
 
 
 def quick_overview_from_manifest(manifest: Manifest) -> str:
@@ -466,22 +773,11 @@ def quick_overview_from_manifest(manifest: Manifest) -> str:
 
 
 def find_files_by_keyword(manifest: Manifest, keyword: str, limit: int = 20) -> list[FileEntry]:
-    """L0 lexical search across paths and symbols. No tokenisation, just substring."""
-    keyword_lc = keyword.lower()
-    hits: list[tuple[int, FileEntry]] = []
-    for entry in manifest.files:
-        score = 0
-        path_lc = entry.path.lower()
-        if keyword_lc in path_lc:
-            score += 5
-            if path_lc.endswith(f"/{keyword_lc}") or path_lc.split("/")[-1] == keyword_lc:
-                score += 10
-        for sym in entry.symbols:
-            if keyword_lc in sym.lower():
-                score += 3
-                if sym.lower() == keyword_lc:
-                    score += 7
-        if score > 0:
-            hits.append((score, entry))
+    """
+    L0 lexical search across paths and symbols. No tokenisation, just substring.
+    Only entries containing the keyword are scored (see ManifestSearchIndex);
+    a sharded manifest searches its shards in parallel.
+    """
+    hits = manifest.keyword_hits(keyword.lower())
     hits.sort(key=lambda x: x[0], reverse=True)
     return [e for _, e in hits[:limit]]
@@ -0,0 +1,251 @@
+"""
+Compact binary storage for the L0 manifest (`.ai/manifest.bin`).
+
+Layout:
+
+    b"PMMF" | u16 format version | u32 header length | header JSON | payload
+
+The header carries the manifest's scalar fields plus a section table
+(name -> [offset, length, crc32] into the payload). Every section is
+compressed with zlib independently, so a reader decompresses only what it
+touches:
+
+    stats, modules, dir_mtimes     JSON
+    files.path                     newline-joined paths
+    files.size / files.mtime       array('q') / array('d') bytes
+    files.lang                     array('B') of indices into header["langs"]
+    files.symbols                  one line per file, symbols tab-separated
+
+`LazyManifest` keeps the raw payload and materialises a section the first
+time its attribute is read, so `quick_overview_from_manifest` never decodes
+the file table. `decode_manifest` still checks every section's bounds and
+checksum up front, so a damaged file fails to load (and is rebuilt) instead
+of failing later on first access. `export_manifest_json` writes the human-readable JSON form.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from manifest import (
+    MANIFEST_VERSION,
+    FileEntry,
+    Manifest,
+    ManifestStats,
+    ModuleEntry,
+)
+
+MAGIC = b"PMMF"
+FORMAT_VERSION = 2
+SECTIONS: tuple[str, ...] = (
+    "stats",
+    "modules",
+    "dir_mtimes",
+    "files.path",
+    "files.size",
+    "files.mtime",
+    "files.lang",
+    "files.symbols",
+)
+_PREAMBLE = struct.Struct("<HI")
+_COMPRESSION_LEVEL = 6
+
+
+class ManifestFormatError(ValueError):
+    """Raised when a binary manifest is truncated, corrupt or of an unknown version."""
+
+
+def _pack_array(values: array[Any]) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack_array(typecode: str, data: bytes) -> array[Any]:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def encode_manifest(manifest: Manifest) -> bytes:
+    """Serialises a manifest into the sectioned binary format."""
+    files = manifest.files
+    langs = sorted({f.lang for f in files})
+    lang_ids = {lang: i for i, lang in enumerate(langs)}
+
+    raw_sections: dict[str, bytes] = {
+        "stats": json.dumps(asdict(manifest.stats)).encode("utf-8"),
+        "modules": json.dumps([[m.name, m.files, m.size] for m in manifest.modules]).encode(
+            "utf-8"
+        ),
+        "dir_mtimes": json.dumps(manifest.dir_mtimes).encode("utf-8"),
+        "files.path": "\n".join(f.path for f in files).encode("utf-8"),
+        "files.size": _pack_array(array("q", (f.size for f in files))),
+        "files.mtime": _pack_array(array("d", (f.mtime for f in files))),
+        "files.lang": array("B", (lang_ids[f.lang] for f in files)).tobytes(),
+        "files.symbols": "\n".join("\t".join(f.symbols) for f in files).encode("utf-8"),
+    }
+
+    table: dict[str, list[int]] = {}
+    payload = bytearray()
+    for name, raw in raw_sections.items():
+        blob = zlib.compress(raw, _COMPRESSION_LEVEL)
+        table[name] = [len(payload), len(blob), zlib.crc32(blob)]
+        payload += blob
+
+    header = json.dumps(
+        {
+            "version": manifest.version,
+            "project_root": manifest.project_root,
+            "generated_at": manifest.generated_at,
+            "duration_ms": manifest.duration_ms,
+            "reused_files": manifest.reused_files,
+            "pruned_files": manifest.pruned_files,
+            "shard": manifest.shard,
+            "file_count": len(files),
+            "langs": langs,
+            "sections": table,
+        }
+    ).encode("utf-8")
+    return MAGIC + _PREAMBLE.pack(FORMAT_VERSION, len(header)) + header + bytes(payload)
+
+
+def read_header(data: bytes) -> tuple[dict[str, Any], memoryview]:
+    """
+    Parses the preamble and header.
+
+    Returns:
+        (header dict, payload view)
+
+    Raises:
+        ManifestFormatError: On bad magic, unknown format version or truncation
+    """
+    start = len(MAGIC) + _PREAMBLE.size
+    if len(data) < start or data[: len(MAGIC)] != MAGIC:
+        raise ManifestFormatError("not a binary manifest")
+    fmt_version, header_len = _PREAMBLE.unpack_from(data, len(MAGIC))
+    if fmt_version != FORMAT_VERSION:
+        raise ManifestFormatError(f"unsupported manifest format {fmt_version}")
+    if len(data) < start + header_len:
+        raise ManifestFormatError("truncated manifest header")
+    header = json.loads(bytes(data[start : start + header_len]).decode("utf-8"))
+    return header, memoryview(data)[start + header_len :]
+
+
+class LazyManifest(Manifest):
+    """
+    Manifest backed by an encoded payload. `stats`, `modules`, `dir_mtimes` and
+    `files` are decoded on first access and then behave like plain attributes.
+    """
+
+    _LAZY_FIELDS = ("stats", "modules", "dir_mtimes", "files")
+
+    def __init__(self, header: dict[str, Any], payload: memoryview):
+        self.version = header.get("version", MANIFEST_VERSION)
+        self.project_root = header.get("project_root", "")
+        self.generated_at = header.get("generated_at", 0.0)
+        self.duration_ms = header.get("duration_ms", 0)
+        self.reused_files = header.get("reused_files", 0)
+        self.pruned_files = header.get("pruned_files", 0)
+        self.shard = header.get("shard")
+        self._search_index = None
+        self._header = header
+        self._payload = payload
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not set yet, i.e. sections not decoded so far.
+        if name not in LazyManifest._LAZY_FIELDS or "_payload" not in self.__dict__:
+            raise AttributeError(name)
+        value = getattr(self, f"_decode_{name}")()
+        setattr(self, name, value)
+        return value
+
+    def _section(self, name: str) -> bytes:
+        try:
+            offset, length, _ = self._header["sections"][name]
+            return zlib.decompress(self._payload[offset : offset + length])
+        except (KeyError, ValueError, zlib.error) as e:
+            raise ManifestFormatError(f"manifest section {name!r} unreadable: {e}") from e
+
+    def _json_section(self, name: str) -> Any:
+        return json.loads(self._section(name).decode("utf-8"))
+
+    def _decode_stats(self) -> ManifestStats:
+        return ManifestStats(**self._json_section("stats"))
+
+    def _decode_modules(self) -> list[ModuleEntry]:
+        return [
+            ModuleEntry(name, files, size) for name, files, size in self._json_section("modules")
+        ]
+
+    def _decode_dir_mtimes(self) -> dict[str, float]:
+        return dict(self._json_section("dir_mtimes"))
+
+    def _decode_files(self) -> list[FileEntry]:
+        count = self._header.get("file_count", 0)
+        if not count:
+            return []
+        langs = self._header.get("langs", [])
+        paths = self._section("files.path").decode("utf-8").split("\n")
+        sizes = _unpack_array("q", self._section("files.size"))
+        mtimes = _unpack_array("d", self._section("files.mtime"))
+        lang_ids = _unpack_array("B", self._section("files.lang"))
+        symbol_lines = self._section("files.symbols").decode("utf-8").split("\n")
+        if not (len(paths) == len(sizes) == len(mtimes) == len(lang_ids) == count):
+            raise ManifestFormatError("manifest file table columns disagree")
+        return [
+            FileEntry(
+                path=paths[i],
+                size=sizes[i],
+                mtime=mtimes[i],
+                lang=langs[lang_ids[i]],
+                symbols=symbol_lines[i].split("\t") if symbol_lines[i] else [],
+            )
+            for i in range(count)
+        ]
+
+
+def _verify_sections(header: dict[str, Any], payload: memoryview) -> None:
+    table = header.get("sections")
+    if not isinstance(table, dict):
+        raise ManifestFormatError("manifest has no section table")
+    for name in SECTIONS:
+        try:
+            offset, length, checksum = table[name]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ManifestFormatError(f"manifest section {name!r} missing from table") from e
+        if offset < 0 or length < 0 or offset + length > len(payload):
+            raise ManifestFormatError(f"manifest section {name!r} out of bounds")
+        if zlib.crc32(payload[offset : offset + length]) != checksum:
+            raise ManifestFormatError(f"manifest section {name!r} checksum mismatch")
+
+
+def decode_manifest(data: bytes) -> LazyManifest:
+    """
+    Parses the header of an encoded manifest and verifies its sections;
+    they are decompressed on demand.
+
+    Raises:
+        ManifestFormatError: If the header or any section is damaged
+    """
+    header, payload = read_header(data)
+    _verify_sections(header, payload)
+    return LazyManifest(header, payload)
+
+
+def export_manifest_json(manifest: Manifest, target: Path) -> Path:
+    """Writes the manifest as indented JSON (the legacy, human-readable form)."""
+    from incremental_indexing import atomic_write
+
+    atomic_write(target, json.dumps(manifest.to_dict(), ensure_ascii=False, indent=2))
+    return target
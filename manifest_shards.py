@@ -0,0 +1,357 @@
+"""
+Sharded L0 manifest.
+
+The manifest is split by top-level module: every non-ignored directory under
+the project root gets its own shard, and files directly under the root form
+the ROOT_MODULE shard. Shards are stored in `.ai/manifest/` in the binary
+format of `manifest_format`, each with its own directory-mtime snapshot, so a
+change inside one package makes only that package's shard stale and only that
+shard is rebuilt. MAX_FILES_TO_SCAN applies per shard, not to the whole tree.
+
+`.ai/manifest/index.json` is the root index. For every shard it records the
+file name, build time, file count, total size and largest files, which the
+merged overview needs in addition to each shard's small stats section.
+
+Staleness checks and rebuilds fan out over a thread pool (stat calls and file
+reads release the GIL), and `ShardedManifest.keyword_hits` searches all shards
+in parallel and merges their hits in shard order.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, TypeVar
+
+import config
+from logger import get_logger
+from manifest import (
+    HOT_PATH_LIMIT,
+    LEGACY_MANIFEST_FILENAME,
+    MANIFEST_FILENAME,
+    MANIFEST_VERSION,
+    ROOT_MODULE,
+    FileEntry,
+    Manifest,
+    ManifestStats,
+    build_manifest,
+    is_manifest_stale,
+    load_manifest,
+    save_manifest,
+)
+from resource_policy import pool_size
+
+logger = get_logger()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+SHARDS_DIRNAME = "manifest"
+INDEX_FILENAME = "index.json"
+SHARD_INDEX_VERSION = 1
+MAX_FANOUT_WORKERS = pool_size()
+
+
+def shards_dir() -> Path:
+    return config.AI_DIR / SHARDS_DIRNAME
+
+
+def shard_filename(name: str) -> str:
+    """Stable, filesystem-safe file name for a shard (hash suffix avoids case collisions)."""
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", name)[:48]
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=4).hexdigest()
+    return f"{safe}-{digest}.bin"
+
+
+def discover_shards(root: Path) -> list[str]:
+    """Shard names for the current tree: ROOT_MODULE plus each non-ignored top-level directory."""
+    names = [ROOT_MODULE]
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False) and not config.is_dir_ignored(
+                        entry.name
+                    ):
+                        names.append(entry.name)
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.warning(f"Cannot list project root {root}: {e}")
+    return sorted(names)
+
+
+def shard_for_path(path: str | Path, root: Path | None = None) -> str | None:
+    """
+    Returns the shard a project path belongs to.
+
+    Args:
+        path: Absolute path, or path relative to the project root
+        root: Project root (defaults to config.PROJECT_ROOT)
+
+    Returns:
+        Shard name, or None if the path lies outside the root
+    """
+    if root is None:
+        root = config.PROJECT_ROOT
+    rel = Path(path)
+    if rel.is_absolute():
+        try:
+            rel = rel.relative_to(root)
+        except ValueError:
+            return None
+    parts = rel.parts
+    if not parts:
+        return ROOT_MODULE
+    if len(parts) == 1 and not (root / parts[0]).is_dir():
+        return ROOT_MODULE
+    return parts[0]
+
+
+@dataclass
+class ShardInfo:
+    file: str
+    generated_at: float = 0.0
+    indexed_files: int = 0
+    size_bytes: int = 0
+    # (path, size) of the shard's largest files, merged into the overall hot paths
+    hot: list[tuple[str, int]] = field(default_factory=list)
+
+
+def _summarize(name: str, manifest: Manifest) -> ShardInfo:
+    hot_paths = set(manifest.stats.hot_paths)
+    sizes = {f.path: f.size for f in manifest.files if f.path in hot_paths}
+    return ShardInfo(
+        file=shard_filename(name),
+        generated_at=manifest.generated_at,
+        indexed_files=manifest.stats.indexed_files,
+        size_bytes=manifest.stats.total_size_bytes,
+        hot=[(p, sizes.get(p, 0)) for p in manifest.stats.hot_paths],
+    )
+
+
+def load_index(root: Path) -> dict[str, ShardInfo]:
+    """Reads the root index. Returns {} if missing, invalid or for another root."""
+    target = shards_dir() / INDEX_FILENAME
+    try:
+        data = json.loads(target.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Manifest shard index unreadable: {e}")
+        return {}
+    if data.get("version") != SHARD_INDEX_VERSION or data.get("project_root") != str(root):
+        return {}
+    try:
+        return {
+            name: ShardInfo(
+                file=info["file"],
+                generated_at=info.get("generated_at", 0.0),
+                indexed_files=info.get("indexed_files", 0),
+                size_bytes=info.get("size_bytes", 0),
+                hot=[(p, s) for p, s in info.get("hot", [])],
+            )
+            for name, info in data.get("shards", {}).items()
+        }
+    except Exception as e:
+        logger.warning(f"Manifest shard index invalid: {e}")
+        return {}
+
+
+def save_index(root: Path, infos: dict[str, ShardInfo]) -> Path:
+    """Atomically writes the root index."""
+    from incremental_indexing import atomic_write
+
+    target = shards_dir() / INDEX_FILENAME
+    target.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "version": SHARD_INDEX_VERSION,
+        "project_root": str(root),
+        "generated_at": time.time(),
+        "shards": {name: asdict(info) for name, info in infos.items()},
+    }
+    atomic_write(target, json.dumps(payload, ensure_ascii=False))
+    return target
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _fan_out(fn: Callable[[T], R], items: Iterable[T]) -> list[R]:
+    """Maps fn over items on the shared fan-out pool, preserving order."""
+    items = list(items)
+    if len(items) <= 1 or MAX_FANOUT_WORKERS <= 1:
+        return [fn(item) for item in items]
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=MAX_FANOUT_WORKERS, thread_name_prefix="manifest-shard"
+                )
+    return list(_executor.map(fn, items))
+
+
+def _refresh_shard(root: Path, name: str, force: bool, deep: bool) -> tuple[Manifest, bool]:
+    """Returns (shard manifest, whether it was rebuilt)."""
+    target = shards_dir() / shard_filename(name)
+    existing = load_manifest(target)
+    if existing is not None and existing.shard != name:
+        existing = None
+    if existing is not None and not force and not is_manifest_stale(existing, root, deep=deep):
+        return existing, False
+    built = build_manifest(root, previous=existing, shard=name)
+    try:
+        save_manifest(built, target)
+    except Exception as e:
+        logger.warning(f"Could not persist manifest shard {name}: {e}")
+    return built, True
+
+
+class ShardedManifest(Manifest):
+    """
+    Merged view over per-module shards. Stats and modules are combined up front;
+    the file table is concatenated on first access, and keyword search runs
+    on the shards in parallel.
+    """
+
+    def __init__(
+        self,
+        project_root: str,
+        shards: dict[str, Manifest],
+        infos: dict[str, ShardInfo],
+        rebuilt: list[str],
+        duration_ms: int = 0,
+    ):
+        self.shards = shards
+        self.infos = infos
+        self.rebuilt_shards = rebuilt
+        self.version = MANIFEST_VERSION
+        self.project_root = project_root
+        self.generated_at = max((m.generated_at for m in shards.values()), default=0.0)
+        self.duration_ms = duration_ms
+        self.reused_files = sum(shards[n].reused_files for n in rebuilt)
+        self.pruned_files = sum(shards[n].pruned_files for n in rebuilt)
+        self.shard = None
+        self._search_index = None
+        self.modules = sorted(
+            (mod for m in shards.values() for mod in m.modules),
+            key=lambda m: m.files,
+            reverse=True,
+        )
+        self.stats = self._merge_stats()
+        self.dir_mtimes = {k: v for m in shards.values() for k, v in m.dir_mtimes.items()}
+
+    def __getattr__(self, name: str) -> Any:
+        if name != "files" or "shards" not in self.__dict__:
+            raise AttributeError(name)
+        tables = _fan_out(lambda m: m.files, self.shards.values())
+        self.files = [f for table in tables for f in table]
+        return self.files
+
+    def _merge_stats(self) -> ManifestStats:
+        stats = ManifestStats()
+        by_extension: dict[str, int] = {}
+        hot: list[tuple[str, int]] = []
+        for name, m in self.shards.items():
+            s = m.stats
+            stats.total_files += s.total_files
+            stats.indexed_files += s.indexed_files
+            stats.total_size_bytes += s.total_size_bytes
+            for lang, count in s.by_language.items():
+                stats.by_language[lang] = stats.by_language.get(lang, 0) + count
+            for ext, count in s.by_extension.items():
+                by_extension[ext] = by_extension.get(ext, 0) + count
+            stats.config_files.extend(s.config_files)
+            info = self.infos.get(name)
+            if info is not None:
+                hot.extend(info.hot)
+        stats.by_extension = dict(sorted(by_extension.items(), key=lambda x: x[1], reverse=True))
+        hot.sort(key=lambda x: x[1], reverse=True)
+        stats.hot_paths = [p for p, _ in hot[:HOT_PATH_LIMIT]]
+        return stats
+
+    def keyword_hits(self, keyword_lc: str) -> list[tuple[int, FileEntry]]:
+        results = _fan_out(lambda m: m.keyword_hits(keyword_lc), self.shards.values())
+        return [hit for hits in results for hit in hits]
+
+
+def _remove_single_file_manifests() -> None:
+    """Deletes the pre-sharding .ai/manifest.bin and .ai/manifest.json, now superseded."""
+    for filename in (MANIFEST_FILENAME, LEGACY_MANIFEST_FILENAME):
+        target = config.AI_DIR / filename
+        try:
+            if target.exists():
+                target.unlink()
+                logger.info(f"Removed {target.name}; the manifest is now sharded")
+        except OSError as e:
+            logger.warning(f"Could not remove {target}: {e}")
+
+
+def refresh_shards(
+    root: Path | None = None,
+    *,
+    force: bool = False,
+    deep: bool = False,
+    dirty: set[str] | None = None,
+) -> ShardedManifest:
+    """
+    Brings every shard up to date and returns the merged manifest.
+
+    Args:
+        root: Project root (defaults to config.PROJECT_ROOT)
+        force: Rebuild all shards
+        deep: Stat every file instead of only directories when checking staleness
+        dirty: Shards to rebuild regardless of their staleness check
+
+    Returns:
+        ShardedManifest over all current shards
+    """
+    if root is None:
+        root = config.PROJECT_ROOT
+    started = time.monotonic()
+    dirty = dirty or set()
+    names = discover_shards(root)
+    index = load_index(root)
+
+    results = _fan_out(lambda name: _refresh_shard(root, name, force or name in dirty, deep), names)
+    shards: dict[str, Manifest] = {}
+    rebuilt: list[str] = []
+    for name, (shard, was_rebuilt) in zip(names, results, strict=True):
+        shards[name] = shard
+        if was_rebuilt:
+            rebuilt.append(name)
+
+    infos = {
+        name: index[name] if name in index and name not in rebuilt else _summarize(name, shard)
+        for name, shard in shards.items()
+    }
+    removed = set(index) - set(names)
+    for name in removed:
+        try:
+            (shards_dir() / shard_filename(name)).unlink(missing_ok=True)
+        except OSError:
+            pass
+    if rebuilt or removed or set(index) != set(names):
+        try:
+            save_index(root, infos)
+            if not index:
+                _remove_single_file_manifests()
+        except Exception as e:
+            logger.warning(f"Could not persist manifest shard index: {e}")
+        logger.info(
+            f"Manifest shards: {len(rebuilt)}/{len(names)} rebuilt"
+            + (f", {len(removed)} removed" if removed else "")
+        )
+
+    duration_ms = int((time.monotonic() - started) * 1000)
+    return ShardedManifest(str(root), shards, infos, rebuilt, duration_ms)
@@ -1,16 +1,19 @@
-import os
 import sys
 import threading
+from collections.abc import Sequence
 from pathlib import Path
 from time import time
+from typing import Any
 
 from mcp.server.fastmcp import FastMCP
 
 import config
 from config import (
     MCP_SERVER_DIR,
+    get_auto_exclude_mode,
     get_file_cache_stats,
     get_ignored_dirs,
+    get_index_time_slice,
     is_dir_ignored,
     is_mcp_server_dir,
     reconfigure,
@@ -19,8 +22,17 @@ from config import (
 )
 from context import get_context, reset_context
 from exceptions import GitError
+from file_catalog import get_file_catalog
+from file_classifier import ExclusionReport
+from file_watcher import ChangeBatch, get_watcher, start_watcher, stop_watcher
 from git_utils import CommitInfo, GitRepository
+from ignore_matcher import read_ignore_file
+from index_jobs import IndexJob, format_job, get_job_queue
+from index_priority import note_access
+from indexing_telemetry import compare_runs, format_run, load_runs
 from logger import setup_logger
+from parse_cache import get_parse_cache
+from resource_policy import interactive_call
 
 logger = setup_logger()
 
@@ -114,7 +126,35 @@ def ensure_startup() -> None:
         _startup_done = True
 
 
-mcp = FastMCP("ProjectMind")
+# Cheap read-only tools that clients poll for progress. They do not count as
+# interactive work: a client polling index_job_status every second would
+# otherwise keep background indexing throttled for the whole job.
+STATUS_TOOLS = frozenset(
+    {
+        "health",
+        "index_job_status",
+        "index_telemetry",
+        "maintenance_status",
+        "get_index_stats",
+        "get_cache_stats",
+    }
+)
+
+
+class ProjectMindMCP(FastMCP):
+    """FastMCP server that marks tool calls (except STATUS_TOOLS) as interactive work in flight."""
+
+    async def call_tool(
+        self, name: str, arguments: dict[str, Any]
+    ) -> Sequence[Any] | dict[str, Any]:
+        if name in STATUS_TOOLS:
+            return await super().call_tool(name, arguments)
+        # Background indexing and maintenance back off while a call runs
+        with interactive_call():
+            return await super().call_tool(name, arguments)
+
+
+mcp = ProjectMindMCP("ProjectMind")
 
 
 def _check_model_loaded() -> str | None:
@@ -187,6 +227,7 @@ def set_project_root(path: str) -> str:
     _startup_done = False
     ensure_startup()
     log(f"Project root changed to: {config.PROJECT_ROOT}")
+    _restart_watcher_for_root()
 
     msg = f"Project root set to: {config.PROJECT_ROOT}"
     if is_mcp_server_dir(target):
@@ -198,6 +239,32 @@ def set_project_root(path: str) -> str:
     return msg
 
 
+def _restart_watcher_for_root() -> None:
+    """Moves a running file watcher to the current project root."""
+    watcher = get_watcher()
+    if watcher is not None and watcher.running and watcher.root != config.PROJECT_ROOT:
+        try:
+            start_watcher(on_batch=_index_watched_batch, backend=watcher.backend_name)
+        except Exception as e:
+            log(f"File watcher could not follow the new root: {e}")
+
+
+def _index_watched_batch(batch: ChangeBatch) -> None:
+    """Watcher callback: re-indexes a batch of changed files if an index exists."""
+    if _check_index_ready() is not None:
+        return
+    ctx = get_context()
+    if ctx.vector_store.get_collection() is None:
+        return
+    if batch.full_rescan:
+        result = ctx.indexer.index_changed(
+            config.PROJECT_ROOT, get_ignored_dirs(), load_index_ignore_patterns()
+        )
+    else:
+        result = ctx.indexer.index_paths(batch.paths, load_index_ignore_patterns())
+    log(f"Watch batch ({len(batch.paths)} paths): {result}")
+
+
 def _count_index_chunks() -> int | None:
     """Returns chunk count or None if vector store is missing/unreadable."""
     import sqlite3
@@ -397,22 +464,17 @@ def _memory_index_markdown() -> str:
     return "\n".join(out)
 
 
-def load_index_ignore_patterns() -> set[str]:
+def load_index_ignore_patterns() -> list[str]:
+    """Returns the active .indexignore patterns in file order (order matters for "!" rules)."""
     ignore_file = resolve_index_ignore_file()
     if not ignore_file.exists():
-        return set()
+        return []
 
     try:
-        patterns = set()
-        with open(ignore_file, encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    patterns.add(line)
-        return patterns
+        return read_ignore_file(ignore_file)
     except Exception as e:
         log(f"Error reading .indexignore at {ignore_file}: {e}")
-        return set()
+        return []
 
 
 def _read_memory_sections() -> dict[str, str]:
@@ -561,13 +623,10 @@ def get_project_overview() -> str:
 
         file_types: dict[str, int] = {}
         total_files = 0
-        for _root_path, dir_names, files in os.walk(root):
-            dir_names[:] = [d for d in dir_names if not is_dir_ignored(d)]
-            for file in files:
-                total_files += 1
-                ext = Path(file).suffix.lower()
-                if ext in config.INDEXABLE_EXTENSIONS:
-                    file_types[ext] = file_types.get(ext, 0) + 1
+        for item in get_file_catalog(root).files():
+            total_files += 1
+            if item.suffix in config.INDEXABLE_EXTENSIONS:
+                file_types[item.suffix] = file_types.get(item.suffix, 0) + 1
 
         overview.append(f"\n## File Stats (total: {total_files})")
         for ext, count in sorted(file_types.items(), key=lambda x: x[1], reverse=True)[:10]:
@@ -729,6 +788,44 @@ def explore_directory(path: str = ".", depth: int = 1, max_items: int = 100) ->
     return "\n".join(lines)
 
 
+def _python_outline(lines: list[str]) -> tuple[list[str], list[str], list[str]]:
+    """Line-based outline of a Python file: (imports, classes, functions)."""
+    imports = []
+    classes = []
+    functions = []
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith(("import ", "from ")):
+            imports.append(stripped)
+        elif stripped.startswith("class ") and ":" in stripped:
+            classes.append(stripped.split("(")[0].split(":")[0].replace("class ", "").strip())
+        elif stripped.startswith("def ") and ":" in stripped:
+            functions.append(stripped.split("(")[0].replace("def ", "").strip())
+    return imports, classes, functions
+
+
+def _js_outline(lines: list[str]) -> tuple[list[str], list[str], list[str]]:
+    """Line-based outline of a JS/TS file: (imports, exports, functions)."""
+    imports = []
+    exports = []
+    functions = []
+    for line in lines:
+        stripped = line.strip()
+        if (
+            stripped.startswith("import ")
+            or stripped.startswith("const ")
+            and "require(" in stripped
+        ):
+            imports.append(stripped[:100])
+        elif stripped.startswith("export "):
+            exports.append(stripped[:100])
+        elif "function " in stripped and (
+            "function " == stripped[:9] or "async function" in stripped
+        ):
+            functions.append(stripped[:80])
+    return imports, exports, functions
+
+
 @mcp.tool()
 def get_file_summary(path: str, max_lines: int = 50) -> str:
     """
@@ -758,6 +855,7 @@ def get_file_summary(path: str, max_lines: int = 50) -> str:
         return f"File not found: {path}"
     if not target.is_file():
         return f"Not a file: {path}"
+    note_access([target])
 
     try:
         stat = target.stat()
@@ -798,17 +896,9 @@ def get_file_summary(path: str, max_lines: int = 50) -> str:
 
     ext = target.suffix.lower()
     if ext == ".py":
-        imports = []
-        classes = []
-        functions = []
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith(("import ", "from ")):
-                imports.append(stripped)
-            elif stripped.startswith("class ") and ":" in stripped:
-                classes.append(stripped.split("(")[0].split(":")[0].replace("class ", "").strip())
-            elif stripped.startswith("def ") and ":" in stripped:
-                functions.append(stripped.split("(")[0].replace("def ", "").strip())
+        imports, classes, functions = get_parse_cache().derive(
+            target, content, "python", "outline", lambda: _python_outline(lines)
+        )
 
         if imports:
             result.append(f"\n**Imports** ({len(imports)}):")
@@ -826,23 +916,9 @@ def get_file_summary(path: str, max_lines: int = 50) -> str:
                 result.append(f"  - ... ({len(functions) - 20} more)")
 
     elif ext in (".js", ".ts", ".jsx", ".tsx"):
-        imports = []
-        exports = []
-        functions = []
-        for line in lines:
-            stripped = line.strip()
-            if (
-                stripped.startswith("import ")
-                or stripped.startswith("const ")
-                and "require(" in stripped
-            ):
-                imports.append(stripped[:100])
-            elif stripped.startswith("export "):
-                exports.append(stripped[:100])
-            elif "function " in stripped and (
-                "function " == stripped[:9] or "async function" in stripped
-            ):
-                functions.append(stripped[:80])
+        imports, exports, _ = get_parse_cache().derive(
+            target, content, "javascript", "outline", lambda: _js_outline(lines)
+        )
 
         if imports:
             result.append(f"\n**Imports** ({len(imports)}):")
@@ -923,6 +999,7 @@ def get_file_relations(path: str) -> str:
         return f"File not found: {path}"
     if not target.is_file():
         return f"Not a file: {path}"
+    note_access([target])
 
     try:
         from code_intelligence import get_file_relations as _get_relations
@@ -995,6 +1072,7 @@ def analyze_change_impact(path: str) -> str:
         return f"File not found: {path}"
     if not target.is_file():
         return f"Not a file: {path}"
+    note_access([target])
 
     try:
         from code_intelligence import analyze_change_impact as _analyze_impact
@@ -1800,21 +1878,82 @@ def delete_memory_section(section_name: str) -> str:
     return mm.delete_section(section_name)
 
 
+def _run_index_job(job: IndexJob) -> str:
+    """Job runner for the background indexing worker."""
+    from code_intelligence import invalidate_import_graph_cache
+
+    if job.root != str(config.PROJECT_ROOT):
+        raise RuntimeError(f"Project root changed to {config.PROJECT_ROOT} before the job ran")
+    ctx = get_context()
+    if ctx.vector_store.get_collection() is None:
+        raise RuntimeError("Failed to initialize vector store.")
+
+    ignored_dirs = get_ignored_dirs()
+    ignore_patterns = load_index_ignore_patterns()
+    if job.kind == "full":
+        result = ctx.indexer.index_all(
+            config.PROJECT_ROOT, ignored_dirs, ignore_patterns, job.force, progress=job.update
+        )
+    else:
+        job.update("indexing", None)
+        result = ctx.indexer.index_changed(config.PROJECT_ROOT, ignored_dirs, ignore_patterns)
+    invalidate_import_graph_cache()
+    if result.startswith("Error"):
+        job.errors.append(result)
+    return result
+
+
+def _submit_index_job(kind: str, force: bool = False) -> str:
+    job, created = get_job_queue(_run_index_job).submit(kind, str(config.PROJECT_ROOT), force)
+    if created:
+        return (
+            f"Started background indexing job {job.job_id}. "
+            f"Check progress with index_job_status('{job.job_id}')."
+        )
+    return (
+        f"Indexing job {job.job_id} is already {job.phase}; the request was merged into it. "
+        f"Check progress with index_job_status('{job.job_id}')."
+    )
+
+
+def _active_job_notice() -> str | None:
+    """Message for a direct indexing call made while a background job owns the index."""
+    job = get_job_queue(_run_index_job).active_job(str(config.PROJECT_ROOT))
+    if job is None:
+        return None
+    return (
+        f"Background indexing job {job.job_id} is {job.phase}; wait for it to finish "
+        f"(index_job_status('{job.job_id}')) or call with background=True to queue after it."
+    )
+
+
 @mcp.tool()
-def index_codebase(force: bool = False) -> str:
+def index_codebase(force: bool = False, background: bool = False) -> str:
     """
     Indexes the entire codebase for semantic search.
 
-    Limited to 5000 files per operation. For large codebases use index_changed_files() instead.
+    Each call works for at most PROJECTMIND_INDEX_TIME_SLICE seconds (45 by
+    default) and checkpoints its progress; on large codebases call it again
+    until it reports completion. An interrupted run resumes the same way.
+    With background=True the whole run happens on the indexing worker and the
+    call returns a job id right away; searches keep using the current index
+    until it finishes.
 
     Args:
-        force: If True, clears existing index before indexing
+        force: If True, rebuilds the index (discarding any unfinished run)
+        background: Run as a background job and return its id (see index_job_status)
 
     Returns:
-        Status message with indexing stats
+        Status message with indexing stats, progress, or the background job id
     """
     from code_intelligence import invalidate_import_graph_cache
 
+    if background:
+        return _submit_index_job("full", force)
+    notice = _active_job_notice()
+    if notice:
+        return notice
+
     ctx = get_context()
     if ctx.vector_store.get_collection() is None:
         return "Failed to initialize vector store."
@@ -1832,7 +1971,9 @@ def index_codebase(force: bool = False) -> str:
     ignored_dirs = get_ignored_dirs()
     ignore_patterns = load_index_ignore_patterns()
 
-    result = ctx.indexer.index_all(root_dir, ignored_dirs, ignore_patterns, force)
+    result = ctx.indexer.index_all(
+        root_dir, ignored_dirs, ignore_patterns, force, time_budget=get_index_time_slice()
+    )
     invalidate_import_graph_cache()
     return warning + result
 
@@ -1871,6 +2012,7 @@ def search_codebase(query: str, n_results: int = 5) -> str:
         for meta in results.get("metadatas", [[]])[0]:
             if "source" in meta:
                 files.add(meta["source"])
+        note_access(files)
 
         # Check index coverage
         total_count = ctx.vector_store.get_count()
@@ -2020,13 +2162,11 @@ def generate_project_summary() -> str:
         py_files = 0
         js_files = 0
 
-        for _root_path, dirs, files in os.walk(root):
-            dirs[:] = [d for d in dirs if not is_dir_ignored(d)]
-            for file in files:
-                if file.endswith(".py"):
-                    py_files += 1
-                elif file.endswith((".js", ".ts")):
-                    js_files += 1
+        for item in get_file_catalog(root).files():
+            if item.rel.endswith(".py"):
+                py_files += 1
+            elif item.rel.endswith((".js", ".ts")):
+                js_files += 1
 
         summary_parts.append("\n## Codebase Stats")
         summary_parts.append(f"- Python files: {py_files}")
@@ -2124,17 +2264,13 @@ def analyze_project_structure() -> str:
         structure = []
         structure.append("# PROJECT STRUCTURE\n")
 
-        dirs_by_depth = {}
-        for item in root.iterdir():
-            if item.is_dir() and not is_dir_ignored(item.name):
-                try:
-                    count = 0
-                    for _r, _d, _f in os.walk(item):
-                        _d[:] = [d for d in _d if not is_dir_ignored(d)]
-                        count += len(_f)
-                    dirs_by_depth[item.name] = count
-                except (PermissionError, OSError):
-                    continue
+        catalog = get_file_catalog(root)
+        catalog_files = catalog.files()
+        dirs_by_depth: dict[str, int] = {}
+        for item in catalog_files:
+            if "/" in item.rel:
+                top = item.rel.split("/", 1)[0]
+                dirs_by_depth[top] = dirs_by_depth.get(top, 0) + 1
 
         sorted_dirs = sorted(dirs_by_depth.items(), key=lambda x: x[1], reverse=True)[:10]
 
@@ -2143,24 +2279,21 @@ def analyze_project_structure() -> str:
             structure.append(f"- `{dir_name}/` ({count} items)")
 
         file_types: dict[str, int] = {}
-        for _root_path, dirs, files in os.walk(root):
-            dirs[:] = [d for d in dirs if not is_dir_ignored(d)]
-
-            for file in files:
-                ext = Path(file).suffix
-                if ext in [
-                    ".py",
-                    ".js",
-                    ".ts",
-                    ".jsx",
-                    ".tsx",
-                    ".go",
-                    ".rs",
-                    ".java",
-                    ".c",
-                    ".cpp",
-                ]:
-                    file_types[ext] = file_types.get(ext, 0) + 1
+        for item in catalog_files:
+            ext = Path(item.rel).suffix
+            if ext in [
+                ".py",
+                ".js",
+                ".ts",
+                ".jsx",
+                ".tsx",
+                ".go",
+                ".rs",
+                ".java",
+                ".c",
+                ".cpp",
+            ]:
+                file_types[ext] = file_types.get(ext, 0) + 1
 
         if file_types:
             structure.append("\n## File Types")
@@ -2228,17 +2361,28 @@ def get_recent_changes_summary(days: int = 7) -> str:
 
 
 @mcp.tool()
-def index_changed_files() -> str:
+def index_changed_files(background: bool = False) -> str:
     """
     Incrementally indexes only changed files since last indexing.
 
     Faster than index_codebase — only processes files modified since last run.
+    In a git repository the changed files come from git (HEAD diff plus working
+    tree status) instead of a scan of every file's mtime.
+
+    Args:
+        background: Run as a background job and return its id (see index_job_status)
 
     Returns:
-        Status message with indexing stats
+        Status message with indexing stats, or the background job id
     """
     from code_intelligence import invalidate_import_graph_cache
 
+    if background:
+        return _submit_index_job("changed")
+    notice = _active_job_notice()
+    if notice:
+        return notice
+
     ctx = get_context()
     if ctx.vector_store.get_collection() is None:
         return "Failed to initialize vector store."
@@ -2252,6 +2396,147 @@ def index_changed_files() -> str:
     return result
 
 
+@mcp.tool()
+def index_job_status(job_id: str = "") -> str:
+    """
+    Reports background indexing jobs: phase, files and chunks done, throughput,
+    ETA and errors.
+
+    Args:
+        job_id: Job to report; empty lists recent jobs, newest first
+
+    Returns:
+        Job status
+    """
+    queue = get_job_queue(_run_index_job)
+    if job_id:
+        job = queue.get(job_id.strip())
+        if job is None:
+            return f"No indexing job '{job_id}'."
+        return format_job(job)
+    jobs = queue.jobs()
+    if not jobs:
+        return "No indexing jobs have been submitted."
+    return "\n\n".join(format_job(job) for job in jobs[:10])
+
+
+@mcp.tool()
+def estimate_index_cost(sample_files: int = 150, load_model: bool = False, depth: int = 1) -> str:
+    """
+    Predicts the cost of a full index without running it: chunk count, time,
+    disk footprint and peak memory, extrapolated from splitting (and, with the
+    model loaded, embedding) a sample of files. Ranks directories by cost, so
+    heavy ones can go into `.ai/.indexignore` first.
+
+    Args:
+        sample_files: Files to read and split for the estimate (10-2000)
+        load_model: Load the embedding model to measure real embedding speed
+            (slow on first use); otherwise the loaded model is used if any,
+            else a typical CPU throughput is assumed
+        depth: Directory depth of the cost ranking (1 = top-level directories)
+
+    Returns:
+        Cost estimate
+    """
+    from index_estimator import estimate_index_cost as estimate
+
+    ctx = get_context()
+    vs = ctx.vector_store
+    # get_collection() loads the model
+    if load_model and not vs.is_loaded() and vs.get_collection() is None:
+        return "Failed to initialize vector store."
+    root_dir = config.PROJECT_ROOT
+    indexable = set(
+        ctx.indexer.scan_indexable_files(root_dir, get_ignored_dirs(), load_index_ignore_patterns())
+    )
+    entries = [e for e in get_file_catalog(root_dir).files() if e.path in indexable]
+    if not entries:
+        return "No indexable files found."
+    loaded = vs.is_loaded()
+    result = estimate(
+        entries,
+        sample_files=max(10, min(sample_files, 2000)),
+        embed_fn=vs.embed if loaded else None,
+        model_loaded=loaded,
+        depth=max(1, depth),
+    )
+    return result.format()
+
+
+@mcp.tool()
+def list_auto_excluded() -> str:
+    """
+    Lists files detected as generated (header markers, protobuf stubs,
+    lockfiles, snapshots, encoded data), minified (long lines) or vendored
+    (third_party/, Pods/, ...), which indexing skips or defers, and estimates
+    the chunks and embedding time they would cost.
+
+    Returns:
+        Excluded files by kind, with the reason for each example
+    """
+    report = ExclusionReport(get_auto_exclude_mode())
+    if report.mode == "off":
+        return "Automatic exclusion is off (PROJECTMIND_AUTO_EXCLUDE=off)."
+    ctx = get_context()
+    ctx.indexer.scan_indexable_files(
+        config.PROJECT_ROOT, get_ignored_dirs(), load_index_ignore_patterns(), exclusions=report
+    )
+    return report.format()
+
+
+@mcp.tool()
+def index_telemetry(last_n: int = 3, kind: str = "") -> str:
+    """
+    Shows per-stage timings of recent indexing runs (scan, read, split, embed,
+    upsert, BM25, ...), their rates and slowest files, and compares the latest
+    run with the previous run of the same kind.
+
+    Args:
+        last_n: Number of runs to show, newest first (1-20)
+        kind: Only runs of this kind: "full", "changed" or "paths" (empty: all)
+
+    Returns:
+        Telemetry report
+    """
+    runs = load_runs()
+    if kind:
+        runs = [run for run in runs if run.get("kind") == kind.strip()]
+    if not runs:
+        return "No indexing runs recorded yet."
+    shown = list(reversed(runs[-max(1, min(last_n, 20)) :]))
+    lines = [f"# INDEXING TELEMETRY ({len(shown)} of {len(runs)} runs)"]
+    for run in shown:
+        lines.append("")
+        lines.extend(format_run(run))
+    latest = runs[-1]
+    previous = [run for run in runs[:-1] if run.get("kind") == latest.get("kind")]
+    if previous:
+        lines.append("")
+        lines.extend(compare_runs(latest, previous[-1]))
+    return "\n".join(lines)
+
+
+@mcp.tool()
+def install_git_hooks() -> str:
+    """
+    Installs post-checkout / post-merge / post-rewrite git hooks that record
+    changed paths, so `index_changed_files` stays git-driven even after history
+    rewrites. Existing hooks are kept and extended.
+
+    Returns:
+        Installed hook files
+    """
+    from git_changes import install_hooks
+
+    try:
+        written = install_hooks()
+    except GitError as e:
+        return f"Error: {e}"
+    if not written:
+        return "Git hooks already installed."
+    return "Installed git hooks:\n" + "\n".join(f"- {path}" for path in written)
+
+
 def should_include_search_result(
     source: str,
     relevance: float,
@@ -2423,11 +2708,7 @@ def analyze_code_complexity(target_path: str = ".", mode: str = "quick") -> str:
 
         supported_exts = set(_LANGUAGE_MAP.keys())
         all_files = [
-            f
-            for f in target.rglob("*")
-            if f.is_file()
-            and f.suffix.lower() in supported_exts
-            and not any(is_dir_ignored(p) for p in f.relative_to(target).parts[:-1])
+            item.path for item in get_file_catalog().files(target) if item.suffix in supported_exts
         ]
 
         if not all_files:
@@ -2508,11 +2789,8 @@ def analyze_code_quality(target_path: str = ".", max_files: int = 10, mode: str
         if not target.exists():
             return f"Path not found: {target_path}"
 
-        py_files = list(target.rglob("*.py"))
         py_files = [
-            f
-            for f in py_files
-            if not any(is_dir_ignored(p) for p in f.relative_to(target).parts[:-1])
+            item.path for item in get_file_catalog().files(target) if item.rel.endswith(".py")
         ]
 
         if not py_files:
@@ -2662,7 +2940,21 @@ def get_cache_stats() -> str:
     result += f"- **Hit Rate**: {query_stats['hit_rate']}\n"
     result += f"- **Size**: {query_stats['size']}/{query_stats['max_size']}\n"
     result += f"- **Expirations**: {query_stats['expirations']}\n"
-    result += f"- **TTL**: {query_stats['ttl_seconds']}s\n"
+    result += f"- **TTL**: {query_stats['ttl_seconds']}s\n\n"
+
+    parse_stats = get_parse_cache().get_stats()
+    result += "## Parse Cache (trees and derived artifacts)\n"
+    result += f"- **Hits**: {parse_stats['hits']}\n"
+    result += f"- **Misses**: {parse_stats['misses']}\n"
+    result += f"- **Hit Rate**: {parse_stats['hit_rate']}\n"
+    result += f"- **Size**: {parse_stats['size']}/{parse_stats['capacity']}\n"
+    result += f"- **Parses**: {parse_stats['parses']}\n"
+    result += f"- **Derived Hit Rate**: {parse_stats['derive_hit_rate']}\n"
+    if parse_stats["spill_enabled"]:
+        result += (
+            f"- **Spilled**: {parse_stats['spill_writes']} written, "
+            f"{parse_stats['spill_loads']} revived\n"
+        )
 
     return result
 
@@ -2773,6 +3065,40 @@ def maintenance_status() -> str:
                 f"- `{t['task']}` — last {age}s ago, next in {t['next_in_s']}s "
                 f"(interval {t['interval_s']}s)"
             )
+        w = s.get("watcher")
+        if w:
+            lines.append("\n## Watcher")
+            lines.append(
+                f"- {w['backend']} on {w['watched_dirs']} directories, " f"running: {w['running']}"
+            )
+            lines.append(
+                f"- queue depth {w['queue_depth']}, oldest pending {w['oldest_pending_s']}s"
+                + (" (full re-check pending)" if w["full_rescan_pending"] else "")
+            )
+            lines.append(
+                f"- {w['batches']} batches from {w['events']} events "
+                f"({w['dropped']} ignored, {w['full_rescans']} full re-checks, "
+                f"{w['errors']} errors); last batch {w['last_batch_size']} paths, "
+                f"lag {w['last_batch_lag_ms']} ms (max {w['max_batch_lag_ms']} ms)"
+            )
+        r = s.get("resource_policy")
+        if r:
+            quota = r["cgroup_cpu_limit"]
+            lines.append("\n## Resource Policy")
+            lines.append(
+                f"- low-impact: {r['low_impact']}, {r['effective_cpus']} effective CPUs "
+                f"of {r['host_cpus']}" + (f" (cgroup quota {quota:g})" if quota is not None else "")
+            )
+            lines.append(
+                f"- background budget {r['background_budget']} threads, "
+                f"torch threads {r['torch_threads'] if r['torch_threads'] else 'not set'}"
+            )
+            for role, applied in r["threads"].items():
+                lines.append(f"- `{role}`: CPU {applied['cpu']}, IO {applied['io']}")
+            lines.append(
+                f"- throttle: {r['in_flight']} calls in flight, {r['interactive_calls']} total; "
+                f"yielded {r['throttled_waits']} times ({r['throttled_s']}s)"
+            )
         if s["recent_history"]:
             lines.append("\n## Recent")
             for h in s["recent_history"][:10]:
@@ -2783,6 +3109,35 @@ def maintenance_status() -> str:
         return f"Error: {e}"
 
 
+@mcp.tool()
+def watch_changes(enable: bool = True, backend: str = "auto") -> str:
+    """
+    Starts or stops watch mode: file changes are batched and applied to the
+    file catalog, manifest, import graph and (if built) the vector index.
+
+    Args:
+        enable: Start (True) or stop (False) watching
+        backend: "auto" (inotify, else polling), "inotify" or "polling"
+
+    Returns:
+        Watcher status
+    """
+    if not enable:
+        stop_watcher()
+        return "Watch mode stopped."
+    try:
+        started = start_watcher(on_batch=_index_watched_batch, backend=backend)
+    except Exception as e:
+        return f"Error: could not start watch mode: {e}"
+    watcher = get_watcher()
+    stats = watcher.get_stats() if watcher is not None else {}
+    state = "started" if started else "already running"
+    return (
+        f"Watch mode {state} for {stats.get('root')} "
+        f"({stats.get('backend')}, {stats.get('watched_dirs')} directories)."
+    )
+
+
 @mcp.tool()
 def maintenance_run() -> str:
     """Synchronously run every self-healing task once. Returns a per-task report."""
@@ -2833,7 +3188,7 @@ def _ensure_default_indexignore() -> None:
     try:
         config.AI_DIR.mkdir(parents=True, exist_ok=True)
         target.write_text(
-            "# ProjectMind index-ignore patterns (substring match on full path).\n"
+            "# ProjectMind index-ignore patterns (.gitignore syntax, root-relative).\n"
             "# Edit freely; one pattern per line.\n"
             "node_modules\n"
             ".next\n"
@@ -2868,4 +3223,9 @@ if __name__ == "__main__":
         start_daemon()
     except Exception as e:
         log(f"Maintenance daemon could not be started: {e}")
+    if config.get_watch_mode() != "off":
+        try:
+            start_watcher(on_batch=_index_watched_batch)
+        except Exception as e:
+            log(f"File watcher could not be started: {e}")
     mcp.run()
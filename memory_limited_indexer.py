@@ -1,4 +1,9 @@
+import importlib
+import os
 import sys
+import threading
+import time
+from collections import deque
 from collections.abc import Callable
 from typing import Any
 
@@ -6,25 +11,65 @@ from logger import get_logger
 
 logger = get_logger()
 
+# Adaptive batch target, as fractions of the per-batch budget
+INITIAL_TARGET_FRACTION = 0.5
+MIN_TARGET_FRACTION = 1 / 16
+GROW_FACTOR = 1.25
+SHRINK_FACTOR = 0.5
+# A batch whose throughput falls below this share of the running average
+# gets a smaller successor (bigger batches stopped paying off)
+THROUGHPUT_DROP_RATIO = 0.75
+# Weight of the newest batch in the running throughput average
+THROUGHPUT_EMA_WEIGHT = 0.3
+# Per-batch records kept for get_stats()
+BATCH_HISTORY = 20
+
+
+def current_rss_bytes() -> int | None:
+    """Current (not peak) resident set size of this process, or None if unknown."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        psutil = importlib.import_module("psutil")
+        return int(psutil.Process(os.getpid()).memory_info().rss)
+    except Exception:
+        return None
+
 
 class MemoryLimitedIndexer:
     """
     Manages document indexing with memory limits.
-    Automatically flushes batches when memory threshold is reached.
+
+    Chunks are buffered until the batch reaches an adaptive byte target, then
+    flushed. With `overlap` the flush of one batch runs on a helper thread while
+    the next batch accumulates; at most one flush is in flight, so two batches
+    share `max_memory_bytes`.
+
+    The target adapts after every flush from what the batch actually cost:
+    it shrinks when the RSS growth over the batch (which includes embedding
+    tensors and Chroma's own buffers, invisible to the size estimate) exceeds
+    the budget, or when embedding throughput drops; otherwise it grows toward
+    the budget.
     """
 
     def __init__(
         self,
         max_memory_bytes: int,
         batch_callback: Callable[[list[str], list[dict], list[str]], None],
+        overlap: bool = True,
     ):
         """
         Args:
             max_memory_bytes: Maximum memory to use for buffering documents
             batch_callback: Function to call when flushing batch (documents, metadatas, ids)
+            overlap: Flush full batches in the background while the next one fills
         """
         self.max_memory_bytes = max_memory_bytes
         self.batch_callback = batch_callback
+        self.overlap = overlap
         self.documents: list[str] = []
         self.metadatas: list[dict] = []
         self.ids: list[str] = []
@@ -32,6 +77,19 @@ class MemoryLimitedIndexer:
         self.total_chunks = 0
         self.total_batches = 0
 
+        self.batch_budget = max_memory_bytes // 2 if overlap else max_memory_bytes
+        self.min_target = max(1, int(self.batch_budget * MIN_TARGET_FRACTION))
+        self.target_bytes = max(self.min_target, int(self.batch_budget * INITIAL_TARGET_FRACTION))
+        self.bytes_flushed = 0
+        self.flush_wait_seconds = 0.0
+        self.throughput_avg: float | None = None
+        self.batches: deque[dict[str, Any]] = deque(maxlen=BATCH_HISTORY)
+
+        self._lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+        self._flush_error: BaseException | None = None
+        self._rss_at_batch_start = current_rss_bytes()
+
     def _estimate_size(self, obj: Any) -> int:
         """
         Estimates memory size of an object in bytes.
@@ -48,12 +106,15 @@ class MemoryLimitedIndexer:
 
     def add_chunk(self, document: str, metadata: dict[str, Any], doc_id: str) -> None:
         """
-        Adds a chunk to the buffer. Flushes if memory limit exceeded.
+        Adds a chunk to the buffer. Flushes if the batch target is exceeded.
 
         Args:
             document: Document text
             metadata: Document metadata
             doc_id: Unique document ID
+
+        Raises:
+            Exception: The error of an earlier background flush
         """
         chunk_size = (
             self._estimate_size(document)
@@ -61,8 +122,8 @@ class MemoryLimitedIndexer:
             + self._estimate_size(doc_id)
         )
 
-        if self.current_memory + chunk_size > self.max_memory_bytes and self.documents:
-            self.flush()
+        if self.current_memory + chunk_size > self.target_bytes and self.documents:
+            self._start_flush(wait=not self.overlap)
 
         self.documents.append(document)
         self.metadatas.append(metadata)
@@ -72,41 +133,147 @@ class MemoryLimitedIndexer:
 
     def flush(self) -> None:
         """
-        Flushes current batch to the callback.
+        Flushes the current batch and waits for every flush in flight.
         Clears buffers and resets memory counter.
+
+        Raises:
+            Exception: The error raised by the callback for any pending batch
         """
-        if not self.documents:
+        self._start_flush(wait=True)
+
+    def _wait_for_flusher(self) -> None:
+        """Blocks until the background flush (if any) is done; re-raises its error."""
+        if self._flusher is not None:
+            started = time.perf_counter()
+            self._flusher.join()
+            self.flush_wait_seconds += time.perf_counter() - started
+            self._flusher = None
+        if self._flush_error is not None:
+            error, self._flush_error = self._flush_error, None
+            raise error
+
+    def _start_flush(self, wait: bool) -> None:
+        try:
+            self._wait_for_flusher()
+        except Exception:
+            # The failed batch is gone; drop the one that was meant to follow it too
+            self._take_batch()
+            raise
+        batch = self._take_batch()
+        if batch is None:
             return
+        if wait:
+            self._run_batch(*batch)
+            return
+        self._flusher = threading.Thread(
+            target=self._run_batch, args=batch, name="index-flush", daemon=True
+        )
+        self._flusher.start()
 
+    def _take_batch(self) -> tuple[list[str], list[dict], list[str], int, int | None] | None:
+        """Hands the buffered batch over and starts an empty one."""
+        if not self.documents:
+            return None
+        batch = (self.documents, self.metadatas, self.ids, self.current_memory)
+        rss_start = self._rss_at_batch_start
+        self.documents, self.metadatas, self.ids = [], [], []
+        self.current_memory = 0
+        self._rss_at_batch_start = current_rss_bytes()
+        return (*batch, rss_start)
+
+    def _run_batch(
+        self,
+        documents: list[str],
+        metadatas: list[dict],
+        ids: list[str],
+        estimated_bytes: int,
+        rss_start: int | None,
+    ) -> None:
         logger.debug(
             f"Flushing batch {self.total_batches + 1}: "
-            f"{len(self.documents)} chunks, "
-            f"{self.current_memory / 1024 / 1024:.2f} MB"
+            f"{len(documents)} chunks, "
+            f"{estimated_bytes / 1024 / 1024:.2f} MB"
         )
-
+        started = time.perf_counter()
         try:
-            self.batch_callback(self.documents, self.metadatas, self.ids)
-            self.total_batches += 1
+            self.batch_callback(documents, metadatas, ids)
         except Exception as e:
             logger.error(f"Error flushing batch: {e}", exc_info=True)
-            raise
-        finally:
-            self.documents.clear()
-            self.metadatas.clear()
-            self.ids.clear()
-            self.current_memory = 0
+            if threading.current_thread() is not self._flusher:
+                raise
+            self._flush_error = e
+            return
+        latency = time.perf_counter() - started
+        # Spans this batch's accumulation and flush (and, when overlapping, the
+        # start of the next batch): an upper bound on what the batch really cost
+        rss_end = current_rss_bytes()
+        rss_delta = rss_end - rss_start if rss_end is not None and rss_start is not None else None
+        with self._lock:
+            self.total_batches += 1
+            self.bytes_flushed += estimated_bytes
+            self._adapt(len(documents), latency, rss_delta)
+            self.batches.append(
+                {
+                    "chunks": len(documents),
+                    "bytes": estimated_bytes,
+                    "rss_delta_bytes": rss_delta,
+                    "latency_s": round(latency, 4),
+                    "target_bytes": self.target_bytes,
+                }
+            )
+
+    def _adapt(self, chunks: int, latency: float, rss_delta: int | None) -> None:
+        """Sets the next batch target from the cost of the batch just flushed."""
+        throughput = chunks / latency if latency > 0 else None
+        previous = self.throughput_avg
+        if throughput is not None:
+            self.throughput_avg = (
+                throughput
+                if previous is None
+                else (1 - THROUGHPUT_EMA_WEIGHT) * previous + THROUGHPUT_EMA_WEIGHT * throughput
+            )
+
+        pressure = rss_delta is not None and rss_delta > self.batch_budget
+        slowing = (
+            throughput is not None
+            and previous is not None
+            and throughput < previous * THROUGHPUT_DROP_RATIO
+        )
+        if pressure:
+            target = self.target_bytes * SHRINK_FACTOR
+        elif slowing:
+            target = self.target_bytes * (1 + SHRINK_FACTOR) / 2
+        else:
+            target = self.target_bytes * GROW_FACTOR
+        self.target_bytes = int(min(self.batch_budget, max(self.min_target, target)))
 
     def get_stats(self) -> dict[str, Any]:
         """
         Returns indexing statistics.
 
         Returns:
-            Dictionary with total_chunks, total_batches, current_buffer_size
+            Dictionary with total_chunks, total_batches, current buffer size,
+            the adaptive batch target and per-batch latency and bytes
         """
-        return {
-            "total_chunks": self.total_chunks,
-            "total_batches": self.total_batches,
-            "current_buffer_chunks": len(self.documents),
-            "current_buffer_bytes": self.current_memory,
-            "max_memory_bytes": self.max_memory_bytes,
-        }
+        with self._lock:
+            batches = list(self.batches)
+            latencies = [b["latency_s"] for b in batches]
+            return {
+                "total_chunks": self.total_chunks,
+                "total_batches": self.total_batches,
+                "current_buffer_chunks": len(self.documents),
+                "current_buffer_bytes": self.current_memory,
+                "max_memory_bytes": self.max_memory_bytes,
+                "target_batch_bytes": self.target_bytes,
+                "bytes_flushed": self.bytes_flushed,
+                "flush_in_flight": self._flusher is not None and self._flusher.is_alive(),
+                "flush_wait_seconds": round(self.flush_wait_seconds, 3),
+                "chunks_per_second": (
+                    round(self.throughput_avg, 1) if self.throughput_avg is not None else None
+                ),
+                "avg_batch_latency_s": (
+                    round(sum(latencies) / len(latencies), 4) if latencies else None
+                ),
+                "max_batch_latency_s": max(latencies) if latencies else None,
+                "recent_batches": batches,
+            }
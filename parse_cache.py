@@ -0,0 +1,257 @@
+"""
+Shared parse-artifact cache.
+
+Every consumer that looks at a file's structure (the AST splitter during
+indexing, tree-sitter complexity analysis, the import graph, file summaries)
+goes through this cache instead of parsing from scratch. Entries are keyed by
+(path, content hash, language), so an edit to the file naturally misses and
+stale artifacts are never served.
+
+Each entry holds the tree-sitter tree (parsed lazily) plus named derived
+artifacts such as "symbols", "imports", "function_spans" or "complexity",
+computed on first request via `derive()` and reused afterwards.
+
+The in-memory LRU is bounded. When `PROJECTMIND_PARSE_CACHE_SPILL=1`, derived
+artifacts of evicted entries are pickled under `.ai/parse_cache/` and revived
+on the next miss (trees themselves are never spilled; they are re-parsed on
+demand).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, TypeVar
+
+import config
+from cache_manager import LRUCache
+from logger import get_logger
+from parser_pool import get_parser_pool
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+PARSE_CACHE_CAPACITY = 256
+SPILL_DIRNAME = "parse_cache"
+SPILL_MAX_FILES = 5000
+SPILL_PRUNE_EVERY = 256
+
+
+def content_hash(data: bytes | str) -> str:
+    """Fast 128-bit content digest used as part of the cache key."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def is_spill_enabled() -> bool:
+    return os.getenv("PROJECTMIND_PARSE_CACHE_SPILL", "").strip().lower() in ("1", "true", "yes")
+
+
+@dataclass
+class ParseArtifacts:
+    path: str
+    content_hash: str
+    language: str
+    tree: Any = None
+    derived: dict[str, Any] = field(default_factory=dict)
+
+
+class ParseCache:
+    """
+    Bounded LRU of parse artifacts with optional on-disk spill of derived data.
+    """
+
+    def __init__(self, capacity: int = PARSE_CACHE_CAPACITY, spill: bool | None = None):
+        """
+        Args:
+            capacity: Maximum number of files kept in memory
+            spill: Persist derived artifacts of evicted entries (defaults to env setting)
+        """
+        self.spill = is_spill_enabled() if spill is None else spill
+        self._lru = LRUCache(capacity, on_evict=self._on_evict)
+        self._lock = Lock()
+        self.parses = 0
+        self.derive_hits = 0
+        self.derive_misses = 0
+        self.spill_writes = 0
+        self.spill_loads = 0
+
+    @staticmethod
+    def _key(path: str | Path, digest: str, language: str) -> str:
+        return f"{language}\x00{digest}\x00{path}"
+
+    @staticmethod
+    def _spill_path(key: str) -> Path:
+        name = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return config.AI_DIR / SPILL_DIRNAME / f"{name}.pkl"
+
+    def get(self, path: str | Path, content: bytes | str, language: str) -> ParseArtifacts:
+        """
+        Returns the cache entry for this exact file content, creating it if needed.
+
+        Args:
+            path: File path (part of the key)
+            content: Current file content (hashed, never stored)
+            language: Language name (tree-sitter language or a file-type label)
+        """
+        digest = content_hash(content)
+        key = self._key(path, digest, language)
+        entry = self._lru.get(key)
+        if entry is not None:
+            return entry  # type: ignore[no-any-return]
+
+        with self._lock:
+            entry = self._lru.cache.get(key)
+            if entry is None:
+                entry = ParseArtifacts(path=str(path), content_hash=digest, language=language)
+                if self.spill:
+                    entry.derived = self._load_spilled(key)
+                self._lru.put(key, entry)
+        return entry
+
+    def tree(
+        self, path: str | Path, content: bytes | str, language: str, parser: Any = None
+    ) -> Any:
+        """
+        Returns the tree-sitter tree for this content, parsing at most once.
+
+        Args:
+            path: File path
+            content: File content (str is encoded as UTF-8)
+            language: tree-sitter language name
+            parser: Parser to use; checked out from the parser pool when omitted
+
+        Returns:
+            Tree, or None if no parser is available for the language
+        """
+        entry = self.get(path, content, language)
+        if entry.tree is not None:
+            return entry.tree
+
+        source = content.encode("utf-8") if isinstance(content, str) else content
+        if parser is None:
+            with get_parser_pool().checkout(language) as pooled:
+                if pooled is None:
+                    return None
+                entry.tree = pooled.parse(source)
+        else:
+            entry.tree = parser.parse(source)
+        self.parses += 1
+        return entry.tree
+
+    def put_tree(self, path: str | Path, content: bytes | str, language: str, tree: Any) -> None:
+        """Registers a tree produced elsewhere (e.g. by an incremental reparse)."""
+        self.get(path, content, language).tree = tree
+
+    def derive(
+        self,
+        path: str | Path,
+        content: bytes | str,
+        language: str,
+        name: str,
+        compute: Callable[[], T],
+    ) -> T:
+        """
+        Returns a named derived artifact, computing it once per content version.
+
+        Args:
+            path: File path
+            content: File content
+            language: Language name
+            name: Artifact name ("symbols", "imports", "complexity", ...)
+            compute: Zero-argument function producing the artifact
+
+        Returns:
+            The cached or freshly computed artifact
+        """
+        entry = self.get(path, content, language)
+        if name in entry.derived:
+            self.derive_hits += 1
+            return entry.derived[name]  # type: ignore[no-any-return]
+        self.derive_misses += 1
+        value = compute()
+        entry.derived[name] = value
+        return value
+
+    def _on_evict(self, key: str, entry: ParseArtifacts) -> None:
+        if not self.spill or not entry.derived:
+            return
+        target = self._spill_path(key)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(entry.derived, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, target)
+            self.spill_writes += 1
+            if self.spill_writes % SPILL_PRUNE_EVERY == 0:
+                self._prune_spill(target.parent)
+        except Exception as e:
+            logger.debug(f"Parse cache spill failed for {entry.path}: {e}")
+
+    def _load_spilled(self, key: str) -> dict[str, Any]:
+        target = self._spill_path(key)
+        if not target.exists():
+            return {}
+        try:
+            with open(target, "rb") as f:
+                derived = pickle.load(f)
+            self.spill_loads += 1
+            return derived if isinstance(derived, dict) else {}
+        except Exception as e:
+            logger.debug(f"Parse cache spill unreadable ({target.name}): {e}")
+            return {}
+
+    @staticmethod
+    def _prune_spill(spill_dir: Path) -> None:
+        """Keeps the spill directory bounded by dropping the oldest files."""
+        try:
+            files = sorted(spill_dir.glob("*.pkl"), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return
+        for stale in files[: max(0, len(files) - SPILL_MAX_FILES)]:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Returns parse cache statistics."""
+        stats = self._lru.get_stats()
+        total = self.derive_hits + self.derive_misses
+        stats.update(
+            {
+                "parses": self.parses,
+                "derive_hits": self.derive_hits,
+                "derive_misses": self.derive_misses,
+                "derive_hit_rate": (f"{self.derive_hits / total * 100:.2f}%" if total else "0.00%"),
+                "spill_enabled": self.spill,
+                "spill_writes": self.spill_writes,
+                "spill_loads": self.spill_loads,
+            }
+        )
+        return stats
+
+
+_parse_cache: ParseCache | None = None
+_parse_cache_lock = Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """Returns the process-wide parse cache, creating it on first use."""
+    global _parse_cache
+    if _parse_cache is None:
+        with _parse_cache_lock:
+            if _parse_cache is None:
+                _parse_cache = ParseCache()
+    return _parse_cache
@@ -0,0 +1,191 @@
+"""
+Thread-safe pool of tree-sitter parsers.
+
+A tree-sitter `Parser` must not be used by two threads at once, so parsers are
+checked out per use instead of being shared. Each language gets at most
+`max_per_language` parser instances, created lazily on demand; a thread that
+finds them all checked out waits for one to be returned. Grammar load
+failures are cached per language so a missing grammar is reported once.
+
+    with get_parser_pool().checkout("python") as parser:
+        if parser is not None:
+            tree = parser.parse(source)
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from logger import get_logger
+from resource_policy import pool_size
+
+logger = get_logger()
+
+DEFAULT_POOL_SIZE = pool_size()
+
+
+def get_pool_size() -> int:
+    """Parsers kept per language (PROJECTMIND_PARSER_POOL_SIZE, default min(8, effective CPUs))."""
+    try:
+        return max(1, int(os.getenv("PROJECTMIND_PARSER_POOL_SIZE", DEFAULT_POOL_SIZE)))
+    except ValueError:
+        return DEFAULT_POOL_SIZE
+
+
+# Language name -> (grammar package, function returning the language pointer)
+GRAMMARS: dict[str, tuple[str, str]] = {
+    "python": ("tree_sitter_python", "language"),
+    "javascript": ("tree_sitter_javascript", "language"),
+    "typescript": ("tree_sitter_typescript", "language_typescript"),
+    "tsx": ("tree_sitter_typescript", "language_tsx"),
+    "java": ("tree_sitter_java", "language"),
+    "go": ("tree_sitter_go", "language"),
+    "rust": ("tree_sitter_rust", "language"),
+    "ruby": ("tree_sitter_ruby", "language"),
+}
+
+
+def load_language(language: str) -> Any | None:
+    """
+    Loads the tree-sitter grammar for a language.
+
+    Returns:
+        tree_sitter.Language, or None for unsupported languages
+
+    Raises:
+        Exception: If the grammar package is missing or incompatible
+    """
+    if language not in GRAMMARS:
+        return None
+    from tree_sitter import Language
+
+    module_name, attr = GRAMMARS[language]
+    module = importlib.import_module(module_name)
+    return Language(getattr(module, attr)())
+
+
+class ParserPool:
+    """
+    Bounded, lazily populated parser instances per language.
+    """
+
+    def __init__(self, max_per_language: int | None = None):
+        """
+        Args:
+            max_per_language: Upper bound on parser instances per language
+        """
+        self.max_per_language = max_per_language or get_pool_size()
+        self._languages: dict[str, Any] = {}
+        self._idle: dict[str, list[Any]] = {}
+        self._created: dict[str, int] = {}
+        self._cond = threading.Condition()
+        self.waits = 0
+
+    def language(self, language: str) -> Any | None:
+        """Returns the loaded grammar, or None if unavailable (failures are cached)."""
+        with self._cond:
+            if language in self._languages:
+                return self._languages[language]
+            try:
+                lang = load_language(language)
+            except Exception as e:
+                logger.warning(f"Could not load tree-sitter parser for {language}: {e}")
+                lang = None
+            self._languages[language] = lang
+            return lang
+
+    def new_parser(self, language: str) -> Any | None:
+        """Creates a parser outside the pool (caller owns it exclusively)."""
+        lang = self.language(language)
+        if lang is None:
+            return None
+        from tree_sitter import Parser
+
+        return Parser(lang)
+
+    def acquire(self, language: str) -> Any | None:
+        """
+        Checks out a parser, creating one if under the bound or waiting otherwise.
+
+        Returns:
+            Parser for exclusive use until release(), or None if the language is unavailable
+        """
+        if self.language(language) is None:
+            return None
+        with self._cond:
+            while True:
+                idle = self._idle.setdefault(language, [])
+                if idle:
+                    return idle.pop()
+                if self._created.get(language, 0) < self.max_per_language:
+                    self._created[language] = self._created.get(language, 0) + 1
+                    break
+                self.waits += 1
+                self._cond.wait()
+        try:
+            return self.new_parser(language)
+        except Exception:
+            with self._cond:
+                self._created[language] -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, language: str, parser: Any) -> None:
+        """Returns a checked-out parser to the pool."""
+        if parser is None:
+            return
+        with self._cond:
+            self._idle.setdefault(language, []).append(parser)
+            self._cond.notify()
+
+    @contextmanager
+    def checkout(self, language: str) -> Iterator[Any | None]:
+        """Context manager around acquire()/release(); yields None if unavailable."""
+        parser = self.acquire(language)
+        try:
+            yield parser
+        finally:
+            self.release(language, parser)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Returns pool statistics."""
+        with self._cond:
+            return {
+                "max_per_language": self.max_per_language,
+                "created": dict(self._created),
+                "idle": {lang: len(p) for lang, p in self._idle.items()},
+                "unavailable": sorted(k for k, v in self._languages.items() if v is None),
+                "waits": self.waits,
+            }
+
+
+_pool: ParserPool | None = None
+_pool_lock = threading.Lock()
+_thread_parsers = threading.local()
+
+
+def get_parser_pool() -> ParserPool:
+    """Returns the process-wide parser pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ParserPool()
+    return _pool
+
+
+def thread_parser(language: str) -> Any | None:
+    """
+    Returns a parser owned by the calling thread, for code that needs a parser
+    object without a checkout scope (e.g. compiling queries against its language).
+    """
+    parsers: dict[str, Any] = getattr(_thread_parsers, "parsers", None) or {}
+    _thread_parsers.parsers = parsers
+    if language not in parsers:
+        parsers[language] = get_parser_pool().new_parser(language)
+    return parsers[language]
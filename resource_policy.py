@@ -0,0 +1,378 @@
+"""
+Resource policy for background indexing and maintenance.
+
+Background work used to compete with interactive tool calls at full strength:
+worker pools were sized from `os.cpu_count()` (the host's CPUs, not the
+container's quota), torch spread every embedding batch over all of them, and
+the indexer kept going while a search waited. The policy here keeps that work
+low-impact:
+
+  - CPU sizing: `effective_cpu_count()` honours cgroup v2 `cpu.max`, cgroup v1
+    `cpu.cfs_quota_us` / `cpu.cfs_period_us` and the scheduler affinity mask,
+    and background pools and torch intra-op threads share one budget
+  - priority: threads that run background work call `enter_background()`,
+    which lowers their nice value and, on Linux, their I/O priority to the
+    lowest best-effort level (threads they start inherit both)
+  - adaptive throttle: tool calls are tracked by `interactive_call()`;
+    background loops call `throttle()` between units of work and back off
+    while a call is in flight and for a short quiet period after it, up to a
+    total per run (`throttle_run()`)
+
+Everything is best-effort: a platform without setpriority or ioprio_set keeps
+running at normal priority and reports so in `maintenance_status`.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import math
+import os
+import platform
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import config
+from logger import get_logger
+
+logger = get_logger()
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+PROC_SELF_CGROUP = Path("/proc/self/cgroup")
+# Upper bound on any worker pool, whatever the CPU count
+MAX_POOL_WORKERS = 8
+
+# Seconds after the last tool call before background work runs at full speed
+INTERACTIVE_QUIET_SECONDS = 1.0
+# Back-off sleeps double from the first to the last value while calls continue
+THROTTLE_MIN_SLEEP = 0.05
+THROTTLE_MAX_SLEEP = 0.5
+# One throttle() call never waits longer than this, so a steady stream of tool
+# calls slows background work down instead of stopping it
+THROTTLE_MAX_WAIT = 5.0
+# Total waits allowed per background run (see throttle_run); past it the run
+# stops yielding, so a client that keeps calling tools cannot stall a job
+THROTTLE_RUN_MAX_WAIT = 60.0
+
+# ioprio_set(2): syscall numbers per machine, "who" and class encoding
+_IOPRIO_SET_SYSCALL = {
+    "x86_64": 251,
+    "amd64": 251,
+    "aarch64": 30,
+    "arm64": 30,
+    "i386": 289,
+    "i686": 289,
+}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_BEST_EFFORT = 2
+_IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_LOWEST_LEVEL = 7
+
+
+def _read_text(path: Path) -> str | None:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_memberships(proc_cgroup: Path) -> list[tuple[set[str], str]]:
+    """(controllers, cgroup path) per line of /proc/self/cgroup."""
+    text = _read_text(proc_cgroup)
+    if not text:
+        return []
+    memberships = []
+    for line in text.splitlines():
+        parts = line.split(":", 2)
+        if len(parts) == 3:
+            memberships.append((set(filter(None, parts[1].split(","))), parts[2]))
+    return memberships
+
+
+def _candidate_dirs(mount: Path, cgroup_path: str) -> list[Path]:
+    """The process's cgroup directory and its ancestors up to the mount point."""
+    dirs = []
+    current = mount / cgroup_path.strip("/") if cgroup_path.strip("/") else mount
+    while True:
+        dirs.append(current)
+        if current == mount:
+            return dirs
+        current = current.parent
+
+
+def _quota_v2(directory: Path) -> float | None:
+    text = _read_text(directory / "cpu.max")
+    if not text:
+        return None
+    quota, _, period = text.partition(" ")
+    if quota == "max" or not period:
+        return None
+    try:
+        return int(quota) / int(period)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _quota_v1(directory: Path) -> float | None:
+    quota = _read_text(directory / "cpu.cfs_quota_us")
+    period = _read_text(directory / "cpu.cfs_period_us")
+    try:
+        if quota is None or period is None or int(quota) <= 0:
+            return None
+        return int(quota) / int(period)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def cgroup_cpu_limit(
+    root: Path = CGROUP_ROOT, proc_cgroup: Path = PROC_SELF_CGROUP
+) -> float | None:
+    """
+    CPU quota of this process's cgroup, in CPUs (None when unlimited or unknown).
+
+    Args:
+        root: cgroup filesystem mount point
+        proc_cgroup: cgroup membership file of the process
+
+    Returns:
+        The tightest quota on the cgroup or its ancestors, e.g. 1.5
+    """
+    limits: list[float] = []
+    for controllers, cgroup_path in _cgroup_memberships(proc_cgroup):
+        if not controllers:
+            # cgroup v2: a single unified hierarchy at the root
+            mount, reader = root, _quota_v2
+        elif "cpu" in controllers:
+            mounts = [p for p in root.glob("cpu*") if "cpu" in p.name.split(",")]
+            if not mounts:
+                continue
+            mount, reader = mounts[0], _quota_v1
+        else:
+            continue
+        # Inside a cgroup namespace the path may not exist below the mount
+        for directory in _candidate_dirs(mount, cgroup_path):
+            limit = reader(directory)
+            if limit is not None:
+                limits.append(limit)
+    return min(limits) if limits else None
+
+
+@lru_cache(maxsize=1)
+def effective_cpu_count() -> int:
+    """CPUs this process may actually use: affinity mask capped by the cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_limit()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def background_cpu_budget() -> int:
+    """
+    Threads background work may keep busy at once: half the effective CPUs in
+    low-impact mode (at least one), all of them otherwise, unless
+    PROJECTMIND_BACKGROUND_THREADS sets it.
+    """
+    override = config.get_background_threads()
+    if override:
+        return override
+    cpus = effective_cpu_count()
+    return max(1, cpus // 2) if config.get_low_impact_indexing() else cpus
+
+
+def pool_size(background: bool = False) -> int:
+    """Worker pool size: the background budget, or the effective CPUs, capped."""
+    cpus = background_cpu_budget() if background else effective_cpu_count()
+    return min(MAX_POOL_WORKERS, cpus)
+
+
+def limit_torch_threads() -> int | None:
+    """
+    Caps torch intra-op threads at the background budget. Called before the
+    embedding model loads; returns the thread count set, or None without torch.
+    """
+    try:
+        import torch
+    except ImportError:
+        return None
+    threads = background_cpu_budget()
+    try:
+        torch.set_num_threads(threads)
+    except Exception as e:
+        logger.debug(f"Could not limit torch threads: {e}")
+        return None
+    with _lock:
+        _policy.torch_threads = threads
+    return threads
+
+
+def _set_nice(tid: int, level: int) -> str:
+    if not hasattr(os, "setpriority"):
+        return "unsupported"
+    try:
+        current = os.getpriority(os.PRIO_PROCESS, tid)
+        target = min(19, max(current, level))
+        if target != current:
+            os.setpriority(os.PRIO_PROCESS, tid, target)
+        return f"nice {target}"
+    except OSError as e:
+        return f"failed ({e.strerror})"
+
+
+def _set_idle_io(tid: int) -> str:
+    number = _IOPRIO_SET_SYSCALL.get(platform.machine().lower())
+    if platform.system() != "Linux" or number is None:
+        return "unsupported"
+    ioprio = (_IOPRIO_CLASS_BEST_EFFORT << _IOPRIO_CLASS_SHIFT) | _IOPRIO_LOWEST_LEVEL
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.syscall(number, _IOPRIO_WHO_PROCESS, tid, ioprio) != 0:
+            return f"failed ({os.strerror(ctypes.get_errno())})"
+    except (OSError, AttributeError) as e:
+        return f"failed ({e})"
+    return f"best-effort {_IOPRIO_LOWEST_LEVEL}"
+
+
+@dataclass
+class PolicyState:
+    # Role -> {"cpu": ..., "io": ...} outcome of enter_background()
+    threads: dict[str, dict[str, str]] = field(default_factory=dict)
+    torch_threads: int | None = None
+    in_flight: int = 0
+    last_call_end: float = 0.0
+    interactive_calls: int = 0
+    throttled_waits: int = 0
+    throttled_seconds: float = 0.0
+
+
+_lock = threading.Lock()
+_policy = PolicyState()
+_local = threading.local()
+
+
+def enter_background(role: str) -> dict[str, str]:
+    """
+    Marks the calling thread as background work: lowers its CPU and I/O
+    priority (in low-impact mode) and enables throttle() on it.
+
+    Args:
+        role: Name reported in the policy status, e.g. "index-worker"
+
+    Returns:
+        {"cpu": ..., "io": ...} describing what was applied
+    """
+    _local.role = role
+    if not config.get_low_impact_indexing():
+        applied = {"cpu": "normal", "io": "normal"}
+    else:
+        tid = threading.get_native_id()
+        applied = {"cpu": _set_nice(tid, config.get_background_nice()), "io": _set_idle_io(tid)}
+    with _lock:
+        _policy.threads[role] = applied
+    logger.debug(f"Background thread '{role}': {applied}")
+    return applied
+
+
+def is_background_thread() -> bool:
+    return getattr(_local, "role", None) is not None
+
+
+@contextmanager
+def interactive_call() -> Iterator[None]:
+    """Marks an interactive tool call in flight; background work yields to it."""
+    with _lock:
+        _policy.in_flight += 1
+        _policy.interactive_calls += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _policy.in_flight -= 1
+            _policy.last_call_end = time.monotonic()
+
+
+def interactive_busy() -> bool:
+    with _lock:
+        return (
+            _policy.in_flight > 0
+            or time.monotonic() - _policy.last_call_end < INTERACTIVE_QUIET_SECONDS
+        )
+
+
+@contextmanager
+def throttle_run() -> Iterator[None]:
+    """
+    Marks one background run (an indexing pass, a job) on the calling thread;
+    throttle() waits at most THROTTLE_RUN_MAX_WAIT in total within it.
+    """
+    previous = getattr(_local, "run_waited", None)
+    _local.run_waited = 0.0
+    try:
+        yield
+    finally:
+        _local.run_waited = previous
+
+
+def throttle() -> float:
+    """
+    Yields to interactive tool calls. Background loops call this between
+    units of work; it returns at once on foreground threads, outside
+    low-impact mode, when no call is in flight, or once the current
+    throttle_run() has used up its waiting budget.
+
+    Returns:
+        Seconds spent waiting
+    """
+    if not is_background_thread() or not config.get_low_impact_indexing():
+        return 0.0
+    run_waited = getattr(_local, "run_waited", None)
+    limit = THROTTLE_MAX_WAIT
+    if run_waited is not None:
+        limit = min(limit, THROTTLE_RUN_MAX_WAIT - run_waited)
+    waited = 0.0
+    delay = THROTTLE_MIN_SLEEP
+    while waited < limit and interactive_busy():
+        time.sleep(delay)
+        waited += delay
+        delay = min(delay * 2, THROTTLE_MAX_SLEEP)
+    if run_waited is not None:
+        _local.run_waited = run_waited + waited
+    if waited:
+        with _lock:
+            _policy.throttled_waits += 1
+            _policy.throttled_seconds += waited
+    return waited
+
+
+def get_resource_status() -> dict[str, Any]:
+    """Policy and throttle counters for maintenance_status."""
+    with _lock:
+        return {
+            "low_impact": config.get_low_impact_indexing(),
+            "effective_cpus": effective_cpu_count(),
+            "host_cpus": os.cpu_count() or 1,
+            "cgroup_cpu_limit": cgroup_cpu_limit(),
+            "background_budget": background_cpu_budget(),
+            "torch_threads": _policy.torch_threads,
+            "threads": {role: dict(applied) for role, applied in _policy.threads.items()},
+            "in_flight": _policy.in_flight,
+            "interactive_calls": _policy.interactive_calls,
+            "throttled_waits": _policy.throttled_waits,
+            "throttled_s": round(_policy.throttled_seconds, 1),
+        }
+
+
+def reset() -> None:
+    """Clears counters and per-thread records (tests)."""
+    global _policy
+    with _lock:
+        _policy = PolicyState()
+    _local.__dict__.clear()
@@ -0,0 +1,203 @@
+"""
+Streaming chunker for files too large to read whole.
+
+Files over MAX_FILE_SIZE_MB used to be skipped. `StreamingSplitter` memory-maps
+such a file and walks it in windows of at most WINDOW_BYTES. Each window ends
+at the best boundary found in its second half, searched in this order:
+
+  1. a top-level declaration: a line starting at column 0 after a blank line
+     (where `def`, `class`, `func`, `CREATE TABLE`, ... usually sit)
+  2. the end of a statement (`;` at the end of a line)
+  3. any blank line
+  4. any line end
+  5. the window end, moved back to a UTF-8 character boundary
+
+Only one window is decoded at a time. It goes through the regular
+`ASTSplitter`, so most windows still get one chunk per function or class.
+The window's tree is not kept for incremental reparsing. Chunk line numbers
+are shifted to file lines, and chunk indexes are adjusted so chunk ids stay
+unique within the file (see RENUMBERED_SYMBOL_TYPES).
+Pages behind the cursor are released with madvise. Peak memory is therefore
+one window plus its chunks, whatever the file size.
+
+    for chunk in StreamingSplitter(ASTSplitter()).chunks(path):
+        indexer.add_chunk(chunk["text"], chunk["metadata"], ...)
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ast_splitter import ASTSplitter
+from logger import get_logger
+
+logger = get_logger()
+
+WINDOW_BYTES = 256 * 1024
+# Boundaries are looked for in the part of the window after this fraction, so
+# windows stay large enough for the splitter to see whole definitions
+MIN_WINDOW_FRACTION = 0.5
+# Bytes before a hard cut scanned for the start of a UTF-8 character
+MAX_UTF8_BACKOFF = 3
+# Every window can yield chunks of these generic symbols ("module_level" code
+# and plain text); their chunk indexes continue across windows. Named symbols
+# can repeat too: a class larger than a window loses its name in later
+# windows, so its methods come out as bare functions. Their indexes are offset
+# by the window's byte offset, which no window's chunk count can reach; the
+# first window keeps the splitter's indexes, as in a file split whole. Either
+# way only a counter per generic type is kept, not one per symbol.
+RENUMBERED_SYMBOL_TYPES = frozenset({"module", "text"})
+
+_BOUNDARIES: tuple[re.Pattern[bytes], ...] = (
+    re.compile(rb"\n[ \t]*\r?\n(?=[^\s)\]}])"),
+    re.compile(rb";[ \t]*\r?\n"),
+    re.compile(rb"\n[ \t]*\r?\n"),
+)
+
+
+@dataclass
+class Segment:
+    """A window of a streamed file, ending at a boundary."""
+
+    data: bytes
+    # Zero-based line of the window's first byte, and its byte offset
+    first_line: int
+    offset: int
+
+
+def _last_boundary(buffer: Any, start: int, end: int) -> int | None:
+    for pattern in _BOUNDARIES:
+        last = None
+        for match in pattern.finditer(buffer, start, end):
+            last = match.end()
+        if last is not None:
+            return last
+    newline = buffer.rfind(b"\n", start, end)
+    return newline + 1 if newline >= 0 else None
+
+
+def _cut(buffer: Any, start: int, end: int) -> int:
+    """End offset of the window that starts at `start` and may reach `end`."""
+    search_from = start + int((end - start) * MIN_WINDOW_FRACTION)
+    boundary = _last_boundary(buffer, search_from, end)
+    if boundary is not None:
+        return boundary
+    # One very long line: cut at a character boundary
+    cut = end
+    while cut > end - MAX_UTF8_BACKOFF and buffer[cut] & 0xC0 == 0x80:
+        cut -= 1
+    return cut
+
+
+def iter_segments(file_path: Path, window_bytes: int = WINDOW_BYTES) -> Iterator[Segment]:
+    """
+    Yields consecutive windows of a file, read through a memory map.
+
+    Args:
+        file_path: File to read
+        window_bytes: Maximum window size
+
+    Yields:
+        Segments that together cover the file exactly once
+    """
+    with open(file_path, "rb") as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            advise = getattr(buffer, "madvise", None)
+            if advise is not None and hasattr(mmap, "MADV_SEQUENTIAL"):
+                advise(mmap.MADV_SEQUENTIAL)
+            position = 0
+            line = 0
+            released = 0
+            while position < size:
+                end = min(position + window_bytes, size)
+                cut = _cut(buffer, position, end) if end < size else size
+                data = buffer[position:cut]
+                yield Segment(data, line, position)
+                line += data.count(b"\n")
+                position = cut
+                # Drop the pages already consumed from this process's mapping
+                page_end = position - position % mmap.PAGESIZE
+                if advise is not None and hasattr(mmap, "MADV_DONTNEED") and page_end > released:
+                    try:
+                        advise(mmap.MADV_DONTNEED, released, page_end - released)
+                    except OSError:
+                        advise = None
+                    released = page_end
+
+
+class StreamingSplitter:
+    """
+    Chunks a large file window by window with an ASTSplitter.
+    """
+
+    def __init__(self, splitter: ASTSplitter, window_bytes: int | None = None):
+        """
+        Args:
+            splitter: Splitter applied to each window
+            window_bytes: Maximum window size (default WINDOW_BYTES)
+        """
+        self.splitter = splitter
+        self.window_bytes = window_bytes or WINDOW_BYTES
+        self.windows = 0
+
+    def split_segment(
+        self, segment: Segment, file_path: Path, next_index: dict[str, int]
+    ) -> list[dict[str, Any]]:
+        """
+        Chunks one window, with file line numbers and chunk indexes that do not
+        repeat those of earlier windows.
+
+        Args:
+            segment: Window to split
+            file_path: File the window belongs to
+            next_index: Next free chunk index per renumbered symbol type,
+                shared by all windows of the file
+
+        Returns:
+            Chunks of the window
+        """
+        self.windows += 1
+        text = segment.data.decode("utf-8", errors="replace")
+        if not text.strip():
+            return []
+        chunks = self.splitter.split(text, file_path, retain=False)
+        last_line = segment.first_line + max(1, text.count("\n"))
+        for chunk in chunks:
+            meta = chunk["metadata"]
+            if meta["line_start"]:
+                meta["line_start"] += segment.first_line
+                meta["line_end"] += segment.first_line
+            else:
+                # Text chunks carry no lines; the window's range is the best we know
+                meta["line_start"] = segment.first_line + 1
+                meta["line_end"] = last_line
+            kind = meta["symbol_type"]
+            if kind in RENUMBERED_SYMBOL_TYPES:
+                index = max(meta["chunk_index"], next_index.get(kind, 0))
+                meta["chunk_index"] = index
+                next_index[kind] = index + 1
+            else:
+                meta["chunk_index"] += segment.offset
+        return chunks
+
+    def chunks(self, file_path: Path) -> Iterator[dict[str, Any]]:
+        """
+        Yields the chunks of a file, one window at a time.
+
+        Args:
+            file_path: File to chunk
+
+        Yields:
+            Chunks in file order
+        """
+        next_index: dict[str, int] = {}
+        for segment in iter_segments(file_path, self.window_bytes):
+            yield from self.split_segment(segment, file_path, next_index)
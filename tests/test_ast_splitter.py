@@ -0,0 +1,95 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ast_splitter import ASTSplitter, _compute_edit, _get_parser
+
+SOURCE = """import os
+
+
+def first():
+    return 1
+
+
+class Widget:
+    def render(self):
+        return "widget"
+
+
+def last():
+    return 3
+"""
+
+
+@unittest.skipIf(_get_parser("python") is None, "tree-sitter-python not installed")
+class TestIncrementalSplit(unittest.TestCase):
+    def test_edit_reparses_incrementally_and_reuses_clean_nodes(self):
+        path = Path("pkg/incremental_example.py")
+        splitter = ASTSplitter()
+        splitter.split(SOURCE, path)
+
+        edited = SOURCE.replace("return 1", "value = 1\n    return value")
+        chunks = splitter.split(edited, path)
+
+        stats = splitter.get_stats()
+        self.assertEqual(stats["incremental_parses"], 1)
+        self.assertEqual(stats["reused_nodes"], 2)
+        self.assertEqual(chunks, ASTSplitter().split(edited, path))
+
+    def test_reused_chunks_get_shifted_line_numbers(self):
+        path = Path("pkg/shift_example.py")
+        splitter = ASTSplitter()
+        splitter.split(SOURCE, path)
+
+        chunks = splitter.split("# header\n" + SOURCE, path)
+
+        last = next(c for c in chunks if c["metadata"]["symbol_name"] == "last")
+        self.assertEqual(last["metadata"]["line_start"], 14)
+        self.assertGreater(splitter.get_stats()["reused_nodes"], 0)
+
+    def test_identical_content_skips_parsing(self):
+        path = Path("pkg/same_example.py")
+        splitter = ASTSplitter()
+        first = splitter.split(SOURCE, path)
+        second = splitter.split(SOURCE, path)
+
+        self.assertEqual(first, second)
+        self.assertEqual(splitter.get_stats()["incremental_parses"], 0)
+
+
+class TestComputeEdit(unittest.TestCase):
+    def test_identical_sources(self):
+        self.assertIsNone(_compute_edit(b"abc", b"abc"))
+
+    def test_middle_replacement(self):
+        edit = _compute_edit(b"ab\ncd\nef", b"ab\nXYZ\nef")
+
+        self.assertEqual(edit["start_byte"], 3)
+        self.assertEqual(edit["old_end_byte"], 5)
+        self.assertEqual(edit["new_end_byte"], 6)
+        self.assertEqual(edit["start_point"], (1, 0))
+        self.assertEqual(edit["new_end_point"], (1, 3))
+
+    def test_edit_across_compare_blocks(self):
+        old = b"x = 1\n" * 5000
+        for offset in (0, 4095, 4096, 12289, len(old) - 1):
+            new = old[:offset] + b"#" + old[offset:]
+            with self.subTest(offset=offset):
+                edit = _compute_edit(old, new)
+                self.assertEqual(
+                    (edit["start_byte"], edit["old_end_byte"], edit["new_end_byte"]),
+                    (offset, offset, offset + 1),
+                )
+
+    def test_insertion_at_end_keeps_whole_prefix(self):
+        old = b"a" * 10000
+        edit = _compute_edit(old, old + b"b")
+
+        self.assertEqual((edit["start_byte"], edit["old_end_byte"]), (10000, 10000))
+
+
+if __name__ == "__main__":
+    unittest.main()
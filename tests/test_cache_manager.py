@@ -80,6 +80,16 @@ class TestLRUCache(unittest.TestCase):
         self.assertIsNone(cache.get("key1"))
         self.assertEqual(cache.get_stats()["size"], 0)
 
+    def test_lru_cache_on_evict_callback(self):
+        """Test that evicted entries are handed to the eviction callback"""
+        evicted = []
+        cache = LRUCache(capacity=1, on_evict=lambda k, v: evicted.append((k, v)))
+
+        cache.put("key1", "value1")
+        cache.put("key2", "value2")
+
+        self.assertEqual(evicted, [("key1", "value1")])
+
 
 class TestTTLCache(unittest.TestCase):
     def test_ttl_cache_basic_operations(self):
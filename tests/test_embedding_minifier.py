@@ -0,0 +1,185 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_minifier import EmbeddingMinifier, MinifyStats, approx_token_count
+
+LICENSED_PY = '''# Copyright (c) 2024 Example Corp.
+# Licensed under the Apache License, Version 2.0
+#
+def add(a, b):
+    """Adds two numbers."""
+
+
+    # ==========================
+    return a    +    b  # inline stays
+'''
+
+FILE_START = {"source": "a.py", "symbol_type": "module", "chunk_index": 0, "line_start": 1}
+
+
+class TestEmbeddingMinifier(unittest.TestCase):
+    def test_off_mode_returns_text_unchanged(self) -> None:
+        minifier = EmbeddingMinifier("off")
+
+        self.assertFalse(minifier.enabled)
+        self.assertEqual(minifier.minify(LICENSED_PY, "a.py"), LICENSED_PY)
+
+    def test_basic_drops_license_blank_lines_and_banners(self) -> None:
+        result = EmbeddingMinifier("basic").minify(LICENSED_PY, "pkg/a.py")
+
+        self.assertNotIn("Copyright", result)
+        self.assertNotIn("=====", result)
+        self.assertNotIn("\n\n", result)
+        self.assertIn("return a + b # inline stays", result)
+        self.assertIn('"""Adds two numbers."""', result)
+
+    def test_basic_keeps_non_license_header(self) -> None:
+        text = "# Helpers for parsing dates\nimport datetime\n"
+
+        result = EmbeddingMinifier("basic").minify(text, "dates.py")
+
+        self.assertIn("Helpers for parsing dates", result)
+
+    def test_aggressive_strips_comments_and_docstrings(self) -> None:
+        text = 'def f():\n    """Doc."""\n    # note\n    return 1\n'
+
+        result = EmbeddingMinifier("aggressive").minify(text, "f.py")
+
+        self.assertEqual(result, "def f():\nreturn 1")
+
+    def test_aggressive_keeps_code_between_string_constant_and_docstring(self) -> None:
+        text = (
+            'SQL = """\nselect 1\n"""\ndef important_function(x):\n    """Doc."""\n    return x\n'
+        )
+
+        result = EmbeddingMinifier("aggressive").minify(text, "queries.py")
+
+        self.assertEqual(result, 'SQL = """\nselect 1\n"""\ndef important_function(x):\nreturn x')
+
+    def test_aggressive_strips_docstrings_in_fragments_that_do_not_tokenize(self) -> None:
+        text = '    """Doc."""\n    return """unterminated\n'
+
+        result = EmbeddingMinifier("aggressive").minify(text, "f.py")
+
+        self.assertEqual(result, 'return """unterminated')
+
+    def test_aggressive_strips_block_comments_for_c_like(self) -> None:
+        text = "/**\n * JSDoc block\n */\nfunction f() {\n  // why\n  return 1;\n}\n"
+
+        result = EmbeddingMinifier("aggressive").minify(text, "f.js")
+
+        self.assertEqual(result, "function f() {\nreturn 1;\n}")
+
+    def test_markdown_headings_are_not_treated_as_comments(self) -> None:
+        text = "# Title\n\nSome   text\n"
+
+        result = EmbeddingMinifier("aggressive").minify(text, "README.md")
+
+        self.assertEqual(result, "# Title\nSome text")
+
+    def test_license_header_is_only_dropped_at_the_top_of_the_file(self) -> None:
+        minifier = EmbeddingMinifier("basic")
+        later = [
+            {**FILE_START, "chunk_index": 1},
+            {**FILE_START, "symbol_type": "function", "line_start": 40},
+            {**FILE_START, "symbol_type": "text", "line_start": 300},
+        ]
+
+        first, *rest = minifier.minify_batch([LICENSED_PY] * 4, [FILE_START, *later])
+
+        self.assertNotIn("Copyright", first)
+        for result in rest:
+            self.assertIn("Copyright", result)
+
+    def test_star_lines_are_comments_only_inside_a_block(self) -> None:
+        code = "void f(int *p) {\n  *p = 1;\n  /* note\n   * more */\n  return;\n}\n"
+
+        result = EmbeddingMinifier("aggressive").minify(code, "f.c")
+
+        self.assertEqual(result, "void f(int *p) {\n*p = 1;\nreturn;\n}")
+
+    def test_license_header_stops_at_code_starting_with_star(self) -> None:
+        text = "// Copyright 2024 Example\n*out = value;\n"
+
+        result = EmbeddingMinifier("basic").minify(text, "a.c")
+
+        self.assertEqual(result, "*out = value;")
+
+    def test_prose_keeps_rules_and_setext_headings(self) -> None:
+        text = "Title\n=======\n\nIntro\n\n------\n\nMore\n"
+
+        result = EmbeddingMinifier("basic").minify(text, "docs/guide.md")
+
+        self.assertEqual(result, "Title\n=======\nIntro\n------\nMore")
+
+    def test_falls_back_to_original_when_everything_is_stripped(self) -> None:
+        text = "# only a comment\n"
+
+        self.assertEqual(EmbeddingMinifier("aggressive").minify(text, "x.py"), text)
+
+    def test_minify_batch_accumulates_stats(self) -> None:
+        minifier = EmbeddingMinifier("basic")
+
+        out = minifier.minify_batch([LICENSED_PY], [FILE_START])
+
+        self.assertEqual(len(out), 1)
+        self.assertEqual(minifier.stats.chunks, 1)
+        self.assertGreater(minifier.stats.tokens_saved, 0)
+        self.assertLess(minifier.stats.encoded_tokens, minifier.stats.original_tokens)
+
+
+class TestMinifyStats(unittest.TestCase):
+    def test_estimated_time_saved_is_proportional(self) -> None:
+        stats = MinifyStats(chunks=1, original_tokens=150, encoded_tokens=100, embed_seconds=2.0)
+
+        self.assertEqual(stats.tokens_saved, 50)
+        self.assertAlmostEqual(stats.est_seconds_saved, 1.0)
+        self.assertIn("50 tokens saved", stats.summary())
+
+    def test_empty_stats(self) -> None:
+        stats = MinifyStats()
+
+        self.assertEqual(stats.saved_ratio, 0.0)
+        self.assertEqual(stats.est_seconds_saved, 0.0)
+
+    def test_approx_token_count(self) -> None:
+        self.assertEqual(approx_token_count("foo(bar, 1)"), 6)
+
+
+class TestIndexerUsesMinifiedEmbeddings(unittest.TestCase):
+    def test_batch_callback_embeds_minified_but_stores_original(self) -> None:
+        from codebase_indexer import CodebaseIndexer
+
+        store = MagicMock()
+        store.embed.return_value = [[0.1, 0.2]]
+        indexer = CodebaseIndexer(store)
+        indexer.minifier = EmbeddingMinifier("basic")
+
+        callback = indexer._create_batch_upsert_callback()
+        callback([LICENSED_PY], [FILE_START], ["id1"])
+
+        embedded = store.embed.call_args[0][0]
+        self.assertNotIn("Copyright", embedded[0])
+        kwargs = store.upsert.call_args.kwargs
+        self.assertEqual(kwargs["documents"], [LICENSED_PY])
+        self.assertEqual(kwargs["embeddings"], [[0.1, 0.2]])
+
+    def test_batch_callback_lets_store_embed_when_disabled(self) -> None:
+        from codebase_indexer import CodebaseIndexer
+
+        store = MagicMock()
+        indexer = CodebaseIndexer(store)
+        indexer.minifier = EmbeddingMinifier("off")
+
+        indexer._create_batch_upsert_callback()(["doc"], [{"source": "a.py"}], ["id1"])
+
+        store.embed.assert_not_called()
+        self.assertIsNone(store.upsert.call_args.kwargs["embeddings"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_catalog
+from file_catalog import FileCatalog, get_file_catalog
+
+
+class TestFileCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "README.md").write_text("# readme\n")
+        (self.root / "src").mkdir()
+        (self.root / "src" / "App.PY").write_text("x = 1\n")
+        (self.root / "src" / "util").mkdir()
+        (self.root / "src" / "util" / "helpers.py").write_text("y = 2\n")
+        (self.root / ".github").mkdir()
+        (self.root / ".github" / "ci.yml").write_text("on: push\n")
+        (self.root / "node_modules").mkdir()
+        (self.root / "node_modules" / "dep.js").write_text("z = 3\n")
+        self.catalog = FileCatalog(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _rels(self, **kwargs):
+        return sorted(e.rel for e in self.catalog.files(**kwargs))
+
+    def test_walk_prunes_ignored_dirs_and_keeps_stats(self):
+        entries = {e.rel: e for e in self.catalog.files()}
+
+        self.assertEqual(
+            sorted(entries), [".github/ci.yml", "README.md", "src/App.PY", "src/util/helpers.py"]
+        )
+        app = entries["src/App.PY"]
+        self.assertEqual(app.suffix, ".py")
+        self.assertEqual(app.size, 6)
+        self.assertEqual(app.path, self.root / "src" / "App.PY")
+
+    def test_scoped_and_hidden_listing(self):
+        self.assertEqual(self._rels(under="src"), ["src/App.PY", "src/util/helpers.py"])
+        self.assertEqual(self._rels(under=self.root / "src", recursive=False), ["src/App.PY"])
+        self.assertNotIn(".github/ci.yml", self._rels(skip_hidden=True))
+        self.assertEqual(self._rels(under="README.md"), [])
+
+    def test_reads_within_window_do_no_io(self):
+        self.catalog.files()
+        scans = self.catalog.dir_scans
+
+        with patch("os.stat") as stat:
+            self.catalog.files()
+        stat.assert_not_called()
+        self.assertEqual(self.catalog.dir_scans, scans)
+
+    def test_refresh_rescans_only_changed_directories(self):
+        self.catalog.files()
+        scans = self.catalog.dir_scans
+
+        (self.root / "src" / "util" / "new.py").write_text("n = 1\n")
+        (self.root / "src" / "pkg").mkdir()
+        (self.root / "src" / "pkg" / "mod.py").write_text("m = 1\n")
+        self.catalog.refresh()
+
+        self.assertIn("src/util/new.py", self._rels())
+        self.assertIn("src/pkg/mod.py", self._rels())
+        # src (new subdir) + src/util (new file) + the new src/pkg
+        self.assertEqual(self.catalog.dir_scans - scans, 3)
+
+    def test_removed_directory_is_dropped(self):
+        self.catalog.files()
+
+        (self.root / "src" / "util" / "helpers.py").unlink()
+        (self.root / "src" / "util").rmdir()
+        self.catalog.refresh()
+
+        self.assertEqual(self._rels(under="src"), ["src/App.PY"])
+        self.assertEqual(self.catalog.get_stats()["files"], 3)
+
+    def test_invalidate_picks_up_in_place_edit(self):
+        self.catalog.files()
+        target = self.root / "src" / "App.PY"
+        mtime = os.stat(self.root / "src").st_mtime_ns
+
+        target.write_text("x = 1000\n")
+        os.utime(self.root / "src", ns=(mtime, mtime))
+        self.catalog.refresh()
+        self.assertEqual(self._size("src/App.PY"), 6)
+
+        self.catalog.invalidate(target)
+        self.assertEqual(self._size("src/App.PY"), 9)
+
+    def test_deep_refresh_restats_files(self):
+        self.catalog.files()
+        (self.root / "README.md").write_text("# longer readme\n")
+
+        sizes = {e.rel: e.size for e in self.catalog.files(deep=True)}
+
+        self.assertEqual(sizes["README.md"], 16)
+
+    def test_cap_limits_catalog_size(self):
+        catalog = FileCatalog(self.root, max_files=2)
+
+        self.assertEqual(len(catalog.files()), 2)
+        self.assertTrue(catalog.capped)
+
+    def _size(self, rel):
+        return next(e.size for e in self.catalog.files() if e.rel == rel)
+
+
+class TestSharedCatalog(unittest.TestCase):
+    def test_one_catalog_per_root(self):
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            patch.object(file_catalog, "_catalogs", file_catalog.LRUCache(2)),
+        ):
+            root = Path(tmp)
+            with patch("config.PROJECT_ROOT", root):
+                self.assertIs(get_file_catalog(), get_file_catalog(root))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import base64
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_classifier
+from codebase_indexer import CodebaseIndexer
+from config import get_auto_exclude_mode
+from file_classifier import ExclusionReport, classify, classify_content, classify_path
+
+ORDINARY_CODE = "".join(
+    f"def handler_{i}(request, retries=3):\n"
+    f"    # Retry the upstream call a few times before giving up\n"
+    f"    return fetch(request.url, timeout={i % 7 + 1}, retries=retries)\n\n\n"
+    for i in range(60)
+).encode()
+
+
+class TestClassify(unittest.TestCase):
+    def test_path_rules(self):
+        self.assertEqual(classify_path("third_party/lib/x.c").kind, "vendored")
+        self.assertEqual(classify_path("api/service_pb2.py").kind, "generated")
+        self.assertEqual(classify_path("web/__snapshots__/app.test.js").kind, "generated")
+        self.assertEqual(classify_path("package-lock.json").reason, "lockfile")
+        self.assertEqual(classify_path("static/app.min.js").kind, "minified")
+        self.assertIsNone(classify_path("src/vendors.py"))
+
+    def test_header_marker_only_counts_in_comments(self):
+        stub = b"// Code generated by protoc-gen-go. DO NOT EDIT.\npackage api\n" + ORDINARY_CODE
+        prose = b'x = "auto-generated"\n' + ORDINARY_CODE
+
+        self.assertEqual(classify_content(stub, ".go").kind, "generated")
+        self.assertIsNone(classify_content(prose, ".py"))
+        self.assertIsNone(classify_content(ORDINARY_CODE, ".py"))
+
+    def test_weak_markers_are_not_generated(self):
+        for header in (
+            b"# Do not edit without updating docs/schema.md\n",
+            b"// Uses autogenerated ids from the sequence\n",
+            b"# Tokens are generated by the lexer below\n",
+        ):
+            with self.subTest(header=header):
+                self.assertIsNone(classify_content(header + ORDINARY_CODE, ".py"))
+        self.assertEqual(
+            classify_content(
+                b"# This file was automatically generated\n" + ORDINARY_CODE, ".py"
+            ).kind,
+            "generated",
+        )
+
+    def test_minified_and_encoded(self):
+        bundle = b"!function(e){" + b"var a=e.b||{};a.c=function(d){return d*2};" * 300 + b"}\n"
+        blob = base64.b64encode(random.Random(0).randbytes(6000))
+        wrapped = b"\n".join(blob[i : i + 76] for i in range(0, len(blob), 76))
+
+        self.assertEqual(classify_content(bundle, ".js").kind, "minified")
+        self.assertIsNone(classify_content(bundle, ".md"))
+        inserts = (
+            b"INSERT INTO t VALUES " + b", ".join(b"(%d, 'row')" % i for i in range(400)) + b";\n"
+        )
+        self.assertIsNone(classify_content(inserts * 3, ".sql"))
+        self.assertIn("encoded data", classify_content(wrapped, ".json").reason)
+
+    def test_this_module_is_not_generated(self):
+        path = Path(file_classifier.__file__)
+        st = path.stat()
+
+        self.assertIsNone(classify(path, "file_classifier.py", st.st_size, st.st_mtime_ns))
+
+
+class TestScanExclusion(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "app.py").write_bytes(ORDINARY_CODE)
+        (self.root / "bundle.js").write_text("var x=1;" * 500)
+        (self.root / "third_party").mkdir()
+        (self.root / "third_party" / "lib.py").write_bytes(ORDINARY_CODE)
+        file_classifier.clear_cache()
+        self.patches = [
+            patch("config.PROJECT_ROOT", self.root),
+            patch("codebase_indexer.is_dir_ignored", return_value=False),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _scan(self, mode):
+        report = ExclusionReport(mode)
+        files = CodebaseIndexer(MagicMock()).scan_indexable_files(
+            self.root, set(), [], exclusions=report
+        )
+        return {f.name for f in files}, report
+
+    def test_skip_reports_excluded_work(self):
+        names, report = self._scan("skip")
+
+        self.assertEqual(names, {"app.py"})
+        self.assertEqual(
+            {kind: c[0] for kind, c in report.by_kind.items()}, {"minified": 1, "vendored": 1}
+        )
+        self.assertGreater(report.chunks, 0)
+        self.assertIn("auto-excluded 2 files", report.summary())
+        self.assertIn("`third_party/lib.py` — under third_party/", report.format())
+
+    def test_defer_keeps_files_and_off_disables(self):
+        names, report = self._scan("defer")
+        self.assertEqual(names, {"app.py", "bundle.js", "lib.py"})
+        self.assertEqual({p.name for p in report.deferred}, {"bundle.js", "lib.py"})
+
+        names, report = self._scan("off")
+        self.assertEqual(len(names), 3)
+        self.assertEqual(report.files, 0)
+
+    def test_defer_is_the_default(self):
+        indexer = CodebaseIndexer(MagicMock())
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("PROJECTMIND_AUTO_EXCLUDE", None)
+            files = indexer.scan_indexable_files(self.root, set(), [])
+            report = ExclusionReport(get_auto_exclude_mode())
+
+        self.assertEqual(len(files), 3)
+        self.assertEqual(report.mode, "defer")
+
+    def test_scan_leaves_no_state_on_the_indexer(self):
+        indexer = CodebaseIndexer(MagicMock())
+        first, second = ExclusionReport("skip"), ExclusionReport("skip")
+
+        indexer.scan_indexable_files(self.root, set(), [], exclusions=first)
+        indexer.scan_indexable_files(self.root, set(), [], exclusions=second)
+
+        self.assertEqual((first.files, second.files), (2, 2))
+        self.assertFalse(hasattr(indexer, "last_exclusions"))
+
+    def test_report_without_files(self):
+        self.assertEqual(ExclusionReport("skip").summary(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_watcher
+from file_catalog import FileCatalog
+from file_watcher import FULL_RESCAN, ChangeBatch, FileWatcher, apply_batch
+
+
+class WatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name).resolve()
+        (self.root / "src").mkdir()
+        (self.root / "src" / "app.py").write_text("x = 1\n")
+        (self.root / "node_modules").mkdir()
+        (self.root / ".gitignore").write_text("*.log\n")
+        self.patches = [
+            patch("config.PROJECT_ROOT", self.root),
+            patch("config.AI_DIR", self.root / ".ai"),
+            patch("config.INDEX_IGNORE_FILE", self.root / ".ai" / ".indexignore"),
+            patch.object(file_watcher, "_watcher", None),
+        ]
+        for p in self.patches:
+            p.start()
+        self.batches: list[ChangeBatch] = []
+        self.batch_seen = threading.Event()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _collect(self, batch):
+        self.batches.append(batch)
+        self.batch_seen.set()
+
+    def _rels(self, batch):
+        return sorted(p.relative_to(self.root).as_posix() for p in batch.paths)
+
+
+class TestDebounceQueue(WatcherTestCase):
+    def test_burst_is_coalesced_and_ignored_paths_dropped(self):
+        watcher = FileWatcher(self.root, debounce=0.0)
+
+        watcher.record([("src/app.py", False), ("src/new.py", False)])
+        watcher.record([("src/app.py", False), ("node_modules/dep.js", False)])
+        watcher.record([("src/debug.log", False)])
+        stats = watcher.get_stats()
+        batch = watcher._take_batch()
+
+        self.assertEqual(stats["queue_depth"], 2)
+        self.assertEqual(stats["dropped"], 2)
+        self.assertEqual(self._rels(batch), ["src/app.py", "src/new.py"])
+        self.assertEqual(batch.events, 3)
+        self.assertEqual(watcher.get_stats()["queue_depth"], 0)
+
+    def test_batch_waits_for_quiet_period(self):
+        watcher = FileWatcher(self.root, debounce=0.2, max_delay=10.0)
+        watcher.record([("src/app.py", False)])
+        started = time.monotonic()
+
+        batch = watcher._take_batch()
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+        self.assertEqual(self._rels(batch), ["src/app.py"])
+
+    def test_overflow_collapses_into_full_rescan(self):
+        watcher = FileWatcher(self.root, debounce=0.0)
+
+        with patch.object(file_watcher, "MAX_PENDING_PATHS", 2):
+            watcher.record([(f"src/f{i}.py", False) for i in range(3)])
+        batch = watcher._take_batch()
+
+        self.assertTrue(batch.full_rescan)
+        self.assertEqual(batch.paths, [])
+
+    def test_dispatch_records_lag(self):
+        watcher = FileWatcher(self.root, on_batch=self._collect, debounce=0.0)
+        watcher.record([FULL_RESCAN])
+
+        watcher.dispatch(watcher._take_batch())
+
+        stats = watcher.get_stats()
+        self.assertEqual(stats["batches"], 1)
+        self.assertEqual(stats["full_rescans"], 1)
+        self.assertGreaterEqual(stats["last_batch_lag_ms"], 0)
+        self.assertEqual(len(self.batches), 1)
+
+
+class TestApplyBatch(WatcherTestCase):
+    def test_invalidates_catalog_manifest_and_import_graph(self):
+        catalog = FileCatalog(self.root)
+        catalog.files()
+        changed = self.root / "src" / "app.py"
+
+        with (
+            patch("manifest.mark_dirty") as mark_dirty,
+            patch("code_intelligence.invalidate_import_graph_cache") as invalidate_graph,
+            patch.object(catalog, "invalidate") as invalidate,
+        ):
+            apply_batch(ChangeBatch(paths=[changed]), catalog)
+
+        mark_dirty.assert_called_once_with(changed)
+        invalidate.assert_called_once_with(changed)
+        invalidate_graph.assert_called_once()
+
+    def test_docs_only_batch_keeps_import_graph(self):
+        with (
+            patch("manifest.mark_dirty"),
+            patch("code_intelligence.invalidate_import_graph_cache") as invalidate_graph,
+        ):
+            apply_batch(ChangeBatch(paths=[self.root / "README.md"]), FileCatalog(self.root))
+
+        invalidate_graph.assert_not_called()
+
+
+class TestBackends(WatcherTestCase):
+    def _run(self, backend):
+        watcher = FileWatcher(self.root, on_batch=self._collect, backend=backend, debounce=0.2)
+        with patch("file_watcher.apply_batch"):
+            watcher.start()
+            try:
+                (self.root / "src" / "app.py").write_text("x = 2\n")
+                (self.root / "pkg").mkdir()
+                (self.root / "pkg" / "mod.py").write_text("y = 1\n")
+                (self.root / "node_modules" / "dep.js").write_text("z = 1\n")
+                deadline = time.monotonic() + 10
+                seen: set[str] = set()
+                while time.monotonic() < deadline and not {"src/app.py", "pkg/mod.py"} <= seen:
+                    self.batch_seen.wait(0.5)
+                    self.batch_seen.clear()
+                    seen = {r for b in self.batches for r in self._rels(b)}
+                stats = watcher.get_stats()
+            finally:
+                watcher.stop()
+        self.assertEqual(stats["backend"], backend)
+        self.assertIn("src/app.py", seen)
+        self.assertIn("pkg/mod.py", seen)
+        self.assertFalse(any(r.startswith("node_modules") for r in seen))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+    def test_inotify_backend(self):
+        self._run("inotify")
+
+    def test_polling_backend(self):
+        with patch.object(file_watcher, "POLL_INTERVAL_SECONDS", 0.2):
+            self._run("polling")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import git_changes
+from codebase_indexer import CodebaseIndexer
+from git_changes import GitChanges, GitIndexState, capture_state, detect_changes, install_hooks
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class GitChangesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name).resolve()
+        self.git("init", "-q", "-b", "main")
+        (self.root / "a.py").write_text("a = 1\n")
+        (self.root / "b.py").write_text("b = 1\n")
+        (self.root / "logo.png").write_bytes(b"\x89PNG")
+        self.commit("initial")
+        self.patches = [
+            patch("config.PROJECT_ROOT", self.root),
+            patch("config.AI_DIR", self.root / ".ai"),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def git(self, *args):
+        return subprocess.run(
+            ["git", "-c", "user.name=t", "-c", "user.email=t@e", *args],
+            cwd=self.root,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    def commit(self, message):
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", message)
+
+    def record(self):
+        git_changes.save_state(capture_state(self.root))
+
+    def rels(self, changes):
+        return sorted(p.relative_to(self.root).as_posix() for p in changes.paths)
+
+
+class TestDetectChanges(GitChangesTestCase):
+    def test_no_recorded_state_means_scan(self):
+        self.assertIsNone(detect_changes(self.root))
+
+    def test_committed_and_working_tree_changes(self):
+        self.record()
+        (self.root / "b.py").write_text("b = 2\n")
+        self.commit("edit b")
+        (self.root / "a.py").write_text("a = 2\n")
+        (self.root / "c.py").write_text("c = 1\n")
+        (self.root / ".ai" / "scratch.py").write_text("ignored\n")
+
+        changes = detect_changes(self.root)
+
+        self.assertEqual(self.rels(changes), ["a.py", "b.py", "c.py"])
+        self.assertEqual(changes.committed, 1)
+        self.assertEqual(changes.worktree_changed, 2)
+
+    def test_dirty_file_is_reported_once_and_again_when_reverted(self):
+        (self.root / "a.py").write_text("a = 2\n")
+        self.record()
+        self.assertEqual(self.rels(detect_changes(self.root)), [])
+
+        self.git("checkout", "--", "a.py")
+
+        self.assertEqual(self.rels(detect_changes(self.root)), ["a.py"])
+
+    def test_mtime_changes_alone_are_not_changes(self):
+        self.record()
+        for name in ("a.py", "b.py"):
+            os.utime(self.root / name, (1, 1))
+
+        self.assertEqual(self.rels(detect_changes(self.root)), [])
+
+    def test_vanished_base_falls_back_to_scan_without_hooks(self):
+        git_changes.save_state(GitIndexState(head="0" * 40))
+
+        self.assertIsNone(detect_changes(self.root))
+
+    def test_vanished_base_uses_hook_log_when_hooks_installed(self):
+        install_hooks(self.root)
+        git_changes.save_state(GitIndexState(head="0" * 40, hooks=True))
+        (self.root / ".ai" / git_changes.HOOK_LOG_FILENAME).write_text("b.py\n")
+
+        self.assertEqual(self.rels(detect_changes(self.root)), ["b.py"])
+
+
+class TestHooks(GitChangesTestCase):
+    def test_hooks_record_checkout_and_keep_existing_hook(self):
+        hook = self.root / ".git" / "hooks" / "post-merge"
+        hook.write_text("#!/bin/sh\necho existing\n")
+
+        written = install_hooks(self.root)
+
+        self.assertEqual(len(written), 3)
+        self.assertIn("echo existing", hook.read_text())
+        self.assertEqual(install_hooks(self.root), [])
+
+        self.git("checkout", "-q", "-b", "feature")
+        (self.root / "b.py").write_text("b = 3\n")
+        self.commit("feature edit")
+        self.git("checkout", "-q", "main")
+
+        log = (self.root / ".ai" / git_changes.HOOK_LOG_FILENAME).read_text()
+        self.assertIn("b.py", log.split())
+
+
+class TestIndexChangedUsesGit(GitChangesTestCase):
+    def test_index_changed_indexes_only_git_paths(self):
+        indexer = CodebaseIndexer.__new__(CodebaseIndexer)
+        indexer.index_paths = MagicMock(return_value="Incrementally indexed 1 changed files.")
+        indexer.scan_indexable_files = MagicMock()
+        changes = GitChanges(
+            base="a" * 40,
+            head="b" * 40,
+            paths=[self.root / "a.py"],
+            state=GitIndexState(head="b" * 40),
+        )
+
+        with patch("codebase_indexer.detect_changes", return_value=changes):
+            result = indexer.index_changed(self.root, set(), [])
+
+        indexer.scan_indexable_files.assert_not_called()
+        indexer.index_paths.assert_called_once_with(
+            [self.root / "a.py"], [], ignored_dirs=set(), check_mtime=False
+        )
+        self.assertIn("git", result)
+        self.assertEqual(git_changes.load_state().head, "b" * 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
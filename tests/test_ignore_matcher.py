@@ -0,0 +1,186 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codebase_indexer import CodebaseIndexer
+from file_catalog import FileCatalog
+from ignore_matcher import (
+    IgnoreMatcher,
+    compile_patterns,
+    load_project_matcher,
+    parse_rule,
+    read_ignore_file,
+)
+
+
+class TestIgnoreRules(unittest.TestCase):
+    def test_parse_rule(self):
+        self.assertIsNone(parse_rule("# comment"))
+        self.assertIsNone(parse_rule("   "))
+        rule = parse_rule("!/docs/build/")
+        self.assertTrue(rule.negate and rule.dir_only and rule.anchored)
+        self.assertEqual(rule.body, "docs/build")
+        self.assertEqual(parse_rule("\\#notes").body, "#notes")
+
+    def test_unanchored_pattern_matches_basename_at_any_depth(self):
+        matcher = IgnoreMatcher(["*.log", "secret.txt", "tmp_?.py"])
+
+        self.assertTrue(matcher.is_ignored("a.log"))
+        self.assertTrue(matcher.is_ignored("deep/dir/b.log"))
+        self.assertTrue(matcher.is_ignored("x/secret.txt"))
+        self.assertTrue(matcher.is_ignored("x/tmp_1.py"))
+        self.assertFalse(matcher.is_ignored("x/tmp_12.py"))
+        self.assertFalse(matcher.is_ignored("log/readme.md"))
+
+    def test_slash_anchors_to_root(self):
+        matcher = IgnoreMatcher(["/build", "docs/*.md"])
+
+        self.assertTrue(matcher.is_ignored("build/out.js"))
+        self.assertFalse(matcher.is_ignored("src/build/out.js"))
+        self.assertTrue(matcher.is_ignored("docs/a.md"))
+        self.assertFalse(matcher.is_ignored("docs/sub/a.md"))
+        self.assertFalse(matcher.is_ignored("other/docs/a.md"))
+
+    def test_double_star(self):
+        matcher = IgnoreMatcher(["**/fixtures", "assets/**", "a/**/z.txt"])
+
+        self.assertTrue(matcher.is_ignored("fixtures/x.json"))
+        self.assertTrue(matcher.is_ignored("tests/unit/fixtures/x.json"))
+        self.assertTrue(matcher.is_ignored("assets/img/logo.png"))
+        self.assertFalse(matcher.match("assets", is_dir=True))
+        self.assertTrue(matcher.is_ignored("a/z.txt"))
+        self.assertTrue(matcher.is_ignored("a/b/c/z.txt"))
+
+    def test_directory_only_rule(self):
+        matcher = IgnoreMatcher(["cache/"])
+
+        self.assertTrue(matcher.is_ignored("cache/data.bin"))
+        self.assertTrue(matcher.match("src/cache", is_dir=True))
+        self.assertFalse(matcher.match("src/cache"))
+
+    def test_negation_last_match_wins(self):
+        matcher = IgnoreMatcher(["*.min.js", "!vendor.min.js", "lib/vendor.min.js"])
+
+        self.assertTrue(matcher.is_ignored("app.min.js"))
+        self.assertFalse(matcher.is_ignored("web/vendor.min.js"))
+        self.assertTrue(matcher.is_ignored("lib/vendor.min.js"))
+
+    def test_negation_cannot_reinclude_inside_excluded_dir(self):
+        matcher = IgnoreMatcher(["logs/", "!logs/keep.txt"])
+
+        self.assertTrue(matcher.is_ignored("logs/keep.txt"))
+
+    def test_character_class_and_escape(self):
+        matcher = IgnoreMatcher(["file[0-9].txt", "[!a]*.tmp", "\\*literal"])
+
+        self.assertTrue(matcher.is_ignored("file3.txt"))
+        self.assertFalse(matcher.is_ignored("fileX.txt"))
+        self.assertTrue(matcher.is_ignored("b.tmp"))
+        self.assertFalse(matcher.is_ignored("a.tmp"))
+        self.assertTrue(matcher.is_ignored("*literal"))
+        self.assertFalse(matcher.is_ignored("xliteral"))
+
+    def test_compiled_matchers_are_cached(self):
+        self.assertIs(compile_patterns(["a", "b/"]), compile_patterns(("a", "b/")))
+
+
+class TestProjectIgnore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / ".gitignore").write_text("generated/\n*.log\n")
+        (self.root / "src").mkdir()
+        (self.root / "src" / "main.py").write_text("x = 1\n")
+        (self.root / "src" / "debug.log").write_text("log\n")
+        (self.root / "generated").mkdir()
+        (self.root / "generated" / "out.py").write_text("y = 2\n")
+        self.patches = [
+            patch("config.PROJECT_ROOT", self.root),
+            patch("config.AI_DIR", self.root / ".ai"),
+            patch("config.INDEX_IGNORE_FILE", self.root / ".ai" / ".indexignore"),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _catalog_rels(self, catalog):
+        return sorted(e.rel for e in catalog.files())
+
+    def test_catalog_prunes_gitignored_paths(self):
+        catalog = FileCatalog(self.root, matcher=load_project_matcher(self.root))
+
+        self.assertEqual(self._catalog_rels(catalog), [".gitignore", "src/main.py"])
+
+    def test_indexignore_can_reinclude_gitignored_file(self):
+        (self.root / ".indexignore").write_text("!debug.log\n")
+
+        catalog = FileCatalog(self.root, matcher=load_project_matcher(self.root))
+
+        self.assertIn("src/debug.log", self._catalog_rels(catalog))
+
+    def test_gitignore_toggle(self):
+        with patch.dict(os.environ, {"PROJECTMIND_RESPECT_GITIGNORE": "0"}):
+            matcher = load_project_matcher(self.root)
+
+        self.assertEqual(len(matcher), 0)
+
+    def test_catalog_reloads_changed_ignore_file(self):
+        catalog = FileCatalog(self.root, matcher=load_project_matcher(self.root))
+        self.assertNotIn("generated/out.py", self._catalog_rels(catalog))
+
+        (self.root / ".gitignore").write_text("*.log\n")
+        catalog.refresh()
+
+        self.assertIn("generated/out.py", self._catalog_rels(catalog))
+
+    def test_should_index_file_uses_gitignore_semantics(self):
+        indexer = CodebaseIndexer.__new__(CodebaseIndexer)
+        patterns = ["/src/legacy", "*.min.js"]
+        files = {
+            "src/legacy/a.py": False,
+            "lib/src/legacy/a.py": True,
+            "web/app.min.js": False,
+            "web/app.js": True,
+        }
+        for rel, expected in files.items():
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("z = 3\n")
+            with self.subTest(rel=rel):
+                self.assertEqual(indexer.should_index_file(path, patterns), expected)
+
+    def test_scan_compiles_patterns_once(self):
+        for i in range(5):
+            (self.root / "src" / f"m{i}.py").write_text("z = 3\n")
+        indexer = CodebaseIndexer(MagicMock())
+
+        with patch("codebase_indexer.compile_patterns", wraps=compile_patterns) as compiled:
+            files = indexer.scan_indexable_files(self.root, set(), ["m0.py"])
+
+        self.assertEqual(compiled.call_count, 1)
+        self.assertNotIn("m0.py", {f.name for f in files})
+        self.assertIn("m1.py", {f.name for f in files})
+
+    def test_legacy_substring_file_warns(self):
+        path = self.root / ".indexignore"
+        path.write_text(
+            "# ProjectMind index-ignore patterns (substring match on full path).\ntest\n"
+        )
+
+        with self.assertLogs("ProjectMind", level="WARNING") as logs:
+            self.assertEqual(read_ignore_file(path), ["test"])
+
+        self.assertIn('"*test*"', logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,13 @@
-import json
 import os
 import sys
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import incremental_indexing
 from incremental_indexing import IndexMetadata, atomic_write
 
 
@@ -58,6 +59,21 @@ class TestAtomicWrite(unittest.TestCase):
 
 
 class TestIndexMetadata(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.patches = [
+            patch("config.INDEX_META_DB", self.root / "index_meta.sqlite"),
+            patch("config.INDEX_METADATA_FILE", self.root / "index_metadata.json"),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
     @patch("config.INDEX_METADATA_FILE")
     def test_load_empty_when_file_not_exists(self, mock_file):
         mock_file.exists.return_value = False
@@ -85,20 +101,17 @@ class TestIndexMetadata(unittest.TestCase):
 
         self.assertEqual(metadata.metadata, {})
 
-    @patch("incremental_indexing.atomic_write")
     @patch("logger.get_logger")
-    def test_save_uses_atomic_write(self, mock_logger, mock_atomic_write):
-        """Test that save uses atomic_write"""
+    def test_save_writes_store_in_one_batch(self, mock_logger):
+        """Test that save writes buffered records to the SQLite store"""
         metadata = IndexMetadata()
         metadata.metadata = {"file1.py": {"mtime": 123.45}}
 
-        metadata.save()
+        with patch.object(metadata.store, "apply", wraps=metadata.store.apply) as apply:
+            metadata.save()
 
-        mock_atomic_write.assert_called_once()
-        args = mock_atomic_write.call_args
-        content = args[0][1]
-        parsed = json.loads(content)
-        self.assertEqual(parsed["file1.py"]["mtime"], 123.45)
+        apply.assert_called_once()
+        self.assertEqual(IndexMetadata().get_file_mtime("file1.py"), 123.45)
 
     def test_get_file_mtime_existing(self):
         """Test getting mtime for existing file"""
@@ -194,5 +207,97 @@ class TestIndexMetadata(unittest.TestCase):
         self.assertIsNone(stats["last_index"])
 
 
+class TestContentHashChangeDetection(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.patchers = [
+            patch("config.INDEX_METADATA_FILE", self.root / "index_metadata.json"),
+            patch("config.INDEX_META_DB", self.root / "index_meta.sqlite"),
+        ]
+        for p in self.patchers:
+            p.start()
+        self.files = []
+        for i in range(4):
+            path = self.root / f"mod{i}.py"
+            path.write_text(f"value = {i}\n")
+            self.files.append(path)
+        self.metadata = IndexMetadata()
+        for path in self.files:
+            self.metadata.record_indexed(path)
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _touch(self, path):
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+    def test_record_stores_stat_and_hash(self):
+        record = self.metadata.metadata[str(self.files[0])]
+
+        self.assertEqual(record["size"], 10)
+        self.assertEqual(record["mtime_ns"], self.files[0].stat().st_mtime_ns)
+        self.assertEqual(len(record["hash"]), 32)
+
+    def test_unchanged_stat_skips_hashing(self):
+        with patch("incremental_indexing.hash_file") as hash_file:
+            changed = self.metadata.get_changed_files(self.files)
+
+        self.assertEqual(changed, [])
+        hash_file.assert_not_called()
+        self.assertEqual(self.metadata.last_scan.stat_unchanged, 4)
+
+    def test_touched_identical_file_only_updates_stat(self):
+        self._touch(self.files[1])
+
+        changed = self.metadata.get_changed_files(self.files)
+
+        self.assertEqual(changed, [])
+        self.assertEqual(self.metadata.last_scan.touched_unchanged, 1)
+        record = self.metadata.metadata[str(self.files[1])]
+        self.assertEqual(record["mtime_ns"], self.files[1].stat().st_mtime_ns)
+        self.assertTrue(self.metadata.dirty)
+
+    def test_same_size_edit_is_detected_by_hash(self):
+        self.files[2].write_text("value = 9\n")
+        self._touch(self.files[2])
+
+        changed = self.metadata.get_changed_files(self.files)
+
+        self.assertEqual(changed, [self.files[2]])
+        self.assertEqual(self.metadata.last_scan.hashed, 1)
+
+    def test_size_change_needs_no_hash(self):
+        self.files[3].write_text("value = 333\n")
+
+        with patch("incremental_indexing.hash_file") as hash_file:
+            changed = self.metadata.get_changed_files(self.files)
+
+        self.assertEqual(changed, [self.files[3]])
+        hash_file.assert_not_called()
+
+    def test_large_change_sets_are_hashed_in_parallel(self):
+        for path in self.files:
+            self._touch(path)
+
+        with (
+            patch.object(incremental_indexing, "PARALLEL_HASH_THRESHOLD", 2),
+            patch.object(incremental_indexing, "MAX_HASH_WORKERS", 4),
+            patch.object(
+                incremental_indexing,
+                "ThreadPoolExecutor",
+                wraps=incremental_indexing.ThreadPoolExecutor,
+            ) as pool,
+        ):
+            changed = self.metadata.get_changed_files(self.files)
+
+        self.assertEqual(changed, [])
+        self.assertEqual(self.metadata.last_scan.touched_unchanged, 4)
+        pool.assert_called_once()
+
+
 if __name__ == "__main__":
     unittest.main()
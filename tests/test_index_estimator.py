@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_catalog import CatalogEntry
+from index_estimator import ASSUMED_EMBED_TOKENS_PER_SECOND, _sample, estimate_index_cost
+
+PY_SOURCE = "".join(f"def func_{i}(x):\n    return x * {i} + 1\n\n\n" for i in range(40))
+
+
+class TestIndexEstimator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.entries = []
+        files = [(f"src/m{i}.py", PY_SOURCE) for i in range(6)]
+        files += [("docs/guide.md", "# Guide\n\nSome text.\n" * 20), ("main.py", PY_SOURCE)]
+        for rel, text in files:
+            self.entries.append(self._entry(rel, text))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _entry(self, rel, text):
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        st = path.stat()
+        return CatalogEntry(
+            path=path,
+            rel=rel,
+            suffix=path.suffix,
+            size=st.st_size,
+            mtime=st.st_mtime,
+            mtime_ns=st.st_mtime_ns,
+        )
+
+    def test_sample_covers_every_extension(self):
+        sample = _sample(self.entries, 3, seed=1)
+
+        self.assertEqual(len(sample), 3)
+        self.assertEqual({e.suffix for e in sample}, {".py", ".md"})
+
+    def test_extrapolates_from_sample_with_assumed_embedding(self):
+        estimate = estimate_index_cost(self.entries, sample_files=3)
+
+        self.assertEqual(estimate.files, 8)
+        self.assertEqual(estimate.sampled_files, 3)
+        self.assertFalse(estimate.embed_measured)
+        self.assertEqual(estimate.embed_tokens_per_second, ASSUMED_EMBED_TOKENS_PER_SECOND)
+        # Seven identical Python files dominate the chunk count
+        self.assertGreater(estimate.chunks, 7 * 10)
+        self.assertGreater(estimate.disk_bytes, 0)
+        self.assertGreater(estimate.peak_rss_bytes, 0)
+        self.assertEqual(estimate.directories[0].path, "src")
+        self.assertEqual({d.path for d in estimate.directories}, {"src", "docs", "."})
+        self.assertIn("## Most expensive directories", estimate.format())
+
+    def test_measures_embedding_throughput(self):
+        calls = []
+
+        def embed(texts):
+            calls.append(len(texts))
+            time.sleep(0.01)
+            return [[0.0] * 8 for _ in texts]
+
+        estimate = estimate_index_cost(self.entries, sample_files=8, embed_fn=embed)
+
+        self.assertTrue(estimate.embed_measured)
+        self.assertEqual(len(calls), 2)
+        self.assertNotEqual(estimate.embed_tokens_per_second, ASSUMED_EMBED_TOKENS_PER_SECOND)
+        self.assertIn("measured", estimate.format())
+
+
+if __name__ == "__main__":
+    unittest.main()
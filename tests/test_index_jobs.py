@@ -0,0 +1,160 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incremental_indexing import IndexCheckpoint
+from index_jobs import IndexJob, IndexJobQueue, format_job
+from vector_store_manager import STAGING_SUFFIX, VectorStoreManager
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.ran: list[str] = []
+
+    def _blocking_runner(self, job):
+        self.ran.append(job.job_id)
+        self.started.set()
+        self.release.wait(5)
+        return f"done {job.kind}"
+
+    def test_duplicate_submissions_are_merged(self):
+        queue = IndexJobQueue(self._blocking_runner)
+        running, _ = queue.submit("full", "/p")
+        self.started.wait(5)
+
+        queued, created = queue.submit("changed", "/p")
+        same, created_again = queue.submit("changed", "/p")
+        rebuild, rebuild_created = queue.submit("full", "/p", force=True)
+        merged_full, _ = queue.submit("full", "/p")
+        self.release.set()
+        queue.wait(rebuild.job_id, timeout=5)
+
+        self.assertTrue(created and rebuild_created)
+        self.assertFalse(created_again)
+        self.assertIs(same, queued)
+        self.assertIs(merged_full, running)
+        self.assertEqual(queued.merged, 1)
+        self.assertEqual(self.ran, [running.job_id, queued.job_id, rebuild.job_id])
+        self.assertEqual(rebuild.phase, "done")
+        self.assertEqual(rebuild.result, "done full")
+
+    def test_force_upgrades_a_queued_full_index(self):
+        queue = IndexJobQueue(self._blocking_runner)
+        queue.submit("changed", "/p")
+        self.started.wait(5)
+
+        queued, _ = queue.submit("full", "/p")
+        upgraded, created = queue.submit("full", "/p", force=True)
+        self.release.set()
+
+        self.assertFalse(created)
+        self.assertIs(upgraded, queued)
+        self.assertTrue(queued.force)
+
+    def test_active_job_covers_running_and_queued_jobs(self):
+        queue = IndexJobQueue(self._blocking_runner)
+        self.assertIsNone(queue.active_job("/p"))
+        running, _ = queue.submit("full", "/p")
+        self.started.wait(5)
+
+        self.assertIs(queue.active_job("/p"), running)
+        self.assertIsNone(queue.active_job("/other"))
+        self.release.set()
+        queue.wait(running.job_id, timeout=5)
+        self.assertIsNone(queue.active_job("/p"))
+
+    def test_failure_is_recorded(self):
+        def failing(job):
+            raise RuntimeError("model missing")
+
+        job = IndexJob(job_id="j1", kind="full", root="/p")
+        IndexJobQueue(failing).run(job)
+
+        self.assertEqual(job.phase, "failed")
+        self.assertEqual(job.errors, ["RuntimeError: model missing"])
+        self.assertIn("Error: RuntimeError: model missing", format_job(job))
+
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            IndexJobQueue(self._blocking_runner).submit("bogus", "/p")
+
+
+class TestJobProgress(unittest.TestCase):
+    def test_throughput_and_eta_from_checkpoints(self):
+        job = IndexJob(job_id="j1", kind="full", root="/p")
+        checkpoint = IndexCheckpoint(job_id="c", root="/p", total=100, started_at=0.0, cursor=20)
+        job.update("indexing", checkpoint)
+        job.started_at = time.time() - 10
+        checkpoint.cursor = 60
+        checkpoint.chunks = 300
+        job.update("indexing", checkpoint)
+
+        info = job.to_dict()
+
+        # 40 files in ~10 s since this run resumed at file 20
+        self.assertAlmostEqual(info["files_per_s"], 4.0, delta=0.2)
+        self.assertAlmostEqual(info["eta_s"], 10, delta=1)
+        self.assertEqual(info["chunks"], 300)
+        self.assertIn("Files: 60/100 (60%)", format_job(job))
+
+
+class TestStagedRebuild(unittest.TestCase):
+    def setUp(self):
+        self.manager = VectorStoreManager()
+        self.manager.chroma_client = MagicMock()
+        self.manager._initialized = True
+        self.live = MagicMock(name="live")
+        self.staging = MagicMock(name="staging")
+        self.manager.collection = self.live
+        self.manager.chroma_client.get_or_create_collection.return_value = self.staging
+
+    def test_writes_go_to_staging_until_commit(self):
+        self.assertIsNone(self.manager.begin_rebuild())
+        self.manager.upsert(["doc"], [{}], ["id"])
+
+        self.assertIs(self.manager.get_collection(), self.live)
+        self.staging.upsert.assert_called_once()
+        self.live.upsert.assert_not_called()
+
+        self.assertIsNone(self.manager.commit_rebuild())
+
+        self.live.modify.assert_called_once_with(name="project_codebase__previous")
+        self.staging.modify.assert_called_once_with(name="project_codebase")
+        self.manager.chroma_client.delete_collection.assert_called_with(
+            "project_codebase__previous"
+        )
+        self.assertIs(self.manager.get_collection(), self.staging)
+        self.assertIsNone(self.manager.staging)
+
+    def test_failed_swap_restores_the_live_collection(self):
+        self.manager.begin_rebuild()
+        self.staging.modify.side_effect = RuntimeError("disk full")
+
+        error = self.manager.commit_rebuild()
+
+        self.assertIn("disk full", error)
+        self.assertEqual(
+            [c.kwargs["name"] for c in self.live.modify.call_args_list],
+            ["project_codebase__previous", "project_codebase"],
+        )
+        self.assertIs(self.manager.get_collection(), self.live)
+        self.assertIs(self.manager.staging, self.staging)
+
+    def test_resume_keeps_staged_chunks(self):
+        self.manager.begin_rebuild(resume=True)
+
+        self.manager.chroma_client.delete_collection.assert_not_called()
+        self.manager.chroma_client.get_or_create_collection.assert_called_once()
+        name = self.manager.chroma_client.get_or_create_collection.call_args.kwargs["name"]
+        self.assertEqual(name, "project_codebase" + STAGING_SUFFIX)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import index_priority
+from code_intelligence import invalidate_import_graph_cache
+from codebase_indexer import CodebaseIndexer
+from file_classifier import FileClass
+from index_priority import note_access, prioritize
+
+
+class PriorityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name).resolve()
+        sources = {
+            "a.py": "import util\n",
+            "b.py": "b = 1\n",
+            "c.py": "c = 1\n",
+            "d.py": "d = 1\n",
+            "e.py": "import util\n",
+            "main.py": "m = 1\n",
+            "util.py": "u = 1\n",
+        }
+        for name, text in sources.items():
+            (self.root / name).write_text(text)
+        self.files = sorted(self.root.glob("*.py"))
+        index_priority.clear_accesses()
+        invalidate_import_graph_cache()
+        self.patches = [
+            patch("config.PROJECT_ROOT", self.root),
+            patch("config.AI_DIR", self.root / ".ai"),
+            patch("config.INDEX_META_DB", self.root / ".ai" / "index_meta.sqlite"),
+            patch("config.INDEX_METADATA_FILE", self.root / ".ai" / "index_metadata.json"),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        index_priority.clear_accesses()
+        invalidate_import_graph_cache()
+        self.tmp.cleanup()
+
+    def names(self, paths):
+        return [p.name for p in paths]
+
+
+class TestPrioritize(PriorityTestCase):
+    def test_signals_order_hot_set_before_walk_order(self):
+        note_access([self.root / "d.py"])
+
+        plan = prioritize(self.files, self.root)
+
+        self.assertEqual(self.names(plan.order[: plan.hot]), ["d.py", "main.py", "util.py"])
+        self.assertEqual(self.names(plan.order[plan.hot :]), ["a.py", "b.py", "c.py", "e.py"])
+        self.assertEqual(plan.signals["recently used"], 1)
+        self.assertEqual(plan.signals["central"], 1)
+        self.assertIn("hot set of 3 files", plan.summary())
+
+    def test_access_memory_is_bounded(self):
+        with patch.object(index_priority, "RECENT_ACCESS_MAX", 2):
+            note_access([self.root / "a.py", self.root / "b.py", self.root / "c.py"])
+
+        self.assertEqual(
+            sorted(index_priority.recent_accesses()), [str(self.root / n) for n in ("b.py", "c.py")]
+        )
+
+    @unittest.skipUnless(shutil.which("git"), "git is not installed")
+    def test_recent_commits_rank_first(self):
+        def git(*args, date=None):
+            env = dict(os.environ)
+            if date:
+                env.update(GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+            subprocess.run(
+                ["git", "-c", "user.name=t", "-c", "user.email=t@e", *args],
+                cwd=self.root,
+                check=True,
+                capture_output=True,
+                env=env,
+            )
+
+        git("init", "-q")
+        git("add", "-A")
+        git("commit", "-q", "-m", "old", date="2000-01-01T00:00:00")
+        (self.root / "c.py").write_text("c = 2\n")
+        git("commit", "-q", "-am", "recent")
+
+        plan = prioritize(self.files, self.root, use_import_graph=False)
+
+        self.assertEqual(self.names(plan.order[:2]), ["c.py", "main.py"])
+        self.assertEqual(plan.signals["recently changed"], 1)
+
+
+class TestHotSetCoverage(PriorityTestCase):
+    def test_index_all_reports_hot_set_coverage(self):
+        indexer = CodebaseIndexer(MagicMock())
+        with patch.dict(os.environ, {"PROJECTMIND_GIT_CHANGES": "0"}):
+            partial = indexer.index_all(self.root, set(), set(), time_budget=1e-9)
+            done = indexer.index_all(self.root, set(), set())
+
+        self.assertIn("Hot set coverage: 1/2 files (50%)", partial)
+        self.assertIn("Hot set coverage: 2/2 files (100%)", done)
+
+    def test_deferred_hot_file_is_not_counted_in_the_hot_set(self):
+        def classify(path, rel, size, mtime_ns):
+            return FileClass("generated", "test") if rel == "util.py" else None
+
+        indexer = CodebaseIndexer(MagicMock())
+        env = {"PROJECTMIND_GIT_CHANGES": "0", "PROJECTMIND_AUTO_EXCLUDE": "defer"}
+        with patch.dict(os.environ, env), patch("codebase_indexer.classify", classify):
+            partial = indexer.index_all(self.root, set(), set(), time_budget=1e-9)
+            done = indexer.index_all(self.root, set(), set())
+
+        self.assertIn("Hot set coverage: 1/1 files (100%)", partial)
+        self.assertIn("Hot set coverage: 1/1 files (100%)", done)
+
+    def test_priority_can_be_disabled(self):
+        indexer = CodebaseIndexer(MagicMock())
+        env = {"PROJECTMIND_GIT_CHANGES": "0", "PROJECTMIND_INDEX_PRIORITY": "0"}
+        with patch.dict(os.environ, env):
+            result = indexer.index_all(self.root, set(), set())
+
+        self.assertNotIn("Hot set", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
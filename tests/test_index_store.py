@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incremental_indexing import IndexMetadata
+from index_store import IndexStore
+
+
+class TestIndexStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.store = IndexStore(self.root / "index_meta.sqlite")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_reads_do_not_create_the_database(self):
+        self.assertIsNone(self.store.get("a.py"))
+        self.assertEqual(self.store.get_many(["a.py"]), {})
+        self.assertFalse(self.store.db_path.exists())
+
+    def test_batch_is_one_generation_in_wal_mode(self):
+        records = {f"f{i}.py": {"mtime": float(i), "chunk_ids": [f"f{i}_0"]} for i in range(3)}
+
+        first = self.store.apply(records)
+        second = self.store.apply({"f0.py": {"mtime": 9.0}}, deletes=["f1.py"])
+
+        self.assertEqual((first, second), (1, 2))
+        self.assertEqual(self.store.get("f0.py"), {"mtime": 9.0, "generation": 2})
+        self.assertEqual(self.store.get("f2.py")["chunk_ids"], ["f2_0"])
+        self.assertEqual(self.store.get("f2.py")["generation"], 1)
+        self.assertIsNone(self.store.get("f1.py"))
+        with sqlite3.connect(self.store.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_lookups_and_prefix_ranges(self):
+        self.store.apply(
+            {
+                "/p/src/a.py": {"mtime": 1.0},
+                "/p/src/sub/b.py": {"mtime": 1.0},
+                "/p/src2/c.py": {"mtime": 1.0},
+            }
+        )
+
+        with patch("index_store.LOOKUP_CHUNK", 1):
+            found = self.store.get_many(["/p/src/a.py", "/p/src2/c.py", "/p/missing.py"])
+
+        self.assertEqual(sorted(found), ["/p/src/a.py", "/p/src2/c.py"])
+        self.assertEqual(
+            sorted(self.store.paths_under("/p/src", "/")), ["/p/src/a.py", "/p/src/sub/b.py"]
+        )
+
+
+class TestIndexMetadataStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.db = self.root / "index_meta.sqlite"
+        self.legacy = self.root / "index_metadata.json"
+        self.patches = [
+            patch("config.INDEX_META_DB", self.db),
+            patch("config.INDEX_METADATA_FILE", self.legacy),
+        ]
+        for p in self.patches:
+            p.start()
+        self.file = self.root / "mod.py"
+        self.file.write_text("value = 1\n")
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def test_legacy_json_is_migrated_once(self):
+        self.legacy.write_text(json.dumps({"a.py": {"mtime": 1.5, "indexed_at": "2024-01-01"}}))
+
+        metadata = IndexMetadata()
+
+        self.assertEqual(metadata.get_file_mtime("a.py"), 1.5)
+        self.assertFalse(self.legacy.exists())
+        self.assertTrue(self.legacy.with_name("index_metadata.json.migrated").exists())
+        self.assertEqual(IndexMetadata().get_stats()["total_files"], 1)
+
+    def test_indexed_record_round_trips(self):
+        metadata = IndexMetadata()
+        metadata.record_indexed(self.file, ["mod_0", "mod_1"])
+        metadata.save()
+
+        reloaded = IndexMetadata()
+
+        self.assertEqual(reloaded.get_chunk_ids(str(self.file)), ["mod_0", "mod_1"])
+        self.assertEqual(reloaded.get_changed_files([self.file]), [])
+        self.assertEqual(reloaded.get_stats()["generation"], 1)
+
+    def test_touch_keeps_generation_of_the_indexing_run(self):
+        metadata = IndexMetadata()
+        metadata.record_indexed(self.file)
+        metadata.save()
+        st = self.file.stat()
+        os.utime(self.file, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+        touched = IndexMetadata()
+        touched.get_changed_files([self.file])
+        touched.save()
+
+        record = IndexMetadata().store.get(str(self.file))
+        self.assertEqual(record["generation"], 1)
+        self.assertEqual(record["mtime_ns"], self.file.stat().st_mtime_ns)
+
+    def test_remove_path_drops_directory_records(self):
+        metadata = IndexMetadata()
+        base = self.root / "pkg"
+        for name in ("a.py", "sub/b.py"):
+            metadata.update_file(str(base / name), 1.0)
+        metadata.update_file(str(self.root / "pkg2" / "c.py"), 1.0)
+        metadata.save()
+
+        reloaded = IndexMetadata()
+        removed = reloaded.remove_path(base)
+        reloaded.save()
+
+        self.assertEqual(removed, 2)
+        self.assertEqual(list(IndexMetadata().metadata), [str(self.root / "pkg2" / "c.py")])
+
+    def test_removed_and_shrunk_chunk_sets_are_orphaned(self):
+        metadata = IndexMetadata()
+        metadata.record_indexed(self.file, ["mod_0", "mod_1", "mod_2"])
+        metadata.save()
+
+        reloaded = IndexMetadata()
+        reloaded.record_indexed(self.file, ["mod_0"])
+        self.assertEqual(reloaded.take_orphaned_chunk_ids(), ["mod_1", "mod_2"])
+        self.assertEqual(reloaded.take_orphaned_chunk_ids(), [])
+
+        reloaded.remove_path(self.file)
+        self.assertEqual(reloaded.take_orphaned_chunk_ids(), ["mod_0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,22 @@
-from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
+
+import pytest
 
 from codebase_indexer import CodebaseIndexer
+from file_catalog import get_file_catalog
+from incremental_indexing import IndexMetadata
 
 
 class TestIndexingLimit:
     """Tests for indexing limits."""
 
-    @patch("os.walk")
-    def test_scan_limit(self, mock_walk):
+    def test_scan_limit(self, tmp_path):
         """Test that scan_indexable_files respects the max_files limit."""
-        # Mock os.walk to return many files
         # We simulate 2 directories, each with 10 files
-        mock_walk.return_value = [
-            ("/root", [], [f"file{i}.py" for i in range(10)]),
-            ("/root/subdir", [], [f"subfile{i}.py" for i in range(10)]),
-        ]
+        (tmp_path / "subdir").mkdir()
+        for i in range(10):
+            (tmp_path / f"file{i}.py").write_text("x = 1\n")
+            (tmp_path / "subdir" / f"subfile{i}.py").write_text("x = 1\n")
 
         # Mock vector store
         mock_store = MagicMock()
@@ -29,9 +30,134 @@ class TestIndexingLimit:
 
         # Run scan with limit
         files = indexer.scan_indexable_files(
-            Path("/root"), ignored_dirs=set(), ignore_patterns=set(), max_files=limit
+            tmp_path, ignored_dirs=set(), ignore_patterns=set(), max_files=limit
         )
 
         assert len(files) == limit
         assert len(files) < 20  # Should be less than total available files
         print(f"Scanned {len(files)} files with limit {limit}")
+
+    def test_scan_skips_caller_ignored_dirs(self, tmp_path):
+        """Directories passed in ignored_dirs are pruned on top of the config defaults."""
+        (tmp_path / "keep").mkdir()
+        (tmp_path / "generated").mkdir()
+        (tmp_path / "keep" / "a.py").write_text("x = 1\n")
+        (tmp_path / "generated" / "b.py").write_text("x = 1\n")
+
+        indexer = CodebaseIndexer(MagicMock())
+        files = indexer.scan_indexable_files(
+            tmp_path, ignored_dirs={"generated"}, ignore_patterns=set()
+        )
+
+        assert [f.name for f in files] == ["a.py"]
+
+
+class TestResumableIndexAll:
+    """index_all runs as a checkpointed job that later calls continue."""
+
+    @pytest.fixture
+    def project(self, tmp_path, monkeypatch):
+        root = tmp_path / "project"
+        root.mkdir()
+        for i in range(5):
+            (root / f"mod{i}.py").write_text(f"def f{i}():\n    return {i}\n")
+        monkeypatch.setattr("config.INDEX_META_DB", tmp_path / "index_meta.sqlite")
+        monkeypatch.setattr("config.INDEX_METADATA_FILE", tmp_path / "index_metadata.json")
+        monkeypatch.setenv("PROJECTMIND_GIT_CHANGES", "0")
+        indexer = CodebaseIndexer(MagicMock())
+        indexer.vector_store.begin_rebuild.return_value = None
+        indexer.vector_store.commit_rebuild.return_value = None
+        processed = []
+        original = indexer.process_file_with_metadata
+
+        def track(file_path, batch_indexer, metadata):
+            processed.append(file_path.name)
+            return original(file_path, batch_indexer, metadata)
+
+        indexer.process_file_with_metadata = track
+        return root, indexer, processed
+
+    def test_time_slices_continue_where_the_last_call_stopped(self, project):
+        root, indexer, processed = project
+
+        first = indexer.index_all(root, set(), set(), time_budget=1e-9)
+        checkpoint = IndexMetadata().load_checkpoint()
+        rest = indexer.index_all(root, set(), set())
+
+        assert first.startswith("Indexing in progress: 1/5 files")
+        assert checkpoint.cursor == 1 and checkpoint.total == 5
+        assert rest.startswith("Indexed 5 files") and "over 2 calls" in rest
+        assert sorted(processed) == [f"mod{i}.py" for i in range(5)]
+        assert IndexMetadata().load_checkpoint() is None
+        assert IndexMetadata().get_changed_files(sorted(root.glob("*.py"))) == []
+
+    def test_interrupted_run_resumes_from_last_checkpoint(self, project, monkeypatch):
+        root, indexer, processed = project
+        monkeypatch.setattr("codebase_indexer.CHECKPOINT_BATCH_FILES", 2)
+        tracked = indexer.process_file_with_metadata
+
+        def crash_on_fourth(file_path, batch_indexer, metadata):
+            if len(processed) == 3:
+                raise KeyboardInterrupt
+            return tracked(file_path, batch_indexer, metadata)
+
+        indexer.process_file_with_metadata = crash_on_fourth
+        with pytest.raises(KeyboardInterrupt):
+            indexer.index_all(root, set(), set())
+        indexer.process_file_with_metadata = tracked
+        interrupted = list(processed)
+
+        indexer.index_all(root, set(), set())
+
+        assert len(interrupted) == 3
+        # The third file was processed but not checkpointed, so it is redone
+        assert len(processed) == 6
+        assert processed[3] == interrupted[2]
+        assert sorted(set(processed)) == [f"mod{i}.py" for i in range(5)]
+
+    def test_force_discards_unfinished_job(self, project):
+        root, indexer, processed = project
+        indexer.index_all(root, set(), set(), time_budget=1e-9)
+
+        result = indexer.index_all(root, set(), set(), force=True)
+
+        assert result.startswith("Indexed 5 files")
+        indexer.vector_store.begin_rebuild.assert_called_once_with()
+        indexer.vector_store.commit_rebuild.assert_called_once()
+        indexer.vector_store.clear_collection.assert_not_called()
+        assert len(processed) == 6
+
+    def test_progress_callback_reports_phases(self, project):
+        root, indexer, _ = project
+        seen = []
+
+        indexer.index_all(
+            root, set(), set(), progress=lambda phase, cp: seen.append((phase, cp and cp.cursor))
+        )
+
+        assert seen[0] == ("scanning", None)
+        assert ("indexing", 5) in seen
+        assert seen[-1] == ("finalizing", 5)
+
+    def test_full_index_has_no_scan_limit_but_reports_catalog_cap(self, project):
+        root, indexer, _ = project
+        scan = indexer.scan_indexable_files
+        limits = []
+
+        def spy(*args, **kwargs):
+            limits.append(kwargs.get("max_files", "default"))
+            return scan(*args, **kwargs)
+
+        indexer.scan_indexable_files = spy
+        get_file_catalog(root).capped = True
+
+        result = indexer.index_all(root, set(), set())
+
+        assert limits == [None]
+        assert "file catalog is capped" in result
+
+    def test_incremental_index_waits_for_unfinished_job(self, project):
+        root, indexer, _ = project
+        indexer.index_all(root, set(), set(), time_budget=1e-9)
+
+        assert "full index is in progress (1/5" in indexer.index_changed(root, set(), set())
@@ -0,0 +1,175 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codebase_indexer import CodebaseIndexer
+from incremental_indexing import IndexCheckpoint, IndexMetadata
+from indexing_telemetry import (
+    IndexTelemetry,
+    compare_runs,
+    format_run,
+    load_runs,
+    save_run,
+)
+
+
+class TestIndexTelemetry(unittest.TestCase):
+    def test_stages_rates_and_slowest_files(self):
+        telemetry = IndexTelemetry("full", "/p")
+        telemetry.add("split", 0.0005, 3)
+        telemetry.add("split", 0.003, 1)
+        telemetry.add("read", 0.001)
+        for i in range(12):
+            telemetry.note_file(f"/p/f{i}.py", i / 100, 1000, 2)
+        telemetry.note_tokens(500)
+
+        run = telemetry.finish("Indexed 12 files.")
+
+        self.assertEqual(list(run["stages"]), ["read", "split"])
+        split = run["stages"]["split"]
+        self.assertEqual((split["calls"], split["items"]), (2, 4))
+        self.assertEqual(split["histogram"], {"<=1ms": 1, "<=4ms": 1})
+        self.assertEqual((run["files"], run["chunks"], run["tokens"]), (12, 24, 500))
+        self.assertEqual(run["bytes_read"], 12000)
+        self.assertEqual(len(run["slowest_files"]), 10)
+        self.assertEqual(run["slowest_files"][0]["path"], "/p/f11.py")
+        self.assertIsNotNone(run["files_per_s"])
+
+    def test_runs_persist_and_are_trimmed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index_telemetry.jsonl"
+            with patch("indexing_telemetry.MAX_RUNS", 3):
+                for i in range(5):
+                    run = IndexTelemetry("changed").finish(f"run {i}")
+                    save_run(run, path)
+
+            runs = load_runs(path)
+
+        self.assertEqual([r["result"] for r in runs], ["run 2", "run 3", "run 4"])
+
+    def test_path_runs_are_kept_apart_from_full_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index_telemetry.jsonl"
+            with (
+                patch("indexing_telemetry.MAX_RUNS", 2),
+                patch("indexing_telemetry.MAX_PATHS_RUNS", 2),
+            ):
+                save_run(IndexTelemetry("full").finish("full"), path)
+                for i in range(6):
+                    batch = IndexTelemetry("paths")
+                    batch.note_file(f"/p/f{i}.py", 0.001, 100, 1)
+                    save_run(batch.finish(f"batch {i}"), path)
+                save_run(IndexTelemetry("paths").finish("nothing indexed"), path)
+
+            runs = load_runs(path)
+
+        self.assertEqual([r["result"] for r in runs], ["full", "batch 4", "batch 5"])
+
+    def test_report_and_comparison(self):
+        old = IndexTelemetry("full")
+        old.add("upsert", 2.0)
+        old.note_file("/p/a.py", 0.1, 100, 1)
+        new = IndexTelemetry("full")
+        new.add("upsert", 1.0)
+        new.note_file("/p/a.py", 0.1, 100, 1)
+
+        report = "\n".join(format_run(new.finish()))
+        comparison = "\n".join(compare_runs(new.finish(), old.finish()))
+
+        self.assertIn("`upsert`: 1.0s over 1 calls (100%", report)
+        self.assertIn("/p/a.py", report)
+        self.assertIn("`upsert`: 2000.00 → 1000.00 ms/file (-50%)", comparison)
+
+
+class TestIndexerRecordsRuns(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.patches = [
+            patch("config.INDEX_TELEMETRY_FILE", self.root / "index_telemetry.jsonl"),
+            patch("config.INDEX_META_DB", self.root / "index_meta.sqlite"),
+            patch("config.INDEX_METADATA_FILE", self.root / "index_metadata.json"),
+            # The temp directory may sit below an ignored name such as "tmp"
+            patch("codebase_indexer.is_dir_ignored", return_value=False),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def test_index_paths_records_one_run_per_call(self):
+        (self.root / "mod.py").write_text("def f():\n    return 1\n\n\nclass C:\n    pass\n")
+        indexer = CodebaseIndexer(MagicMock())
+
+        indexer.index_paths([self.root / "mod.py"], [], check_mtime=False)
+
+        runs = load_runs(self.root / "index_telemetry.jsonl")
+        self.assertEqual(len(runs), 1)
+        run = runs[0]
+        self.assertEqual(run["kind"], "paths")
+        self.assertEqual(run["files"], 1)
+        self.assertGreater(run["chunks"], 0)
+        self.assertGreater(run["tokens"], 0)
+        for stage in ("read", "split", "upsert", "metadata", "bm25"):
+            self.assertIn(stage, run["stages"])
+        self.assertIsNone(indexer.telemetry)
+
+    def test_index_paths_deletes_chunks_of_removed_files(self):
+        module = self.root / "mod.py"
+        module.write_text("def f():\n    return 1\n\n\ndef g():\n    return 2\n")
+        store = MagicMock()
+        indexer = CodebaseIndexer(store)
+        indexer.index_paths([module], [], check_mtime=False)
+        indexed = IndexMetadata().get_chunk_ids(str(module))
+        module.unlink()
+        store.rebuild_bm25.reset_mock()
+
+        result = indexer.index_paths([module], [])
+
+        self.assertIn("1 removed from metadata", result)
+        store.delete.assert_called_once_with(indexed)
+        store.rebuild_bm25.assert_called_once()
+
+    def test_runs_from_other_threads_wait_for_the_current_one(self):
+        (self.root / "mod.py").write_text("def f():\n    return 1\n")
+        indexer = CodebaseIndexer(MagicMock())
+        results = []
+
+        with indexer.index_lock:
+            watcher = threading.Thread(
+                target=lambda: results.append(
+                    indexer.index_paths([self.root / "mod.py"], [], check_mtime=False)
+                )
+            )
+            watcher.start()
+            watcher.join(0.2)
+            self.assertTrue(watcher.is_alive())
+        watcher.join(5)
+
+        self.assertIn("Incrementally indexed 1 changed files", results[0])
+        self.assertEqual(len(load_runs(self.root / "index_telemetry.jsonl")), 1)
+
+    def test_index_paths_waits_for_unfinished_full_index(self):
+        (self.root / "mod.py").write_text("def f():\n    return 1\n")
+        metadata = IndexMetadata()
+        metadata.begin_job(
+            IndexCheckpoint(job_id="j", root=str(self.root), total=2, started_at=0.0),
+            [self.root / "mod.py", self.root / "other.py"],
+        )
+
+        result = CodebaseIndexer(MagicMock()).index_paths([self.root / "mod.py"], [])
+
+        self.assertIn("A full index is in progress (0/2 files)", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import manifest as manifest_module
+import manifest_shards
+from manifest import (
+    FileEntry,
+    Manifest,
+    ManifestStats,
+    ModuleEntry,
+    build_manifest,
+    export_manifest_json,
+    find_files_by_keyword,
+    get_or_build_manifest,
+    is_manifest_stale,
+    load_manifest,
+    mark_dirty,
+    save_manifest,
+)
+from manifest_format import ManifestFormatError, decode_manifest, encode_manifest
+
+
+class TestIncrementalManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "pkg").mkdir()
+        (self.root / "pkg" / "a.py").write_text("def alpha():\n    pass\n")
+        (self.root / "pkg" / "b.py").write_text("class Beta:\n    pass\n")
+        (self.root / "gone.py").write_text("def gone():\n    pass\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _symbols(self, manifest: Manifest) -> dict[str, list[str]]:
+        return {f.path: f.symbols for f in manifest.files}
+
+    def test_unchanged_files_reuse_symbols_without_reading(self):
+        first = build_manifest(self.root)
+
+        with patch("pathlib.Path.read_text", side_effect=AssertionError("file was re-read")):
+            second = build_manifest(self.root, previous=first)
+
+        self.assertEqual(second.reused_files, 3)
+        self.assertEqual(self._symbols(second), self._symbols(first))
+
+    def test_modified_new_and_deleted_files(self):
+        first = build_manifest(self.root)
+        a = self.root / "pkg" / "a.py"
+        a.write_text("def alpha():\n    pass\n\n\ndef alpha_two():\n    pass\n")
+        os.utime(a, (a.stat().st_atime, a.stat().st_mtime + 10))
+        (self.root / "pkg" / "c.py").write_text("def gamma():\n    pass\n")
+        (self.root / "gone.py").unlink()
+
+        second = build_manifest(self.root, previous=first)
+        symbols = self._symbols(second)
+
+        self.assertEqual(symbols["pkg/a.py"], ["alpha", "alpha_two"])
+        self.assertEqual(symbols["pkg/c.py"], ["gamma"])
+        self.assertNotIn("gone.py", symbols)
+        self.assertEqual(second.reused_files, 1)
+        self.assertEqual(second.pruned_files, 1)
+
+    def test_counts_survive_serialisation(self):
+        first = build_manifest(self.root)
+        second = build_manifest(self.root, previous=first)
+
+        restored = Manifest.from_dict(second.to_dict())
+
+        self.assertEqual(restored.reused_files, 3)
+
+
+class TestManifestStaleness(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "pkg").mkdir()
+        (self.root / "pkg" / "a.py").write_text("def alpha():\n    pass\n")
+        old = self.root.stat().st_mtime - 60
+        for d in (self.root, self.root / "pkg"):
+            os.utime(d, (old, old))
+        self.manifest = build_manifest(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unchanged_tree_is_fresh(self):
+        self.assertEqual(set(self.manifest.dir_mtimes), {"", "pkg"})
+        self.assertFalse(is_manifest_stale(self.manifest, self.root))
+
+    def test_added_file_is_detected_from_directory_mtime(self):
+        (self.root / "pkg" / "b.py").write_text("x = 1\n")
+
+        self.assertTrue(is_manifest_stale(self.manifest, self.root))
+
+    def test_in_place_edit_needs_deep_check(self):
+        a = self.root / "pkg" / "a.py"
+        future = self.manifest.generated_at + 100
+        os.utime(a, (future, future))
+
+        self.assertFalse(is_manifest_stale(self.manifest, self.root))
+        self.assertTrue(is_manifest_stale(self.manifest, self.root, deep=True))
+
+    def test_freshness_window_skips_io_until_marked_dirty(self):
+        with (
+            patch("config.PROJECT_ROOT", self.root),
+            patch("config.AI_DIR", self.root / ".ai"),
+            patch.object(manifest_module, "_current", None),
+            patch.object(
+                manifest_shards, "refresh_shards", wraps=manifest_shards.refresh_shards
+            ) as load,
+        ):
+            get_or_build_manifest()
+            get_or_build_manifest()
+            self.assertEqual(load.call_count, 1)
+
+            mark_dirty()
+            get_or_build_manifest()
+            self.assertEqual(load.call_count, 2)
+
+
+class TestResidentManifest(unittest.TestCase):
+    def test_load_returns_resident_copy_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            with patch("config.PROJECT_ROOT", root), patch("config.AI_DIR", root / ".ai"):
+                save_manifest(Manifest(project_root=str(root), generated_at=1.0))
+
+                with patch("manifest_format.decode_manifest") as decode:
+                    first = load_manifest()
+                    second = load_manifest()
+                decode.assert_not_called()
+                self.assertIs(first, second)
+
+                save_manifest(Manifest(project_root=str(root), generated_at=2.0))
+                self.assertEqual(load_manifest().generated_at, 2.0)
+
+
+class TestBinaryFormat(unittest.TestCase):
+    def setUp(self):
+        self.manifest = Manifest(
+            project_root="/proj",
+            generated_at=12.5,
+            duration_ms=7,
+            files=[
+                FileEntry("a.py", 10, 1.25, "python", ["Alpha", "beta"]),
+                FileEntry("docs/readme.md", 200, 2.5, "markdown", []),
+            ],
+            modules=[ModuleEntry("docs", 1, 200)],
+            stats=ManifestStats(total_files=2, by_language={"python": 1, "markdown": 1}),
+            reused_files=1,
+            dir_mtimes={"": 3.0, "docs": 4.0},
+        )
+
+    def test_round_trip(self):
+        restored = decode_manifest(encode_manifest(self.manifest))
+
+        self.assertEqual(restored.to_dict(), self.manifest.to_dict())
+
+    def test_sections_decode_on_first_access(self):
+        restored = decode_manifest(encode_manifest(self.manifest))
+
+        self.assertEqual(restored.stats.total_files, 2)
+        self.assertIn("stats", vars(restored))
+        self.assertNotIn("files", vars(restored))
+        self.assertEqual([f.path for f in restored.files], ["a.py", "docs/readme.md"])
+        self.assertIn("files", vars(restored))
+
+    def test_rejects_foreign_data(self):
+        with self.assertRaises(ManifestFormatError):
+            decode_manifest(b'{"version": 1}')
+
+    def test_damaged_section_is_rejected_at_load(self):
+        data = bytearray(encode_manifest(self.manifest))
+        data[-3] ^= 0xFF
+
+        with self.assertRaises(ManifestFormatError):
+            decode_manifest(bytes(data))
+        with self.assertRaises(ManifestFormatError):
+            decode_manifest(bytes(data[:-10]))
+
+    def test_legacy_json_is_loaded_and_export_round_trips(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            with patch("config.PROJECT_ROOT", root), patch("config.AI_DIR", root / ".ai"):
+                self.manifest.project_root = str(root)
+                legacy = export_manifest_json(self.manifest)
+                self.assertEqual(legacy.name, "manifest.json")
+
+                loaded = load_manifest()
+                self.assertEqual(loaded.to_dict(), self.manifest.to_dict())
+
+                save_manifest(self.manifest)
+                self.assertEqual(load_manifest().to_dict(), self.manifest.to_dict())
+
+
+class TestKeywordSearch(unittest.TestCase):
+    def setUp(self):
+        self.manifest = Manifest(
+            files=[
+                FileEntry("src/Parser.py", 1, 0.0, "python", ["Parser", "parse_args"]),
+                FileEntry("src/lexer.py", 1, 0.0, "python", ["Lexer"]),
+                FileEntry("docs/parser", 1, 0.0, "markdown", []),
+                FileEntry("src/util.py", 1, 0.0, "python", ["helper"]),
+            ]
+        )
+
+    def test_scores_paths_and_symbols(self):
+        hits = find_files_by_keyword(self.manifest, "PARSER")
+
+        self.assertEqual([h.path for h in hits], ["src/Parser.py", "docs/parser"])
+
+    def test_no_match(self):
+        self.assertEqual(find_files_by_keyword(self.manifest, "zzz"), [])
+
+    def test_short_keyword_and_limit(self):
+        hits = find_files_by_keyword(self.manifest, "l", limit=2)
+
+        self.assertEqual(len(hits), 2)
+
+    def test_offsets_survive_lowercasing_that_changes_length(self):
+        manifest = Manifest(
+            files=[
+                FileEntry("docs/İSTANBUL_İZMİR.md", 1, 0.0, "markdown", ["İİİİ"]),
+                FileEntry("src/a.py", 1, 0.0, "python", ["alpha"]),
+                FileEntry("src/b.py", 1, 0.0, "python", ["beta"]),
+            ]
+        )
+
+        hits = find_files_by_keyword(manifest, "beta")
+
+        self.assertEqual([h.path for h in hits], ["src/b.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import manifest as manifest_module
+from manifest import ROOT_MODULE, build_manifest, find_files_by_keyword, mark_dirty
+from manifest_shards import (
+    discover_shards,
+    load_index,
+    refresh_shards,
+    shard_filename,
+    shard_for_path,
+    shards_dir,
+)
+
+
+class ShardTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "setup.py").write_text("def setup_root():\n    pass\n")
+        (self.root / "pkg").mkdir()
+        (self.root / "pkg" / "a.py").write_text("def alpha():\n    pass\n" * 20)
+        (self.root / "lib").mkdir()
+        (self.root / "lib" / "deep").mkdir()
+        (self.root / "lib" / "deep" / "b.py").write_text("class Beta:\n    pass\n")
+        (self.root / "node_modules").mkdir()
+        (self.root / "node_modules" / "x.js").write_text("function x() {}\n")
+        (self.root / ".ai").mkdir()
+        old = self.root.stat().st_mtime - 60
+        for d in (self.root, self.root / "pkg", self.root / "lib", self.root / "lib" / "deep"):
+            os.utime(d, (old, old))
+        self.patches = [
+            patch("config.PROJECT_ROOT", self.root),
+            patch("config.AI_DIR", self.root / ".ai"),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+
+class TestShardLayout(ShardTestCase):
+    def test_discovers_top_level_modules(self):
+        self.assertEqual(discover_shards(self.root), [ROOT_MODULE, "lib", "pkg"])
+
+    def test_shard_for_path(self):
+        self.assertEqual(shard_for_path(self.root / "lib" / "deep" / "b.py"), "lib")
+        self.assertEqual(shard_for_path("pkg"), "pkg")
+        self.assertEqual(shard_for_path("setup.py"), ROOT_MODULE)
+        self.assertIsNone(shard_for_path("/elsewhere/file.py"))
+
+    def test_shard_build_is_scoped(self):
+        root_shard = build_manifest(self.root, shard=ROOT_MODULE)
+        lib = build_manifest(self.root, shard="lib")
+
+        self.assertEqual([f.path for f in root_shard.files], ["setup.py"])
+        self.assertEqual(root_shard.stats.config_files, ["setup.py"])
+        self.assertEqual([f.path for f in lib.files], ["lib/deep/b.py"])
+        self.assertEqual(set(lib.dir_mtimes), {"lib", "lib/deep"})
+        self.assertEqual(lib.stats.config_files, [])
+
+
+class TestRefreshShards(ShardTestCase):
+    def test_first_refresh_builds_every_shard_and_index(self):
+        merged = refresh_shards(self.root)
+
+        self.assertEqual(sorted(merged.rebuilt_shards), [ROOT_MODULE, "lib", "pkg"])
+        self.assertEqual(set(load_index(self.root)), {ROOT_MODULE, "lib", "pkg"})
+        self.assertEqual(merged.stats.indexed_files, 3)
+        self.assertEqual(merged.stats.config_files, ["setup.py"])
+        self.assertEqual(merged.stats.hot_paths[0], "pkg/a.py")
+        self.assertEqual(
+            sorted(f.path for f in merged.files), ["lib/deep/b.py", "pkg/a.py", "setup.py"]
+        )
+
+    def test_first_refresh_removes_single_file_manifests(self):
+        for name in ("manifest.bin", "manifest.json"):
+            (self.root / ".ai" / name).write_text("old")
+
+        refresh_shards(self.root)
+
+        self.assertFalse((self.root / ".ai" / "manifest.bin").exists())
+        self.assertFalse((self.root / ".ai" / "manifest.json").exists())
+
+    def test_change_in_one_module_rebuilds_only_its_shard(self):
+        refresh_shards(self.root)
+        self.assertEqual(refresh_shards(self.root).rebuilt_shards, [])
+
+        (self.root / "lib" / "deep" / "c.py").write_text("def gamma():\n    pass\n")
+        merged = refresh_shards(self.root)
+
+        self.assertEqual(merged.rebuilt_shards, ["lib"])
+        self.assertEqual(merged.shards["lib"].reused_files, 1)
+        self.assertEqual(merged.stats.indexed_files, 4)
+
+    def test_dirty_shard_is_rebuilt(self):
+        refresh_shards(self.root)
+
+        merged = refresh_shards(self.root, dirty={"pkg"})
+
+        self.assertEqual(merged.rebuilt_shards, ["pkg"])
+
+    def test_removed_module_drops_its_shard(self):
+        refresh_shards(self.root)
+        shard_file = shards_dir() / shard_filename("pkg")
+        self.assertTrue(shard_file.exists())
+
+        (self.root / "pkg" / "a.py").unlink()
+        (self.root / "pkg").rmdir()
+        merged = refresh_shards(self.root)
+
+        self.assertNotIn("pkg", merged.shards)
+        self.assertFalse(shard_file.exists())
+        self.assertNotIn("pkg", load_index(self.root))
+
+    def test_keyword_search_fans_out_across_shards(self):
+        merged = refresh_shards(self.root)
+
+        hits = find_files_by_keyword(merged, "beta")
+
+        self.assertEqual([h.path for h in hits], ["lib/deep/b.py"])
+
+    def test_mark_dirty_path_rebuilds_that_shard(self):
+        with patch.object(manifest_module, "_current", None):
+            manifest_module.get_or_build_manifest()
+            mark_dirty(self.root / "lib" / "deep" / "b.py")
+
+            merged = manifest_module.get_or_build_manifest()
+
+        self.assertEqual(merged.rebuilt_shards, ["lib"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 import os
 import sys
+import threading
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -197,5 +198,83 @@ class TestMemoryLimitedIndexer(unittest.TestCase):
         self.assertGreaterEqual(indexer.total_batches, 3)
 
 
+class TestAdaptiveFlushing(unittest.TestCase):
+    def test_flush_overlaps_with_next_batch(self):
+        release = threading.Event()
+        received = []
+
+        def slow_callback(docs, metas, ids):
+            release.wait(5)
+            received.append(list(ids))
+
+        indexer = MemoryLimitedIndexer(8000, slow_callback)
+        for i in range(20):
+            indexer.add_chunk("x" * 100, {"source": "f.py"}, f"id{i}")
+            if indexer.get_stats()["flush_in_flight"]:
+                break
+        # The first batch is still being flushed while the next one fills
+        self.assertEqual(received, [])
+        indexer.add_chunk("y", {"source": "g.py"}, "next")
+        self.assertIn("next", indexer.ids)
+        self.assertEqual(received, [])
+
+        release.set()
+        indexer.flush()
+
+        flushed = [doc_id for batch in received for doc_id in batch]
+        self.assertEqual(flushed[-1], "next")
+        self.assertEqual(len(flushed), indexer.total_chunks)
+        self.assertEqual(indexer.get_stats()["current_buffer_chunks"], 0)
+
+    def test_background_flush_error_surfaces_on_flush(self):
+        calls = []
+
+        def failing_callback(docs, metas, ids):
+            calls.append(len(docs))
+            raise ValueError("upsert failed")
+
+        indexer = MemoryLimitedIndexer(1000, failing_callback)
+        for i in range(10):
+            indexer.add_chunk("x" * 100, {"source": "f.py"}, f"id{i}")
+            if indexer._flusher is not None:
+                break
+
+        with self.assertRaises(ValueError):
+            indexer.flush()
+        self.assertEqual(indexer.get_stats()["current_buffer_chunks"], 0)
+
+    def test_target_shrinks_under_rss_pressure_and_grows_otherwise(self):
+        indexer = MemoryLimitedIndexer(64 * 1024, lambda d, m, i: None, overlap=False)
+        start = indexer.target_bytes
+
+        with patch("memory_limited_indexer.current_rss_bytes", side_effect=[0, 0]):
+            indexer.add_chunk("doc", {"source": "f.py"}, "id0")
+            indexer.flush()
+        grown = indexer.target_bytes
+        with patch("memory_limited_indexer.current_rss_bytes", side_effect=[0, 10**9]):
+            indexer.add_chunk("doc", {"source": "f.py"}, "id1")
+            indexer.flush()
+
+        self.assertGreater(grown, start)
+        self.assertLess(indexer.target_bytes, grown)
+        self.assertGreaterEqual(indexer.target_bytes, indexer.min_target)
+
+    def test_stats_report_per_batch_latency_and_bytes(self):
+        max_memory = 1024 * 1024
+        indexer = MemoryLimitedIndexer(max_memory, lambda d, m, i: None)
+
+        indexer.add_chunk("doc1", {"source": "f.py"}, "id1")
+        indexer.flush()
+        stats = indexer.get_stats()
+
+        batch = stats["recent_batches"][0]
+        self.assertEqual(batch["chunks"], 1)
+        self.assertGreater(batch["bytes"], 0)
+        self.assertGreaterEqual(batch["latency_s"], 0)
+        self.assertEqual(stats["bytes_flushed"], batch["bytes"])
+        self.assertLessEqual(stats["target_batch_bytes"], max_memory // 2)
+        self.assertIsNotNone(stats["avg_batch_latency_s"])
+
+
 if __name__ == "__main__":
     unittest.main()
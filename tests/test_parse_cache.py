@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parse_cache import ParseCache, content_hash
+
+
+class TestParseCache(unittest.TestCase):
+    def test_tree_is_parsed_once_per_content(self):
+        cache = ParseCache(capacity=4, spill=False)
+        parser = MagicMock()
+
+        first = cache.tree("a.py", "x = 1\n", "python", parser)
+        second = cache.tree("a.py", "x = 1\n", "python", parser)
+
+        self.assertIs(first, second)
+        parser.parse.assert_called_once_with(b"x = 1\n")
+        self.assertEqual(cache.get_stats()["parses"], 1)
+
+    def test_changed_content_misses(self):
+        cache = ParseCache(capacity=4, spill=False)
+        parser = MagicMock()
+
+        cache.tree("a.py", "x = 1\n", "python", parser)
+        cache.tree("a.py", "x = 2\n", "python", parser)
+
+        self.assertEqual(parser.parse.call_count, 2)
+
+    def test_derive_computes_once(self):
+        cache = ParseCache(capacity=4, spill=False)
+        compute = MagicMock(return_value=["os"])
+
+        self.assertEqual(cache.derive("a.py", b"import os", "python", "imports", compute), ["os"])
+        self.assertEqual(cache.derive("a.py", "import os", "python", "imports", compute), ["os"])
+
+        compute.assert_called_once()
+        stats = cache.get_stats()
+        self.assertEqual(stats["derive_hits"], 1)
+        self.assertEqual(stats["derive_misses"], 1)
+
+    def test_capacity_is_bounded(self):
+        cache = ParseCache(capacity=2, spill=False)
+        for i in range(5):
+            cache.derive(f"f{i}.py", "", "python", "symbols", lambda: [])
+
+        self.assertEqual(cache.get_stats()["size"], 2)
+
+    def test_spill_revives_derived_artifacts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch("config.AI_DIR", Path(tmp)):
+                cache = ParseCache(capacity=1, spill=True)
+                cache.derive("a.py", "a", "python", "symbols", lambda: ["A"])
+                cache.derive("b.py", "b", "python", "symbols", lambda: ["B"])
+
+                compute = MagicMock(return_value=["stale"])
+                self.assertEqual(cache.derive("a.py", "a", "python", "symbols", compute), ["A"])
+
+                compute.assert_not_called()
+                self.assertEqual(cache.get_stats()["spill_loads"], 1)
+
+    def test_content_hash_matches_for_str_and_bytes(self):
+        self.assertEqual(content_hash("héllo"), content_hash("héllo".encode()))
+
+
+class TestParseCacheIntegration(unittest.TestCase):
+    def test_complexity_reuses_splitter_tree(self):
+        from ast_splitter import ASTSplitter, _get_parser
+        from code_intelligence import compute_file_complexity_ast
+        from parse_cache import get_parse_cache
+
+        if _get_parser("python") is None:
+            self.skipTest("tree-sitter-python not installed")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "mod.py"
+            path.write_text("def f(x):\n    if x:\n        return 1\n    return 0\n")
+
+            cache = get_parse_cache()
+            ASTSplitter().split(path.read_text(), path)
+            parses = cache.parses
+
+            result = compute_file_complexity_ast(path)
+
+            self.assertEqual(result, [("f", 1, 2)])
+            self.assertEqual(cache.parses, parses)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parse_cache import get_parse_cache
+from parser_pool import ParserPool, get_parser_pool
+
+
+class TestParserPool(unittest.TestCase):
+    @patch("parser_pool.load_language", side_effect=ImportError("no grammar"))
+    def test_load_failure_is_cached(self, mock_load):
+        pool = ParserPool(max_per_language=2)
+
+        self.assertIsNone(pool.acquire("cobol"))
+        self.assertIsNone(pool.acquire("cobol"))
+
+        mock_load.assert_called_once()
+        self.assertEqual(pool.get_stats()["unavailable"], ["cobol"])
+
+    @patch("tree_sitter.Parser", side_effect=lambda lang: MagicMock())
+    @patch("parser_pool.load_language", return_value=object())
+    def test_checkout_is_bounded_and_reuses_parsers(self, _mock_load, _mock_parser):
+        pool = ParserPool(max_per_language=1)
+        first = pool.acquire("python")
+        acquired = []
+
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire("python")))
+        waiter.start()
+        waiter.join(timeout=0.2)
+        self.assertTrue(waiter.is_alive())
+
+        pool.release("python", first)
+        waiter.join(timeout=2)
+
+        self.assertEqual(acquired, [first])
+        self.assertEqual(pool.get_stats()["created"], {"python": 1})
+
+    def test_concurrent_splits_match_serial(self):
+        from ast_splitter import ASTSplitter
+
+        if get_parser_pool().language("python") is None:
+            self.skipTest("tree-sitter-python not installed")
+
+        sources = {
+            Path(f"pkg/concurrent_{i}.py"): f"def f{i}(x):\n    return x + {i}\n\nclass C{i}:\n"
+            f"    def m(self):\n        return {i}\n"
+            for i in range(16)
+        }
+        serial = {p: ASTSplitter().split(c, p) for p, c in sources.items()}
+        get_parse_cache().clear()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            parallel = dict(
+                zip(
+                    sources,
+                    executor.map(
+                        lambda item: ASTSplitter().split(item[1], item[0]), sources.items()
+                    ),
+                    strict=True,
+                )
+            )
+
+        self.assertEqual(parallel, serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resource_policy
+from resource_policy import (
+    background_cpu_budget,
+    cgroup_cpu_limit,
+    effective_cpu_count,
+    enter_background,
+    get_resource_status,
+    interactive_call,
+    throttle,
+    throttle_run,
+)
+
+
+class TestCgroupLimit(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "cgroup"
+        self.proc = Path(self.tmp.name) / "proc_cgroup"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel, text):
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    def test_v2_takes_tightest_quota_of_cgroup_and_ancestors(self):
+        self.proc.write_text("0::/app/worker\n")
+        self._write("app/cpu.max", "150000 100000\n")
+        self._write("app/worker/cpu.max", "max 100000\n")
+
+        self.assertEqual(cgroup_cpu_limit(self.root, self.proc), 1.5)
+
+    def test_v1_cfs_quota(self):
+        self.proc.write_text("4:memory:/\n2:cpu,cpuacct:/\n")
+        self._write("cpu,cpuacct/cpu.cfs_quota_us", "200000\n")
+        self._write("cpu,cpuacct/cpu.cfs_period_us", "100000\n")
+
+        self.assertEqual(cgroup_cpu_limit(self.root, self.proc), 2.0)
+
+    def test_unlimited_or_missing_is_none(self):
+        self.proc.write_text("2:cpu:/\n")
+        self._write("cpu/cpu.cfs_quota_us", "-1\n")
+        self._write("cpu/cpu.cfs_period_us", "100000\n")
+
+        self.assertIsNone(cgroup_cpu_limit(self.root, self.proc))
+        self.assertIsNone(cgroup_cpu_limit(self.root, Path(self.tmp.name) / "missing"))
+
+
+class TestCpuBudget(unittest.TestCase):
+    def tearDown(self):
+        effective_cpu_count.cache_clear()
+
+    def test_quota_caps_affinity(self):
+        effective_cpu_count.cache_clear()
+        with (
+            patch("resource_policy.os.sched_getaffinity", return_value=set(range(16))),
+            patch("resource_policy.cgroup_cpu_limit", return_value=2.5),
+        ):
+            self.assertEqual(effective_cpu_count(), 3)
+
+    def test_low_impact_halves_budget_unless_overridden(self):
+        with patch("resource_policy.effective_cpu_count", return_value=6):
+            with patch.dict(os.environ, {"PROJECTMIND_LOW_IMPACT": "1"}):
+                self.assertEqual(background_cpu_budget(), 3)
+            with patch.dict(os.environ, {"PROJECTMIND_LOW_IMPACT": "0"}):
+                self.assertEqual(background_cpu_budget(), 6)
+            with patch.dict(os.environ, {"PROJECTMIND_BACKGROUND_THREADS": "2"}):
+                self.assertEqual(background_cpu_budget(), 2)
+
+
+class TestThrottle(unittest.TestCase):
+    def setUp(self):
+        resource_policy.reset()
+        self.patches = [
+            patch.dict(os.environ, {"PROJECTMIND_LOW_IMPACT": "1"}),
+            patch("resource_policy.THROTTLE_MIN_SLEEP", 0.01),
+            patch("resource_policy.THROTTLE_MAX_WAIT", 0.05),
+            patch("resource_policy.INTERACTIVE_QUIET_SECONDS", 0.0),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        resource_policy.reset()
+
+    def _in_background(self, fn):
+        result = {}
+
+        def run():
+            result["applied"] = enter_background("test-worker")
+            result["value"] = fn()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join(5)
+        return result
+
+    def test_foreground_threads_are_never_throttled(self):
+        with interactive_call():
+            self.assertEqual(throttle(), 0.0)
+
+    def test_background_yields_while_a_call_is_in_flight(self):
+        with interactive_call():
+            busy = self._in_background(throttle)
+        idle = self._in_background(throttle)
+
+        self.assertGreater(busy["value"], 0.0)
+        self.assertLessEqual(busy["value"], 0.1)
+        self.assertEqual(idle["value"], 0.0)
+        status = get_resource_status()
+        self.assertEqual(status["throttled_waits"], 1)
+        self.assertEqual(status["interactive_calls"], 1)
+        self.assertEqual(status["in_flight"], 0)
+
+    def test_waits_are_capped_per_run(self):
+        def run():
+            with throttle_run():
+                return [throttle() for _ in range(4)]
+
+        with patch("resource_policy.THROTTLE_RUN_MAX_WAIT", 0.08), interactive_call():
+            waits = self._in_background(run)["value"]
+
+        self.assertGreater(waits[0], 0.0)
+        self.assertLessEqual(sum(waits), 0.1)
+        self.assertEqual(waits[-1], 0.0)
+
+    def test_background_thread_priority_is_reported(self):
+        with patch.dict(os.environ, {"PROJECTMIND_BACKGROUND_NICE": "7"}):
+            result = self._in_background(lambda: None)
+
+        applied = result["applied"]
+        if hasattr(os, "setpriority"):
+            expected = f"nice {max(7, os.getpriority(os.PRIO_PROCESS, 0))}"
+            self.assertIn(applied["cpu"], (expected, "failed (Permission denied)"))
+        self.assertEqual(get_resource_status()["threads"]["test-worker"], applied)
+
+
+class TestStatusPolling(unittest.TestCase):
+    def setUp(self):
+        resource_policy.reset()
+        self.patches = [
+            patch.dict(os.environ, {"PROJECTMIND_LOW_IMPACT": "1"}),
+            patch("resource_policy.THROTTLE_MAX_WAIT", 0.5),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        resource_policy.reset()
+
+    def test_polling_job_status_does_not_stall_background_work(self):
+        from mcp_server import mcp
+
+        stop = threading.Event()
+        polls = []
+
+        def poll():
+            while not stop.is_set():
+                polls.append(asyncio.run(mcp.call_tool("index_job_status", {})))
+                stop.wait(0.01)
+
+        done = []
+
+        def job():
+            enter_background("test-worker")
+            with throttle_run():
+                for unit in range(20):
+                    throttle()
+                    done.append(unit)
+
+        poller = threading.Thread(target=poll)
+        poller.start()
+        try:
+            while not polls:
+                stop.wait(0.01)
+            worker = threading.Thread(target=job)
+            worker.start()
+            worker.join(2)
+        finally:
+            stop.set()
+            poller.join(5)
+
+        self.assertEqual(len(done), 20)
+        status = get_resource_status()
+        self.assertEqual((status["interactive_calls"], status["throttled_waits"]), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
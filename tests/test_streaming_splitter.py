@@ -0,0 +1,176 @@
+import os
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ast_splitter import ASTSplitter
+from codebase_indexer import CodebaseIndexer
+from streaming_splitter import StreamingSplitter, iter_segments
+
+
+def python_source(functions):
+    return "".join(
+        f"def handler_{i}(request):\n"
+        f"    value = request.get('key_{i}', {i})\n"
+        f"    return value * 2\n\n\n"
+        for i in range(functions)
+    )
+
+
+def client_source(classes, methods):
+    return "".join(
+        f"class Client{c}:\n"
+        + "".join(
+            f"    def call_{m}(self, request):\n"
+            f"        return self.transport.send('/api/v1/resource_{m}', request, retries=3)\n\n"
+            for m in range(methods)
+        )
+        + "\n\n"
+        for c in range(classes)
+    )
+
+
+class TestIterSegments(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_windows_cover_file_and_end_at_top_level_definitions(self):
+        path = self.root / "big.py"
+        path.write_text(python_source(2000))
+
+        segments = list(iter_segments(path, 8192))
+
+        self.assertGreater(len(segments), 10)
+        self.assertEqual(b"".join(s.data for s in segments), path.read_bytes())
+        for previous, segment in zip(segments, segments[1:], strict=False):
+            self.assertLessEqual(len(previous.data), 8192)
+            self.assertTrue(segment.data.startswith(b"def handler_"))
+            self.assertEqual(segment.first_line, previous.first_line + previous.data.count(b"\n"))
+
+    def test_long_line_is_cut_on_a_character_boundary(self):
+        path = self.root / "data.json"
+        path.write_text('["' + "ключ-值" * 5000 + '"]', encoding="utf-8")
+
+        segments = list(iter_segments(path, 4099))
+
+        self.assertGreater(len(segments), 1)
+        for segment in segments:
+            segment.data.decode("utf-8")
+        self.assertEqual(b"".join(s.data for s in segments), path.read_bytes())
+
+    def test_empty_file_has_no_segments(self):
+        path = self.root / "empty.sql"
+        path.write_bytes(b"")
+
+        self.assertEqual(list(iter_segments(path)), [])
+
+
+class TestStreamingSplitter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "big.py"
+        self.path.write_text(python_source(3000))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chunks_have_file_lines_and_unique_ids(self):
+        streaming = StreamingSplitter(ASTSplitter(), window_bytes=16384)
+        lines = self.path.read_text().splitlines()
+
+        chunks = list(streaming.chunks(self.path))
+
+        self.assertGreater(streaming.windows, 5)
+        functions = [c for c in chunks if c["metadata"]["symbol_type"] == "function"]
+        self.assertEqual(len(functions), 3000)
+        for chunk in functions[::250]:
+            meta = chunk["metadata"]
+            self.assertEqual(lines[meta["line_start"] - 1], f"def {meta['symbol_name']}(request):")
+        keys = [
+            (m["symbol_type"], m["class_name"], m["symbol_name"], m["chunk_index"])
+            for m in (c["metadata"] for c in chunks)
+        ]
+        self.assertEqual(len(keys), len(set(keys)))
+
+    def test_class_spanning_windows_gives_unique_chunk_ids(self):
+        path = self.path.with_name("client.py")
+        path.write_text(client_source(3, 400))
+        streaming = StreamingSplitter(ASTSplitter(), window_bytes=16384)
+        indexer = CodebaseIndexer(MagicMock())
+        sink = MagicMock()
+
+        chunks = list(streaming.chunks(path))
+        ids = [indexer._add_chunk(path, chunk, sink) for chunk in chunks]
+
+        self.assertGreater(streaming.windows, 6)
+        self.assertGreater(sum(1 for c in chunks if not c["metadata"]["class_name"]), 0)
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def _peak(self, path):
+        streaming = StreamingSplitter(ASTSplitter(), window_bytes=16384)
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in streaming.chunks(path))
+            return count, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_peak_memory_does_not_grow_with_file_size(self):
+        bigger = self.path.with_name("bigger.py")
+        bigger.write_text(python_source(12000))
+
+        # The first run also allocates parsers, queries and the text splitter
+        self._peak(self.path)
+        count, peak = self._peak(self.path)
+        bigger_count, bigger_peak = self._peak(bigger)
+
+        self.assertEqual((count, bigger_count), (3000, 12000))
+        self.assertLess(bigger_peak, 1.5 * peak)
+        self.assertLess(bigger_peak, bigger.stat().st_size)
+
+
+class TestIndexerStreamsLargeFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "schema.py"
+        self.path.write_text(python_source(400))
+        self.patches = [
+            patch("codebase_indexer.get_max_file_size_bytes", return_value=4096),
+            patch("streaming_splitter.WINDOW_BYTES", 8192),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def test_large_file_is_streamed_not_skipped(self):
+        indexer = CodebaseIndexer(MagicMock())
+        sink = MagicMock()
+
+        self.assertTrue(indexer.should_index_file(self.path, []))
+        chunk_ids = indexer._chunk_file(self.path, sink)
+
+        self.assertEqual(len(chunk_ids), sink.add_chunk.call_count)
+        self.assertEqual(len(chunk_ids), len(set(chunk_ids)))
+        self.assertGreaterEqual(len(chunk_ids), 400)
+
+    def test_streaming_limit_still_skips_huge_files(self):
+        indexer = CodebaseIndexer(MagicMock())
+        with patch.dict(os.environ, {"PROJECTMIND_MAX_STREAM_FILE_SIZE_MB": "0"}):
+            self.assertFalse(indexer.should_index_file(self.path, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
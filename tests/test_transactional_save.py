@@ -8,7 +8,7 @@ from pathlib import Path
 
 sys.path.append(os.getcwd())
 
-from config import INDEX_METADATA_FILE
+from config import INDEX_META_DB, INDEX_METADATA_FILE
 from incremental_indexing import IndexMetadata, atomic_write
 
 
@@ -95,7 +95,7 @@ def test_metadata_save_load() -> None:
 
     metadata.save()
 
-    assert INDEX_METADATA_FILE.exists()
+    assert INDEX_META_DB.exists()
 
     new_metadata = IndexMetadata()
 
@@ -173,9 +173,9 @@ def test_no_temp_files_left() -> None:
 
 def cleanup_test_metadata():
     """Clean up test metadata file"""
-    if INDEX_METADATA_FILE.exists():
+    for path in (INDEX_METADATA_FILE, INDEX_META_DB):
         try:
-            INDEX_METADATA_FILE.unlink()
+            path.unlink(missing_ok=True)
         except OSError:
             pass
 
@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ast_splitter import ASTSplitter, _get_parser
+from ts_queries import (
+    get_kinds_query,
+    get_top_level_query,
+    kinds_query_source,
+    run_captures,
+    top_level_query_source,
+)
+
+SOURCE = b"""import os
+
+@decorator
+def first(x):
+    def nested():
+        if x:
+            return 1
+    return x if x else 0
+
+
+class Widget:
+    def render(self):
+        for i in range(3):
+            pass
+"""
+
+
+class TestQuerySources(unittest.TestCase):
+    def test_top_level_source(self):
+        self.assertEqual(
+            top_level_query_source("module", ["class_definition", "function_definition"]),
+            "(module [(class_definition) (function_definition)] @definition)",
+        )
+
+    def test_kinds_source_has_one_pattern_per_capture(self):
+        source = kinds_query_source({"function": ["a"], "branch": ["b", "c"]})
+
+        self.assertEqual(source, "[(a)] @function\n[(b) (c)] @branch")
+
+    def test_unusable_grammar_yields_none(self):
+        parser = MagicMock()
+        parser.language.id_for_node_kind.return_value = None
+
+        self.assertIsNone(get_kinds_query("nolang", "test", parser, {"x": ["missing"]}))
+
+
+@unittest.skipIf(_get_parser("python") is None, "tree-sitter-python not installed")
+class TestCompiledQueries(unittest.TestCase):
+    def setUp(self):
+        self.parser = _get_parser("python")
+        self.root = self.parser.parse(SOURCE).root_node
+
+    def test_top_level_query_captures_only_root_children(self):
+        query = get_top_level_query(
+            "python",
+            self.parser,
+            ["function_definition", "class_definition", "decorated_definition", "bogus_kind"],
+        )
+
+        nodes = run_captures(query, self.root, max_start_depth=0)["definition"]
+
+        self.assertEqual([n.type for n in nodes], ["decorated_definition", "class_definition"])
+
+    def test_query_split_matches_python_walk(self):
+        path = Path("pkg/query_example.py")
+        with_queries = ASTSplitter().split(SOURCE.decode(), path)
+
+        with patch("ast_splitter.get_top_level_query", return_value=None):
+            walked = ASTSplitter().split(SOURCE.decode() + "\n", path)
+
+        self.assertEqual(
+            [c["metadata"]["symbol_name"] for c in with_queries],
+            [c["metadata"]["symbol_name"] for c in walked],
+        )
+
+    def test_query_complexity_matches_python_walk(self):
+        from code_intelligence import compute_file_complexity_ast
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "mod.py"
+            path.write_bytes(SOURCE)
+            with_queries = compute_file_complexity_ast(path)
+
+            path.write_bytes(SOURCE + b"\n")
+            with patch("code_intelligence.get_kinds_query", return_value=None):
+                walked = compute_file_complexity_ast(path)
+
+        self.assertEqual(with_queries, walked)
+        self.assertEqual(with_queries[0], ("first", 4, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
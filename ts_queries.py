@@ -0,0 +1,144 @@
+"""
+Compiled tree-sitter queries.
+
+Queries are generated from the node-type tables that already drive splitting
+and complexity analysis (`ast_splitter.TOP_LEVEL_NODES`,
+`code_intelligence._BRANCH_NODES` / `_FUNCTION_NODES`), so there is a single
+source of truth per language. Node kinds a grammar does not define are
+dropped before compiling, and a query that still fails to compile is cached as
+None so callers fall back to walking the tree in Python.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from threading import Lock
+from typing import Any
+
+from logger import get_logger
+
+logger = get_logger()
+
+# Root node kind of each grammar; top-level definitions are its direct children.
+ROOT_NODES: dict[str, str] = {
+    "python": "module",
+    "javascript": "program",
+    "typescript": "program",
+    "tsx": "program",
+    "java": "program",
+    "go": "source_file",
+    "rust": "source_file",
+    "ruby": "program",
+}
+
+_queries: dict[tuple[str, str], Any] = {}
+_queries_lock = Lock()
+
+
+def _known_kinds(language: Any, kinds: Iterable[str]) -> list[str]:
+    return sorted(k for k in kinds if language.id_for_node_kind(k, True))
+
+
+def top_level_query_source(root: str, kinds: list[str]) -> str:
+    """Query matching direct children of the root whose type is one of kinds."""
+    alternatives = " ".join(f"({k})" for k in kinds)
+    return f"({root} [{alternatives}] @definition)"
+
+
+def kinds_query_source(captures: dict[str, list[str]]) -> str:
+    """Query matching nodes at any depth, one alternation pattern per capture name."""
+    patterns = []
+    for capture, kinds in captures.items():
+        alternatives = " ".join(f"({k})" for k in kinds)
+        patterns.append(f"[{alternatives}] @{capture}")
+    return "\n".join(patterns)
+
+
+def _compile(language_name: str, purpose: str, build: Callable[[Any], str], parser: Any) -> Any:
+    key = (language_name, purpose)
+    if key in _queries:
+        return _queries[key]
+
+    with _queries_lock:
+        if key in _queries:
+            return _queries[key]
+        query = None
+        try:
+            from tree_sitter import Query
+
+            source = build(parser.language)
+            if source:
+                query = Query(parser.language, source)
+        except Exception as e:
+            logger.debug(f"Could not compile {purpose} query for {language_name}: {e}")
+        _queries[key] = query
+        return query
+
+
+def get_top_level_query(language_name: str, parser: Any, kinds: Iterable[str]) -> Any | None:
+    """
+    Returns the compiled query capturing top-level definitions as "@definition".
+
+    Args:
+        language_name: tree-sitter language name ("python", "go", ...)
+        parser: Parser whose language the query is compiled for
+        kinds: Definition node kinds (direct children of the root node)
+
+    Returns:
+        Compiled Query, or None if the grammar or query is unusable
+    """
+
+    def build(language: Any) -> str:
+        root = ROOT_NODES.get(language_name, "")
+        known = _known_kinds(language, kinds)
+        if not known or not language.id_for_node_kind(root, True):
+            return ""
+        return top_level_query_source(root, known)
+
+    return _compile(language_name, "definitions", build, parser)
+
+
+def get_kinds_query(
+    language_name: str, purpose: str, parser: Any, captures: dict[str, Iterable[str]]
+) -> Any | None:
+    """
+    Returns a compiled query capturing nodes of the given kinds at any depth.
+    All captures are collected in a single native pass over the tree.
+
+    Args:
+        language_name: tree-sitter language name
+        purpose: Cache key for the query ("complexity", ...)
+        parser: Parser whose language the query is compiled for
+        captures: Capture name -> node kinds
+
+    Returns:
+        Compiled Query, or None if any capture has no kinds known to the grammar
+    """
+
+    def build(language: Any) -> str:
+        known = {name: _known_kinds(language, kinds) for name, kinds in captures.items()}
+        if not all(known.values()):
+            return ""
+        return kinds_query_source(known)
+
+    return _compile(language_name, purpose, build, parser)
+
+
+def run_captures(query: Any, node: Any, max_start_depth: int | None = None) -> dict[str, list[Any]]:
+    """
+    Runs a query natively and returns captured nodes per capture name in source order.
+
+    Args:
+        query: Compiled query
+        node: Node to search under
+        max_start_depth: Only start matches this deep below node (0 = node's own pattern)
+    """
+    from tree_sitter import QueryCursor
+
+    cursor = QueryCursor(query)
+    if max_start_depth is not None:
+        cursor.set_max_start_depth(max_start_depth)
+    return {
+        name: sorted(nodes, key=lambda n: (n.start_byte, -n.end_byte))
+        for name, nodes in cursor.captures(node).items()
+    }
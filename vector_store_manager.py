@@ -9,6 +9,11 @@ from logger import get_logger
 
 logger = get_logger()
 
+# A forced rebuild writes into "<collection>__staging" and swaps it in when done
+STAGING_SUFFIX = "__staging"
+# The replaced collection is kept under this name until the swap has succeeded
+BACKUP_SUFFIX = "__previous"
+
 
 class VectorStoreManager:
     """
@@ -28,6 +33,8 @@ class VectorStoreManager:
         self.collection_name = collection_name
         self.chroma_client: Any = None
         self.collection: Any = None
+        # Write target of a rebuild in progress; queries keep using `collection`
+        self.staging: Any = None
         self.embedding_fn: Any = None
         self._initialized = False
         self._query_cache = TTLCache(ttl_seconds=300, max_size=100)
@@ -52,6 +59,7 @@ class VectorStoreManager:
         try:
             self.embedding_fn = None
             self.collection = None
+            self.staging = None
             self._initialized = False
             self._query_cache.cache.clear() if hasattr(self._query_cache, "cache") else None
         except Exception:
@@ -74,9 +82,12 @@ class VectorStoreManager:
             from chromadb.utils import embedding_functions
             from sentence_transformers import SentenceTransformer
 
+            from resource_policy import limit_torch_threads
+
             class LocalSentenceTransformerEmbeddingFunction(embedding_functions.EmbeddingFunction):  # type: ignore[type-arg]
                 def __init__(self, model_name: str) -> None:
                     logger.info(f"Loading SentenceTransformer model '{model_name}'...")
+                    limit_torch_threads()
                     self.model = SentenceTransformer(model_name)
                     logger.info("Model loaded successfully")
 
@@ -138,6 +149,96 @@ class VectorStoreManager:
             logger.error(error_msg)
             return error_msg
 
+    def _create_collection(self, name: str) -> Any:
+        return self.chroma_client.get_or_create_collection(
+            name=name,
+            embedding_function=self.embedding_fn,
+            metadata={"hnsw:space": "cosine"},
+        )
+
+    def begin_rebuild(self, resume: bool = False) -> str | None:
+        """
+        Starts a full rebuild into a staging collection. Upserts go there while
+        queries keep serving the current collection until commit_rebuild().
+
+        Args:
+            resume: Keep what an interrupted rebuild already wrote to staging
+
+        Returns:
+            Error message if failed, None if successful
+        """
+        if not self.chroma_client:
+            return "ChromaDB client not initialized"
+
+        name = self.collection_name + STAGING_SUFFIX
+        try:
+            if not resume:
+                self._drop_collection(name)
+            self.staging = self._create_collection(name)
+            logger.info(f"Rebuilding into staging collection '{name}'")
+            return None
+        except Exception as e:
+            error_msg = f"Error creating staging collection: {e}"
+            logger.error(error_msg)
+            return error_msg
+
+    def commit_rebuild(self) -> str | None:
+        """
+        Replaces the served collection with the staging collection.
+
+        The live collection is renamed to a backup, the staging collection is
+        renamed into place, and only then is the backup dropped. If the second
+        rename fails, the backup is renamed back and keeps serving queries.
+
+        Returns:
+            Error message if failed, None if successful (or no rebuild was active)
+        """
+        if self.staging is None:
+            return None
+        backup_name = self.collection_name + BACKUP_SUFFIX
+        live = self.collection
+        try:
+            # Left over from a swap that crashed after its first rename
+            self._drop_collection(backup_name)
+            if live is not None:
+                live.modify(name=backup_name)
+        except Exception as e:
+            error_msg = f"Error swapping in rebuilt collection: {e}"
+            logger.error(error_msg)
+            return error_msg
+        try:
+            self.staging.modify(name=self.collection_name)
+        except Exception as e:
+            error_msg = f"Error swapping in rebuilt collection: {e}"
+            if live is not None:
+                try:
+                    live.modify(name=self.collection_name)
+                except Exception as restore_error:
+                    error_msg += (
+                        f" (restoring the previous collection also failed: {restore_error})"
+                    )
+            logger.error(error_msg)
+            return error_msg
+        self.collection = self.staging
+        self.staging = None
+        self._query_cache.clear()
+        self._drop_collection(backup_name)
+        logger.info(f"Collection '{self.collection_name}' replaced by the rebuilt index")
+        return None
+
+    def abort_rebuild(self) -> None:
+        """Drops the staging collection of an abandoned rebuild."""
+        self.staging = None
+        if self.chroma_client:
+            self._drop_collection(self.collection_name + STAGING_SUFFIX)
+
+    def _drop_collection(self, name: str) -> None:
+        try:
+            self.chroma_client.delete_collection(name)
+        except Exception:
+            # Chroma raises when the collection does not exist
+            pass
+
     def get_count(self) -> int | None:
         """
         Gets the number of items in the collection.
@@ -234,7 +335,32 @@ class VectorStoreManager:
         """
         return self._query_cache.get_stats()
 
-    def upsert(self, documents: list[str], metadatas: list[dict], ids: list[str]) -> bool:
+    def embed(self, texts: list[str]) -> list[list[float]] | None:
+        """
+        Encodes texts with the loaded embedding model.
+
+        Args:
+            texts: Texts to encode
+
+        Returns:
+            One embedding per text, or None if the model is unavailable
+        """
+        if self.get_collection() is None or self.embedding_fn is None:
+            return None
+        try:
+            embeddings: list[list[float]] = self.embedding_fn(texts)
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error computing embeddings: {e}", exc_info=True)
+            return None
+
+    def upsert(
+        self,
+        documents: list[str],
+        metadatas: list[dict],
+        ids: list[str],
+        embeddings: list[list[float]] | None = None,
+    ) -> bool:
         """
         Upserts documents into the collection.
 
@@ -242,21 +368,50 @@ class VectorStoreManager:
             documents: List of document texts
             metadatas: List of metadata dicts
             ids: List of document IDs
+            embeddings: Precomputed embeddings (e.g. of minified text). When omitted
+                the collection embeds `documents` itself.
 
         Returns:
             True if successful, False otherwise
         """
-        coll = self.get_collection()
+        coll = self.staging if self.staging is not None else self.get_collection()
         if coll is None:
             return False
 
         try:
-            coll.upsert(documents=documents, metadatas=metadatas, ids=ids)
+            if embeddings is not None:
+                coll.upsert(
+                    documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings
+                )
+            else:
+                coll.upsert(documents=documents, metadatas=metadatas, ids=ids)
             return True
         except Exception as e:
             logger.error(f"Error upserting to collection: {e}", exc_info=True)
             return False
 
+    def delete(self, ids: list[str]) -> bool:
+        """
+        Deletes chunks by id from the collection being written (the staging
+        collection during a rebuild). Unknown ids are ignored.
+
+        Args:
+            ids: Chunk ids to delete
+
+        Returns:
+            True if successful, False otherwise
+        """
+        coll = self.staging if self.staging is not None else self.get_collection()
+        if coll is None:
+            return False
+
+        try:
+            coll.delete(ids=ids)
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting from collection: {e}", exc_info=True)
+            return False
+
     def get_all_documents(self) -> tuple[list[str], list[str], list[dict[str, Any]]]:
         """
         Fetches all documents from ChromaDB for BM25 rebuild.